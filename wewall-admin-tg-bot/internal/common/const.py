@@ -8,6 +8,7 @@ REQUEST_ID_KEY = "request_id"
 EXTRA_LOG_FIELDS_KEY = "extra"
 FILE_KEY = "file"
 ERROR_KEY = "error"
+OUTCOME_KEY = "outcome"
 
 HTTP_METHOD_KEY = "http.request.method"
 HTTP_STATUS_KEY = "http.response.status_code"
@@ -25,6 +26,8 @@ TELEGRAM_CALLBACK_QUERY_DATA_KEY = "telegram.callback_query.data"
 TELEGRAM_MESSAGE_DURATION_KEY = "telegram.message.duration"
 TELEGRAM_MESSAGE_DIRECTION_KEY = "telegram.message.direction"
 TELEGRAM_CHAT_TYPE_KEY = "telegram.chat.type"
+TELEGRAM_HANDLER_KEY = "telegram.handler"
+STATE_STATUS_KEY = "state.status"
 
 REQUEST_DURATION_METRIC = "http.server.request.duration"
 ACTIVE_REQUESTS_METRIC = "http.server.active_requests"
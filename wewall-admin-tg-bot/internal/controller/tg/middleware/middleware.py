@@ -36,13 +36,13 @@ class TgMiddleware(interface.ITelegramMiddleware):
         )
 
         self.message_duration = self.meter.create_histogram(
-            name=common.REQUEST_DURATION_METRIC,
+            name=common.MESSAGE_DURATION_METRIC,
             description="Message duration in seconds",
             unit="s"
         )
 
         self.active_messages = self.meter.create_up_down_counter(
-            name=common.ACTIVE_REQUESTS_METRIC,
+            name=common.ACTIVE_MESSAGES_METRIC,
             description="Number of active messages",
             unit="1"
         )
@@ -110,52 +110,34 @@ class TgMiddleware(interface.ITelegramMiddleware):
             start_time = time.time()
             self.active_messages.add(1)
 
-            message = event.message if event.message is not None else event.callback_query.message
-            event_type = "message" if event.message is not None else "callback_query"
-            message_id = message.message_id
-            if event_type == "message":
-                user_username = message.from_user.username
-            else:
-                user_username = event.callback_query.from_user.username
-            tg_chat_id = message.chat.id
-            if message.text is not None:
-                message_text = message.text
-            else:
-                message_text = "Изображение"
-            callback_query_data = event.callback_query.data if event.callback_query is not None else ""
-            trace_id = data["trace_id"]
-            span_id = data["span_id"]
-
+            # В метрики идут только метки с ограниченным набором значений: чат, пользователь и текст
+            # остаются в спанах и логах, а trace_id попадает в exemplars
             request_attrs: dict = {
-                common.TELEGRAM_EVENT_TYPE_KEY: event_type,
-                common.TELEGRAM_CHAT_ID_KEY: tg_chat_id,
-                common.TELEGRAM_USER_USERNAME_KEY: user_username,
-                common.TELEGRAM_USER_MESSAGE_KEY: message_text,
-                common.TELEGRAM_MESSAGE_ID_KEY: message_id,
-                common.TELEGRAM_CALLBACK_QUERY_DATA_KEY: callback_query_data,
-                common.TRACE_ID_KEY: trace_id,
-                common.SPAN_ID_KEY: span_id,
+                common.TELEGRAM_EVENT_TYPE_KEY: "message" if event.message is not None else "callback_query",
+                common.TELEGRAM_HANDLER_KEY: self.__handler_name(event),
             }
 
             try:
                 await handler(event, data)
 
-                duration_seconds = time.time() - start_time
-
-                request_attrs[common.HTTP_REQUEST_DURATION_KEY] = duration_seconds
+                request_attrs[common.STATE_STATUS_KEY] = self.__state_status(data)
+                request_attrs[common.OUTCOME_KEY] = "ok"
 
                 self.ok_message_counter.add(1, attributes=request_attrs)
-                self.message_duration.record(duration_seconds, attributes=request_attrs)
+                self.message_duration.record(time.time() - start_time, attributes=request_attrs)
                 span.set_status(Status(StatusCode.OK))
             except TelegramBadRequest:
-                pass
+                request_attrs[common.STATE_STATUS_KEY] = self.__state_status(data)
+                request_attrs[common.OUTCOME_KEY] = "bad_request"
+
+                self.error_message_counter.add(1, attributes=request_attrs)
+                self.message_duration.record(time.time() - start_time, attributes=request_attrs)
             except Exception as err:
-                duration_seconds = time.time() - start_time
-                request_attrs[common.TELEGRAM_MESSAGE_DURATION_KEY] = 500
-                request_attrs[common.ERROR_KEY] = str(err)
+                request_attrs[common.STATE_STATUS_KEY] = self.__state_status(data)
+                request_attrs[common.OUTCOME_KEY] = "error"
 
                 self.error_message_counter.add(1, attributes=request_attrs)
-                self.message_duration.record(duration_seconds, attributes=request_attrs)
+                self.message_duration.record(time.time() - start_time, attributes=request_attrs)
 
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
@@ -163,6 +145,20 @@ class TgMiddleware(interface.ITelegramMiddleware):
             finally:
                 self.active_messages.add(-1)
 
+    def __handler_name(self, event: Update) -> str:
+        if event.callback_query is not None:
+            return "callback_query"
+        if event.message.text is None:
+            return "media"
+        if event.message.text.startswith("/"):
+            return "command"
+        return "text"
+
+    def __state_status(self, data: dict[str, Any]) -> str:
+        # Состояние кладет get_state_middleware в общий data, поэтому после handler оно уже известно
+        state = data.get("user_state")
+        return state.status if state is not None and state.status else "unknown"
+
     async def logger_middleware03(
             self,
             handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
@@ -29,11 +29,18 @@ amocrm = AmocrmClient(
     cfg.amocrm_scope_id,
     cfg.amocrm_contact_custom_fields,
     cfg.amocrm_lead_custom_fields,
+    cfg.amocrm_rate_limit,
 )
 
-if __name__ == "__main__":
+
+async def main():
     main_pipeline_id = 9839286
     appeal_pipeline_id = 9839298
 
-    asyncio.run(amocrm.all_status_by_pipeline_id(main_pipeline_id))
-    asyncio.run(amocrm.all_status_by_pipeline_id(appeal_pipeline_id))
\ No newline at end of file
+    # Сессии AsyncHTTPClient привязаны к event loop, поэтому оба запроса в одном asyncio.run
+    await amocrm.all_status_by_pipeline_id(main_pipeline_id)
+    await amocrm.all_status_by_pipeline_id(appeal_pipeline_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -5,6 +5,7 @@ REQUEST_ID_KEY = "request_id"
 EXTRA_LOG_FIELDS_KEY = "extra"
 FILE_KEY = "file"
 ERROR_KEY = "error"
+OUTCOME_KEY = "outcome"
 
 HTTP_METHOD_KEY = "http.request.method"
 HTTP_STATUS_KEY = "http.response.status_code"
@@ -12,6 +13,7 @@ HTTP_ROUTE_KEY = "http.route"
 HTTP_REQUEST_DURATION_KEY = "http.server.request.duration"
 
 CRM_SYSTEM_NAME_KEY = "crm.system.name"
+AMOCRM_ENDPOINT_KEY = "amocrm.endpoint"
 
 TELEGRAM_EVENT_TYPE_KEY = "telegram.event.type"
 TELEGRAM_CHAT_ID_KEY = "telegram.chat.id"
@@ -30,6 +32,8 @@ RESPONSE_BODY_SIZE_METRIC = "http.server.response.body.size"
 OK_REQUEST_TOTAL_METRIC = "http.server.ok.request.total"
 ERROR_REQUEST_TOTAL_METRIC = "http.server.error.request.total"
 
+AMOCRM_REQUEST_DURATION_METRIC = "amocrm.client.request.duration"
+
 OK_MESSAGE_TOTAL_METRIC = "telegram.server.ok.message.total"
 ERROR_MESSAGE_TOTAL_METRIC = "telegram.server.error.message.total"
 OK_JOIN_CHAT_TOTAL_METRIC = "telegram.server.ok.join_chat.total"
@@ -30,6 +30,7 @@ class Config:
     amocrm_channel_id: str = os.environ.get("AMOCRM_CHANNEL_ID")
     amocrm_channel_code: str = os.environ.get("AMOCRM_CHANNEL_CODE")
     amocrm_scope_id: str = os.environ.get("AMOCRM_SCOPE_ID")
+    amocrm_rate_limit: float = float(os.environ.get("AMOCRM_RATE_LIMIT", 7))
     amocrm_contact_custom_fields = {
         "tg_username_field_id": int(os.environ.get("AMOCRM_TG_USERNAME_FIELD_ID"))
     }
@@ -57,6 +57,7 @@ amocrm = AmocrmClient(
     cfg.amocrm_scope_id,
     cfg.amocrm_contact_custom_fields,
     cfg.amocrm_lead_custom_fields,
+    cfg.amocrm_rate_limit,
 )
 
 db = PG(tel, cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
@@ -3,16 +3,26 @@ import hmac
 import json
 import hashlib
 from email.utils import format_datetime
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
 
-import requests
+import httpx
 from uuid import uuid4
 from datetime import datetime
 
+from tenacity import AsyncRetrying, RetryCallState, stop_after_attempt, retry_if_exception
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import interface, common
 
+from pkg.client.client import AsyncHTTPClient, ExponentialBackoffWithJitter
+from pkg.client.external.amocrm.rate_limiter import TokenBucket
+
+IDEMPOTENT_METHODS = {"GET", "PUT", "PATCH", "DELETE"}
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+# До amoCRM такой запрос не дошел, поэтому его можно повторить даже для POST
+NOT_SENT_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
 
 class AmocrmClient(interface.IAmocrmClient):
     def __init__(
@@ -30,10 +40,13 @@ class AmocrmClient(interface.IAmocrmClient):
             amocrm_channel_code: str,
             amocrm_scope_id: str,
             amocrm_contact_custom_fields: dict,
-            amocrm_lead_custom_fields: dict
+            amocrm_lead_custom_fields: dict,
+            amocrm_rate_limit: float = 7,
+            amocrm_retry_count: int = 3,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
+        self.meter = tel.meter()
 
         self.amocrm_token = amocrm_token
         self.amocrm_subdomain = amocrm_subdomain
@@ -50,6 +63,33 @@ class AmocrmClient(interface.IAmocrmClient):
         self.amocrm_contact_custom_fields = amocrm_contact_custom_fields
         self.amocrm_lead_custom_fields = amocrm_lead_custom_fields
 
+        # amoCRM отвечает 429 и может заблокировать интеграцию, если превысить 7 запросов в секунду
+        self.rate_limiter = TokenBucket(amocrm_rate_limit, int(amocrm_rate_limit))
+
+        # Повторы делает __request, а не AsyncHTTPClient: каждая попытка берет токен,
+        # а POST повторяется только если запрос точно не ушел в amoCRM
+        self.retry_count = amocrm_retry_count
+        self.backoff = ExponentialBackoffWithJitter()
+
+        api_chats_url = urlsplit(self.amocrm_api_chats_url)
+        self.api_chats_client = AsyncHTTPClient(
+            api_chats_url.hostname,
+            api_chats_url.port or 443,
+            prefix=api_chats_url.path,
+            use_https=api_chats_url.scheme == "https",
+            retry_count=1,
+            logger=self.logger,
+        )
+        # AsyncHTTPClient хранится в слабом словаре, без сильной ссылки пул соединений собирался бы после каждого запроса
+        self.subdomain_clients: dict[str, AsyncHTTPClient] = {}
+        self.__subdomain_client(self.amocrm_subdomain)
+
+        self.request_duration = self.meter.create_histogram(
+            name=common.AMOCRM_REQUEST_DURATION_METRIC,
+            description="amoCRM API request duration in seconds",
+            unit="s"
+        )
+
     async def create_source(
             self,
             amocrm_source_name: str,
@@ -76,9 +116,11 @@ class AmocrmClient(interface.IAmocrmClient):
 
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/sources",
+                    self.amocrm_subdomain,
+                    "/sources",
                     "POST",
-                    body
+                    body,
+                    endpoint="create_source",
                 )
 
                 source_id = response["_embedded"]["sources"][0]["id"]
@@ -100,9 +142,11 @@ class AmocrmClient(interface.IAmocrmClient):
             try:
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/account?with=amojo_id",
+                    self.amocrm_subdomain,
+                    "/account?with=amojo_id",
                     "GET",
-                    {}
+                    {},
+                    endpoint="account",
                 )
                 amocrm_chat_account_id = response["amojo_id"]
 
@@ -118,6 +162,7 @@ class AmocrmClient(interface.IAmocrmClient):
                     body,
                     f"/{self.amocrm_channel_id}/connect",
                     "POST",
+                    endpoint="connect_channel_to_account",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -162,9 +207,11 @@ class AmocrmClient(interface.IAmocrmClient):
 
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/contacts",
+                    self.amocrm_subdomain,
+                    "/contacts",
                     "POST",
-                    body
+                    body,
+                    endpoint="create_contact",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -206,9 +253,11 @@ class AmocrmClient(interface.IAmocrmClient):
 
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/leads",
+                    self.amocrm_subdomain,
+                    "/leads",
                     "POST",
-                    body
+                    body,
+                    endpoint="create_lead",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -243,9 +292,11 @@ class AmocrmClient(interface.IAmocrmClient):
 
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/leads",
+                    self.amocrm_subdomain,
+                    "/leads",
                     "PATCH",
-                    body
+                    body,
+                    endpoint="edit_lead",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -281,6 +332,7 @@ class AmocrmClient(interface.IAmocrmClient):
                     body,
                     f"/{self.amocrm_scope_id}/{message_id}/delivery_status",
                     "POST",
+                    endpoint="update_message_status",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -317,6 +369,7 @@ class AmocrmClient(interface.IAmocrmClient):
                     body,
                     f"/{self.amocrm_scope_id}/chats",
                     "POST",
+                    endpoint="create_chat",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -349,9 +402,11 @@ class AmocrmClient(interface.IAmocrmClient):
 
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/contacts/chats",
+                    self.amocrm_subdomain,
+                    "/contacts/chats",
                     "POST",
                     body,
+                    endpoint="assign_chat_to_contact",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -404,6 +459,7 @@ class AmocrmClient(interface.IAmocrmClient):
                     body,
                     f"/{self.amocrm_scope_id}",
                     "POST",
+                    endpoint="send_message_from_contact",
                 )
 
                 amocrm_message_id = response["new_message"]["msgid"]
@@ -464,6 +520,7 @@ class AmocrmClient(interface.IAmocrmClient):
                     body,
                     f"/{self.amocrm_scope_id}",
                     "POST",
+                    endpoint="import_message_from_bot_to_amocrm",
                 )
 
                 amocrm_message_id = response["new_message"]["msgid"]
@@ -491,9 +548,11 @@ class AmocrmClient(interface.IAmocrmClient):
 
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/sources",
+                    self.amocrm_subdomain,
+                    "/sources",
                     "DELETE",
                     body,
+                    endpoint="delete_source",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -513,9 +572,11 @@ class AmocrmClient(interface.IAmocrmClient):
             try:
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + f"/leads/pipelines/{pipeline_id}/statuses",
+                    self.amocrm_subdomain,
+                    f"/leads/pipelines/{pipeline_id}/statuses",
                     "GET",
                     {},
+                    endpoint="all_status_by_pipeline_id",
                 )
             except Exception as err:
                 span.record_exception(err)
@@ -541,9 +602,11 @@ class AmocrmClient(interface.IAmocrmClient):
 
                 response = await self.__request_subdomain(
                     self.amocrm_token,
-                    self.amocrm_subdomain + self.amocrm_api_platform_base_url + "/webhooks",
+                    self.amocrm_subdomain,
+                    "/webhooks",
                     "POST",
                     body,
+                    endpoint="subscribe_to_event_webhook",
                 )
 
                 span.set_status(StatusCode.OK)
@@ -567,9 +630,11 @@ class AmocrmClient(interface.IAmocrmClient):
             try:
                 response = await self.__request_subdomain(
                     amocrm_token,
-                    amocrm_subdomain + self.amocrm_api_platform_base_url + "/sources",
+                    amocrm_subdomain,
+                    "/sources",
                     "GET",
                     {},
+                    endpoint="all_source",
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -579,8 +644,16 @@ class AmocrmClient(interface.IAmocrmClient):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
-    async def __request_subdomain(self, amocrm_token: str, url: str, http_method: str, body: list[dict] | dict) -> dict:
-        self.logger.debug(f"Запрос на: {url}", {"request_body": body})
+    async def __request_subdomain(
+            self,
+            amocrm_token: str,
+            amocrm_subdomain: str,
+            path: str,
+            http_method: str,
+            body: list[dict] | dict,
+            endpoint: str,
+    ) -> dict:
+        self.logger.debug(f"Запрос на: {amocrm_subdomain + path}", {"request_body": body})
         json_body = json.dumps(body)
 
         headers = {
@@ -588,14 +661,16 @@ class AmocrmClient(interface.IAmocrmClient):
             "Content-Type": "application/json",
         }
 
-        response = requests.request(http_method, "https://" + url, headers=headers, data=json_body)
+        response = await self.__request(
+            self.__subdomain_client(amocrm_subdomain),
+            http_method,
+            path,
+            headers,
+            json_body,
+            endpoint,
+        )
         json_response = response.json()
-        self.logger.debug(f"Ответ от {url}", {"response_body": json_response})
-
-        if response.status_code >= 500:
-            raise Exception("Internal Server Error")
-        if response.status_code >= 400:
-            raise Exception(f"Client error: {response.status_code}")
+        self.logger.debug(f"Ответ от {amocrm_subdomain + path}", {"response_body": json_response})
 
         return json_response
 
@@ -604,8 +679,9 @@ class AmocrmClient(interface.IAmocrmClient):
             body: dict,
             path: str,
             http_method: str,
+            endpoint: str,
     ) -> dict:
-        self.logger.debug(f"Запрос на: {self.amocrm_api_chats_url + path,}", {"request_body": body})
+        self.logger.debug(f"Запрос на: {self.amocrm_api_chats_url + path}", {"request_body": body})
         json_body = json.dumps(body)
         body_checksum = self.__create_body_checksum(json_body)
         date = format_datetime(datetime.now(tz=ZoneInfo("Europe/Moscow")))
@@ -624,11 +700,13 @@ class AmocrmClient(interface.IAmocrmClient):
             date,
         )
 
-        response = requests.request(
+        response = await self.__request(
+            self.api_chats_client,
             http_method,
-            self.amocrm_api_chats_url + path,
-            headers=headers,
-            data=json_body,
+            path,
+            headers,
+            json_body,
+            endpoint,
         )
 
         try:
@@ -638,13 +716,93 @@ class AmocrmClient(interface.IAmocrmClient):
 
         self.logger.debug(f"Ответ от {self.amocrm_api_chats_url + path}", {"response_body": json_response})
 
-        if response.status_code >= 500:
-            raise Exception("Internal Server Error")
-        if response.status_code >= 400:
-            raise Exception(f"Client error: {response.status_code}")
-
         return json_response
 
+    async def __request(
+            self,
+            client: AsyncHTTPClient,
+            http_method: str,
+            path: str,
+            headers: dict[str, str],
+            json_body: str,
+            endpoint: str,
+    ) -> httpx.Response:
+        status_code = 0
+        start_time = time.perf_counter()
+        try:
+            request = getattr(client, http_method.lower())
+            async for attempt in AsyncRetrying(
+                    stop=stop_after_attempt(self.retry_count),
+                    wait=self.backoff,
+                    retry=retry_if_exception(lambda err: self.__is_retryable(http_method, err)),
+                    before_sleep=lambda retry_state: self.__log_retry(http_method, path, retry_state),
+                    reraise=True,
+            ):
+                with attempt:
+                    # Повтор тоже запрос к amoCRM, поэтому токен берется на каждую попытку
+                    await self.rate_limiter.acquire()
+                    response = await request(path, headers=headers, content=json_body)
+
+            status_code = response.status_code
+            return response
+        except httpx.HTTPStatusError as err:
+            status_code = err.response.status_code
+            self.logger.debug(f"Ответ от {path}", {"response_body": err.response.text})
+
+            if status_code >= 500:
+                raise Exception("Internal Server Error")
+            raise Exception(f"Client error: {status_code}")
+        finally:
+            self.request_duration.record(
+                time.perf_counter() - start_time,
+                {
+                    common.AMOCRM_ENDPOINT_KEY: endpoint,
+                    common.HTTP_METHOD_KEY: http_method,
+                    common.HTTP_STATUS_KEY: status_code,
+                }
+            )
+
+    def __log_retry(self, http_method: str, path: str, retry_state: RetryCallState):
+        err = retry_state.outcome.exception()
+        self.logger.warning(
+            f"Запрос {http_method} {path} к amoCRM неуспешен "
+            f"(попытка {retry_state.attempt_number}/{self.retry_count}), повторяем. "
+            f"Ошибка: {err.__class__.__name__}: {str(err)}"
+        )
+
+    def __subdomain_client(self, amocrm_subdomain: str) -> AsyncHTTPClient:
+        client = self.subdomain_clients.get(amocrm_subdomain)
+        if client is None:
+            # Поддомен склеивается с base url как есть: wewall + .amocrm.ru/api/v4
+            api_platform_url = urlsplit("https://" + amocrm_subdomain + self.amocrm_api_platform_base_url)
+            client = AsyncHTTPClient(
+                api_platform_url.hostname,
+                api_platform_url.port or 443,
+                prefix=api_platform_url.path,
+                use_https=True,
+                retry_count=1,
+                logger=self.logger,
+            )
+            self.subdomain_clients[amocrm_subdomain] = client
+        return client
+
+    @staticmethod
+    def __is_retryable(http_method: str, err: BaseException) -> bool:
+        if isinstance(err, NOT_SENT_EXCEPTIONS):
+            return True
+
+        # Повтор POST после таймаута чтения или 5xx может создать вторую сделку, контакт или сообщение
+        if http_method.upper() not in IDEMPOTENT_METHODS:
+            return False
+
+        if isinstance(err, httpx.TransportError):
+            return True
+
+        if isinstance(err, httpx.HTTPStatusError):
+            return err.response.status_code in RETRYABLE_STATUS_CODES
+
+        return False
+
     @staticmethod
     def __create_body_checksum(
             body: str
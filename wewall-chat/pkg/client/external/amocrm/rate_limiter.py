@@ -0,0 +1,27 @@
+import time
+import asyncio
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        # Ожидающие получают токены по очереди, иначе после паузы все проснутся разом и превысят лимит
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        started_at = time.monotonic()
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - started_at
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
@@ -0,0 +1,196 @@
+import gc
+import json
+
+import httpx
+import pytest
+
+from internal import common
+from pkg.client.client import AsyncHTTPClient
+from pkg.client.external.amocrm.client import AmocrmClient
+
+from tests.unit import utils
+
+
+class TestAmocrmClient:
+    @pytest.fixture
+    def amocrm_server(self, monkeypatch):
+        server = utils.FakeAmocrmServer()
+
+        # AsyncHTTPClient живет один на base_url, в каждом тесте сессии должны смотреть в свой фейковый сервер
+        AsyncHTTPClient._instances.clear()
+        monkeypatch.setattr(
+            AsyncHTTPClient,
+            "_create_session",
+            lambda client: httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(server.handler)),
+        )
+        return server
+
+    @pytest.fixture
+    def amocrm_client(self, tel, amocrm_server):
+        amocrm_client = AmocrmClient(
+            tel=tel,
+            messenger="telegram",
+            amocrm_token=utils.TOKEN,
+            amocrm_subdomain=utils.SUBDOMAIN,
+            amocrm_api_platform_base_url=utils.API_PLATFORM_BASE_URL,
+            amocrm_api_chats_url=utils.API_CHATS_URL,
+            amocrm_bot_name="WEWALL AI",
+            amocrm_bot_id="bot-id",
+            amocrm_channel_secret=utils.CHANNEL_SECRET,
+            amocrm_channel_id="channel-id",
+            amocrm_channel_code="channel-code",
+            amocrm_scope_id=utils.SCOPE_ID,
+            amocrm_contact_custom_fields={"tg_username_field_id": 11},
+            amocrm_lead_custom_fields={"lead_source_field_id": 22},
+            amocrm_rate_limit=1000,
+        )
+        amocrm_client.backoff = lambda retry_state: 0
+        return amocrm_client
+
+    @pytest.fixture
+    def acquired_tokens(self, amocrm_client, monkeypatch) -> list[float]:
+        acquired = []
+        acquire = amocrm_client.rate_limiter.acquire
+
+        async def counting_acquire() -> float:
+            waited = await acquire()
+            acquired.append(waited)
+            return waited
+
+        monkeypatch.setattr(amocrm_client.rate_limiter, "acquire", counting_acquire)
+        return acquired
+
+    async def test_platform_client_is_built_from_env_format(self, amocrm_client, amocrm_server):
+        # Act
+        await amocrm_client.create_lead(7, 8, "tg-bot")
+        gc.collect()
+        await amocrm_client.create_lead(7, 8, "tg-bot")
+
+        # Assert
+        [platform_client] = amocrm_client.subdomain_clients.values()
+        assert platform_client.base_url == f"https://{utils.API_PLATFORM_HOST}:443{utils.API_PLATFORM_PATH}"
+        assert AsyncHTTPClient._instances[platform_client.base_url] is platform_client
+        assert all(
+            request.url.host == utils.API_PLATFORM_HOST
+            for request in amocrm_server.requests_to("POST", "/api/v4/leads")
+        )
+
+    async def test_create_lead_contract(self, amocrm_client, amocrm_server):
+        # Act
+        lead_id = await amocrm_client.create_lead(7, 8, "tg-bot")
+
+        # Assert
+        [request] = amocrm_server.requests_to("POST", "/api/v4/leads")
+        assert request.headers["Authorization"] == f"Bearer {utils.TOKEN}"
+        assert json.loads(request.content) == [{
+            "pipeline_id": 8,
+            "_embedded": {"contacts": [{"id": 7}]},
+            "custom_fields_values": [{"field_id": 22, "values": [{"value": "tg-bot"}]}],
+        }]
+        assert lead_id == 101
+
+    async def test_chats_api_requests_are_signed(self, amocrm_client, amocrm_server):
+        # Act
+        amocrm_chat_id = await amocrm_client.create_chat("conversation-1", 7, "Иван")
+        amocrm_message_id = await amocrm_client.send_message_from_contact(
+            7, "conversation-1", amocrm_chat_id, "Иван", "Привет"
+        )
+
+        # Assert
+        assert amocrm_chat_id == "chat-conversation-1"
+        [request] = amocrm_server.requests_to("POST", f"/v2/origin/custom/{utils.SCOPE_ID}")
+        assert amocrm_message_id == f"amo-{json.loads(request.content)['payload']['msgid']}"
+
+    async def test_idempotent_request_retries_with_token_per_attempt(
+            self,
+            amocrm_client,
+            amocrm_server,
+            acquired_tokens
+    ):
+        # Arrange
+        amocrm_server.fail("PATCH", "/api/v4/leads", 503, httpx.ReadTimeout("timeout"))
+
+        # Act
+        await amocrm_client.edit_lead(5, 8, 9)
+
+        # Assert
+        assert len(amocrm_server.requests_to("PATCH", "/api/v4/leads")) == 3
+        assert len(acquired_tokens) == 3
+
+    async def test_idempotent_request_gives_up_after_retry_count(
+            self,
+            amocrm_client,
+            amocrm_server,
+            acquired_tokens
+    ):
+        # Arrange
+        amocrm_server.fail("PATCH", "/api/v4/leads", 502, 502, 502)
+
+        # Act
+        with pytest.raises(Exception, match="Internal Server Error"):
+            await amocrm_client.edit_lead(5, 8, 9)
+
+        # Assert
+        assert len(amocrm_server.requests_to("PATCH", "/api/v4/leads")) == 3
+        assert len(acquired_tokens) == 3
+
+    @pytest.mark.parametrize("failure", [503, httpx.ReadTimeout("timeout")])
+    async def test_create_lead_is_not_retried(self, amocrm_client, amocrm_server, acquired_tokens, failure):
+        # Arrange
+        amocrm_server.fail("POST", "/api/v4/leads", failure)
+
+        # Act
+        with pytest.raises(Exception):
+            await amocrm_client.create_lead(7, 8, "tg-bot")
+
+        # Assert
+        assert len(amocrm_server.requests_to("POST", "/api/v4/leads")) == 1
+        assert len(acquired_tokens) == 1
+
+    async def test_send_message_is_not_retried_after_read_timeout(self, amocrm_client, amocrm_server):
+        # Arrange
+        amocrm_server.fail("POST", f"/v2/origin/custom/{utils.SCOPE_ID}", httpx.ReadTimeout("timeout"))
+
+        # Act
+        with pytest.raises(httpx.ReadTimeout):
+            await amocrm_client.import_message_from_bot_to_amocrm("conversation-1", "chat-1", 7, "Иван", "Ответ")
+
+        # Assert
+        assert len(amocrm_server.requests_to("POST", f"/v2/origin/custom/{utils.SCOPE_ID}")) == 1
+
+    async def test_create_contact_is_retried_when_request_was_not_sent(
+            self,
+            amocrm_client,
+            amocrm_server,
+            acquired_tokens
+    ):
+        # Arrange
+        amocrm_server.fail("POST", "/api/v4/contacts", httpx.ConnectError("connection refused"))
+
+        # Act
+        contact_id = await amocrm_client.create_contact("Иван Петров", "Иван", "Петров", "ivan")
+
+        # Assert
+        [_, request] = amocrm_server.requests_to("POST", "/api/v4/contacts")
+        assert json.loads(request.content)[0]["custom_fields_values"] == [
+            {"field_id": 11, "values": [{"value": "ivan"}]}
+        ]
+        assert contact_id == 101
+        assert len(acquired_tokens) == 2
+
+    async def test_client_error_is_not_retried(self, amocrm_client, amocrm_server, metric_reader):
+        # Arrange
+        amocrm_server.fail("PATCH", "/api/v4/leads", 400)
+
+        # Act
+        with pytest.raises(Exception, match="Client error: 400"):
+            await amocrm_client.edit_lead(5, 8, 9)
+
+        # Assert
+        assert len(amocrm_server.requests_to("PATCH", "/api/v4/leads")) == 1
+        [point] = utils.collect_metric_points(metric_reader, {common.AMOCRM_REQUEST_DURATION_METRIC})
+        assert point.attributes == {
+            common.AMOCRM_ENDPOINT_KEY: "edit_lead",
+            common.HTTP_METHOD_KEY: "PATCH",
+            common.HTTP_STATUS_KEY: 400,
+        }
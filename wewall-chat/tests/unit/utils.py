@@ -0,0 +1,97 @@
+import hmac
+import json
+import hashlib
+
+import httpx
+
+# Формат как в wewall-system/env: голый поддомен и base url, который начинается с домена
+SUBDOMAIN = "wewall"
+API_PLATFORM_BASE_URL = ".amocrm.ru/api/v4"
+API_PLATFORM_HOST = "wewall.amocrm.ru"
+API_PLATFORM_PATH = "/api/v4"
+API_CHATS_URL = "https://amojo.amocrm.ru/v2/origin/custom"
+CHANNEL_SECRET = "channel-secret"
+SCOPE_ID = "scope-id"
+TOKEN = "amocrm-token"
+
+
+class FakeAmocrmServer:
+    """Отвечает как API amoCRM v4 и API чатов, проверяет токен и подпись запросов."""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.failures: dict[tuple[str, str], list] = {}
+        self.next_id = 100
+
+    def fail(self, method: str, path: str, *failures: int | Exception):
+        # Следующие запросы на method path получат эти статусы или сетевые ошибки по очереди
+        self.failures.setdefault((method, path), []).extend(failures)
+
+    def requests_to(self, method: str, path: str) -> list[httpx.Request]:
+        return [request for request in self.requests if (request.method, request.url.path) == (method, path)]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+
+        failures = self.failures.get((request.method, request.url.path))
+        if failures:
+            failure = failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx.Response(failure, json={"title": "Fake amoCRM error"})
+
+        if request.url.host == API_PLATFORM_HOST:
+            return self.__platform(request)
+        return self.__chats(request)
+
+    def __platform(self, request: httpx.Request) -> httpx.Response:
+        if request.headers.get("Authorization") != f"Bearer {TOKEN}":
+            return httpx.Response(401, json={"title": "Unauthorized"})
+
+        body = json.loads(request.content)
+        path = request.url.path.removeprefix(API_PLATFORM_PATH)
+        if (request.method, path) == ("POST", "/contacts"):
+            return httpx.Response(200, json={"_embedded": {"contacts": [{"id": self.__id()} for _ in body]}})
+        if (request.method, path) == ("POST", "/leads"):
+            return httpx.Response(200, json={"_embedded": {"leads": [{"id": self.__id()} for _ in body]}})
+        if (request.method, path) == ("PATCH", "/leads"):
+            return httpx.Response(200, json={"_embedded": {"leads": [{"id": lead["id"]} for lead in body]}})
+        return httpx.Response(404, json={"title": "Not found"})
+
+    def __chats(self, request: httpx.Request) -> httpx.Response:
+        body_checksum = hashlib.md5(request.content).hexdigest()
+        string_to_hash = "\n".join([
+            request.method,
+            body_checksum,
+            request.headers["Content-Type"],
+            request.headers["Date"],
+            request.url.path,
+        ])
+        signature = hmac.new(CHANNEL_SECRET.encode(), string_to_hash.encode(), hashlib.sha1).hexdigest()
+        if request.headers.get("Content-MD5") != body_checksum or request.headers.get("X-Signature") != signature:
+            return httpx.Response(403, json={"title": "Invalid signature"})
+
+        body = json.loads(request.content)
+        path = request.url.path.removeprefix("/v2/origin/custom")
+        if (request.method, path) == ("POST", f"/{SCOPE_ID}/chats"):
+            return httpx.Response(200, json={"id": f"chat-{body['conversation_id']}"})
+        if (request.method, path) == ("POST", f"/{SCOPE_ID}"):
+            return httpx.Response(200, json={"new_message": {"msgid": f"amo-{body['payload']['msgid']}"}})
+        return httpx.Response(404, json={"title": "Not found"})
+
+    def __id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+
+def collect_metric_points(metric_reader, metric_names: set[str]) -> list:
+    points = []
+    metrics_data = metric_reader.get_metrics_data()
+    if metrics_data is None:
+        return points
+    for resource_metrics in metrics_data.resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name in metric_names:
+                    points.extend(metric.data.data_points)
+    return points
@@ -7,7 +7,9 @@ PREFIX = "/api/estate-calculator"
 
 
 def NewHttp(
+        tel: interface.ITelemetry,
         db: interface.IDB,
+        metro_reference_data: interface.IMetroReferenceData,
         estate_calculator_controller: interface.IEstateCalculatorController,
         http_middleware: interface.IHttpMiddleware,
         prefix: str
@@ -15,7 +17,8 @@ def NewHttp(
     app = FastAPI()
 
     include_middleware(app, http_middleware)
-    include_db_handler(app, db, prefix)
+    include_db_handler(app, db, metro_reference_data, prefix)
+    include_reference_data_handler(app, tel, metro_reference_data, prefix)
     include_estate_calculator_handlers(app, estate_calculator_controller, prefix)
 
     return app
@@ -91,26 +94,123 @@ def include_estate_calculator_handlers(
         tags=["Estate finance model calculator"]
     )
 
-def include_db_handler(app: FastAPI, db: interface.IDB, prefix: str):
-    app.add_api_route(prefix + "/table/create", create_table_handler(db), methods=["GET"])
-    app.add_api_route(prefix + "/table/drop", drop_table_handler(db), methods=["GET"])
+    app.add_api_route(
+        prefix + "/finished/office/batch",
+        estate_calculator_controller.calc_finance_model_finished_office_batch,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+    app.add_api_route(
+        prefix + "/finished/retail/batch",
+        estate_calculator_controller.calc_finance_model_finished_retail_batch,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+    app.add_api_route(
+        prefix + "/building/office/batch",
+        estate_calculator_controller.calc_finance_model_building_office_batch,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+    app.add_api_route(
+        prefix + "/building/retail/batch",
+        estate_calculator_controller.calc_finance_model_building_retail_batch,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+    app.add_api_route(
+        prefix + "/finished/office/bundle",
+        estate_calculator_controller.calc_finance_model_finished_office_bundle,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+    app.add_api_route(
+        prefix + "/finished/retail/bundle",
+        estate_calculator_controller.calc_finance_model_finished_retail_bundle,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+    app.add_api_route(
+        prefix + "/building/office/bundle",
+        estate_calculator_controller.calc_finance_model_building_office_bundle,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+    app.add_api_route(
+        prefix + "/building/retail/bundle",
+        estate_calculator_controller.calc_finance_model_building_retail_bundle,
+        methods=["POST"],
+        tags=["Estate finance model calculator"]
+    )
+
+def include_db_handler(
+        app: FastAPI,
+        db: interface.IDB,
+        metro_reference_data: interface.IMetroReferenceData,
+        prefix: str
+):
+    app.add_api_route(prefix + "/table/create", create_table_handler(db, metro_reference_data), methods=["GET"])
+    app.add_api_route(prefix + "/table/drop", drop_table_handler(db, metro_reference_data), methods=["GET"])
+
+
+def include_reference_data_handler(
+        app: FastAPI,
+        tel: interface.ITelemetry,
+        metro_reference_data: interface.IMetroReferenceData,
+        prefix: str
+):
+    app.add_event_handler("startup", preload_reference_data_handler(tel, metro_reference_data))
+    app.add_api_route(
+        prefix + "/reference-data/invalidate",
+        invalidate_reference_data_handler(metro_reference_data),
+        methods=["POST"]
+    )
 
 
-def create_table_handler(db: interface.IDB):
+def create_table_handler(db: interface.IDB, metro_reference_data: interface.IMetroReferenceData):
     async def create_table():
         try:
             await db.multi_query(model.create_queries)
+            metro_reference_data.invalidate()
         except Exception as err:
             raise err
 
     return create_table
 
 
-def drop_table_handler(db: interface.IDB):
+def drop_table_handler(db: interface.IDB, metro_reference_data: interface.IMetroReferenceData):
     async def delete_table():
         try:
             await db.multi_query(model.drop_queries)
+            metro_reference_data.invalidate()
         except Exception as err:
             raise err
 
-    return delete_table
\ No newline at end of file
+    return delete_table
+
+
+def preload_reference_data_handler(tel: interface.ITelemetry, metro_reference_data: interface.IMetroReferenceData):
+    logger = tel.logger()
+
+    async def preload_reference_data():
+        try:
+            await metro_reference_data.load()
+        except Exception as err:
+            # справочники догрузятся при первом запросе, сервис должен подняться и без БД
+            logger.error(f"Не удалось загрузить справочники при старте: {err}")
+
+    return preload_reference_data
+
+
+def invalidate_reference_data_handler(metro_reference_data: interface.IMetroReferenceData):
+    async def invalidate_reference_data():
+        metro_reference_data.invalidate()
+
+    return invalidate_reference_data
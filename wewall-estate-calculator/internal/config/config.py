@@ -8,6 +8,7 @@ class Config:
     db_port: str = "5432"
 
     income_tax_share: float = 0.06
+    reference_data_ttl: int = 600
 
     http_port: int = int(os.environ.get('WEWALL_ESTATE_CALCULATOR_PORT'))
     prefix = os.environ.get('WEWALL_ESTATE_CALCULATOR_PREFIX')
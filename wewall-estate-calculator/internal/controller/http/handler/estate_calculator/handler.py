@@ -1,3 +1,7 @@
+import io
+import math
+import base64
+
 from fastapi.responses import Response, JSONResponse
 from fastapi import status
 from opentelemetry.trace import Status, StatusCode, SpanKind
@@ -303,3 +307,278 @@ class EstateCalculatorController(interface.IEstateCalculatorController):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
+
+    async def calc_finance_model_finished_office_batch(self, body: FinishedOfficeFinanceModelBatchBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_finished_office_batch",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "batch_size": len(body.items)
+                }
+        ) as span:
+            try:
+                finance_models = await self.estate_calculator.calc_finance_model_finished_office_batch(
+                    [item.model_dump() for item in body.items]
+                )
+
+                response = self.__batch_response(finance_models)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def calc_finance_model_finished_retail_batch(self, body: FinishedRetailFinanceModelBatchBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_finished_retail_batch",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "batch_size": len(body.items)
+                }
+        ) as span:
+            try:
+                finance_models = await self.estate_calculator.calc_finance_model_finished_retail_batch(
+                    [item.model_dump() for item in body.items]
+                )
+
+                response = self.__batch_response(finance_models)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def calc_finance_model_building_office_batch(self, body: BuildingOfficeFinanceModelBatchBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_building_office_batch",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "batch_size": len(body.items)
+                }
+        ) as span:
+            try:
+                finance_models = await self.estate_calculator.calc_finance_model_building_office_batch(
+                    [item.model_dump() for item in body.items]
+                )
+
+                response = self.__batch_response(finance_models)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def calc_finance_model_building_retail_batch(self, body: BuildingRetailFinanceModelBatchBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_building_retail_batch",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "batch_size": len(body.items)
+                }
+        ) as span:
+            try:
+                finance_models = await self.estate_calculator.calc_finance_model_building_retail_batch(
+                    [item.model_dump() for item in body.items]
+                )
+
+                response = self.__batch_response(finance_models)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def calc_finance_model_finished_office_bundle(self, body: FinishedOfficeFinanceModelBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_finished_office_bundle",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "square": body.square,
+                    "price_per_meter": body.price_per_meter,
+                    "need_repairs": body.need_repairs,
+                    "metro_station_name": body.metro_station_name,
+                    "estate_category": body.estate_category,
+                    "distance_to_metro": body.distance_to_metro,
+                    "nds_rate": body.nds_rate
+                }
+        ) as span:
+            try:
+                finance_model, finance_model_xlsx = await self.estate_calculator.calc_finance_model_finished_office(
+                    **body.model_dump(),
+                    create_bundle=True
+                )
+
+                response = self.__bundle_response(finance_model, finance_model_xlsx)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except common.MetroStationNotFound as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                return JSONResponse(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    content={"error": str(err), "error_code": 4041},
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def calc_finance_model_finished_retail_bundle(self, body: FinishedRetailFinanceModelBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_finished_retail_bundle",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "square": body.square,
+                    "price_per_meter": body.price_per_meter,
+                    "m_a_p": body.m_a_p,
+                    "nds_rate": body.nds_rate,
+                    "need_repairs": body.need_repairs
+                }
+        ) as span:
+            try:
+                finance_model, finance_model_xlsx = await self.estate_calculator.calc_finance_model_finished_retail(
+                    **body.model_dump(),
+                    create_bundle=True
+                )
+
+                response = self.__bundle_response(finance_model, finance_model_xlsx)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def calc_finance_model_building_office_bundle(self, body: BuildingOfficeFinanceModelBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_building_office_bundle",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "project_readiness": body.project_readiness,
+                    "square": body.square,
+                    "metro_station_name": body.metro_station_name,
+                    "distance_to_metro": body.distance_to_metro,
+                    "estate_category": body.estate_category,
+                    "price_per_meter": body.price_per_meter,
+                    "nds_rate": body.nds_rate,
+                    "transaction_dict": body.transaction_dict
+                }
+        ) as span:
+            try:
+                finance_model, finance_model_xlsx = await self.estate_calculator.calc_finance_model_building_office(
+                    **body.model_dump(),
+                    create_bundle=True
+                )
+
+                response = self.__bundle_response(finance_model, finance_model_xlsx)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except common.MetroStationNotFound as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                return JSONResponse(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    content={"error": str(err), "error_code": 4041},
+                )
+            except common.TransactionDictSumNotEqual100 as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"error": str(err), "error_code": 4001},
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def calc_finance_model_building_retail_bundle(self, body: BuildingRetailFinanceModelBody):
+        with self.tracer.start_as_current_span(
+                "EstateCalculatorController.calc_finance_model_building_retail_bundle",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "square": body.square,
+                    "price_per_meter": body.price_per_meter,
+                    "transaction_dict": body.transaction_dict,
+                    "price_rva": body.price_rva,
+                    "m_a_p": body.m_a_p,
+                    "nds_rate": body.nds_rate,
+                    "project_readiness": body.project_readiness,
+                    "need_repairs": body.need_repairs
+                }
+        ) as span:
+            try:
+                finance_model, finance_model_xlsx = await self.estate_calculator.calc_finance_model_building_retail(
+                    **body.model_dump(),
+                    create_bundle=True
+                )
+
+                response = self.__bundle_response(finance_model, finance_model_xlsx)
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=status.HTTP_200_OK,
+                    content=response.model_dump(),
+                )
+            except common.TransactionDictSumNotEqual100 as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"error": str(err), "error_code": 4001},
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    def __batch_response(self, finance_models: list[dict | Exception]) -> FinanceModelBatchResponse:
+        # ошибка одного объекта не должна валить весь батч, коды ошибок те же, что у одиночных ручек
+        items = []
+        for finance_model in finance_models:
+            if isinstance(finance_model, common.MetroStationNotFound):
+                items.append(FinanceModelBatchItem(error=str(finance_model), error_code=4041))
+            elif isinstance(finance_model, common.TransactionDictSumNotEqual100):
+                items.append(FinanceModelBatchItem(error=str(finance_model), error_code=4001))
+            elif isinstance(finance_model, Exception):
+                items.append(FinanceModelBatchItem(error=str(finance_model), error_code=5001))
+            elif not self.__irr_is_finite(finance_model):
+                # NaN не сериализуется в JSON, поэтому такой объект отдаем ошибкой, а не роняем весь батч
+                items.append(FinanceModelBatchItem(error="IRR не определен для этих параметров", error_code=4221))
+            else:
+                items.append(FinanceModelBatchItem(finance_model=FinanceModelResponse(**finance_model)))
+
+        return FinanceModelBatchResponse(items=items)
+
+    def __irr_is_finite(self, finance_model: dict) -> bool:
+        return math.isfinite(finance_model["rent_irr"]) and math.isfinite(finance_model["sale_irr"])
+
+    def __bundle_response(self, finance_model: dict, finance_model_xlsx: io.BytesIO) -> FinanceModelBundleResponse:
+        return FinanceModelBundleResponse(
+            finance_model=FinanceModelResponse(**finance_model),
+            xlsx=base64.b64encode(finance_model_xlsx.getvalue()).decode("ascii"),
+        )
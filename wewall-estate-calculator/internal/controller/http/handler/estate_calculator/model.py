@@ -54,3 +54,34 @@ class FinanceModelResponse(BaseModel):
     added_value: float
     rent_irr: float
     sale_irr: float
+
+
+class FinishedOfficeFinanceModelBatchBody(BaseModel):
+    items: list[FinishedOfficeFinanceModelBody]
+
+
+class FinishedRetailFinanceModelBatchBody(BaseModel):
+    items: list[FinishedRetailFinanceModelBody]
+
+
+class BuildingOfficeFinanceModelBatchBody(BaseModel):
+    items: list[BuildingOfficeFinanceModelBody]
+
+
+class BuildingRetailFinanceModelBatchBody(BaseModel):
+    items: list[BuildingRetailFinanceModelBody]
+
+
+class FinanceModelBatchItem(BaseModel):
+    finance_model: FinanceModelResponse | None = None
+    error: str | None = None
+    error_code: int | None = None
+
+
+class FinanceModelBatchResponse(BaseModel):
+    items: list[FinanceModelBatchItem]
+
+
+class FinanceModelBundleResponse(BaseModel):
+    finance_model: FinanceModelResponse
+    xlsx: str
@@ -128,32 +128,24 @@ class HttpMiddleware(interface.IHttpMiddleware):
             start_time = time.time()
             active_requests.add(1)
 
-            trace_id = request.state.trace_id
-            span_id = request.state.span_id
-
-            content_length = request.headers.get("content-length")
+            # В метрики идут только метки с ограниченным набором значений, детали запроса остаются в спанах и логах.
+            # trace_id и span_id попадают в exemplars, потому что измерения пишутся внутри спана trace_middleware01
             request_attrs = {
                 SpanAttributes.HTTP_METHOD: request.method,
-                SpanAttributes.HTTP_ROUTE: request.url.path,
-                common.SPAN_ID_KEY: span_id,
-                common.TRACE_ID_KEY: trace_id,
             }
             try:
-                if content_length and int(content_length) > 0:
-                    request_size.record(int(content_length), attributes=request_attrs)
-
                 response = await call_next(request)
 
                 duration_seconds = time.time() - start_time
                 status_code = response.status_code
 
+                request_attrs[SpanAttributes.HTTP_ROUTE] = self.__route(request)
                 request_attrs[common.HTTP_STATUS_KEY] = status_code
-                request_attrs[common.HTTP_REQUEST_DURATION_KEY] = duration_seconds
+                request_attrs[common.OUTCOME_KEY] = self.__outcome(status_code)
 
-                if status_code >= 500:
-                    error_request_counter.add(1, attributes=request_attrs)
-                else:
-                    ok_request_counter.add(1, attributes=request_attrs)
+                content_length = request.headers.get("content-length")
+                if content_length and int(content_length) > 0:
+                    request_size.record(int(content_length), attributes=request_attrs)
 
                 request_duration.record(duration_seconds, attributes=request_attrs)
                 response_content_length = response.headers.get("content-length")
@@ -164,11 +156,17 @@ class HttpMiddleware(interface.IHttpMiddleware):
                     except ValueError:
                         pass
 
+                if status_code >= 500:
+                    error_request_counter.add(1, attributes=request_attrs)
+                else:
+                    ok_request_counter.add(1, attributes=request_attrs)
+
                 return response
             except Exception as err:
                 duration_seconds = time.time() - start_time
+                request_attrs[SpanAttributes.HTTP_ROUTE] = self.__route(request)
                 request_attrs[common.HTTP_STATUS_KEY] = 500
-                request_attrs[common.ERROR_KEY] = str(err)
+                request_attrs[common.OUTCOME_KEY] = "error"
 
                 error_request_counter.add(1, attributes=request_attrs)
                 request_duration.record(duration_seconds, attributes=request_attrs)
@@ -178,6 +176,18 @@ class HttpMiddleware(interface.IHttpMiddleware):
 
         return _metrics_middleware02
 
+    def __route(self, request: Request) -> str:
+        # Шаблон маршрута вместо пути, чтобы параметры пути не порождали новые временные ряды
+        route = request.scope.get("route")
+        return route.path if route is not None else "unmatched"
+
+    def __outcome(self, status_code: int) -> str:
+        if status_code >= 500:
+            return "server_error"
+        if status_code >= 400:
+            return "client_error"
+        return "ok"
+
     def logger_middleware03(self, app: FastAPI):
         @app.middleware("http")
         async def _logger_middleware03(request: Request, call_next: Callable):
@@ -29,6 +29,30 @@ class IEstateCalculatorController(Protocol):
     @abstractmethod
     async def calc_finance_model_building_retail_table(self, body: BuildingRetailFinanceModelBody): pass
 
+    @abstractmethod
+    async def calc_finance_model_finished_office_batch(self, body: FinishedOfficeFinanceModelBatchBody): pass
+
+    @abstractmethod
+    async def calc_finance_model_finished_retail_batch(self, body: FinishedRetailFinanceModelBatchBody): pass
+
+    @abstractmethod
+    async def calc_finance_model_building_office_batch(self, body: BuildingOfficeFinanceModelBatchBody): pass
+
+    @abstractmethod
+    async def calc_finance_model_building_retail_batch(self, body: BuildingRetailFinanceModelBatchBody): pass
+
+    @abstractmethod
+    async def calc_finance_model_finished_office_bundle(self, body: FinishedOfficeFinanceModelBody): pass
+
+    @abstractmethod
+    async def calc_finance_model_finished_retail_bundle(self, body: FinishedRetailFinanceModelBody): pass
+
+    @abstractmethod
+    async def calc_finance_model_building_office_bundle(self, body: BuildingOfficeFinanceModelBody): pass
+
+    @abstractmethod
+    async def calc_finance_model_building_retail_bundle(self, body: BuildingRetailFinanceModelBody): pass
+
 
 class IEstateCalculator(Protocol):
     @abstractmethod
@@ -42,7 +66,8 @@ class IEstateCalculator(Protocol):
             distance_to_metro: float,
             nds_rate: int,
             create_xlsx: bool = False,
-    ) -> dict | io.BytesIO: pass
+            create_bundle: bool = False,
+    ) -> dict | io.BytesIO | tuple[dict, io.BytesIO]: pass
 
     @abstractmethod
     async def calc_finance_model_finished_retail(
@@ -53,7 +78,8 @@ class IEstateCalculator(Protocol):
             nds_rate: int,
             need_repairs: int,
             create_xlsx: bool = False,
-    ) -> dict | io.BytesIO: pass
+            create_bundle: bool = False,
+    ) -> dict | io.BytesIO | tuple[dict, io.BytesIO]: pass
 
     @abstractmethod
     async def calc_finance_model_building_office(
@@ -67,7 +93,8 @@ class IEstateCalculator(Protocol):
             nds_rate: int,
             transaction_dict: dict,
             create_xlsx: bool = False,
-    ) -> dict | io.BytesIO: pass
+            create_bundle: bool = False,
+    ) -> dict | io.BytesIO | tuple[dict, io.BytesIO]: pass
 
     @abstractmethod
     async def calc_finance_model_building_retail(
@@ -81,4 +108,17 @@ class IEstateCalculator(Protocol):
             project_readiness: str,
             need_repairs: int,
             create_xlsx: bool = False,
-    ) -> dict | io.BytesIO: pass
+            create_bundle: bool = False,
+    ) -> dict | io.BytesIO | tuple[dict, io.BytesIO]: pass
+
+    @abstractmethod
+    async def calc_finance_model_finished_office_batch(self, params: list[dict]) -> list[dict | Exception]: pass
+
+    @abstractmethod
+    async def calc_finance_model_finished_retail_batch(self, params: list[dict]) -> list[dict | Exception]: pass
+
+    @abstractmethod
+    async def calc_finance_model_building_office_batch(self, params: list[dict]) -> list[dict | Exception]: pass
+
+    @abstractmethod
+    async def calc_finance_model_building_retail_batch(self, params: list[dict]) -> list[dict | Exception]: pass
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Protocol
+from typing import Protocol, Any
 
 from internal import model
 
@@ -40,3 +40,20 @@ class IMetroRepo(Protocol):
 
     @abstractmethod
     async def all_square_coeff(self) -> list[model.SquareCoeff]: pass
+
+    @abstractmethod
+    async def all_metro_stations(self) -> list[model.MetroStation]: pass
+
+
+class IMetroReferenceData(Protocol):
+    @abstractmethod
+    async def load(self) -> None: pass
+
+    @abstractmethod
+    def invalidate(self) -> None: pass
+
+    @abstractmethod
+    async def metro_station(self, name: str) -> model.MetroStation | None: pass
+
+    @abstractmethod
+    async def price_coeffs(self) -> tuple[Any, Any]: pass
@@ -27,4 +27,8 @@ SELECT * FROM metro_distance_coeffs
 
 all_square_coeff = """
 SELECT * FROM square_coeffs
-"""
\ No newline at end of file
+"""
+all_metro_stations = """
+SELECT * FROM metro_stations
+ORDER BY id
+"""
@@ -75,3 +75,10 @@ class MetroRepo(interface.IMetroRepo):
             rows = model.SquareCoeff.serialize(rows)
 
         return rows
+
+    async def all_metro_stations(self) -> list[model.MetroStation]:
+        rows = await self.db.select(all_metro_stations, {})
+        if rows:
+            rows = model.MetroStation.serialize(rows)
+
+        return rows
@@ -8,6 +8,7 @@ from internal.controller.http.middlerware.middleware import HttpMiddleware
 from internal.controller.http.handler.estate_calculator.handler import EstateCalculatorController
 
 from pkg.estate_calculator.estate_calculator import EstateCalculator
+from pkg.estate_calculator.reference_data import MetroReferenceData
 
 from internal.repo.metro.repo import MetroRepo
 
@@ -44,14 +45,18 @@ db = PG(tel, cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
 
 metro_repo = MetroRepo(db)
 
-estate_calculator = EstateCalculator(tel, metro_repo, cfg.income_tax_share)
+metro_reference_data = MetroReferenceData(tel, metro_repo, cfg.reference_data_ttl)
+
+estate_calculator = EstateCalculator(tel, metro_reference_data, cfg.income_tax_share)
 estate_calculator_controller = EstateCalculatorController(tel, estate_calculator)
 
 http_middleware = HttpMiddleware(tel, cfg.prefix)
 
 if __name__ == '__main__':
     app = NewHttp(
+        tel,
         db,
+        metro_reference_data,
         estate_calculator_controller,
         http_middleware,
         cfg.prefix,
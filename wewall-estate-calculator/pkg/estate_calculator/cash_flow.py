@@ -0,0 +1,495 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+IRR_FALLBACK = -1
+
+
+@dataclass
+class RentCashFlow:
+    auxiliary_calculation: np.ndarray
+    buying_property: np.ndarray
+    rent_flow: np.ndarray
+    income_tax: np.ndarray
+    renovation: np.ndarray
+    terminal_value: np.ndarray
+    property_tax: np.ndarray
+    money_flow: np.ndarray
+
+    def by_quartal(self, quartals: list[str], row: int = 0) -> dict[str, dict[str, float]]:
+        return _by_quartal(self, quartals, row)
+
+    def total(self, row: int = 0) -> dict[str, float]:
+        return _total(self, row)
+
+
+@dataclass
+class SaleCashFlow:
+    auxiliary_calculation: np.ndarray
+    buying_property: np.ndarray
+    sale_property: np.ndarray
+    added_value: np.ndarray
+    property_tax: np.ndarray
+    money_flow: np.ndarray
+
+    def by_quartal(self, quartals: list[str], row: int = 0) -> dict[str, dict[str, float]]:
+        return _by_quartal(self, quartals, row)
+
+    def total(self, row: int = 0) -> dict[str, float]:
+        return _total(self, row)
+
+
+@dataclass
+class FinanceModel:
+    quartals: list[str]
+    years: list[str]
+    deal_quartal: str
+    project_readiness: str
+    transactions: dict[str, float]
+
+    rental_date: str
+    renovation_quartal: str
+    rental_flow_quartal: str
+    sale_quartal: str
+
+    rental_holidays: int
+    minimal_ipc: float
+    capitalization_rate: float
+    rent_indexing: float
+    ipc_rent_rate: float
+
+    square: np.ndarray
+    price_per_meter: np.ndarray
+    nds_rate: np.ndarray
+    price_rva: np.ndarray
+    rental_rate: np.ndarray
+    m_a_p: np.ndarray
+    predict_rent_rate: np.ndarray
+    price_of_finishing: np.ndarray
+    predict_finishing_price: np.ndarray
+    average_value_real_estate: np.ndarray
+
+    rent: RentCashFlow
+    rent_irr: np.ndarray
+    sale: SaleCashFlow | None = None
+    sale_irr: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.square)
+
+    def rent_irr_at(self, row: int = 0) -> float:
+        return _irr_value(self.rent_irr[row])
+
+    def sale_irr_at(self, row: int = 0) -> float:
+        return _irr_value(self.sale_irr[row])
+
+    def result(self, row: int = 0) -> dict:
+        rent_total = self.rent.total(row)
+        if self.sale is None:
+            sale_property = 0
+            added_value = 0
+            sale_tax = rent_total["property_tax"]
+            sale_income = rent_total["money_flow"]
+        else:
+            sale_total = self.sale.total(row)
+            sale_property = sale_total["sale_property"]
+            added_value = sale_total["added_value"]
+            sale_tax = sale_total["property_tax"]
+            sale_income = sale_total["money_flow"]
+
+        rent_tax = rent_total["property_tax"] + rent_total["income_tax"]
+        return {
+            "buying_property": round(rent_total["buying_property"] / 1000000, 1),
+            "sale_property": round(sale_property / 1000000, 1),
+            "sale_tax": round(sale_tax / 1000000, 1),
+            "rent_tax": round(rent_tax / 1000000, 1),
+            "price_of_finishing": round(rent_total["renovation"] / 1000000, 1),
+            "rent_flow": round(rent_total["rent_flow"] / 1000000, 1),
+            "terminal_value": round(rent_total["terminal_value"] / 1000000, 1),
+            "sale_income": round(sale_income / 1000000, 1),
+            "rent_income": round(rent_total["money_flow"] / 1000000, 1),
+            "added_value": round(added_value / 1000000, 1),
+            "rent_irr": round(self.rent_irr_at(row), 1),
+            "sale_irr": round(self.sale_irr_at(row), 1) if self.sale_irr is not None else 0,
+        }
+
+    def results(self) -> list[dict]:
+        return [self.result(row) for row in range(len(self))]
+
+
+def finished_finance_model(
+        quartals: list[str],
+        years: list[str],
+        deal_quartal: str,
+        project_readiness: str,
+        transactions: dict[str, float],
+        square,
+        price_per_meter,
+        price_rva,
+        rental_rate,
+        m_a_p,
+        rent_per_quartal,
+        price_of_finishing,
+        average_value_real_estate,
+        nds_rate,
+        income_tax_share: float,
+        rental_holidays: int,
+        minimal_ipc: float,
+        capitalization_rate: float,
+        rent_indexing: float,
+) -> FinanceModel:
+    (
+        square, price_per_meter, price_rva, rental_rate, m_a_p, rent_per_quartal,
+        price_of_finishing, average_value_real_estate, nds_rate
+    ) = _rows(
+        square, price_per_meter, price_rva, rental_rate, m_a_p, rent_per_quartal,
+        price_of_finishing, average_value_real_estate, nds_rate
+    )
+    rental_holidays = rental_holidays // 3
+    readiness_idx = quartals.index(project_readiness)
+    rental_date = _rental_date(project_readiness, rental_holidays)
+    renovation_quartal = shift_quartal(project_readiness, 1)
+
+    rent = rent_cash_flow(
+        quartals,
+        transactions,
+        lot_price=square * price_per_meter,
+        square=square,
+        rent_per_quartal=rent_per_quartal,
+        finishing_price=price_of_finishing,
+        renovation_quartal=renovation_quartal,
+        rent_start_idx=readiness_idx + rental_holidays - 1,
+        rental_date=rental_date,
+        property_tax_start_idx=readiness_idx + 4,
+        capitalization_rate=capitalization_rate / 100,
+        rent_indexing=rent_indexing / 100,
+        average_value_real_estate=average_value_real_estate,
+        tax_rate=income_tax_share + (nds_rate / 100),
+    )
+
+    return FinanceModel(
+        quartals=quartals,
+        years=years,
+        deal_quartal=deal_quartal,
+        project_readiness=project_readiness,
+        transactions=transactions,
+        rental_date=rental_date,
+        renovation_quartal=renovation_quartal,
+        rental_flow_quartal=shift_quartal(project_readiness, 1),
+        sale_quartal=quartals[readiness_idx + 1],
+        rental_holidays=rental_holidays,
+        minimal_ipc=minimal_ipc / 100,
+        capitalization_rate=capitalization_rate / 100,
+        rent_indexing=rent_indexing / 100,
+        ipc_rent_rate=0,
+        square=square,
+        price_per_meter=price_per_meter,
+        nds_rate=nds_rate,
+        price_rva=price_rva,
+        rental_rate=rental_rate,
+        m_a_p=m_a_p,
+        predict_rent_rate=rental_rate,
+        price_of_finishing=price_of_finishing,
+        predict_finishing_price=price_of_finishing,
+        average_value_real_estate=average_value_real_estate,
+        rent=rent,
+        rent_irr=_rent_irr(rent.money_flow),
+    )
+
+
+def building_finance_model(
+        quartals: list[str],
+        years: list[str],
+        deal_quartal: str,
+        project_readiness: str,
+        transactions: dict[str, float],
+        square,
+        price_per_meter,
+        price_rva,
+        rental_rate,
+        m_a_p,
+        price_of_finishing,
+        average_value_real_estate,
+        nds_rate,
+        income_tax_share: float,
+        rental_holidays: int,
+        minimal_ipc: float,
+        capitalization_rate: float,
+        rent_indexing: float,
+        sale_offset: int,
+        property_tax_offset: int,
+) -> FinanceModel:
+    (
+        square, price_per_meter, price_rva, rental_rate, m_a_p,
+        price_of_finishing, average_value_real_estate, nds_rate
+    ) = _rows(
+        square, price_per_meter, price_rva, rental_rate, m_a_p,
+        price_of_finishing, average_value_real_estate, nds_rate
+    )
+    rental_holidays = rental_holidays // 3
+    readiness_idx = quartals.index(project_readiness)
+    rental_date = _rental_date(project_readiness, rental_holidays)
+    renovation_quartal = shift_quartal(project_readiness, 1)
+    tax_rate = income_tax_share + (nds_rate / 100)
+
+    # степень ИПЦ растёт на 0.25 за квартал от первого квартала расчёта, к РвЭ добавляется полгода
+    ipc_rent_rate = readiness_idx * 0.25 + 0.5
+    predict_rent_rate = rental_rate * (1 + ipc_rent_rate * (minimal_ipc / 100))
+    predict_finishing_price = price_of_finishing * (1 + ipc_rent_rate * (minimal_ipc / 100))
+
+    sale_quartal = quartals[readiness_idx + sale_offset]
+    lot_price = square * price_per_meter
+
+    sale = sale_cash_flow(
+        quartals,
+        transactions,
+        lot_price=lot_price,
+        sale_property=price_rva * square,
+        sale_quartal=sale_quartal,
+        minimal_ipc=minimal_ipc / 100,
+        tax_rate=tax_rate,
+    )
+    rent = rent_cash_flow(
+        quartals,
+        transactions,
+        lot_price=lot_price,
+        square=square,
+        rent_per_quartal=predict_rent_rate * square / 4,
+        finishing_price=predict_finishing_price,
+        renovation_quartal=renovation_quartal,
+        rent_start_idx=readiness_idx + rental_holidays,
+        rental_date=rental_date,
+        property_tax_start_idx=readiness_idx + property_tax_offset,
+        capitalization_rate=capitalization_rate / 100,
+        rent_indexing=rent_indexing / 100,
+        average_value_real_estate=average_value_real_estate,
+        tax_rate=tax_rate,
+    )
+
+    sale_irr = annual_irr(sale.money_flow)
+    sale_irr[sale_irr == 0] = IRR_FALLBACK
+
+    return FinanceModel(
+        quartals=quartals,
+        years=years,
+        deal_quartal=deal_quartal,
+        project_readiness=project_readiness,
+        transactions=transactions,
+        rental_date=rental_date,
+        renovation_quartal=renovation_quartal,
+        rental_flow_quartal=shift_quartal(project_readiness, 2),
+        sale_quartal=sale_quartal,
+        rental_holidays=rental_holidays,
+        minimal_ipc=minimal_ipc / 100,
+        capitalization_rate=capitalization_rate / 100,
+        rent_indexing=rent_indexing / 100,
+        ipc_rent_rate=ipc_rent_rate,
+        square=square,
+        price_per_meter=price_per_meter,
+        nds_rate=nds_rate,
+        price_rva=price_rva,
+        rental_rate=rental_rate,
+        m_a_p=m_a_p,
+        predict_rent_rate=predict_rent_rate,
+        price_of_finishing=price_of_finishing,
+        predict_finishing_price=predict_finishing_price,
+        average_value_real_estate=average_value_real_estate,
+        rent=rent,
+        rent_irr=_rent_irr(rent.money_flow),
+        sale=sale,
+        sale_irr=sale_irr,
+    )
+
+
+def rent_cash_flow(
+        quartals: list[str],
+        transactions: dict[str, float],
+        lot_price: np.ndarray,
+        square: np.ndarray,
+        rent_per_quartal: np.ndarray,
+        finishing_price: np.ndarray,
+        renovation_quartal: str,
+        rent_start_idx: int,
+        rental_date: str,
+        property_tax_start_idx: int,
+        capitalization_rate: float,
+        rent_indexing: float,
+        average_value_real_estate: np.ndarray,
+        tax_rate: np.ndarray,
+) -> RentCashFlow:
+    idx = np.arange(len(quartals))
+    zeros = np.zeros((len(lot_price), len(quartals)))
+    is_indexing_quartal = np.array([quartal[0] == rental_date for quartal in quartals])
+
+    auxiliary_calculation = zeros + np.where(is_indexing_quartal, rent_indexing, 0.0)
+
+    # индексация применяется к уже идущему потоку, в квартал старта аренды поток задаётся заново
+    rent_flow = zeros.copy()
+    current_rent_flow = np.zeros(len(lot_price))
+    for i in idx:
+        if is_indexing_quartal[i]:
+            current_rent_flow = current_rent_flow + current_rent_flow * rent_indexing
+        if i == rent_start_idx:
+            current_rent_flow = rent_per_quartal
+        rent_flow[:, i] = current_rent_flow
+
+    renovation = zeros.copy()
+    if renovation_quartal in quartals:
+        renovation[:, quartals.index(renovation_quartal)] = -square * finishing_price
+
+    buying_property = _buying_property(quartals, transactions, lot_price)
+
+    terminal_value = zeros.copy()
+    terminal_value[:, -1] = rent_flow[:, -1] * 4 / capitalization_rate
+
+    property_tax = np.where(
+        idx >= property_tax_start_idx,
+        (-average_value_real_estate * square / 4 * 0.015)[:, None],
+        0.0
+    )
+
+    income_tax = -(rent_flow + terminal_value) * tax_rate[:, None]
+    money_flow = buying_property + rent_flow + income_tax + renovation + terminal_value + property_tax
+
+    return RentCashFlow(
+        auxiliary_calculation=auxiliary_calculation,
+        buying_property=buying_property,
+        rent_flow=rent_flow,
+        income_tax=income_tax,
+        renovation=renovation,
+        terminal_value=terminal_value,
+        property_tax=property_tax,
+        money_flow=money_flow,
+    )
+
+
+def sale_cash_flow(
+        quartals: list[str],
+        transactions: dict[str, float],
+        lot_price: np.ndarray,
+        sale_property: np.ndarray,
+        sale_quartal: str,
+        minimal_ipc: float,
+        tax_rate: np.ndarray,
+) -> SaleCashFlow:
+    idx = np.arange(len(quartals))
+    buying_property = _buying_property(quartals, transactions, lot_price)
+
+    # срок владения считается кварталами от первого транша
+    is_paid = buying_property < 0
+    has_payment = is_paid.any(axis=1)
+    first_payment_idx = np.where(has_payment, is_paid.argmax(axis=1), len(quartals))
+    auxiliary_calculation = np.where(
+        idx > first_payment_idx[:, None],
+        (idx - first_payment_idx[:, None]) * 0.25,
+        0.0
+    )
+
+    sale_property_flow = np.zeros_like(buying_property)
+    if sale_quartal in quartals:
+        sale_property_flow[:, quartals.index(sale_quartal)] = sale_property
+
+    added_value = -sale_property_flow + sale_property_flow * (1 + minimal_ipc) ** auxiliary_calculation
+    property_tax = -(sale_property_flow + added_value) * tax_rate[:, None]
+    money_flow = buying_property + sale_property_flow + added_value + property_tax
+
+    return SaleCashFlow(
+        auxiliary_calculation=auxiliary_calculation,
+        buying_property=buying_property,
+        sale_property=sale_property_flow,
+        added_value=added_value,
+        property_tax=property_tax,
+        money_flow=money_flow,
+    )
+
+
+def irr(money_flow: np.ndarray) -> np.ndarray:
+    # Тот же алгоритм, что numpy_financial.irr: корни полинома через собственные числа
+    # матрицы-компаньона, из положительных вещественных берётся ставка, ближайшая к нулю.
+    # Строки с одинаковыми границами ненулевых значений считаются одним батчем.
+    money_flow = np.atleast_2d(np.asarray(money_flow, dtype=float))
+    result = np.full(len(money_flow), np.nan)
+
+    is_nonzero = money_flow != 0
+    has_nonzero = is_nonzero.any(axis=1)
+    first_idx = is_nonzero.argmax(axis=1)
+    last_idx = money_flow.shape[1] - 1 - is_nonzero[:, ::-1].argmax(axis=1)
+
+    bounds = {(first, last) for first, last, ok in zip(first_idx, last_idx, has_nonzero) if ok}
+    for first, last in bounds:
+        rows = np.flatnonzero(has_nonzero & (first_idx == first) & (last_idx == last))
+        degree = last - first
+        if degree == 0:
+            continue
+
+        coeffs = money_flow[rows, first:last + 1][:, ::-1]
+        companion = np.zeros((len(rows), degree, degree))
+        companion[:, 1:, :-1] = np.eye(degree - 1)
+        companion[:, 0, :] = -coeffs[:, 1:] / coeffs[:, :1]
+        roots = np.linalg.eigvals(companion)
+
+        is_valid = (roots.imag == 0) & (roots.real > 0)
+        with np.errstate(divide="ignore"):
+            rates = np.where(is_valid, 1 / np.where(is_valid, roots.real, 1) - 1, np.inf)
+        best = np.abs(rates).argmin(axis=1)
+        best_rates = rates[np.arange(len(rows)), best]
+        result[rows] = np.where(is_valid.any(axis=1), best_rates, np.nan)
+
+    return result
+
+
+def annual_irr(money_flow: np.ndarray) -> np.ndarray:
+    return ((1 + irr(money_flow)) ** 4 - 1) * 100
+
+
+def shift_quartal(quartal: str, shift: int) -> str:
+    number, year = int(quartal[0]), int(quartal[2:])
+    if number + shift <= 4:
+        return str(number + shift) + "Q" + str(year)
+    return str(number + shift - 4) + "Q" + str(year + 1)
+
+
+def _rental_date(project_readiness: str, rental_holidays: int) -> str:
+    if int(project_readiness[0]) + rental_holidays <= 4:
+        return str(int(project_readiness[0]) + rental_holidays)
+    return str(int(project_readiness[0]) + rental_holidays - 4)
+
+
+def _rent_irr(money_flow: np.ndarray) -> np.ndarray:
+    rent_irr = annual_irr(money_flow)
+    rent_irr[np.isnan(rent_irr)] = IRR_FALLBACK
+    return rent_irr
+
+
+def _irr_value(irr: float) -> float:
+    # Заглушку отдаем целым числом, чтобы в отчете было "-1%", а не "-1.0%"
+    if irr == IRR_FALLBACK:
+        return IRR_FALLBACK
+    return float(irr)
+
+
+def _buying_property(quartals: list[str], transactions: dict[str, float], lot_price: np.ndarray) -> np.ndarray:
+    shares = np.array([transactions.get(quartal, 0.0) for quartal in quartals])
+    buying_property = -lot_price[:, None] * shares
+    buying_property[:, shares == 0] = 0.0
+    return buying_property
+
+
+def _rows(*values) -> list[np.ndarray]:
+    return np.broadcast_arrays(*[np.atleast_1d(np.asarray(value, dtype=float)) for value in values])
+
+
+def _by_quartal(cash_flow, quartals: list[str], row: int) -> dict[str, dict[str, float]]:
+    columns = {name: getattr(cash_flow, name)[row].tolist() for name in cash_flow.__dataclass_fields__}
+    return {
+        quartal: {name: values[i] for name, values in columns.items()}
+        for i, quartal in enumerate(quartals)
+    }
+
+
+def _total(cash_flow, row: int) -> dict[str, float]:
+    return {
+        name: sum(getattr(cash_flow, name)[row].tolist())
+        for name in cash_flow.__dataclass_fields__
+        if name != "auxiliary_calculation"
+    }
@@ -0,0 +1,111 @@
+import time
+import asyncio
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import interface, model
+
+
+@dataclass
+class CoeffIntervals:
+    min_values: list[float]
+    max_values: list[float]
+    coeffs: list[float]
+
+    @classmethod
+    def from_ranges(cls, ranges: list[tuple[float, float, float]]) -> "CoeffIntervals":
+        ranges = sorted(ranges, key=lambda item: (item[0], item[1]))
+        return cls(
+            min_values=[float(item[0]) for item in ranges],
+            max_values=[float(item[1]) for item in ranges],
+            coeffs=[float(item[2]) for item in ranges],
+        )
+
+    def coeff(self, param: float) -> float | None:
+        # границы включительные: на стыке интервалов берется нижний, как и при линейном переборе
+        idx = bisect_left(self.max_values, param)
+        if idx == len(self.max_values) or self.min_values[idx] > param:
+            return None
+
+        return self.coeffs[idx]
+
+
+class MetroReferenceData(interface.IMetroReferenceData):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            metro_repo: interface.IMetroRepo,
+            ttl: int
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.metro_repo = metro_repo
+        self.ttl = ttl
+
+        self._lock = asyncio.Lock()
+        self._expires_at = 0.0
+        self._metro_stations: dict[str, model.MetroStation] = {}
+        self._metro_coeffs = CoeffIntervals([], [], [])
+        self._square_coeffs = CoeffIntervals([], [], [])
+
+    async def load(self) -> None:
+        with self.tracer.start_as_current_span(
+                "MetroReferenceData.load",
+                kind=SpanKind.INTERNAL,
+        ) as span:
+            try:
+                async with self._lock:
+                    metro_stations = {}
+                    for metro_station in await self.metro_repo.all_metro_stations():
+                        metro_stations.setdefault(metro_station.name, metro_station)
+
+                    metro_coeffs = CoeffIntervals.from_ranges([
+                        (coeff.min_distance, coeff.max_distance, coeff.coeff)
+                        for coeff in await self.metro_repo.all_metro_distance_coeff()
+                    ])
+                    square_coeffs = CoeffIntervals.from_ranges([
+                        (coeff.min_square, coeff.max_square, coeff.coeff)
+                        for coeff in await self.metro_repo.all_square_coeff()
+                    ])
+
+                    self._metro_stations = metro_stations
+                    self._metro_coeffs = metro_coeffs
+                    self._square_coeffs = square_coeffs
+                    self._expires_at = time.monotonic() + self.ttl
+
+                self.logger.debug("Загрузили справочники метро и коэффициентов", {
+                    "metro_stations_count": len(metro_stations),
+                    "metro_coeffs_count": len(metro_coeffs.coeffs),
+                    "square_coeffs_count": len(square_coeffs.coeffs),
+                })
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    async def metro_station(self, name: str) -> model.MetroStation | None:
+        await self._ensure_fresh()
+        return self._metro_stations.get(name)
+
+    async def price_coeffs(self) -> tuple[CoeffIntervals, CoeffIntervals]:
+        await self._ensure_fresh()
+        return self._metro_coeffs, self._square_coeffs
+
+    async def _ensure_fresh(self) -> None:
+        if time.monotonic() < self._expires_at:
+            return
+
+        if self._lock.locked():
+            # справочники уже перезагружаются другим запросом, ждем его
+            async with self._lock:
+                pass
+            if time.monotonic() < self._expires_at:
+                return
+
+        await self.load()
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+from unittest.mock import MagicMock
+from opentelemetry.sdk.trace import TracerProvider
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+@pytest.fixture
+def tel():
+    tel = MagicMock()
+    tel.tracer.return_value = TracerProvider().get_tracer("test")
+    tel.meter.return_value = MagicMock()
+    tel.logger.return_value = MagicMock()
+    return tel
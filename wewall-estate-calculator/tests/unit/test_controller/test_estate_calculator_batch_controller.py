@@ -0,0 +1,53 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from internal import interface
+from internal.controller.http.handler.estate_calculator.handler import EstateCalculatorController
+from internal.controller.http.handler.estate_calculator.model import (
+    BuildingRetailFinanceModelBatchBody,
+    BuildingRetailFinanceModelBody,
+)
+from pkg.estate_calculator.estate_calculator import EstateCalculator
+
+
+def create_building_retail_body(transaction_dict: dict) -> BuildingRetailFinanceModelBody:
+    return BuildingRetailFinanceModelBody(
+        square=100,
+        price_per_meter=300000,
+        transaction_dict=transaction_dict,
+        price_rva=400000,
+        m_a_p=10000,
+        nds_rate=0,
+        project_readiness="4Q2028",
+        need_repairs=1,
+    )
+
+
+class TestEstateCalculatorBatchController:
+
+    @pytest.fixture
+    def controller(self, tel):
+        estate_calculator = EstateCalculator(tel, AsyncMock(spec=interface.IMetroReferenceData), 0.25)
+        return EstateCalculatorController(tel, estate_calculator)
+
+    async def test_building_batch_isolates_nan_irr(self, controller):
+        # Arrange
+        # Вся оплата в квартал РвЭ: в потоке продажи одно ненулевое значение, IRR получается NaN
+        body = BuildingRetailFinanceModelBatchBody(items=[
+            create_building_retail_body({"4Q2028": 100}),
+            create_building_retail_body({"1Q2027": 50, "2Q2027": 50}),
+        ])
+
+        # Act
+        response = await controller.calc_finance_model_building_retail_batch(body)
+
+        # Assert
+        assert response.status_code == 200
+
+        nan_item, ok_item = json.loads(response.body)["items"]
+        assert nan_item["finance_model"] is None
+        assert nan_item["error_code"] == 4221
+        assert ok_item["error"] is None
+        assert ok_item["finance_model"]["sale_irr"] > 0
@@ -47,6 +47,11 @@ def include_chat_handlers(
         chat_controller.send_message_to_estate_expert_by_tg,
         methods=["POST"],
     )
+    app.add_api_route(
+        prefix + "/message/send/tg/estate-expert/stream",
+        chat_controller.stream_message_to_estate_expert_by_tg,
+        methods=["POST"],
+    )
     app.add_api_route(
         prefix + "/message/send/tg/estate-search-expert",
         chat_controller.send_message_to_estate_search_expert_by_tg,
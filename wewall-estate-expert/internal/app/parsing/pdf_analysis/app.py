@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 
 from internal import interface
@@ -5,8 +6,17 @@ from internal import interface
 
 async def PdfAnalysisParsing(
         analysis_service: interface.IAnalysisService,
+        pdf_concurrency: int = 2,
 ):
     ctx = {}
-    for pdf_path in [f.name for f in Path("pkg/analysis_pdf").iterdir() if f.is_file()]:
-        print(f"Analyzing pdf {pdf_path}\n\n", flush=True)
-        await analysis_service.analysis_from_pdf(ctx, "pkg/analysis_pdf/" +pdf_path)
+    semaphore = asyncio.Semaphore(pdf_concurrency)
+
+    async def analyze(pdf_path: str):
+        async with semaphore:
+            print(f"Analyzing pdf {pdf_path}\n\n", flush=True)
+            await analysis_service.analysis_from_pdf(ctx, "pkg/analysis_pdf/" + pdf_path)
+
+    await asyncio.gather(*[
+        analyze(pdf_path)
+        for pdf_path in [f.name for f in Path("pkg/analysis_pdf").iterdir() if f.is_file()]
+    ])
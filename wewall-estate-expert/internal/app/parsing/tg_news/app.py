@@ -1,3 +1,5 @@
+import asyncio
+
 from internal import interface
 from pkg.logger.logger import logger
 
@@ -6,8 +8,17 @@ async def TgNewsParsing(
         news_service: interface.INewsService,
         tg_news_parsing: interface.ITgNewsParsing,
         channel_names: list,
+        channel_concurrency: int = 4,
 ):
-    for channel_name in channel_names:
-        news = await tg_news_parsing.parse(channel_name)
-        await news_service.create_news(channel_name, news)
-        logger.info(f"{channel_name} parsed")
+    semaphore = asyncio.Semaphore(channel_concurrency)
+
+    async def ingest(channel_name: str):
+        async with semaphore:
+            created = await news_service.ingest_channel_news(channel_name)
+            logger.info(f"{channel_name} parsed, new posts: {created}")
+
+    await tg_news_parsing.start()
+    try:
+        await asyncio.gather(*(ingest(channel_name) for channel_name in channel_names))
+    finally:
+        await tg_news_parsing.stop()
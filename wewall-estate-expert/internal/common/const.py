@@ -22,6 +22,7 @@ REQUEST_ID_KEY = "request_id"
 EXTRA_LOG_FIELDS_KEY = "extra"
 FILE_KEY = "file"
 ERROR_KEY = "error"
+OUTCOME_KEY = "outcome"
 
 HTTP_METHOD_KEY = "http.request.method"
 HTTP_STATUS_KEY = "http.response.status_code"
@@ -54,5 +55,15 @@ ERROR_JOIN_CHAT_TOTAL_METRIC = "telegram.server.error.join_chat.total"
 MESSAGE_DURATION_METRIC = "telegram.server.message.duration"
 ACTIVE_MESSAGES_METRIC = "telegram.server.active_messages"
 
+PROMPT_SIZE_METRIC = "llm.prompt.size"
+PROMPT_TOKENS_METRIC = "llm.prompt.tokens"
+PROMPT_REBUILD_TOTAL_METRIC = "llm.prompt.rebuild.total"
+PROMPT_NAME_KEY = "llm.prompt.name"
+
+RESPONSE_CACHE_LOOKUP_TOTAL_METRIC = "llm.response_cache.lookup.total"
+RESPONSE_CACHE_SIZE_METRIC = "llm.response_cache.size"
+RESPONSE_CACHE_RESULT_KEY = "llm.response_cache.result"
+EXPERT_NAME_KEY = "llm.expert.name"
+
 TRACE_ID_HEADER = "X-Trace-ID"
 SPAN_ID_HEADER = "X-Span-ID"
\ No newline at end of file
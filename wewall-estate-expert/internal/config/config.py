@@ -19,12 +19,40 @@ class Config:
     wewall_estate_calculator_host: str = os.environ.get('WEWALL_ESTATE_CALCULATOR_CONTAINER_NAME')
     wewall_estate_calculator_port: int = int(os.environ.get('WEWALL_ESTATE_CALCULATOR_PORT'))
 
+    # Как часто (сек) сверять версию базы знаний, прежде чем отдать закешированный промпт
+    prompt_version_check_interval: float = 5
+
+    # Бюджет токенов на историю диалога для каждой модели, без учета системного промпта
+    history_token_budget: dict[str, int] = {
+        "gpt-4o": 6000,
+        "gpt-4o-mini": 4000,
+    }
+    history_pinned_messages: int = 4
+
+    response_cache_max_entries: int = 1000
+    response_cache_ttl: float = 6 * 60 * 60
+    response_cache_similarity_threshold: float = 0.95
+
+    # PDF анализируются параллельно, страницы внутри PDF тоже, с общим лимитом на процесс
+    pdf_concurrency: int = 2
+    pdf_page_concurrency: int = 8
+    pdf_dpi: int = 100
+    pdf_image_max_side: int = 1600
+
     openai_api_key: str = os.environ.get('WEWALL_OPEN_AI_API_KEY')
 
     tg_phone_number: str = os.environ.get('TG_NEWS_PHONE_NUMBER')
     tg_api_id: int = os.environ.get('TG_NEWS_API_ID')
     tg_api_hash: str = os.environ.get('TG_NEWS_API_HASH')
-    tg_news_channels: list[str] = os.environ.get('TG_NEWS_CHANNELS')
+    # В env список задан как "['a','b']", принимаем и обычное перечисление через запятую
+    tg_news_channels: list[str] = [
+        channel_name.strip(" '\"")
+        for channel_name in os.environ.get('TG_NEWS_CHANNELS', '').strip(" []").split(",")
+        if channel_name.strip(" '\"")
+    ]
+    tg_news_channel_concurrency: int = 4
+    news_max_age_days: int = int(os.environ.get('NEWS_MAX_AGE_DAYS', 30))
+    news_prompt_channel_limit: int = int(os.environ.get('NEWS_PROMPT_CHANNEL_LIMIT', 20))
 
     environment = os.environ.get('ENVIRONMENT')
     log_level = os.environ.get('LOG_LEVEL')
@@ -1,5 +1,6 @@
+import ujson as json
 from fastapi import status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import interface
@@ -76,6 +77,44 @@ class ChatController(interface.IChatController):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
+    async def stream_message_to_estate_expert_by_tg(self, body: SendMessageToLLMtByTgBody):
+        with self.tracer.start_as_current_span(
+                "ChatController.stream_message_to_estate_expert_by_tg",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": body.tg_chat_id,
+                    "text": body.text
+                }
+        ) as span:
+            try:
+                chat = await self.chat_service.chat_by_tg_chat_id(body.tg_chat_id)
+                if not chat:
+                    self.logger.info("Создаем новый чат")
+                    await self.chat_service.create_chat(body.tg_chat_id)
+                    chat = await self.chat_service.chat_by_tg_chat_id(body.tg_chat_id)
+                chat = chat[0]
+
+                span.set_status(Status(StatusCode.OK))
+                return StreamingResponse(
+                    self.__sse_events(self.chat_service.stream_message_estate_expert(chat.id, body.text)),
+                    media_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def __sse_events(self, chunks):
+        # Статус ответа уже отправлен, поэтому ошибку генерации передаем отдельным событием
+        try:
+            async for chunk in chunks:
+                yield f"data: {json.dumps({'text': chunk}, ensure_ascii=False)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as err:
+            self.logger.error("Ошибка при стриминге ответа LLM", {"error": str(err)})
+            yield f"event: error\ndata: {json.dumps({'error': str(err)}, ensure_ascii=False)}\n\n"
+
     async def send_message_to_estate_search_expert_by_tg(self, body: SendMessageToLLMtByTgBody):
         with self.tracer.start_as_current_span(
                 "ChatController.send_message_to_estate_search_expert_by_tg",
@@ -2,6 +2,9 @@ from internal.interface.general import *
 from internal.interface.analysis import *
 from internal.interface.chat import *
 from internal.interface.news import *
+from internal.interface.tokenizer import *
+from internal.interface.knowledge_base import *
 from internal.interface.prompt import *
+from internal.interface.response_cache import *
 from internal.interface.wewall import *
 from internal.interface.client.llm import *
\ No newline at end of file
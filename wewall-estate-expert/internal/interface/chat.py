@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Protocol
+from typing import Protocol, AsyncIterator
 
 from internal.controller.http.handler.chat.model import *
 from internal import model
@@ -12,6 +12,9 @@ class IChatController(Protocol):
     @abstractmethod
     async def send_message_to_estate_expert_by_tg(self, body: SendMessageToLLMtByTgBody): pass
 
+    @abstractmethod
+    async def stream_message_to_estate_expert_by_tg(self, body: SendMessageToLLMtByTgBody): pass
+
     @abstractmethod
     async def send_message_to_estate_search_expert_by_tg(self, body: SendMessageToLLMtByTgBody): pass
 
@@ -47,6 +50,9 @@ class IChatService(Protocol):
     @abstractmethod
     async def send_message_estate_expert(self, chat_id: int, text: str) -> str: pass
 
+    @abstractmethod
+    def stream_message_estate_expert(self, chat_id: int, text: str) -> AsyncIterator[str]: pass
+
     @abstractmethod
     async def send_message_estate_search_expert(self, chat_id: int, text: str) -> str: pass
 
@@ -69,7 +75,7 @@ class IChatRepo(Protocol):
     async def create_chat(self, tg_chat_id: int) -> int: pass
 
     @abstractmethod
-    async def create_message(self, chat_id: int, text: str, role: str) -> int: pass
+    async def create_message(self, chat_id: int, text: str, role: str, token_count: int) -> int: pass
 
     @abstractmethod
     async def chat_by_tg_chat_id(self, tg_chat_id: int) -> list[model.Chat]: pass
@@ -77,5 +83,34 @@ class IChatRepo(Protocol):
     @abstractmethod
     async def message_by_chat_id(self, chat_id: int) -> list[model.Message]: pass
 
+    @abstractmethod
+    async def message_tail_by_chat_id(
+            self,
+            chat_id: int,
+            after_message_id: int,
+            token_budget: int,
+            pinned_messages: int
+    ) -> model.MessageTail: pass
+
+    @abstractmethod
+    async def messages_between(
+            self,
+            chat_id: int,
+            after_message_id: int,
+            before_message_id: int
+    ) -> list[model.Message]: pass
+
+    @abstractmethod
+    async def chat_summary_by_chat_id(self, chat_id: int) -> list[model.ChatSummary]: pass
+
+    @abstractmethod
+    async def upsert_chat_summary(
+            self,
+            chat_id: int,
+            summary: str,
+            last_message_id: int,
+            token_count: int
+    ) -> None: pass
+
     @abstractmethod
     async def delete_all_message(self, chat_id: int) -> None: pass
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Protocol
+from typing import Protocol, AsyncIterator
 
 from internal import model
 
@@ -11,5 +11,18 @@ class ILLMClient(Protocol):
             system_prompt: str,
             temperature: float,
             _model: str = "gpt-4o-mini",
-            base64img: str = None
+            base64img: str = None,
+            image_mime_type: str = "image/png"
     ) -> str: pass
+
+    @abstractmethod
+    def generate_stream(
+            self,
+            history: list[model.Message],
+            system_prompt: str,
+            temperature: float,
+            _model: str = "gpt-4o-mini",
+    ) -> AsyncIterator[str]: pass
+
+    @abstractmethod
+    async def embedding(self, text: str, _model: str = "text-embedding-3-small") -> list[float]: pass
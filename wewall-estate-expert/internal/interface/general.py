@@ -5,6 +5,8 @@ from fastapi import FastAPI
 from opentelemetry.metrics import Meter
 from opentelemetry.trace import Tracer
 
+from internal import model
+
 
 class IOtelLogger(Protocol):
     @abstractmethod
@@ -51,7 +53,13 @@ class IHttpMiddleware(Protocol):
 
 class ITgNewsParsing(Protocol):
     @abstractmethod
-    async def parse(self, channel_name: str) -> str: pass
+    async def start(self) -> None: pass
+
+    @abstractmethod
+    async def stop(self) -> None: pass
+
+    @abstractmethod
+    async def new_posts(self, channel_name: str, after_message_id: int | None) -> list[model.TgPost]: pass
 
 
 class IRedis(Protocol):
@@ -0,0 +1,7 @@
+from abc import abstractmethod
+from typing import Protocol
+
+
+class IKnowledgeBaseRepo(Protocol):
+    @abstractmethod
+    async def knowledge_base_version(self) -> int: pass
@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from datetime import datetime
 from typing import Protocol
 
 from internal import model
@@ -10,10 +11,30 @@ class INewsService(Protocol):
     @abstractmethod
     async def all_news(self) -> list[model.News]: pass
 
+    @abstractmethod
+    async def ingest_channel_news(self, channel_name: str) -> int: pass
+
 class INewsRepo(Protocol):
     @abstractmethod
     async def all_news(self) -> list[model.News]: pass
 
+    @abstractmethod
+    async def recent_news(self, created_after: datetime, channel_limit: int) -> list[model.News]: pass
+
     @abstractmethod
     async def create_news(self, news_name: str, news_summary: str) -> int: pass
 
+    @abstractmethod
+    async def channel_watermark(self, channel_name: str) -> int | None: pass
+
+    @abstractmethod
+    async def create_channel_news(self, channel_name: str, posts: list[model.TgPost]) -> int: pass
+
+    @abstractmethod
+    async def update_channel_watermark(self, channel_name: str, last_message_id: int) -> None: pass
+
+    @abstractmethod
+    async def delete_legacy_channel_news(self, channel_name: str) -> None: pass
+
+    @abstractmethod
+    async def delete_old_channel_news(self, channel_name: str, created_before: datetime) -> None: pass
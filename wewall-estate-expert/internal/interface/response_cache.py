@@ -0,0 +1,12 @@
+from abc import abstractmethod
+from typing import Protocol
+
+from internal import model
+
+
+class IResponseCache(Protocol):
+    @abstractmethod
+    async def get(self, expert: str, system_prompt: str, history: list[model.Message]) -> str | None: pass
+
+    @abstractmethod
+    async def put(self, expert: str, system_prompt: str, history: list[model.Message], llm_response: str): pass
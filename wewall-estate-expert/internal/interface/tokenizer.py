@@ -0,0 +1,10 @@
+from abc import abstractmethod
+from typing import Protocol
+
+
+class ITokenizer(Protocol):
+    @abstractmethod
+    def count(self, text: str) -> int: pass
+
+    @abstractmethod
+    def count_message(self, text: str) -> int: pass
@@ -12,6 +12,8 @@ class Message:
 
     created_at: datetime
 
+    token_count: int | None = None
+
     @classmethod
     def serialize(cls, rows) -> list:
         return [
@@ -21,10 +23,51 @@ class Message:
                 role=row.role,
                 text=row.text,
                 created_at=row.created_at,
+                token_count=row.token_count,
             ) for row in rows
         ]
 
 
+@dataclass
+class MessageTail:
+    messages: list[Message]
+    # Сколько еще не свернутых в саммари сообщений не влезло в бюджет
+    truncated_count: int
+
+    @classmethod
+    def serialize(cls, rows) -> "MessageTail":
+        if not rows:
+            return cls(messages=[], truncated_count=0)
+        return cls(
+            messages=Message.serialize(rows),
+            truncated_count=rows[0].total_count - len(rows),
+        )
+
+
+@dataclass
+class ChatSummary:
+    chat_id: int
+
+    summary: str
+    last_message_id: int
+    token_count: int
+
+    updated_at: datetime
+
+    @classmethod
+    def serialize(cls, rows) -> list:
+        return [
+            cls(
+                chat_id=row.chat_id,
+                summary=row.summary,
+                last_message_id=row.last_message_id,
+                token_count=row.token_count,
+                updated_at=row.updated_at,
+            )
+            for row in rows
+        ]
+
+
 @dataclass
 class Chat:
     id: int | None
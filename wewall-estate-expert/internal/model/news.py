@@ -22,3 +22,13 @@ class News:
             )
             for row in rows
         ]
+
+
+@dataclass
+class TgPost:
+    channel_name: str
+    message_id: int
+
+    text: str
+
+    created_at: datetime
@@ -20,6 +20,25 @@ CREATE TABLE IF NOT EXISTS messages (
 );
 """
 
+alter_message_table = """
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS token_count INTEGER;
+"""
+
+create_message_chat_id_index = """
+CREATE INDEX IF NOT EXISTS messages_chat_id_id_idx ON messages (chat_id, id);
+"""
+
+create_chat_summary_table = """
+CREATE TABLE IF NOT EXISTS chat_summaries (
+    chat_id INTEGER PRIMARY KEY,
+    summary TEXT NOT NULL,
+    last_message_id INTEGER NOT NULL,
+    token_count INTEGER NOT NULL,
+
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
 create_analysis_table = """
 CREATE TABLE IF NOT EXISTS analysis (
     id SERIAL PRIMARY KEY,
@@ -40,6 +59,167 @@ CREATE TABLE IF NOT EXISTS news (
 );
 """
 
+alter_news_table = """
+ALTER TABLE news
+    ADD COLUMN IF NOT EXISTS channel_name TEXT,
+    ADD COLUMN IF NOT EXISTS message_id BIGINT;
+"""
+
+create_news_channel_message_index = """
+CREATE UNIQUE INDEX IF NOT EXISTS news_channel_message_idx ON news (channel_name, message_id);
+"""
+
+create_tg_news_watermark_table = """
+CREATE TABLE IF NOT EXISTS tg_news_watermarks (
+    channel_name TEXT PRIMARY KEY,
+    last_message_id BIGINT NOT NULL,
+
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+create_knowledge_base_version_table = """
+CREATE TABLE IF NOT EXISTS knowledge_base_version (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+init_knowledge_base_version = """
+INSERT INTO knowledge_base_version (id, version)
+VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
+"""
+
+# Любое изменение analysis или news увеличивает версию базы знаний,
+# так промпт пересобирается и после загрузок из отдельных процессов.
+# Триггеры на INSERT, UPDATE и DELETE смотрят в таблицу переходов и не трогают версию,
+# если запрос не изменил ни одной строки, например ON CONFLICT DO NOTHING на уже загруженных постах
+on_knowledge_base_change_query1 = """
+CREATE OR REPLACE FUNCTION bump_knowledge_base_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE knowledge_base_version SET version = version + 1, updated_at = NOW() WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE 'plpgsql';
+"""
+
+on_knowledge_base_change_query2 = """
+CREATE OR REPLACE FUNCTION bump_knowledge_base_version_on_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE knowledge_base_version SET version = version + 1, updated_at = NOW()
+    WHERE id = 1 AND EXISTS (SELECT 1 FROM changed_rows);
+    RETURN NULL;
+END;
+$$ LANGUAGE 'plpgsql';
+"""
+
+drop_analysis_knowledge_base_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_trigger ON analysis;
+"""
+
+drop_analysis_knowledge_base_insert_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_insert_trigger ON analysis;
+"""
+
+drop_analysis_knowledge_base_update_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_update_trigger ON analysis;
+"""
+
+drop_analysis_knowledge_base_delete_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_delete_trigger ON analysis;
+"""
+
+drop_analysis_knowledge_base_truncate_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_truncate_trigger ON analysis;
+"""
+
+on_knowledge_base_change_query3 = """
+CREATE TRIGGER bump_knowledge_base_version_insert_trigger
+AFTER INSERT ON analysis
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version_on_change();
+"""
+
+on_knowledge_base_change_query4 = """
+CREATE TRIGGER bump_knowledge_base_version_update_trigger
+AFTER UPDATE ON analysis
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version_on_change();
+"""
+
+on_knowledge_base_change_query5 = """
+CREATE TRIGGER bump_knowledge_base_version_delete_trigger
+AFTER DELETE ON analysis
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version_on_change();
+"""
+
+on_knowledge_base_change_query6 = """
+CREATE TRIGGER bump_knowledge_base_version_truncate_trigger
+AFTER TRUNCATE ON analysis
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version();
+"""
+
+drop_news_knowledge_base_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_trigger ON news;
+"""
+
+drop_news_knowledge_base_insert_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_insert_trigger ON news;
+"""
+
+drop_news_knowledge_base_update_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_update_trigger ON news;
+"""
+
+drop_news_knowledge_base_delete_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_delete_trigger ON news;
+"""
+
+drop_news_knowledge_base_truncate_trigger = """
+DROP TRIGGER IF EXISTS bump_knowledge_base_version_truncate_trigger ON news;
+"""
+
+on_knowledge_base_change_query7 = """
+CREATE TRIGGER bump_knowledge_base_version_insert_trigger
+AFTER INSERT ON news
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version_on_change();
+"""
+
+on_knowledge_base_change_query8 = """
+CREATE TRIGGER bump_knowledge_base_version_update_trigger
+AFTER UPDATE ON news
+REFERENCING NEW TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version_on_change();
+"""
+
+on_knowledge_base_change_query9 = """
+CREATE TRIGGER bump_knowledge_base_version_delete_trigger
+AFTER DELETE ON news
+REFERENCING OLD TABLE AS changed_rows
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version_on_change();
+"""
+
+on_knowledge_base_change_query10 = """
+CREATE TRIGGER bump_knowledge_base_version_truncate_trigger
+AFTER TRUNCATE ON news
+FOR EACH STATEMENT
+EXECUTE PROCEDURE bump_knowledge_base_version();
+"""
+
 on_update_table_query1 = """
 CREATE OR REPLACE FUNCTION update_updated_at()
 RETURNS TRIGGER AS $$
@@ -65,6 +245,10 @@ drop_message_table = """
 DROP TABLE IF EXISTS messages;
 """
 
+drop_chat_summary_table = """
+DROP TABLE IF EXISTS chat_summaries;
+"""
+
 drop_analysis_table = """
 DROP TABLE IF EXISTS analysis;
 """
@@ -73,12 +257,59 @@ drop_news_table = """
 DROP TABLE IF EXISTS news;
 """
 
+drop_tg_news_watermark_table = """
+DROP TABLE IF EXISTS tg_news_watermarks;
+"""
+
+drop_knowledge_base_version_table = """
+DROP TABLE IF EXISTS knowledge_base_version;
+"""
+
+drop_knowledge_base_version_function = """
+DROP FUNCTION IF EXISTS bump_knowledge_base_version() CASCADE;
+"""
+
+drop_knowledge_base_version_on_change_function = """
+DROP FUNCTION IF EXISTS bump_knowledge_base_version_on_change() CASCADE;
+"""
+
 create_queries = [
     create_chat_table,
     create_analysis_table,
     create_news_table,
+    alter_news_table,
+    create_news_channel_message_index,
+    create_tg_news_watermark_table,
     create_message_table,
+    alter_message_table,
+    create_message_chat_id_index,
+    create_chat_summary_table,
+    create_knowledge_base_version_table,
+    init_knowledge_base_version,
+    on_knowledge_base_change_query1,
+    on_knowledge_base_change_query2,
+    drop_analysis_knowledge_base_trigger,
+    drop_analysis_knowledge_base_insert_trigger,
+    drop_analysis_knowledge_base_update_trigger,
+    drop_analysis_knowledge_base_delete_trigger,
+    drop_analysis_knowledge_base_truncate_trigger,
+    on_knowledge_base_change_query3,
+    on_knowledge_base_change_query4,
+    on_knowledge_base_change_query5,
+    on_knowledge_base_change_query6,
+    drop_news_knowledge_base_trigger,
+    drop_news_knowledge_base_insert_trigger,
+    drop_news_knowledge_base_update_trigger,
+    drop_news_knowledge_base_delete_trigger,
+    drop_news_knowledge_base_truncate_trigger,
+    on_knowledge_base_change_query7,
+    on_knowledge_base_change_query8,
+    on_knowledge_base_change_query9,
+    on_knowledge_base_change_query10,
     on_update_table_query1,
     on_update_table_query2
 ]
-drop_queries = [drop_chat_table, drop_message_table, drop_analysis_table, drop_news_table]
+drop_queries = [drop_chat_table, drop_message_table, drop_chat_summary_table, drop_analysis_table, drop_news_table,
+                drop_tg_news_watermark_table,
+                drop_knowledge_base_version_function, drop_knowledge_base_version_on_change_function,
+                drop_knowledge_base_version_table]
@@ -10,8 +10,8 @@ WHERE tg_chat_id = :tg_chat_id;
 """
 
 create_message = """
-INSERT INTO messages (chat_id, text, role)
-VALUES (:chat_id, :text, :role)
+INSERT INTO messages (chat_id, text, role, token_count)
+VALUES (:chat_id, :text, :role, :token_count)
 RETURNING id;
 """
 
@@ -21,6 +21,48 @@ WHERE chat_id = :chat_id
 ORDER BY created_at ASC;
 """
 
+# Хвост истории после саммари, который влезает в бюджет токенов.
+# Для старых сообщений без token_count берем грубую оценку по длине текста
+message_tail_by_chat_id = """
+SELECT * FROM (
+    SELECT *,
+        SUM(COALESCE(token_count, CEIL(length(text) / 2.0)::INTEGER)) OVER (ORDER BY id DESC) AS running_tokens,
+        ROW_NUMBER() OVER (ORDER BY id DESC) AS position,
+        COUNT(*) OVER () AS total_count
+    FROM messages
+    WHERE chat_id = :chat_id AND id > :after_message_id
+) AS tail
+WHERE position <= :pinned_messages OR running_tokens <= :token_budget
+ORDER BY id ASC;
+"""
+
+messages_between = """
+SELECT * FROM messages
+WHERE chat_id = :chat_id AND id > :after_message_id AND id < :before_message_id
+ORDER BY id ASC;
+"""
+
+chat_summary_by_chat_id = """
+SELECT * FROM chat_summaries
+WHERE chat_id = :chat_id;
+"""
+
+upsert_chat_summary = """
+INSERT INTO chat_summaries (chat_id, summary, last_message_id, token_count)
+VALUES (:chat_id, :summary, :last_message_id, :token_count)
+ON CONFLICT (chat_id) DO UPDATE SET
+    summary = EXCLUDED.summary,
+    last_message_id = EXCLUDED.last_message_id,
+    token_count = EXCLUDED.token_count,
+    updated_at = NOW()
+WHERE chat_summaries.last_message_id < EXCLUDED.last_message_id;
+"""
+
+delete_chat_summary = """
+DELETE FROM chat_summaries
+WHERE chat_id = :chat_id;
+"""
+
 delete_all_message = """
 DELETE FROM messages
 WHERE chat_id = :chat_id;
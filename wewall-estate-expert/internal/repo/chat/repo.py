@@ -33,18 +33,19 @@ class ChatRepository(interface.IChatRepo):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
-    async def create_message(self, chat_id: int, text: str, role: str) -> int:
+    async def create_message(self, chat_id: int, text: str, role: str, token_count: int) -> int:
         with self.tracer.start_as_current_span(
                 "ChatRepository.create_message",
                 kind=SpanKind.INTERNAL,
                 attributes={
                     "chat_id": chat_id,
                     "text": text,
-                    "role": role
+                    "role": role,
+                    "token_count": token_count
                 }
         ) as span:
             try:
-                args = {"chat_id": chat_id, "text": text, "role": role}
+                args = {"chat_id": chat_id, "text": text, "role": role, "token_count": token_count}
                 message_id = await self.db.insert(create_message, args)
 
                 span.set_status(Status(StatusCode.OK))
@@ -97,6 +98,124 @@ class ChatRepository(interface.IChatRepo):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
+    async def message_tail_by_chat_id(
+            self,
+            chat_id: int,
+            after_message_id: int,
+            token_budget: int,
+            pinned_messages: int
+    ) -> model.MessageTail:
+        with self.tracer.start_as_current_span(
+                "ChatRepository.message_tail_by_chat_id",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "chat_id": chat_id,
+                    "after_message_id": after_message_id,
+                    "token_budget": token_budget,
+                    "pinned_messages": pinned_messages,
+                }
+        ) as span:
+            try:
+                args = {
+                    "chat_id": chat_id,
+                    "after_message_id": after_message_id,
+                    "token_budget": token_budget,
+                    "pinned_messages": pinned_messages,
+                }
+                rows = await self.db.select(message_tail_by_chat_id, args)
+                tail = model.MessageTail.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return tail
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def messages_between(
+            self,
+            chat_id: int,
+            after_message_id: int,
+            before_message_id: int
+    ) -> list[model.Message]:
+        with self.tracer.start_as_current_span(
+                "ChatRepository.messages_between",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "chat_id": chat_id,
+                    "after_message_id": after_message_id,
+                    "before_message_id": before_message_id,
+                }
+        ) as span:
+            try:
+                args = {
+                    "chat_id": chat_id,
+                    "after_message_id": after_message_id,
+                    "before_message_id": before_message_id,
+                }
+                rows = await self.db.select(messages_between, args)
+                if rows:
+                    rows = model.Message.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def chat_summary_by_chat_id(self, chat_id: int) -> list[model.ChatSummary]:
+        with self.tracer.start_as_current_span(
+                "ChatRepository.chat_summary_by_chat_id",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "chat_id": chat_id,
+                }
+        ) as span:
+            try:
+                args = {"chat_id": chat_id}
+                rows = await self.db.select(chat_summary_by_chat_id, args)
+                if rows:
+                    rows = model.ChatSummary.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def upsert_chat_summary(
+            self,
+            chat_id: int,
+            summary: str,
+            last_message_id: int,
+            token_count: int
+    ) -> None:
+        with self.tracer.start_as_current_span(
+                "ChatRepository.upsert_chat_summary",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "chat_id": chat_id,
+                    "last_message_id": last_message_id,
+                    "token_count": token_count,
+                }
+        ) as span:
+            try:
+                args = {
+                    "chat_id": chat_id,
+                    "summary": summary,
+                    "last_message_id": last_message_id,
+                    "token_count": token_count,
+                }
+                await self.db.update(upsert_chat_summary, args)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
     async def delete_all_message(self, chat_id: int) -> None:
         with self.tracer.start_as_current_span(
                 "ChatRepository.delete_all_message",
@@ -108,6 +227,7 @@ class ChatRepository(interface.IChatRepo):
             try:
                 args = {"chat_id": chat_id}
                 await self.db.delete(delete_all_message, args)
+                await self.db.delete(delete_chat_summary, args)
                 span.set_status(Status(StatusCode.OK))
             except Exception as err:
                 span.record_exception(err)
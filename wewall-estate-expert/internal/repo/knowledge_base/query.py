@@ -0,0 +1,3 @@
+knowledge_base_version = """
+SELECT version FROM knowledge_base_version WHERE id = 1;
+"""
@@ -0,0 +1,30 @@
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import interface
+from .query import *
+
+
+class KnowledgeBaseRepo(interface.IKnowledgeBaseRepo):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            db: interface.IDB
+    ):
+        self.tracer = tel.tracer()
+        self.db = db
+
+    async def knowledge_base_version(self) -> int:
+        with self.tracer.start_as_current_span(
+                "KnowledgeBaseRepo.knowledge_base_version",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                rows = await self.db.select(knowledge_base_version, {})
+                version = rows[0].version if rows else 0
+
+                span.set_status(Status(StatusCode.OK))
+                return version
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
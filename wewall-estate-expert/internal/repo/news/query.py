@@ -6,4 +6,53 @@ RETURNING id;
 
 all_news = """
 SELECT * FROM news;
-"""
\ No newline at end of file
+"""
+
+# Для промпта: последние посты каждого канала за окно свежести, вручную добавленные новости без message_id не стареют
+recent_news = """
+SELECT id, news_name, news_summary, created_at FROM (
+    SELECT
+        news.*,
+        ROW_NUMBER() OVER (PARTITION BY news_name ORDER BY created_at DESC, id DESC) AS channel_rank
+    FROM news
+    WHERE message_id IS NULL OR created_at >= :created_after
+) AS ranked_news
+WHERE channel_rank <= :channel_limit
+ORDER BY news_name, created_at, id;
+"""
+
+channel_watermark = """
+SELECT last_message_id FROM tg_news_watermarks
+WHERE channel_name = :channel_name;
+"""
+
+create_channel_news = """
+INSERT INTO news (news_name, news_summary, channel_name, message_id, created_at)
+SELECT :channel_name, post.text, :channel_name, post.message_id, post.created_at
+FROM unnest(
+    CAST(:message_ids AS BIGINT[]),
+    CAST(:texts AS TEXT[]),
+    CAST(:created_ats AS TIMESTAMP[])
+) AS post(message_id, text, created_at)
+ON CONFLICT (channel_name, message_id) DO NOTHING
+RETURNING id;
+"""
+
+update_channel_watermark = """
+INSERT INTO tg_news_watermarks (channel_name, last_message_id)
+VALUES (:channel_name, :last_message_id)
+ON CONFLICT (channel_name) DO UPDATE SET
+    last_message_id = GREATEST(tg_news_watermarks.last_message_id, EXCLUDED.last_message_id),
+    updated_at = NOW();
+"""
+
+delete_old_channel_news = """
+DELETE FROM news
+WHERE channel_name = :channel_name AND message_id IS NOT NULL AND created_at < :created_before;
+"""
+
+# Старые записи, где последние посты канала склеены в одну строку
+delete_legacy_channel_news = """
+DELETE FROM news
+WHERE news_name = :channel_name AND message_id IS NULL;
+"""
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import interface
@@ -52,4 +54,126 @@ class NewsRepo(interface.INewsRepo):
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise
\ No newline at end of file
+                raise
+
+    async def recent_news(self, created_after: datetime, channel_limit: int) -> list[model.News]:
+        with self.tracer.start_as_current_span(
+                "NewsRepo.recent_news",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "created_after": str(created_after),
+                    "channel_limit": channel_limit,
+                }
+        ) as span:
+            try:
+                args = {"created_after": created_after, "channel_limit": channel_limit}
+                rows = await self.db.select(recent_news, args)
+                if rows:
+                    rows = model.News.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def channel_watermark(self, channel_name: str) -> int | None:
+        with self.tracer.start_as_current_span(
+                "NewsRepo.channel_watermark",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "channel_name": channel_name,
+                }
+        ) as span:
+            try:
+                rows = await self.db.select(channel_watermark, {"channel_name": channel_name})
+                last_message_id = rows[0].last_message_id if rows else None
+
+                span.set_status(Status(StatusCode.OK))
+                return last_message_id
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def create_channel_news(self, channel_name: str, posts: list[model.TgPost]) -> int:
+        with self.tracer.start_as_current_span(
+                "NewsRepo.create_channel_news",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "channel_name": channel_name,
+                    "posts": len(posts),
+                }
+        ) as span:
+            try:
+                args = {
+                    "channel_name": channel_name,
+                    "message_ids": [post.message_id for post in posts],
+                    "texts": [post.text for post in posts],
+                    "created_ats": [post.created_at for post in posts],
+                }
+                # select, потому что нужны все RETURNING строки, а не только первая
+                rows = await self.db.select(create_channel_news, args)
+
+                span.set_status(Status(StatusCode.OK))
+                return len(rows)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def update_channel_watermark(self, channel_name: str, last_message_id: int) -> None:
+        with self.tracer.start_as_current_span(
+                "NewsRepo.update_channel_watermark",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "channel_name": channel_name,
+                    "last_message_id": last_message_id,
+                }
+        ) as span:
+            try:
+                args = {"channel_name": channel_name, "last_message_id": last_message_id}
+                await self.db.update(update_channel_watermark, args)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def delete_legacy_channel_news(self, channel_name: str) -> None:
+        with self.tracer.start_as_current_span(
+                "NewsRepo.delete_legacy_channel_news",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "channel_name": channel_name,
+                }
+        ) as span:
+            try:
+                await self.db.delete(delete_legacy_channel_news, {"channel_name": channel_name})
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def delete_old_channel_news(self, channel_name: str, created_before: datetime) -> None:
+        with self.tracer.start_as_current_span(
+                "NewsRepo.delete_old_channel_news",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "channel_name": channel_name,
+                    "created_before": str(created_before),
+                }
+        ) as span:
+            try:
+                args = {"channel_name": channel_name, "created_before": created_before}
+                await self.db.delete(delete_old_channel_news, args)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
@@ -1,5 +1,6 @@
 import io
 import base64
+import asyncio
 from datetime import datetime
 
 from opentelemetry.trace import Status, StatusCode, SpanKind
@@ -14,12 +15,24 @@ class AnalysisService(interface.IAnalysisService):
             self,
             tel: interface.ITelemetry,
             analysis_repo: interface.IAnalysisRepo,
-            llm_client: interface.ILLMClient
+            llm_client: interface.ILLMClient,
+            page_concurrency: int = 8,
+            dpi: int = 100,
+            image_max_side: int = 1600,
+            image_quality: int = 80,
     ):
         self.tracer = tel.tracer()
+        self.logger = tel.logger()
         self.analysis_repo = analysis_repo
         self.llm_client = llm_client
 
+        # Страницы растрируются по одной прямо перед отправкой в LLM,
+        # поэтому в памяти одновременно не больше page_concurrency картинок
+        self.page_semaphore = asyncio.Semaphore(page_concurrency)
+        self.dpi = dpi
+        self.image_max_side = image_max_side
+        self.image_quality = image_quality
+
     async def analysis_from_pdf(self, ctx: dict, pdf_path: str) -> int:
         with self.tracer.start_as_current_span(
                 "AnalysisService.analysis_from_pdf",
@@ -29,40 +42,77 @@ class AnalysisService(interface.IAnalysisService):
                 }
         ) as span:
             try:
-                analysis_summary = ""
-                analysis_name = ""
-                history = []
-                images = self.__pdf2image(pdf_path)
-                for current_page, image in enumerate(images):
-                    current_page += 1
-                    print(f"{current_page}-я страница", flush=True)
+                pdf_info = await asyncio.to_thread(pdf2image.pdfinfo_from_path, pdf_path)
+                page_count = pdf_info["Pages"]
+                span.set_attribute("page_count", page_count)
 
-                    base64image = base64.b64encode(image.getvalue()).decode('utf-8')
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [
+                        tg.create_task(self.__page_summary(pdf_path, page, page_count))
+                        for page in range(1, page_count + 1)
+                    ]
+                page_summaries = [task.result() for task in tasks]
 
-                    if current_page == len(images):
-                        history.append(model.Message(0, "", common.Roles.user, "Последняя страница", datetime.now()))
-                        llm_response = await self.__send_message(history, base64image)
-                        history.append(model.Message(0, "", common.Roles.assistant, llm_response, datetime.now()))
+                analysis_summary = "".join("\n" + page_summary + "\n" for page_summary in page_summaries)
+                analysis_name = await self.__analysis_name(page_summaries)
 
-                        analysis_summary += "\n" + llm_response + "\n"
-                        history.append(
-                            model.Message(0, "", common.Roles.user, "Напиши мне сейчас только название этой презентации",
-                                          datetime.now()))
-                        analysis_name = await self.__send_message(history)
-
-                    else:
-                        history.append(model.Message(0, "", common.Roles.user, f"{current_page}-я страница", datetime.now()))
-                        llm_response = await self.__send_message(history, base64image)
-                        history.append(model.Message(0, "", common.Roles.assistant, llm_response, datetime.now()))
+                analysis_id = await self.analysis_repo.create_analysis(analysis_name, analysis_summary)
+                self.logger.info("PDF проанализирован", {"pdf_path": pdf_path, "page_count": page_count})
 
-                        analysis_summary += "\n" + llm_response + "\n"
+                span.set_status(Status(StatusCode.OK))
+                return analysis_id
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
 
+    async def __page_summary(self, pdf_path: str, page: int, page_count: int) -> str:
+        with self.tracer.start_as_current_span(
+                "AnalysisService.__page_summary",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "pdf_path": pdf_path,
+                    "page": page
+                }
+        ) as span:
+            try:
+                async with self.page_semaphore:
+                    image = await asyncio.to_thread(self.__pdf_page2image, pdf_path, page)
+                    base64image = base64.b64encode(image.getvalue()).decode('utf-8')
                     del image
-                del images
-                analysis_id = await self.analysis_repo.create_analysis(analysis_name, analysis_summary)
+
+                    history = [
+                        model.Message(0, "", common.Roles.user, f"{page}-я страница из {page_count}", datetime.now())
+                    ]
+                    llm_response = await self.__send_message(history, base64image)
+
+                self.logger.info(f"{page}-я страница проанализирована", {"pdf_path": pdf_path})
 
                 span.set_status(Status(StatusCode.OK))
-                return analysis_id
+                return llm_response
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def __analysis_name(self, page_summaries: list[str]) -> str:
+        with self.tracer.start_as_current_span(
+                "AnalysisService.__analysis_name",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                # Название почти всегда на первых страницах, весь отчет для этого не нужен
+                history = []
+                for page, page_summary in enumerate(page_summaries[:3], start=1):
+                    history.append(model.Message(0, "", common.Roles.user, f"{page}-я страница", datetime.now()))
+                    history.append(model.Message(0, "", common.Roles.assistant, page_summary, datetime.now()))
+                history.append(
+                    model.Message(0, "", common.Roles.user, "Напиши мне сейчас только название этой презентации",
+                                  datetime.now()))
+                analysis_name = await self.__send_message(history)
+
+                span.set_status(Status(StatusCode.OK))
+                return analysis_name
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
@@ -73,8 +123,8 @@ class AnalysisService(interface.IAnalysisService):
                 "AnalysisService.__send_message",
                 kind=SpanKind.INTERNAL,
                 attributes={
-                    "history": history,
-                    "base64img": base64img
+                    "history": len(history),
+                    "base64img_size": len(base64img) if base64img else 0
                 }
         ) as span:
             try:
@@ -83,7 +133,8 @@ class AnalysisService(interface.IAnalysisService):
                     history,
                     system_prompt,
                     0.7,
-                    base64img=base64img
+                    base64img=base64img,
+                    image_mime_type="image/jpeg"
                 )
 
                 span.set_status(Status(StatusCode.OK))
@@ -93,26 +144,31 @@ class AnalysisService(interface.IAnalysisService):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
-    def __pdf2image(self, pdf_path: str) -> list[io.BytesIO] | None:
+    def __pdf_page2image(self, pdf_path: str, page: int) -> io.BytesIO:
         with self.tracer.start_as_current_span(
-                "AnalysisService.__pdf2image",
+                "AnalysisService.__pdf_page2image",
                 kind=SpanKind.INTERNAL,
                 attributes={
-                    "pdf_path": pdf_path
+                    "pdf_path": pdf_path,
+                    "page": page
                 }
         ) as span:
             try:
-                pdf_images = pdf2image.convert_from_path(f"{pdf_path}")
-
-                result = []
-                for page in range(len(pdf_images)):
-                    image_buffer = io.BytesIO()
-                    pdf_images[page].save(image_buffer, 'PNG')
-                    image_buffer.seek(0)
-                    result.append(image_buffer)
+                pdf_image = pdf2image.convert_from_path(
+                    pdf_path,
+                    dpi=self.dpi,
+                    first_page=page,
+                    last_page=page,
+                )[0]
+                pdf_image.thumbnail((self.image_max_side, self.image_max_side))
+
+                image_buffer = io.BytesIO()
+                pdf_image.convert("RGB").save(image_buffer, "JPEG", quality=self.image_quality, optimize=True)
+                image_buffer.seek(0)
+                pdf_image.close()
 
                 span.set_status(Status(StatusCode.OK))
-                return result
+                return image_buffer
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import interface
@@ -13,12 +15,29 @@ class ChatService(interface.IChatService):
             chat_repo: interface.IChatRepo,
             llm_client: interface.ILLMClient,
             prompt_service: interface.IPromptService,
+            response_cache: interface.IResponseCache,
+            tokenizer: interface.ITokenizer,
+            history_token_budget: dict[str, int],
+            history_pinned_messages: int = 4,
+            history_keep_share: float = 0.5,
+            history_summary_model: str = "gpt-4o-mini",
+            history_summary_chunk_tokens: int = 8000,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.chat_repo = chat_repo
         self.llm_client = llm_client
         self.prompt_service = prompt_service
+        self.response_cache = response_cache
+        self.tokenizer = tokenizer
+
+        # В LLM уходит только хвост истории в пределах бюджета модели,
+        # все что старше сворачивается в саммари, которое дополняется по мере роста диалога
+        self.history_token_budget = history_token_budget
+        self.history_pinned_messages = history_pinned_messages
+        self.history_keep_share = history_keep_share
+        self.history_summary_model = history_summary_model
+        self.history_summary_chunk_tokens = history_summary_chunk_tokens
 
     async def create_chat(self, tg_chat_id: int) -> int:
         with self.tracer.start_as_current_span(
@@ -50,7 +69,12 @@ class ChatService(interface.IChatService):
                 }
         ) as span:
             try:
-                message_id = await self.chat_repo.create_message(tg_chat_id, text, role)
+                message_id = await self.chat_repo.create_message(
+                    tg_chat_id,
+                    text,
+                    role,
+                    self.tokenizer.count_message(text)
+                )
                 span.set_attribute("message_id", message_id)
 
                 span.set_status(Status(StatusCode.OK))
@@ -70,17 +94,23 @@ class ChatService(interface.IChatService):
                 }
         ) as span:
             try:
-                await self.chat_repo.create_message(chat_id, text, common.Roles.user)
-                all_message = await self.chat_repo.message_by_chat_id(chat_id)
+                await self.chat_repo.create_message(chat_id, text, common.Roles.user, self.tokenizer.count_message(text))
+                history, history_summary = await self.__history(chat_id, "gpt-4o-mini")
                 system_prompt = await self.prompt_service.wewall_expert_system_prompt()
-                llm_response = await self.llm_client.generate(all_message, system_prompt, 0.7)
+                system_prompt = self.__with_history_summary(system_prompt, history_summary)
+                llm_response = await self.__generate("wewall_expert", history, system_prompt, 0.7)
 
                 if self.__check_command_in_response(llm_response):
                     self.logger.info(f"LLM ответила командой")
                     span.set_status(Status(StatusCode.OK))
                     return llm_response
                 else:
-                    message_id = await self.chat_repo.create_message(chat_id, llm_response, common.Roles.assistant)
+                    message_id = await self.chat_repo.create_message(
+                        chat_id,
+                        llm_response,
+                        common.Roles.assistant,
+                        self.tokenizer.count_message(llm_response)
+                    )
                     span.set_attribute("message_id", message_id)
 
                     span.set_status(Status(StatusCode.OK))
@@ -100,17 +130,23 @@ class ChatService(interface.IChatService):
                 }
         ) as span:
             try:
-                await self.chat_repo.create_message(chat_id, text, common.Roles.user)
-                all_message = await self.chat_repo.message_by_chat_id(chat_id)
+                await self.chat_repo.create_message(chat_id, text, common.Roles.user, self.tokenizer.count_message(text))
+                history, history_summary = await self.__history(chat_id, "gpt-4o")
                 system_prompt = await self.prompt_service.estate_expert_system_prompt()
-                llm_response = await self.llm_client.generate(all_message, system_prompt, 0.1, "gpt-4o")
+                system_prompt = self.__with_history_summary(system_prompt, history_summary)
+                llm_response = await self.__generate("estate_expert", history, system_prompt, 0.1, "gpt-4o")
 
                 if self.__check_command_in_response(llm_response):
                     self.logger.info(f"LLM ответила командой")
                     span.set_status(Status(StatusCode.OK))
                     return llm_response
                 else:
-                    message_id = await self.chat_repo.create_message(chat_id, llm_response, common.Roles.assistant)
+                    message_id = await self.chat_repo.create_message(
+                        chat_id,
+                        llm_response,
+                        common.Roles.assistant,
+                        self.tokenizer.count_message(llm_response)
+                    )
                     span.set_attribute("message_id", message_id)
 
                     span.set_status(Status(StatusCode.OK))
@@ -120,6 +156,48 @@ class ChatService(interface.IChatService):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
+    async def stream_message_estate_expert(self, chat_id: int, text: str) -> AsyncIterator[str]:
+        with self.tracer.start_as_current_span(
+                "ChatService.stream_message_estate_expert",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "chat_id": chat_id,
+                    "text": text,
+                }
+        ) as span:
+            try:
+                await self.chat_repo.create_message(chat_id, text, common.Roles.user, self.tokenizer.count_message(text))
+                history, history_summary = await self.__history(chat_id, "gpt-4o")
+                system_prompt = await self.prompt_service.estate_expert_system_prompt()
+                system_prompt = self.__with_history_summary(system_prompt, history_summary)
+
+                llm_response = await self.__cached_response("estate_expert", system_prompt, history)
+                if llm_response is not None:
+                    yield llm_response
+                else:
+                    llm_response = ""
+                    async for chunk in self.llm_client.generate_stream(history, system_prompt, 0.1, "gpt-4o"):
+                        llm_response += chunk
+                        yield chunk
+                    await self.__cache_response("estate_expert", system_prompt, history, llm_response)
+
+                if self.__check_command_in_response(llm_response):
+                    self.logger.info(f"LLM ответила командой")
+                else:
+                    message_id = await self.chat_repo.create_message(
+                        chat_id,
+                        llm_response,
+                        common.Roles.assistant,
+                        self.tokenizer.count_message(llm_response)
+                    )
+                    span.set_attribute("message_id", message_id)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
     async def send_message_estate_search_expert(self, chat_id: int, text: str) -> str:
         with self.tracer.start_as_current_span(
                 "ChatService.send_message_estate_search_expert",
@@ -130,17 +208,23 @@ class ChatService(interface.IChatService):
                 }
         ) as span:
             try:
-                await self.chat_repo.create_message(chat_id, text, common.Roles.user)
-                all_message = await self.chat_repo.message_by_chat_id(chat_id)
+                await self.chat_repo.create_message(chat_id, text, common.Roles.user, self.tokenizer.count_message(text))
+                history, history_summary = await self.__history(chat_id, "gpt-4o")
                 system_prompt = await self.prompt_service.estate_search_expert_prompt()
-                llm_response = await self.llm_client.generate(all_message, system_prompt, 0.1, "gpt-4o")
+                system_prompt = self.__with_history_summary(system_prompt, history_summary)
+                llm_response = await self.__generate("estate_search_expert", history, system_prompt, 0.1, "gpt-4o")
 
                 if self.__check_command_in_response(llm_response):
                     self.logger.info(f"LLM ответила командой")
                     span.set_status(Status(StatusCode.OK))
                     return llm_response
                 else:
-                    message_id = await self.chat_repo.create_message(chat_id, llm_response, common.Roles.assistant)
+                    message_id = await self.chat_repo.create_message(
+                        chat_id,
+                        llm_response,
+                        common.Roles.assistant,
+                        self.tokenizer.count_message(llm_response)
+                    )
                     span.set_attribute("message_id", message_id)
 
                     span.set_status(Status(StatusCode.OK))
@@ -160,17 +244,23 @@ class ChatService(interface.IChatService):
                 }
         ) as span:
             try:
-                await self.chat_repo.create_message(chat_id, text, common.Roles.user)
-                all_message = await self.chat_repo.message_by_chat_id(chat_id)
+                await self.chat_repo.create_message(chat_id, text, common.Roles.user, self.tokenizer.count_message(text))
+                history, history_summary = await self.__history(chat_id, "gpt-4o")
                 system_prompt = await self.prompt_service.estate_calculator_expert_prompt()
-                llm_response = await self.llm_client.generate(all_message, system_prompt, 0.1, "gpt-4o")
+                system_prompt = self.__with_history_summary(system_prompt, history_summary)
+                llm_response = await self.llm_client.generate(history, system_prompt, 0.1, "gpt-4o")
 
                 if self.__check_command_in_response(llm_response):
                     self.logger.info(f"LLM ответила командой")
                     span.set_status(Status(StatusCode.OK))
                     return llm_response
                 else:
-                    message_id = await self.chat_repo.create_message(chat_id, llm_response, common.Roles.assistant)
+                    message_id = await self.chat_repo.create_message(
+                        chat_id,
+                        llm_response,
+                        common.Roles.assistant,
+                        self.tokenizer.count_message(llm_response)
+                    )
                     span.set_attribute("message_id", message_id)
 
                     span.set_status(Status(StatusCode.OK))
@@ -190,17 +280,23 @@ class ChatService(interface.IChatService):
                 }
         ) as span:
             try:
-                await self.chat_repo.create_message(chat_id, text, common.Roles.user)
-                all_message = await self.chat_repo.message_by_chat_id(chat_id)
+                await self.chat_repo.create_message(chat_id, text, common.Roles.user, self.tokenizer.count_message(text))
+                history, history_summary = await self.__history(chat_id, "gpt-4o-mini")
                 system_prompt = await self.prompt_service.contact_collector_prompt()
-                llm_response = await self.llm_client.generate(all_message, system_prompt, 0.6)
+                system_prompt = self.__with_history_summary(system_prompt, history_summary)
+                llm_response = await self.llm_client.generate(history, system_prompt, 0.6)
 
                 if self.__check_command_in_response(llm_response):
                     self.logger.info(f"LLM ответила командой")
                     span.set_status(Status(StatusCode.OK))
                     return llm_response
                 else:
-                    message_id = await self.chat_repo.create_message(chat_id, llm_response, common.Roles.assistant)
+                    message_id = await self.chat_repo.create_message(
+                        chat_id,
+                        llm_response,
+                        common.Roles.assistant,
+                        self.tokenizer.count_message(llm_response)
+                    )
                     span.set_attribute("message_id", message_id)
 
                     span.set_status(Status(StatusCode.OK))
@@ -227,12 +323,23 @@ class ChatService(interface.IChatService):
                 message_id = await self.chat_repo.create_message(
                     chat_id,
                     text,
-                    common.Roles.user
+                    common.Roles.user,
+                    self.tokenizer.count_message(text)
                 )
 
-                all_message = await self.chat_repo.message_by_chat_id(chat_id)
-                chat_summary = await self.llm_client.generate(all_message, text, 0.6)
-                await self.chat_repo.create_message(chat_id, chat_summary, common.Roles.assistant)
+                # Тот же бюджет, что и у ответов: старая часть диалога приходит свернутой в саммари
+                history, history_summary = await self.__history(chat_id, "gpt-4o-mini")
+                chat_summary = await self.llm_client.generate(
+                    history,
+                    self.__with_history_summary(text, history_summary),
+                    0.6
+                )
+                await self.chat_repo.create_message(
+                    chat_id,
+                    chat_summary,
+                    common.Roles.assistant,
+                    self.tokenizer.count_message(chat_summary)
+                )
 
                 span.set_status(Status(StatusCode.OK))
                 return chat_summary
@@ -275,6 +382,158 @@ class ChatService(interface.IChatService):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
+    async def __generate(
+            self,
+            expert: str,
+            history: list[model.Message],
+            system_prompt: str,
+            temperature: float,
+            _model: str = "gpt-4o-mini"
+    ) -> str:
+        llm_response = await self.__cached_response(expert, system_prompt, history)
+        if llm_response is None:
+            llm_response = await self.llm_client.generate(history, system_prompt, temperature, _model)
+            await self.__cache_response(expert, system_prompt, history, llm_response)
+        return llm_response
+
+    # Кеш ответов только ускоряет ответ, его ошибки не должны ломать диалог
+    async def __cached_response(self, expert: str, system_prompt: str, history: list[model.Message]) -> str | None:
+        try:
+            return await self.response_cache.get(expert, system_prompt, history)
+        except Exception as err:
+            self.logger.warning("Ошибка чтения кеша ответов LLM", {"error": str(err)})
+            return None
+
+    async def __cache_response(self, expert: str, system_prompt: str, history: list[model.Message], llm_response: str):
+        try:
+            await self.response_cache.put(expert, system_prompt, history, llm_response)
+        except Exception as err:
+            self.logger.warning("Ошибка записи в кеш ответов LLM", {"error": str(err)})
+
+    async def __history(self, chat_id: int, _model: str) -> tuple[list[model.Message], str]:
+        with self.tracer.start_as_current_span(
+                "ChatService.__history",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "chat_id": chat_id,
+                    "model": _model
+                }
+        ) as span:
+            try:
+                token_budget = self.history_token_budget[_model]
+
+                chat_summary = await self.chat_repo.chat_summary_by_chat_id(chat_id)
+                chat_summary = chat_summary[0] if chat_summary else None
+                summary = chat_summary.summary if chat_summary else ""
+                last_message_id = chat_summary.last_message_id if chat_summary else 0
+                summary_tokens = chat_summary.token_count if chat_summary else 0
+
+                tail = await self.chat_repo.message_tail_by_chat_id(
+                    chat_id,
+                    last_message_id,
+                    max(token_budget - summary_tokens, 0),
+                    self.history_pinned_messages
+                )
+                span.set_attribute("tail_messages", len(tail.messages))
+                span.set_attribute("truncated_messages", tail.truncated_count)
+
+                if tail.truncated_count == 0:
+                    span.set_status(Status(StatusCode.OK))
+                    return tail.messages, summary
+
+                # Сворачиваем с запасом, чтобы следующие ходы не вызывали саммаризацию каждый раз
+                history = self.__fit_history(tail.messages, int(token_budget * self.history_keep_share))
+                folded_messages = await self.chat_repo.messages_between(chat_id, last_message_id, history[0].id)
+
+                summary = await self.__fold_history_summary(summary, folded_messages)
+                await self.chat_repo.upsert_chat_summary(
+                    chat_id,
+                    summary,
+                    folded_messages[-1].id,
+                    self.tokenizer.count(summary)
+                )
+                self.logger.info("Старая часть диалога свернута в саммари", {
+                    "chat_id": chat_id,
+                    "folded_messages": len(folded_messages),
+                })
+
+                span.set_status(Status(StatusCode.OK))
+                return history, summary
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    def __fit_history(self, messages: list[model.Message], token_budget: int) -> list[model.Message]:
+        history = []
+        used_tokens = 0
+        for message in reversed(messages):
+            token_count = message.token_count or self.tokenizer.count_message(message.text)
+            if len(history) >= self.history_pinned_messages and used_tokens + token_count > token_budget:
+                break
+            history.append(message)
+            used_tokens += token_count
+        return history[::-1]
+
+    async def __fold_history_summary(self, summary: str, messages: list[model.Message]) -> str:
+        with self.tracer.start_as_current_span(
+                "ChatService.__fold_history_summary",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "messages": len(messages)
+                }
+        ) as span:
+            try:
+                system_prompt = (
+                    "Ты ведешь краткое содержание диалога клиента с ИИ экспертом по недвижимости. "
+                    "Тебе дают текущее краткое содержание и новые реплики. "
+                    "Дополни краткое содержание новыми репликами: сохрани запросы и параметры клиента, "
+                    "названные объекты, цифры, ссылки и договоренности. "
+                    "Пиши сжато, не более 300 слов. В ответе только обновленное краткое содержание."
+                )
+
+                chunk = []
+                chunk_tokens = 0
+                for message in messages:
+                    chunk.append(message)
+                    chunk_tokens += message.token_count or self.tokenizer.count_message(message.text)
+                    if chunk_tokens >= self.history_summary_chunk_tokens or message is messages[-1]:
+                        transcript = "\n".join(
+                            ("Клиент: " if _message.role == common.Roles.user else "Эксперт: ") + _message.text
+                            for _message in chunk
+                        )
+                        request = model.Message(
+                            id=0,
+                            chat_id="",
+                            role=common.Roles.user,
+                            text=f"ТЕКУЩЕЕ КРАТКОЕ СОДЕРЖАНИЕ:\n{summary or 'нет'}\n\nНОВЫЕ РЕПЛИКИ:\n{transcript}",
+                            created_at=None,
+                        )
+                        summary = await self.llm_client.generate(
+                            [request],
+                            system_prompt,
+                            0.2,
+                            self.history_summary_model
+                        )
+                        chunk = []
+                        chunk_tokens = 0
+
+                span.set_status(Status(StatusCode.OK))
+                return summary
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    def __with_history_summary(self, system_prompt: str, summary: str) -> str:
+        if not summary:
+            return system_prompt
+        return f"""{system_prompt}
+
+КРАТКОЕ СОДЕРЖАНИЕ ПРЕДЫДУЩЕЙ ЧАСТИ ДИАЛОГА:
+{summary}
+"""
+
     def __check_command_in_response(self, llm_response: str) -> bool:
         with self.tracer.start_as_current_span(
                 "ChatService.__check_command_in_response",
@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import interface
@@ -7,10 +9,15 @@ class NewsService(interface.INewsService):
     def __init__(
             self,
             tel: interface.ITelemetry,
-            news_repo: interface.INewsRepo
+            news_repo: interface.INewsRepo,
+            tg_news_parser: interface.ITgNewsParsing,
+            news_max_age: timedelta = timedelta(days=30),
     ):
         self.tracer = tel.tracer()
+        self.logger = tel.logger()
         self.news_repo = news_repo
+        self.tg_news_parser = tg_news_parser
+        self.news_max_age = news_max_age
 
     async def create_news(self, news_name: str, news_summary: str) -> int:
         with self.tracer.start_as_current_span(
@@ -45,3 +52,48 @@ class NewsService(interface.INewsService):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
+
+    async def ingest_channel_news(self, channel_name: str) -> int:
+        with self.tracer.start_as_current_span(
+                "NewsService.ingest_channel_news",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "channel_name": channel_name,
+                }
+        ) as span:
+            try:
+                last_message_id = await self.news_repo.channel_watermark(channel_name)
+                posts = await self.tg_news_parser.new_posts(channel_name, last_message_id)
+
+                created = 0
+                text_posts = [post for post in posts if post.text.strip()]
+                if text_posts:
+                    created = await self.news_repo.create_channel_news(channel_name, text_posts)
+
+                # Водяной знак сдвигаем только после вставки, иначе при падении посты потеряются
+                if posts:
+                    await self.news_repo.update_channel_watermark(
+                        channel_name,
+                        max(post.message_id for post in posts)
+                    )
+
+                if last_message_id is None:
+                    # Первый инкрементальный прогон: старая склейка канала дублирует новые посты
+                    await self.news_repo.delete_legacy_channel_news(channel_name)
+
+                # Посты старше окна свежести в промпт не попадают, храним их только до этого срока
+                await self.news_repo.delete_old_channel_news(channel_name, datetime.now() - self.news_max_age)
+
+                self.logger.info("Новости канала загружены", {
+                    "channel_name": channel_name,
+                    "fetched": len(posts),
+                    "created": created,
+                })
+
+                span.set_attribute("created", created)
+                span.set_status(Status(StatusCode.OK))
+                return created
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
@@ -1,4 +1,6 @@
-from datetime import datetime
+import time
+import asyncio
+from datetime import datetime, timedelta
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import interface
@@ -12,11 +14,46 @@ class PromptService(interface.IPromptService):
             news_repo: interface.INewsRepo,
             analysis_repo: interface.IAnalysisRepo,
             wewall_repo: interface.IWewallRepo,
+            knowledge_base_repo: interface.IKnowledgeBaseRepo,
+            tokenizer: interface.ITokenizer,
+            version_check_interval: float = 5,
+            news_max_age: timedelta = timedelta(days=30),
+            news_channel_limit: int = 20,
     ):
         self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
         self.news_repo = news_repo
         self.analysis_repo = analysis_repo
         self.wewall_repo = wewall_repo
+        self.knowledge_base_repo = knowledge_base_repo
+        self.tokenizer = tokenizer
+        self.news_max_age = news_max_age
+        self.news_channel_limit = news_channel_limit
+
+        # Промпт эксперта по рынку собирается из всей базы знаний, поэтому он кешируется
+        # до изменения версии базы знаний, которую триггеры увеличивают при записи в analysis и news
+        self.version_check_interval = version_check_interval
+        self.__estate_expert_prompt: str | None = None
+        self.__estate_expert_prompt_version: int | None = None
+        self.__version_checked_at = 0.0
+        self.__estate_expert_prompt_lock = asyncio.Lock()
+
+        self.prompt_size = self.meter.create_histogram(
+            name=common.PROMPT_SIZE_METRIC,
+            description="Size of assembled system prompt",
+            unit="bytes"
+        )
+        self.prompt_tokens = self.meter.create_histogram(
+            name=common.PROMPT_TOKENS_METRIC,
+            description="Token count of assembled system prompt",
+            unit="tokens"
+        )
+        self.prompt_rebuild_counter = self.meter.create_counter(
+            name=common.PROMPT_REBUILD_TOTAL_METRIC,
+            description="Total count of system prompt rebuilds",
+            unit="1"
+        )
 
     async def wewall_expert_system_prompt(self) -> str:
         with self.tracer.start_as_current_span(
@@ -72,6 +109,53 @@ class PromptService(interface.IPromptService):
         with self.tracer.start_as_current_span(
                 "PromptService.estate_expert_system_prompt",
                 kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                if self.__estate_expert_prompt_is_fresh():
+                    span.set_status(Status(StatusCode.OK))
+                    return self.__estate_expert_prompt
+
+                async with self.__estate_expert_prompt_lock:
+                    if not self.__estate_expert_prompt_is_fresh():
+                        version = await self.knowledge_base_repo.knowledge_base_version()
+                        self.__version_checked_at = time.monotonic()
+
+                        if self.__estate_expert_prompt is None or version != self.__estate_expert_prompt_version:
+                            prompt = await self.__build_estate_expert_system_prompt()
+                            self.__estate_expert_prompt = prompt
+                            self.__estate_expert_prompt_version = version
+                            self.__record_prompt_size("estate_expert", prompt)
+
+                            self.logger.info("Промпт эксперта по рынку пересобран", {
+                                "knowledge_base_version": version,
+                                "prompt_size": len(prompt.encode()),
+                            })
+
+                    prompt = self.__estate_expert_prompt
+
+                span.set_status(Status(StatusCode.OK))
+                return prompt
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    def __estate_expert_prompt_is_fresh(self) -> bool:
+        return (
+                self.__estate_expert_prompt is not None and
+                time.monotonic() - self.__version_checked_at < self.version_check_interval
+        )
+
+    def __record_prompt_size(self, prompt_name: str, prompt: str):
+        attributes = {common.PROMPT_NAME_KEY: prompt_name}
+        self.prompt_size.record(len(prompt.encode()), attributes)
+        self.prompt_tokens.record(self.tokenizer.count(prompt), attributes)
+        self.prompt_rebuild_counter.add(1, attributes)
+
+    async def __build_estate_expert_system_prompt(self) -> str:
+        with self.tracer.start_as_current_span(
+                "PromptService.__build_estate_expert_system_prompt",
+                kind=SpanKind.INTERNAL
         ) as span:
             try:
                 all_analysis = await self.analysis_repo.all_analysis()
@@ -81,8 +165,12 @@ class PromptService(interface.IPromptService):
                     [analysis.analysis_name + analysis.analysis_summary for analysis in all_analysis if
                      analysis.analysis_name == "БАЗА ЗНАНИЙ"])
 
-                all_news = await self.news_repo.all_news()
-                all_news_summary = "\n\n\n\n".join([news.news_summary for news in all_news])
+                # Только свежие посты и не больше news_channel_limit на канал, иначе промпт растет с каждым прогоном парсера
+                recent_news = await self.news_repo.recent_news(
+                    datetime.now() - self.news_max_age,
+                    self.news_channel_limit
+                )
+                all_news_summary = "\n\n\n\n".join([news.news_summary for news in recent_news])
 
                 prompt = f"""
 КТО ТЫ: 
@@ -0,0 +1,184 @@
+import re
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import interface
+from internal import common
+from internal import model
+from .vector_index import VectorIndex
+
+
+@dataclass
+class CacheEntry:
+    llm_response: str
+    expires_at: float
+
+
+class ResponseCache(interface.IResponseCache):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            llm_client: interface.ILLMClient,
+            max_entries: int = 1000,
+            ttl: float = 6 * 60 * 60,
+            similarity_threshold: float = 0.95,
+            max_history_messages: int = 1,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
+        self.llm_client = llm_client
+
+        # Кешируются только короткие диалоги: ответ на первые реплики определяется
+        # экспертом, версией промпта и самими репликами
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_history_messages = max_history_messages
+
+        self.entries: OrderedDict[tuple[str, str, str], CacheEntry] = OrderedDict()
+        # Отдельный индекс на пару (эксперт, версия промпта), чтобы перефразы искались только среди совместимых ответов
+        self.indexes: dict[tuple[str, str], VectorIndex] = {}
+        # Эмбеддинги промахов, чтобы не запрашивать их повторно при сохранении ответа
+        self.pending_embeddings: OrderedDict[tuple[str, str, str], list[float]] = OrderedDict()
+
+        self.lookup_counter = self.meter.create_counter(
+            name=common.RESPONSE_CACHE_LOOKUP_TOTAL_METRIC,
+            description="Total count of response cache lookups by result",
+            unit="1"
+        )
+        self.size_counter = self.meter.create_up_down_counter(
+            name=common.RESPONSE_CACHE_SIZE_METRIC,
+            description="Number of cached LLM responses",
+            unit="1"
+        )
+
+    async def get(self, expert: str, system_prompt: str, history: list[model.Message]) -> str | None:
+        with self.tracer.start_as_current_span(
+                "ResponseCache.get",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "expert": expert,
+                }
+        ) as span:
+            try:
+                if not self.__cacheable(history):
+                    span.set_status(Status(StatusCode.OK))
+                    return None
+
+                key = self.__key(expert, system_prompt, history)
+
+                entry = self.__entry(key)
+                if entry is not None:
+                    self.__record_lookup(expert, "exact")
+                    span.set_attribute("cache_result", "exact")
+                    span.set_status(Status(StatusCode.OK))
+                    return entry.llm_response
+
+                index = self.indexes.get(key[:2])
+                embedding = await self.llm_client.embedding(self.__normalize(history[-1].text))
+                self.__remember_embedding(key, embedding)
+
+                if index is not None:
+                    similar_key, similarity = index.search(embedding)
+                    span.set_attribute("similarity", similarity)
+
+                    if similarity >= self.similarity_threshold:
+                        entry = self.__entry(similar_key)
+                        if entry is not None:
+                            self.__record_lookup(expert, "semantic")
+                            span.set_attribute("cache_result", "semantic")
+                            span.set_status(Status(StatusCode.OK))
+                            return entry.llm_response
+
+                self.__record_lookup(expert, "miss")
+                span.set_attribute("cache_result", "miss")
+                span.set_status(Status(StatusCode.OK))
+                return None
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def put(self, expert: str, system_prompt: str, history: list[model.Message], llm_response: str):
+        with self.tracer.start_as_current_span(
+                "ResponseCache.put",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "expert": expert,
+                }
+        ) as span:
+            try:
+                if not self.__cacheable(history):
+                    span.set_status(Status(StatusCode.OK))
+                    return
+
+                key = self.__key(expert, system_prompt, history)
+                embedding = self.pending_embeddings.pop(key, None)
+                if embedding is None:
+                    embedding = await self.llm_client.embedding(self.__normalize(history[-1].text))
+
+                if key not in self.entries:
+                    self.size_counter.add(1, {common.EXPERT_NAME_KEY: expert})
+                self.entries[key] = CacheEntry(llm_response=llm_response, expires_at=time.monotonic() + self.ttl)
+                self.entries.move_to_end(key)
+                self.indexes.setdefault(key[:2], VectorIndex()).add(key, embedding)
+
+                while len(self.entries) > self.max_entries:
+                    self.__evict(next(iter(self.entries)))
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    def __cacheable(self, history: list[model.Message]) -> bool:
+        return 0 < len(history) <= self.max_history_messages and history[-1].role == common.Roles.user
+
+    def __key(self, expert: str, system_prompt: str, history: list[model.Message]) -> tuple[str, str, str]:
+        prompt_version = hashlib.sha256(system_prompt.encode()).hexdigest()
+        history_fingerprint = hashlib.sha256(
+            "\n".join(f"{message.role}:{self.__normalize(message.text)}" for message in history).encode()
+        ).hexdigest()
+        return expert, prompt_version, history_fingerprint
+
+    def __normalize(self, text: str) -> str:
+        text = re.sub(r"[^\w\s]", " ", text.lower().replace("ё", "е"))
+        return " ".join(text.split())
+
+    def __entry(self, key: tuple[str, str, str]) -> CacheEntry | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self.__evict(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def __evict(self, key: tuple[str, str, str]):
+        self.entries.pop(key, None)
+        self.size_counter.add(-1, {common.EXPERT_NAME_KEY: key[0]})
+
+        index = self.indexes.get(key[:2])
+        if index is not None:
+            index.remove(key)
+            if not len(index):
+                del self.indexes[key[:2]]
+
+    def __remember_embedding(self, key: tuple[str, str, str], embedding: list[float]):
+        self.pending_embeddings[key] = embedding
+        self.pending_embeddings.move_to_end(key)
+        while len(self.pending_embeddings) > self.max_entries:
+            self.pending_embeddings.popitem(last=False)
+
+    def __record_lookup(self, expert: str, result: str):
+        self.lookup_counter.add(1, {
+            common.EXPERT_NAME_KEY: expert,
+            common.RESPONSE_CACHE_RESULT_KEY: result,
+        })
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class VectorIndex:
+    # Точный поиск по косинусной близости в памяти процесса, рассчитан на тысячи векторов
+    def __init__(self):
+        self.keys: list = []
+        self.vectors: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key, vector: list[float]):
+        vector = np.asarray(vector, dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+
+        if key in self.keys:
+            self.remove(key)
+
+        self.keys.append(key)
+        if self.vectors is None:
+            self.vectors = vector[np.newaxis, :]
+        else:
+            self.vectors = np.vstack([self.vectors, vector])
+
+    def remove(self, key):
+        if key not in self.keys:
+            return
+        idx = self.keys.index(key)
+        self.keys.pop(idx)
+        self.vectors = np.delete(self.vectors, idx, axis=0) if self.keys else None
+
+    def search(self, vector: list[float]) -> tuple[object | None, float]:
+        if not self.keys:
+            return None, 0.0
+
+        vector = np.asarray(vector, dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+
+        similarities = self.vectors @ vector
+        idx = int(np.argmax(similarities))
+        return self.keys[idx], float(similarities[idx])
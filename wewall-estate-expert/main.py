@@ -1,10 +1,12 @@
 import uvicorn
 import asyncio
 import argparse
+from datetime import timedelta
 
 from infrastructure.pg.pg import PG
 from pkg.client.external.openai.client import GPTClient
 from pkg.tg_news_parser.tg_news_parser import TgNewsParser
+from pkg.tokenizer.tokenizer import Tokenizer
 
 from infrastructure.telemetry.telemetry import Telemetry, AlertManager
 
@@ -15,12 +17,14 @@ from internal.controller.http.handler.chat.handler import ChatController
 from internal.service.chat.service import ChatService
 from internal.service.news.service import NewsService
 from internal.service.prompt.service import PromptService
+from internal.service.response_cache.service import ResponseCache
 from internal.service.analysis.service import AnalysisService
 
 from internal.repo.news.repo import NewsRepo
 from internal.repo.wewall.repo import WewallRepo
 from internal.repo.chat.repo import ChatRepository
 from internal.repo.analysis.repo import AnalysisRepo
+from internal.repo.knowledge_base.repo import KnowledgeBaseRepo
 
 from internal.app.parsing.tg_news.app import TgNewsParsing
 from internal.app.parsing.pdf_analysis.app import PdfAnalysisParsing
@@ -62,23 +66,54 @@ tel = Telemetry(
 db = PG(tel, cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
 
 gpt_client = GPTClient(tel, cfg.openai_api_key)
+tokenizer = Tokenizer()
 tg_news_parser = TgNewsParser(tel, cfg.tg_phone_number, cfg.tg_api_id, cfg.tg_api_hash)
 
 news_repo = NewsRepo(tel, db)
 analysis_repo = AnalysisRepo(tel, db)
 wewall_repo = WewallRepo(tel, db)
+knowledge_base_repo = KnowledgeBaseRepo(tel, db)
 chat_repository = ChatRepository(tel, db)
 
 prompt_service = PromptService(
     tel,
     news_repo,
     analysis_repo,
-    wewall_repo
+    wewall_repo,
+    knowledge_base_repo,
+    tokenizer,
+    cfg.prompt_version_check_interval,
+    timedelta(days=cfg.news_max_age_days),
+    cfg.news_prompt_channel_limit
 )
 
-chat_service = ChatService(tel, chat_repository, gpt_client, prompt_service)
-news_service = NewsService(tel, news_repo)
-analysis_service = AnalysisService(tel, analysis_repo, gpt_client)
+response_cache = ResponseCache(
+    tel,
+    gpt_client,
+    cfg.response_cache_max_entries,
+    cfg.response_cache_ttl,
+    cfg.response_cache_similarity_threshold
+)
+
+chat_service = ChatService(
+    tel,
+    chat_repository,
+    gpt_client,
+    prompt_service,
+    response_cache,
+    tokenizer,
+    cfg.history_token_budget,
+    cfg.history_pinned_messages
+)
+news_service = NewsService(tel, news_repo, tg_news_parser, timedelta(days=cfg.news_max_age_days))
+analysis_service = AnalysisService(
+    tel,
+    analysis_repo,
+    gpt_client,
+    cfg.pdf_page_concurrency,
+    cfg.pdf_dpi,
+    cfg.pdf_image_max_side
+)
 
 chat_controller = ChatController(tel, chat_service)
 http_middleware = HttpMiddleware(tel, cfg.prefix)
@@ -102,7 +137,8 @@ if __name__ == '__main__':
             TgNewsParsing(
                 news_service,
                 tg_news_parser,
-                cfg.tg_news_channels
+                cfg.tg_news_channels,
+                cfg.tg_news_channel_concurrency,
             )
         )
     if args.app == "pdf_analysis":
@@ -110,5 +146,6 @@ if __name__ == '__main__':
         loop.run_until_complete(
             PdfAnalysisParsing(
                 analysis_service,
+                cfg.pdf_concurrency,
             )
         )
@@ -1,4 +1,5 @@
 import httpx
+from typing import AsyncIterator
 
 import openai
 from opentelemetry.trace import Status, StatusCode, SpanKind
@@ -24,7 +25,8 @@ class GPTClient(interface.ILLMClient):
             system_prompt: str,
             temperature: float,
             _model: str = "gpt-4o-mini",
-            base64img: str = None
+            base64img: str = None,
+            image_mime_type: str = "image/png"
     ) -> str:
         with self.tracer.start_as_current_span(
                 "GPTClient.generate",
@@ -49,7 +51,7 @@ class GPTClient(interface.ILLMClient):
                         },
                         {
                             "type": "image_url",
-                            "image_url": {"url": f"data:image/png;base64,{base64img}"},
+                            "image_url": {"url": f"data:{image_mime_type};base64,{base64img}"},
                         },
                     ]
 
@@ -66,3 +68,59 @@ class GPTClient(interface.ILLMClient):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
+
+    async def embedding(self, text: str, _model: str = "text-embedding-3-small") -> list[float]:
+        with self.tracer.start_as_current_span(
+                "GPTClient.embedding",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                response = await self.client.embeddings.create(model=_model, input=text)
+
+                span.set_status(Status(StatusCode.OK))
+                return response.data[0].embedding
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def generate_stream(
+            self,
+            history: list[model.Message],
+            system_prompt: str,
+            temperature: float,
+            _model: str = "gpt-4o-mini",
+    ) -> AsyncIterator[str]:
+        with self.tracer.start_as_current_span(
+                "GPTClient.generate_stream",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                system_prompt = [{"role": "user", "content": system_prompt}]
+
+                history = [
+                    *system_prompt,
+                    *[
+                        {"role": message.role, "content": message.text}
+                        for message in history
+                    ]
+                ]
+
+                stream = await self.client.chat.completions.create(
+                    model=_model,
+                    messages=history,
+                    temperature=temperature,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta.replace("#", "").replace("*", "")
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
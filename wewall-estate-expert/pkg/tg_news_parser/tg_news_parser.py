@@ -2,6 +2,7 @@ from pyrogram import Client
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import interface
+from internal import model
 
 
 class TgNewsParser(interface.ITgNewsParsing):
@@ -10,79 +11,85 @@ class TgNewsParser(interface.ITgNewsParsing):
             tel: interface.ITelemetry,
             phone_number: str,
             api_id: int,
-            api_hash: str
+            api_hash: str,
+            history_limit: int = 50,
     ):
         self.tracer = tel.tracer()
         self.phone_number = phone_number
         self.api_id = api_id
         self.api_hash = api_hash
+        self.history_limit = history_limit
+        self.app: Client | None = None
 
-    async def parse(self, channel_name: str) -> str:
+    async def start(self) -> None:
         with self.tracer.start_as_current_span(
-                "TgNewsParser.parse",
+                "TgNewsParser.start",
                 kind=SpanKind.INTERNAL,
-                attributes={
-                    "channel_name": channel_name
-                }
         ) as span:
             try:
-                self.app = await self.__start_client()
-                messages_list = []
-
-                async with self.app:
-                    channel = await self.app.get_chat(channel_name)
-                    async for message in self.app.get_chat_history(channel.id, limit=50):
-                        if message.text:
-                            messages_list.append(message.text)
-                        elif message.caption:
-                            messages_list.append(message.caption)
-
-                news = await self.__list_to_str(messages_list)
+                # Один клиент на весь прогон: авторизация и handshake выполняются один раз, а не на каждый канал
+                if self.app is None:
+                    self.app = Client(
+                        "pkg/my_account",
+                        api_id=self.api_id,
+                        api_hash=self.api_hash,
+                        phone_number=self.phone_number
+                    )
+                if not self.app.is_connected:
+                    await self.app.start()
 
                 span.set_status(Status(StatusCode.OK))
-                return news
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
-    async def __list_to_str(self, messages_list: list[str]) -> str:
+    async def stop(self) -> None:
         with self.tracer.start_as_current_span(
-                "TgNewsParser.__list_to_str",
+                "TgNewsParser.stop",
                 kind=SpanKind.INTERNAL,
-                attributes={
-                    "messages_list": messages_list
-                }
         ) as span:
             try:
-                news = ""
-                for message in messages_list:
-                    news += message
-                    news += "\n\n"
+                if self.app is not None and self.app.is_connected:
+                    await self.app.stop()
 
                 span.set_status(Status(StatusCode.OK))
-                return news
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
-    async def __start_client(self):
+    async def new_posts(self, channel_name: str, after_message_id: int | None) -> list[model.TgPost]:
         with self.tracer.start_as_current_span(
-                "TgNewsParser.__start_client",
+                "TgNewsParser.new_posts",
                 kind=SpanKind.INTERNAL,
+                attributes={
+                    "channel_name": channel_name,
+                    "after_message_id": after_message_id or 0,
+                }
         ) as span:
             try:
-                app = Client(
-                    "pkg/my_account",
-                    api_id=self.api_id,
-                    api_hash=self.api_hash,
-                    phone_number=self.phone_number
-                )
+                posts = []
+                # История отдается от новых к старым страницами, поэтому листаем до первого уже прочитанного поста.
+                # Без водяного знака (первый прогон канала) берем только последние history_limit постов
+                limit = 0 if after_message_id is not None else self.history_limit
+                async for message in self.app.get_chat_history(channel_name, limit=limit):
+                    if after_message_id is not None and message.id <= after_message_id:
+                        break
 
+                    # Посты без текста тоже возвращаем, чтобы водяной знак сдвинулся и за них
+                    posts.append(model.TgPost(
+                        channel_name=channel_name,
+                        message_id=message.id,
+                        text=message.text or message.caption or "",
+                        created_at=message.date,
+                    ))
+                posts.reverse()
+
+                span.set_attribute("posts", len(posts))
                 span.set_status(Status(StatusCode.OK))
-                return app
+                return posts
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise
\ No newline at end of file
+                raise
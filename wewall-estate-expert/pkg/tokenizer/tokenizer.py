@@ -0,0 +1,17 @@
+import tiktoken
+
+from internal import interface
+
+
+class Tokenizer(interface.ITokenizer):
+    # Служебные токены chat-формата, которые OpenAI добавляет к каждому сообщению
+    message_overhead = 4
+
+    def __init__(self, encoding_name: str = "o200k_base"):
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_message(self, text: str) -> int:
+        return self.count(text) + self.message_overhead
@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+from unittest.mock import MagicMock
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+@pytest.fixture
+def metric_reader():
+    return InMemoryMetricReader()
+
+
+@pytest.fixture
+def tel(metric_reader):
+    tel = MagicMock()
+    tel.tracer.return_value = TracerProvider().get_tracer("test")
+    tel.meter.return_value = MeterProvider(metric_readers=[metric_reader]).get_meter("test")
+    tel.logger.return_value = MagicMock()
+    return tel
+
@@ -0,0 +1,148 @@
+from datetime import datetime
+
+import pytest
+
+from internal import common, model
+from internal.service.response_cache import service as response_cache_service
+from internal.service.response_cache.service import ResponseCache
+
+from tests.unit import utils
+
+SYSTEM_PROMPT = "Ты эксперт по коммерческой недвижимости"
+
+
+class StubLLMClient:
+    # Эмбеддинги задаются в тесте, чтобы близость перефраз была известна заранее
+    def __init__(self, embeddings: dict[str, list[float]]):
+        self.embeddings = embeddings
+        self.embedding_calls = []
+
+    async def embedding(self, text: str, _model: str = "text-embedding-3-small") -> list[float]:
+        self.embedding_calls.append(text)
+        return self.embeddings[text]
+
+
+def create_history(text: str) -> list[model.Message]:
+    return [model.Message(id=1, chat_id="1", role=common.Roles.user, text=text, created_at=datetime.now())]
+
+
+class TestResponseCache:
+
+    @pytest.fixture
+    def llm_client(self):
+        return StubLLMClient({
+            "сколько стоит офис": [1.0, 0.0, 0.0],
+            "какая цена офиса": [0.99, 0.1, 0.0],
+            "где купить склад": [0.6, 0.8, 0.0],
+            "что такое ирр": [0.0, 0.0, 1.0],
+        })
+
+    @pytest.fixture
+    def now(self, monkeypatch):
+        clock = {"now": 1000.0}
+        monkeypatch.setattr(response_cache_service.time, "monotonic", lambda: clock["now"])
+        return clock
+
+    @pytest.fixture
+    def response_cache(self, tel, llm_client, now):
+        return ResponseCache(tel, llm_client, max_entries=2, ttl=60, similarity_threshold=0.95)
+
+    def lookups(self, metric_reader) -> dict:
+        return {
+            point.attributes[common.RESPONSE_CACHE_RESULT_KEY]: point.value
+            for point in utils.collect_metric_points(metric_reader, {common.RESPONSE_CACHE_LOOKUP_TOTAL_METRIC})
+        }
+
+    async def test_exact_hit(self, response_cache, llm_client, metric_reader):
+        # Arrange
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"), "Около 300 тыс. за м²")
+        llm_client.embedding_calls.clear()
+
+        # Act
+        llm_response = await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("сколько стоит офис"))
+
+        # Assert
+        assert llm_response == "Около 300 тыс. за м²"
+        assert llm_client.embedding_calls == []
+        assert self.lookups(metric_reader) == {"exact": 1}
+
+    async def test_semantic_hit_above_threshold(self, response_cache, metric_reader):
+        # Arrange
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"), "Около 300 тыс. за м²")
+
+        # Act
+        llm_response = await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Какая цена офиса?"))
+
+        # Assert
+        assert llm_response == "Около 300 тыс. за м²"
+        assert self.lookups(metric_reader) == {"semantic": 1}
+
+    async def test_semantic_miss_below_threshold(self, response_cache, metric_reader):
+        # Arrange
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"), "Около 300 тыс. за м²")
+
+        # Act
+        llm_response = await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Где купить склад?"))
+
+        # Assert
+        assert llm_response is None
+        assert self.lookups(metric_reader) == {"miss": 1}
+
+    async def test_other_prompt_version_is_miss(self, response_cache, metric_reader):
+        # Arrange
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"), "Около 300 тыс. за м²")
+
+        # Act
+        llm_response = await response_cache.get("estate_expert", SYSTEM_PROMPT + " v2", create_history("Сколько стоит офис?"))
+
+        # Assert
+        assert llm_response is None
+        assert self.lookups(metric_reader) == {"miss": 1}
+
+    async def test_expired_entry_is_miss(self, response_cache, now, metric_reader):
+        # Arrange
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"), "Около 300 тыс. за м²")
+        now["now"] += 61
+
+        # Act
+        exact = await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"))
+        semantic = await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Какая цена офиса?"))
+
+        # Assert
+        assert exact is None
+        assert semantic is None
+        assert response_cache.entries == {}
+        assert self.lookups(metric_reader) == {"miss": 2}
+
+    async def test_evicts_least_recently_used(self, response_cache, metric_reader):
+        # Arrange
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"), "Около 300 тыс. за м²")
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Где купить склад?"), "На юге Москвы")
+        # Первая запись становится самой свежей
+        await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?"))
+
+        # Act
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, create_history("Что такое ИРР?"), "Внутренняя норма доходности")
+
+        # Assert
+        assert await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Где купить склад?")) is None
+        assert await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Сколько стоит офис?")) == "Около 300 тыс. за м²"
+        assert await response_cache.get("estate_expert", SYSTEM_PROMPT, create_history("Что такое ИРР?")) == "Внутренняя норма доходности"
+        assert self.lookups(metric_reader) == {"exact": 3, "miss": 1}
+
+        [size] = utils.collect_metric_points(metric_reader, {common.RESPONSE_CACHE_SIZE_METRIC})
+        assert size.value == 2
+
+    async def test_long_history_is_not_cached(self, response_cache, llm_client, metric_reader):
+        # Arrange
+        history = create_history("Сколько стоит офис?") + create_history("Какая цена офиса?")
+
+        # Act
+        await response_cache.put("estate_expert", SYSTEM_PROMPT, history, "Около 300 тыс. за м²")
+        llm_response = await response_cache.get("estate_expert", SYSTEM_PROMPT, history)
+
+        # Assert
+        assert llm_response is None
+        assert response_cache.entries == {}
+        assert llm_client.embedding_calls == []
+        assert self.lookups(metric_reader) == {}
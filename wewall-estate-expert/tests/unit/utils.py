@@ -0,0 +1,11 @@
+def collect_metric_points(metric_reader, metric_names: set[str]) -> list:
+    points = []
+    metrics_data = metric_reader.get_metrics_data()
+    if metrics_data is None:
+        return points
+    for resource_metrics in metrics_data.resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name in metric_names:
+                    points.extend(metric.data.data_points)
+    return points
@@ -1,4 +1,6 @@
-from typing import Any, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Sequence
 
 from opentelemetry.trace import Status, StatusCode, SpanKind
 from sqlalchemy import text
@@ -37,6 +39,8 @@ class PG(interface.IDB):
     def __init__(self, tel: interface.ITelemetry, db_user, db_pass, db_host, db_port, db_name):
         self.pool = NewPool(db_user, db_pass, db_host, db_port, db_name)
         self.tracer = tel.tracer()
+        # Сессия открытого unit_of_work: transaction внутри него не коммитит сам, а пишет в общую транзакцию
+        self.uow_session: ContextVar[AsyncSession | None] = ContextVar("pg_uow_session", default=None)
 
     async def insert(self, query: str, query_params: dict) -> int:
         with self.tracer.start_as_current_span(
@@ -112,3 +116,60 @@ class PG(interface.IDB):
                 await session.execute(text(query))
             await session.commit()
         return None
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[None]:
+        if self.uow_session.get() is not None:
+            yield
+            return
+
+        with self.tracer.start_as_current_span(
+                "PG.unit_of_work",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                async with self.pool() as session:
+                    token = self.uow_session.set(session)
+                    try:
+                        yield
+                        await session.commit()
+                    finally:
+                        self.uow_session.reset(token)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def transaction(self, queries: list[tuple[str, dict]]) -> list[Sequence[Any]]:
+        with self.tracer.start_as_current_span(
+                "PG.transaction",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "queries_count": len(queries)
+                }
+        ) as span:
+            try:
+                uow_session = self.uow_session.get()
+                if uow_session is not None:
+                    results = await self.__execute(uow_session, queries)
+                else:
+                    async with self.pool() as session:
+                        results = await self.__execute(session, queries)
+                        await session.commit()
+
+                span.set_status(Status(StatusCode.OK))
+                return results
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    @staticmethod
+    async def __execute(session: AsyncSession, queries: list[tuple[str, dict]]) -> list[Sequence[Any]]:
+        results = []
+        for query, query_params in queries:
+            result = await session.execute(text(query), query_params)
+            results.append(result.all() if result.returns_rows else [])
+        return results
@@ -3,7 +3,7 @@ from opentelemetry.sdk.trace import TracerProvider, SpanLimits
 from opentelemetry._logs import set_logger_provider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.sdk.trace.sampling import TraceIdRatioBased, ALWAYS_ON
-from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics import MeterProvider, TraceBasedExemplarFilter
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk._logs import LoggerProvider
 from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
@@ -110,9 +110,11 @@ class Telemetry(interface.ITelemetry):
             export_interval_millis=30000
         )
 
+        # Exemplars связывают точки метрик с трейсами, поэтому trace_id не нужен в атрибутах метрик
         self._meter_provider = MeterProvider(
             resource=resource,
-            metric_readers=[reader]
+            metric_readers=[reader],
+            exemplar_filter=TraceBasedExemplarFilter()
         )
 
         metrics.set_meter_provider(self._meter_provider)
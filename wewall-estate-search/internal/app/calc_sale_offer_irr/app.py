@@ -7,7 +7,7 @@ async def CalcSaleOfferIRR(
 ):
     print("Start CalcSaleOfferIRR")
     sale_offers = await sale_offer_repo.all_sale_offer()
+    print(f"{len(sale_offers)=}")
 
-    for sale_offer in sale_offers:
-        print(f"{sale_offer.id=}")
-        await sale_offer_service.calc_sale_offer_irr(sale_offer)
\ No newline at end of file
+    await sale_offer_service.calc_sale_offers_irr(sale_offers)
+    print("Finish CalcSaleOfferIRR")
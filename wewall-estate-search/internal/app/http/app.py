@@ -40,6 +40,12 @@ def include_rent_offer_handlers(
         methods=["POST"],
         tags=["Estate search rent knn"],
     )
+    app.add_api_route(
+        prefix + "/rent/by-ids",
+        rent_offer_controller.rent_offers_by_ids,
+        methods=["POST"],
+        tags=["Estate search rent offers"],
+    )
 
 
 def include_sale_offer_handlers(
@@ -53,11 +59,18 @@ def include_sale_offer_handlers(
         methods=["POST"],
         tags=["Estate search sale knn"],
     )
+    app.add_api_route(
+        prefix + "/sale/by-ids",
+        sale_offer_controller.sale_offers_by_ids,
+        methods=["POST"],
+        tags=["Estate search sale offers"],
+    )
 
 
 def include_db_handler(app: FastAPI, db: interface.IDB, prefix: str):
     app.add_api_route(prefix + "/table/create", create_table_handler(db), methods=["GET"])
     app.add_api_route(prefix + "/table/drop", drop_table_handler(db), methods=["GET"])
+    app.add_api_route(prefix + "/table/migrate", migrate_table_handler(db), methods=["GET"])
 
 
 def create_table_handler(db: interface.IDB):
@@ -78,3 +91,13 @@ def drop_table_handler(db: interface.IDB):
             raise err
 
     return delete_table
+
+
+def migrate_table_handler(db: interface.IDB):
+    async def migrate_table():
+        try:
+            await db.multi_query(model.migrate_queries)
+        except Exception as err:
+            raise err
+
+    return migrate_table
@@ -7,94 +7,89 @@ async def M2DataParsing(
         rent_offer_service: interface.IRentOfferService,
         sale_offer_service: interface.ISaleOfferService,
         m2data_parser: interface.IM2DataParser,
+        batch_size: int = 50,
 ):
     # await db.multi_query(model.create_queries)
 
-    estates = m2data_parser.parse()
-    print(f"{estates}", flush=True)
-    for estate in estates:
-        estate_id = await estate_service.create_estate(
-            estate.link,
-            estate.name,
-            estate.category,
-            estate.address,
-            estate.coords,
-            estate.metro_stations,
-        )
-        print(f"{estate_id}", flush=True)
-
-        for rent_offer in estate.rent_offers:
-            rent_offer_id = await rent_offer_service.create_rent_offer(
-                estate_id,
-                rent_offer.link,
-                rent_offer.name,
-                rent_offer.square,
-                rent_offer.price_per_month,
-                rent_offer.design,
-                rent_offer.floor,
-                rent_offer.type,
-                rent_offer.location,
-                rent_offer.image_urls,
-                rent_offer.offer_readiness,
-                rent_offer.readiness_date,
-                rent_offer.description
-            )
-            print(f"{rent_offer_id}", flush=True)
-
-        for sale_offer in estate.sale_offers:
-            sale_offer_id = await sale_offer_service.create_sale_offer(
-                estate_id,
-                sale_offer.link,
-                sale_offer.name,
-                sale_offer.square,
-                sale_offer.price,
-                sale_offer.price_per_meter,
-                sale_offer.design,
-                sale_offer.floor,
-                sale_offer.type,
-                sale_offer.location,
-                sale_offer.image_urls,
-                sale_offer.offer_readiness,
-                sale_offer.readiness_date,
-                sale_offer.description,
-            )
-            print(f"{sale_offer_id}", flush=True)
+    estates_result = model.UpsertResult()
+    rent_offers_result = model.UpsertResult()
+    sale_offers_result = model.UpsertResult()
+
+    batch = []
+    async for estate in m2data_parser.parse():
+        batch.append(estate)
+        if len(batch) < batch_size:
+            continue
+
+        batch_results = await ingest_estates(db, batch, estate_service, rent_offer_service, sale_offer_service)
+        estates_result += batch_results[0]
+        rent_offers_result += batch_results[1]
+        sale_offers_result += batch_results[2]
+        print(f"{estates_result=} {rent_offers_result=} {sale_offers_result=}", flush=True)
+        batch = []
+
+    if batch:
+        batch_results = await ingest_estates(db, batch, estate_service, rent_offer_service, sale_offer_service)
+        estates_result += batch_results[0]
+        rent_offers_result += batch_results[1]
+        sale_offers_result += batch_results[2]
+
+    print(f"Finish M2DataParsing {estates_result=} {rent_offers_result=} {sale_offers_result=}", flush=True)
 
 
 async def TrendAgentParsing(
+        db: interface.IDB,
         estate_service: interface.IEstateService,
         sale_offer_service: interface.ISaleOfferService,
         trend_agent_parser: interface.ITrendAgentParser,
+        batch_size: int = 50,
 ):
     print("Start TrendAgentParsing", flush=True)
-    estates = trend_agent_parser.parse()
-    # print(f"{estates=}")
-    for estate in estates:
-        estate_id = await estate_service.create_estate(
-            estate.link,
-            estate.name,
-            estate.category,
-            estate.address,
-            estate.coords,
-            estate.metro_stations,
+    estates = await trend_agent_parser.parse()
+
+    estates_result = model.UpsertResult()
+    sale_offers_result = model.UpsertResult()
+    for start in range(0, len(estates), batch_size):
+        batch_results = await ingest_estates(
+            db,
+            estates[start:start + batch_size],
+            estate_service,
+            None,
+            sale_offer_service
         )
-        print(f"{estate_id=}", flush=True)
-
-        for sale_offer in estate.sale_offers:
-            sale_offer_id = await sale_offer_service.create_sale_offer(
-                estate_id,
-                sale_offer.link,
-                sale_offer.name,
-                sale_offer.square,
-                sale_offer.price,
-                sale_offer.price_per_meter,
-                sale_offer.design,
-                sale_offer.floor,
-                sale_offer.type,
-                sale_offer.location,
-                sale_offer.image_urls,
-                sale_offer.offer_readiness,
-                sale_offer.readiness_date,
-                sale_offer.description
-            )
-            print(f"{sale_offer_id=}", flush=True)
\ No newline at end of file
+        estates_result += batch_results[0]
+        sale_offers_result += batch_results[2]
+
+    print(f"Finish TrendAgentParsing {estates_result=} {sale_offers_result=}", flush=True)
+
+
+async def ingest_estates(
+        db: interface.IDB,
+        estates: list[model.ParsedEstate],
+        estate_service: interface.IEstateService,
+        rent_offer_service: interface.IRentOfferService | None,
+        sale_offer_service: interface.ISaleOfferService,
+) -> tuple[model.UpsertResult, model.UpsertResult, model.UpsertResult]:
+    # Здания и их офферы пишутся одной транзакцией: сбой между upsert не оставит здания без офферов
+    async with db.unit_of_work():
+        estate_ids, estates_result = await estate_service.upsert_estates(estates)
+
+        rent_offer_estate_ids, rent_offers = [], []
+        sale_offer_estate_ids, sale_offers = [], []
+        for estate in estates:
+            for rent_offer in estate.rent_offers:
+                rent_offer_estate_ids.append(estate_ids[estate.link])
+                rent_offers.append(rent_offer)
+            for sale_offer in estate.sale_offers:
+                sale_offer_estate_ids.append(estate_ids[estate.link])
+                sale_offers.append(sale_offer)
+
+        rent_offers_result = model.UpsertResult()
+        if rent_offers and rent_offer_service is not None:
+            rent_offers_result = await rent_offer_service.upsert_rent_offers(rent_offer_estate_ids, rent_offers)
+
+        sale_offers_result = model.UpsertResult()
+        if sale_offers:
+            sale_offers_result = await sale_offer_service.upsert_sale_offers(sale_offer_estate_ids, sale_offers)
+
+        return estates_result, rent_offers_result, sale_offers_result
@@ -4,6 +4,7 @@ REQUEST_ID_KEY = "request_id"
 EXTRA_LOG_FIELDS_KEY = "extra"
 FILE_KEY = "file"
 ERROR_KEY = "error"
+OUTCOME_KEY = "outcome"
 
 HTTP_METHOD_KEY = "http.request.method"
 HTTP_STATUS_KEY = "http.response.status_code"
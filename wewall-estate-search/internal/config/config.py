@@ -21,6 +21,8 @@ class Config:
     wewall_estate_calculator_port: int = int(os.environ.get('WEWALL_ESTATE_CALCULATOR_PORT'))
 
     m2data_building_url: str = os.environ.get('M2DATA_BUILDING_URL')
+    m2data_host_concurrency: int = 8
+    route_google_lookup: bool = os.environ.get('WEWALL_ROUTE_GOOGLE_LOOKUP', 'true') == 'true'
 
     environment = os.environ.get('ENVIRONMENT')
     log_level = os.environ.get('LOG_LEVEL')
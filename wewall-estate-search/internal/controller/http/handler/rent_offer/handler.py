@@ -52,3 +52,24 @@ class RentOfferController(interface.IRentOfferController):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
+
+    async def rent_offers_by_ids(self, body: RentOffersByIdsBody):
+        with self.tracer.start_as_current_span(
+                "RentOfferController.rent_offers_by_ids",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "ids": body.ids,
+                }
+        ) as span:
+            try:
+                rent_offers = await self.rent_offer_service.rent_offers_by_ids(body.ids)
+
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=200,
+                    content={"rent_offers": [rent_offer.to_dict() for rent_offer in rent_offers]},
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
@@ -12,3 +12,6 @@ class EstateSearchRentBody(BaseModel):
     readiness: int
     irr: float
 
+
+class RentOffersByIdsBody(BaseModel):
+    ids: list[int]
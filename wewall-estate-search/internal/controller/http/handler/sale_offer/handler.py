@@ -52,3 +52,24 @@ class SaleOfferController(interface.ISaleOfferController):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
+
+    async def sale_offers_by_ids(self, body: SaleOffersByIdsBody):
+        with self.tracer.start_as_current_span(
+                "SaleOfferController.sale_offers_by_ids",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "ids": body.ids,
+                }
+        ) as span:
+            try:
+                sale_offers = await self.sale_offer_service.sale_offers_by_ids(body.ids)
+
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    status_code=200,
+                    content={"sale_offers": [sale_offer.to_dict() for sale_offer in sale_offers]},
+                )
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
@@ -11,3 +11,7 @@ class EstateSearchSaleBody(BaseModel):
     design: int
     readiness: int
     irr: float
+
+
+class SaleOffersByIdsBody(BaseModel):
+    ids: list[int]
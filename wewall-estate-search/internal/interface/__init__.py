@@ -1,5 +1,6 @@
 from internal.interface.sale_offer import *
 from internal.interface.rent_offer import *
 from internal.interface.estate import *
+from internal.interface.route import *
 from internal.interface.general import *
 from internal.interface.client.wewall_estate_calculator import *
\ No newline at end of file
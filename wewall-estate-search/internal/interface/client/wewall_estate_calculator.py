@@ -26,3 +26,9 @@ class IWewallEstateCalculatorClient(Protocol):
             nds_rate: int,
             need_repairs: int,
     ) -> model.FinanceModelResponse: pass
+
+    @abstractmethod
+    async def calc_finance_model_finished_office_batch(
+            self,
+            params: list[dict],
+    ) -> list[model.FinanceModelResponse | None]: pass
@@ -1,4 +1,5 @@
 from typing import Protocol
+from datetime import datetime
 from abc import abstractmethod
 
 from internal import model
@@ -18,6 +19,12 @@ class IEstateService(Protocol):
     @abstractmethod
     async def all_estate(self) -> list[model.Estate]: pass
 
+    @abstractmethod
+    async def upsert_estates(
+            self,
+            estates: list[model.ParsedEstate]
+    ) -> tuple[dict[str, int], model.UpsertResult]: pass
+
 class IEstateRepo(Protocol):
     @abstractmethod
     async def create_estate(
@@ -33,5 +40,20 @@ class IEstateRepo(Protocol):
     @abstractmethod
     async def estate_by_id(self, estate_id: int) -> list[model.Estate]: pass
 
+    @abstractmethod
+    async def estates_by_ids(self, estate_ids: list[int]) -> list[model.Estate]: pass
+
     @abstractmethod
     async def all_estate(self) -> list[model.Estate]: pass
+
+    @abstractmethod
+    async def estates_updated_after(self, updated_after: datetime) -> list[model.Estate]: pass
+
+    @abstractmethod
+    async def all_estate_ids(self) -> set[int]: pass
+
+    @abstractmethod
+    async def upsert_estates(
+            self,
+            estates: list[model.ParsedEstate]
+    ) -> tuple[dict[str, int], model.UpsertResult]: pass
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Protocol, Sequence, Any
+from typing import Protocol, Sequence, Any, AsyncIterator, AsyncContextManager
 
 from fastapi import FastAPI
 from opentelemetry.metrics import Meter
@@ -10,12 +10,20 @@ from internal import model
 
 class IM2DataParser(Protocol):
     @abstractmethod
-    def parse(self) -> list[model.ParsedEstate]: pass
+    def parse(self) -> AsyncIterator[model.ParsedEstate]: pass
+
+
+class IRingClassifier(Protocol):
+    @abstractmethod
+    def define_ring(self, coords: model.Coords) -> str: pass
+
+    @abstractmethod
+    def define_rings(self, coords_list: list[model.Coords]) -> list[str]: pass
 
 
 class ITrendAgentParser(Protocol):
     @abstractmethod
-    def parse(self) -> list[model.ParsedEstate]: pass
+    async def parse(self) -> list[model.ParsedEstate]: pass
 
 
 class IOtelLogger(Protocol):
@@ -85,3 +93,9 @@ class IDB(Protocol):
 
     @abstractmethod
     async def multi_query(self, queries: list[str]) -> None: pass
+
+    @abstractmethod
+    async def transaction(self, queries: list[tuple[str, dict]]) -> list[Sequence[Any]]: pass
+
+    @abstractmethod
+    def unit_of_work(self) -> AsyncContextManager[None]: pass
@@ -8,6 +8,9 @@ class IRentOfferController(Protocol):
     @abstractmethod
     async def estate_search_rent(self, body: EstateSearchRentBody): pass
 
+    @abstractmethod
+    async def rent_offers_by_ids(self, body: RentOffersByIdsBody): pass
+
 class IRentOfferService(Protocol):
     @abstractmethod
     async def create_rent_offer(
@@ -27,6 +30,13 @@ class IRentOfferService(Protocol):
             description: str
     ) -> int: pass
 
+    @abstractmethod
+    async def upsert_rent_offers(
+            self,
+            estate_ids: list[int],
+            rent_offers: list[model.ParsedRentOffer]
+    ) -> model.UpsertResult: pass
+
     @abstractmethod
     async def find_rent_offers(
             self,
@@ -41,6 +51,9 @@ class IRentOfferService(Protocol):
             irr: float,
     ) -> list[model.RentOfferDTO]: pass
 
+    @abstractmethod
+    async def rent_offers_by_ids(self, rent_offer_ids: list[int]) -> list[model.RentOfferDTO]: pass
+
 class IRentOfferRepo(Protocol):
     @abstractmethod
     async def create_rent_offer(
@@ -60,9 +73,32 @@ class IRentOfferRepo(Protocol):
             description: str
     ) -> int: pass
 
+    @abstractmethod
+    async def upsert_rent_offers(
+            self,
+            estate_ids: list[int],
+            rent_offers: list[model.ParsedRentOffer]
+    ) -> model.UpsertResult: pass
+
     @abstractmethod
     async def rent_offer_by_id(self, rent_offer_id: int) -> list[model.RentOffer]: pass
 
+    @abstractmethod
+    async def rent_offers_by_ids(self, rent_offer_ids: list[int]) -> list[model.RentOffer]: pass
+
     @abstractmethod
     async def all_rent_offer(self) -> list[model.RentOffer]: pass
 
+    @abstractmethod
+    async def search_rent_offers(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            limit: int,
+    ) -> list[model.RentOffer]: pass
@@ -0,0 +1,54 @@
+from abc import abstractmethod
+from typing import Protocol
+
+from internal import model
+
+
+class IRouteService(Protocol):
+    @abstractmethod
+    async def metro_coords(self) -> dict[str, model.Coords]: pass
+
+    @abstractmethod
+    async def metro_stations(
+            self,
+            estate_coords: model.Coords,
+            station_coords: list[tuple[str, model.Coords]]
+    ) -> list[model.MetroStation]: pass
+
+
+class IRouteRepo(Protocol):
+    @abstractmethod
+    async def all_metro_station_coords(self) -> list[model.MetroStationCoords]: pass
+
+    @abstractmethod
+    async def upsert_metro_station_coords(self, metro_stations: list[model.MetroStationCoords]) -> None: pass
+
+    @abstractmethod
+    async def route_distances_by_coords(self, lat: float, lon: float) -> list[model.RouteDistance]: pass
+
+    @abstractmethod
+    async def upsert_route_distance(
+            self,
+            station: str,
+            lat: float,
+            lon: float,
+            is_car: bool,
+            distance: int,
+            time: int,
+            source: str
+    ) -> None: pass
+
+
+class IRouteClient(Protocol):
+    @abstractmethod
+    async def metro_station_coords(self) -> list[model.MetroStationCoords]: pass
+
+    @abstractmethod
+    async def route(
+            self,
+            lon1: float,
+            lat1: float,
+            lon2: float,
+            lat2: float,
+            is_car: bool
+    ) -> tuple[int, int] | None: pass
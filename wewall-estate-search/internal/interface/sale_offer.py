@@ -1,4 +1,5 @@
 from typing import Protocol, Sequence, Any
+from datetime import datetime
 from abc import abstractmethod
 
 from internal.controller.http.handler.sale_offer.model import *
@@ -9,6 +10,9 @@ class ISaleOfferController(Protocol):
     @abstractmethod
     async def estate_search_sale(self, body: EstateSearchSaleBody): pass
 
+    @abstractmethod
+    async def sale_offers_by_ids(self, body: SaleOffersByIdsBody): pass
+
 class ISaleOfferService(Protocol):
     @abstractmethod
     async def create_sale_offer(
@@ -29,9 +33,19 @@ class ISaleOfferService(Protocol):
             description: str
     ) -> int: pass
 
+    @abstractmethod
+    async def upsert_sale_offers(
+            self,
+            estate_ids: list[int],
+            sale_offers: list[model.ParsedSaleOffer]
+    ) -> model.UpsertResult: pass
+
     @abstractmethod
     async def calc_sale_offer_irr(self, sale_offer: model.SaleOffer) -> None: pass
 
+    @abstractmethod
+    async def calc_sale_offers_irr(self, sale_offers: list[model.SaleOffer]) -> None: pass
+
     @abstractmethod
     async def find_sale_offers(
             self,
@@ -46,6 +60,38 @@ class ISaleOfferService(Protocol):
             irr: float,
     ) -> list[model.SaleOfferDTO]: pass
 
+    @abstractmethod
+    async def sale_offers_by_ids(self, sale_offer_ids: list[int]) -> list[model.SaleOfferDTO]: pass
+
+
+class ISaleOfferIndex(Protocol):
+    @abstractmethod
+    def is_loaded(self) -> bool: pass
+
+    @abstractmethod
+    def load_in_background(self) -> None: pass
+
+    @abstractmethod
+    async def refresh(self) -> None: pass
+
+    @abstractmethod
+    def find(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            irr: float,
+            limit: int,
+    ) -> list[model.SaleOffer]: pass
+
+    @abstractmethod
+    def estates_by_ids(self, estate_ids: list[int]) -> list[model.Estate]: pass
+
 
 class ISaleOfferRepo(Protocol):
     @abstractmethod
@@ -67,11 +113,45 @@ class ISaleOfferRepo(Protocol):
             description: str
     ) -> int: pass
 
+    @abstractmethod
+    async def upsert_sale_offers(
+            self,
+            estate_ids: list[int],
+            sale_offers: list[model.ParsedSaleOffer]
+    ) -> model.UpsertResult: pass
+
     @abstractmethod
     async def update_sale_offer_irr(self, sale_offer_id: int, irr: float) -> None: pass
 
+    @abstractmethod
+    async def update_sale_offers_irr(self, sale_offer_ids: list[int], irrs: list[float]) -> None: pass
+
     @abstractmethod
     async def sale_offer_by_id(self, sale_offer_id: int) -> list[model.SaleOffer]: pass
 
+    @abstractmethod
+    async def sale_offers_by_ids(self, sale_offer_ids: list[int]) -> list[model.SaleOffer]: pass
+
     @abstractmethod
     async def all_sale_offer(self) -> list[model.SaleOffer]: pass
+
+    @abstractmethod
+    async def sale_offers_updated_after(self, updated_after: datetime) -> list[model.SaleOffer]: pass
+
+    @abstractmethod
+    async def all_sale_offer_ids(self) -> set[int]: pass
+
+    @abstractmethod
+    async def search_sale_offers(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            irr: float,
+            limit: int,
+    ) -> list[model.SaleOffer]: pass
@@ -1,6 +1,8 @@
 from internal.model.estate import *
 from internal.model.rent_offer import *
 from internal.model.sale_offer import *
+from internal.model.route import *
+from internal.model.ingest import *
 from internal.model.sql_model import *
 
 from internal.model.client.estate_calculator import *
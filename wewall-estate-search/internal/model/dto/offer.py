@@ -5,6 +5,7 @@ from internal.model.estate import Coords, MetroStation
 
 @dataclass
 class RentOfferDTO:
+    id: int
     estate_id: int
     estate_name: str
     estate_category: str
@@ -26,6 +27,7 @@ class RentOfferDTO:
 
     def to_dict(self) -> dict:
         return {
+            "id": self.id,
             "estate_id": self.estate_id,
             "estate_name": self.estate_name,
             "estate_category": self.estate_category,
@@ -48,6 +50,7 @@ class RentOfferDTO:
 
 @dataclass
 class SaleOfferDTO:
+    id: int
     estate_id: int
     estate_name: str
     estate_category: str
@@ -70,6 +73,7 @@ class SaleOfferDTO:
 
     def to_dict(self) -> dict:
         return {
+            "id": self.id,
             "estate_id": self.estate_id,
             "estate_name": self.estate_name,
             "estate_category": self.estate_category,
@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __add__(self, other: "UpsertResult") -> "UpsertResult":
+        return UpsertResult(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+        )
+
+    @classmethod
+    def from_rows(cls, rows, total: int) -> "UpsertResult":
+        inserted = sum(1 for row in rows if row.inserted)
+        updated = len(rows) - inserted
+        return cls(inserted=inserted, updated=updated, unchanged=total - inserted - updated)
+
+    def to_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged
+        }
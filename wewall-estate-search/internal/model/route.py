@@ -0,0 +1,49 @@
+from datetime import datetime
+from dataclasses import dataclass
+
+
+@dataclass
+class MetroStationCoords:
+    name: str
+    lat: float
+    lon: float
+
+    @classmethod
+    def serialize(cls, rows) -> list:
+        return [
+            cls(
+                name=row.name,
+                lat=row.lat,
+                lon=row.lon,
+            )
+            for row in rows
+        ]
+
+
+@dataclass
+class RouteDistance:
+    station: str
+    lat: float
+    lon: float
+    is_car: bool
+    distance: int
+    time: int
+    source: str
+
+    created_at: datetime
+
+    @classmethod
+    def serialize(cls, rows) -> list:
+        return [
+            cls(
+                station=row.station,
+                lat=row.lat,
+                lon=row.lon,
+                is_car=row.is_car,
+                distance=row.distance,
+                time=row.time,
+                source=row.source,
+                created_at=row.created_at,
+            )
+            for row in rows
+        ]
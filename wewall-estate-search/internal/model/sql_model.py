@@ -62,6 +62,31 @@ CREATE TABLE IF NOT EXISTS sale_offers(
 )
 """
 
+create_metro_station_coords_table = """
+CREATE TABLE IF NOT EXISTS metro_station_coords(
+    name TEXT PRIMARY KEY,
+    lat FLOAT NOT NULL,
+    lon FLOAT NOT NULL,
+    
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+create_route_distance_table = """
+CREATE TABLE IF NOT EXISTS route_distances(
+    station TEXT NOT NULL,
+    lat FLOAT NOT NULL,
+    lon FLOAT NOT NULL,
+    is_car BOOLEAN NOT NULL,
+    distance INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (lat, lon, station, is_car)
+)
+"""
+
 on_update_table_query1 = """
 CREATE OR REPLACE FUNCTION update_updated_at()
 RETURNS TRIGGER AS $$
@@ -79,6 +104,99 @@ FOR EACH ROW
 EXECUTE PROCEDURE update_updated_at();
 """
 
+create_sale_offer_type_location_price_index = """
+CREATE INDEX IF NOT EXISTS sale_offers_type_location_price_idx
+ON sale_offers (type, location, price);
+"""
+
+create_sale_offer_type_location_square_index = """
+CREATE INDEX IF NOT EXISTS sale_offers_type_location_square_idx
+ON sale_offers (type, location, square);
+"""
+
+create_sale_offer_estate_id_index = """
+CREATE INDEX IF NOT EXISTS sale_offers_estate_id_idx
+ON sale_offers (estate_id);
+"""
+
+create_sale_offer_updated_at_index = """
+CREATE INDEX IF NOT EXISTS sale_offers_updated_at_idx
+ON sale_offers (updated_at);
+"""
+
+create_rent_offer_type_location_price_index = """
+CREATE INDEX IF NOT EXISTS rent_offers_type_location_price_idx
+ON rent_offers (type, location, price_per_month);
+"""
+
+create_rent_offer_type_location_square_index = """
+CREATE INDEX IF NOT EXISTS rent_offers_type_location_square_idx
+ON rent_offers (type, location, square);
+"""
+
+create_rent_offer_estate_id_index = """
+CREATE INDEX IF NOT EXISTS rent_offers_estate_id_idx
+ON rent_offers (estate_id);
+"""
+
+create_estate_category_index = """
+CREATE INDEX IF NOT EXISTS estates_category_idx
+ON estates (category);
+"""
+
+create_estate_updated_at_index = """
+CREATE INDEX IF NOT EXISTS estates_updated_at_idx
+ON estates (updated_at);
+"""
+
+create_estate_link_unique_index = """
+CREATE UNIQUE INDEX IF NOT EXISTS estates_link_uidx
+ON estates (link);
+"""
+
+create_rent_offer_link_unique_index = """
+CREATE UNIQUE INDEX IF NOT EXISTS rent_offers_link_uidx
+ON rent_offers (link);
+"""
+
+create_sale_offer_link_unique_index = """
+CREATE UNIQUE INDEX IF NOT EXISTS sale_offers_link_uidx
+ON sale_offers (link);
+"""
+
+# до появления upsert повторные обходы дублировали строки: оставляем самую свежую версию по link
+dedupe_estate_rent_offers = """
+UPDATE rent_offers
+SET estate_id = ranked.keep_id
+FROM (SELECT id, MAX(id) OVER (PARTITION BY link) AS keep_id FROM estates) AS ranked
+WHERE rent_offers.estate_id = ranked.id AND ranked.id <> ranked.keep_id;
+"""
+
+dedupe_estate_sale_offers = """
+UPDATE sale_offers
+SET estate_id = ranked.keep_id
+FROM (SELECT id, MAX(id) OVER (PARTITION BY link) AS keep_id FROM estates) AS ranked
+WHERE sale_offers.estate_id = ranked.id AND ranked.id <> ranked.keep_id;
+"""
+
+dedupe_estates = """
+DELETE FROM estates
+USING (SELECT id, MAX(id) OVER (PARTITION BY link) AS keep_id FROM estates) AS ranked
+WHERE estates.id = ranked.id AND ranked.id <> ranked.keep_id;
+"""
+
+dedupe_rent_offers = """
+DELETE FROM rent_offers
+USING rent_offers AS newer
+WHERE rent_offers.link = newer.link AND rent_offers.id < newer.id;
+"""
+
+dedupe_sale_offers = """
+DELETE FROM sale_offers
+USING sale_offers AS newer
+WHERE sale_offers.link = newer.link AND sale_offers.id < newer.id;
+"""
+
 drop_estate_table = """
 DROP TABLE IF EXISTS estates;
 """
@@ -91,12 +209,60 @@ drop_sale_offer_table = """
 DROP TABLE IF EXISTS sale_offers;
 """
 
+drop_metro_station_coords_table = """
+DROP TABLE IF EXISTS metro_station_coords;
+"""
+
+drop_route_distance_table = """
+DROP TABLE IF EXISTS route_distances;
+"""
+
+search_index_queries = [
+    create_sale_offer_type_location_price_index,
+    create_sale_offer_type_location_square_index,
+    create_sale_offer_estate_id_index,
+    create_sale_offer_updated_at_index,
+    create_rent_offer_type_location_price_index,
+    create_rent_offer_type_location_square_index,
+    create_rent_offer_estate_id_index,
+    create_estate_category_index,
+    create_estate_updated_at_index,
+]
+
+link_unique_index_queries = [
+    create_estate_link_unique_index,
+    create_rent_offer_link_unique_index,
+    create_sale_offer_link_unique_index,
+]
+
 create_queries = [
     create_estate_table,
     create_rent_offer_table,
     create_sale_offer_table,
+    create_metro_station_coords_table,
+    create_route_distance_table,
     on_update_table_query1,
-    on_update_table_query2
+    on_update_table_query2,
+    *search_index_queries,
+    *link_unique_index_queries
 ]
 
-drop_queries = [drop_estate_table, drop_rent_offer_table, drop_sale_offer_table]
+migrate_queries = [
+    create_metro_station_coords_table,
+    create_route_distance_table,
+    *search_index_queries,
+    dedupe_estate_rent_offers,
+    dedupe_estate_sale_offers,
+    dedupe_estates,
+    dedupe_rent_offers,
+    dedupe_sale_offers,
+    *link_unique_index_queries
+]
+
+drop_queries = [
+    drop_estate_table,
+    drop_rent_offer_table,
+    drop_sale_offer_table,
+    drop_metro_station_coords_table,
+    drop_route_distance_table
+]
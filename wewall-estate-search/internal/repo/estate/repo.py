@@ -1,4 +1,5 @@
 import json
+from datetime import datetime
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import model, interface
@@ -96,3 +97,101 @@ class EstateRepo(interface.IEstateRepo):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
+    async def estates_updated_after(self, updated_after: datetime) -> list[model.Estate]:
+        with self.tracer.start_as_current_span(
+                "EstateRepo.estates_updated_after",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "updated_after": str(updated_after)
+                },
+        ) as span:
+            try:
+                args = {"updated_after": updated_after}
+                rows = await self.db.select(estates_updated_after, args)
+                if rows:
+                    rows = model.Estate.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def all_estate_ids(self) -> set[int]:
+        with self.tracer.start_as_current_span(
+                "EstateRepo.all_estate_ids",
+                kind=SpanKind.INTERNAL,
+        ) as span:
+            try:
+                rows = await self.db.select(all_estate_ids, {})
+
+                span.set_status(Status(StatusCode.OK))
+                return {row.id for row in rows}
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def estates_by_ids(self, estate_ids: list[int]) -> list[model.Estate]:
+        with self.tracer.start_as_current_span(
+                "EstateRepo.estates_by_ids",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "estate_ids": estate_ids
+                },
+        ) as span:
+            try:
+                args = {"estate_ids": estate_ids}
+                rows = await self.db.select(estates_by_ids, args)
+                if rows:
+                    rows = model.Estate.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def upsert_estates(
+            self,
+            estates: list[model.ParsedEstate]
+    ) -> tuple[dict[str, int], model.UpsertResult]:
+        with self.tracer.start_as_current_span(
+                "EstateRepo.upsert_estates",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "estates_count": len(estates)
+                }
+        ) as span:
+            try:
+                # одна и та же ссылка дважды в одном INSERT ... ON CONFLICT недопустима
+                estates = list({estate.link: estate for estate in estates}.values())
+                links = [estate.link for estate in estates]
+                args = {
+                    "links": links,
+                    "names": [estate.name for estate in estates],
+                    "categories": [estate.category for estate in estates],
+                    "addresses": [estate.address for estate in estates],
+                    "metro_stations": [
+                        json.dumps([metro_station.to_dict() for metro_station in estate.metro_stations],
+                                   ensure_ascii=False)
+                        for estate in estates
+                    ],
+                    "coords": [json.dumps(estate.coords.to_dict(), ensure_ascii=False) for estate in estates],
+                }
+
+                upserted_rows, estate_id_rows = await self.db.transaction([
+                    (upsert_estates, args),
+                    (estate_ids_by_links, {"links": links}),
+                ])
+                estate_ids = {row.link: row.id for row in estate_id_rows}
+                upsert_result = model.UpsertResult.from_rows(upserted_rows, len(estates))
+
+                span.set_status(Status(StatusCode.OK))
+                return estate_ids, upsert_result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
@@ -11,4 +11,51 @@ WHERE id = :estate_id
 
 all_estate = """
 SELECT * FROM estates
-"""
\ No newline at end of file
+"""
+
+estates_updated_after = """
+SELECT * FROM estates
+WHERE updated_at > :updated_after
+"""
+
+all_estate_ids = """
+SELECT id FROM estates
+"""
+
+estates_by_ids = """
+SELECT * FROM estates
+WHERE id = ANY(:estate_ids)
+"""
+
+upsert_estates = """
+INSERT INTO estates (link, name, category, address, metro_stations, coords)
+SELECT
+    batch.link,
+    batch.name,
+    batch.category,
+    batch.address,
+    ARRAY(SELECT jsonb_array_elements(CAST(batch.metro_stations AS JSONB))),
+    CAST(batch.coords AS JSONB)
+FROM unnest(
+    CAST(:links AS TEXT[]),
+    CAST(:names AS TEXT[]),
+    CAST(:categories AS TEXT[]),
+    CAST(:addresses AS TEXT[]),
+    CAST(:metro_stations AS TEXT[]),
+    CAST(:coords AS TEXT[])
+) AS batch(link, name, category, address, metro_stations, coords)
+ON CONFLICT (link) DO UPDATE
+SET name = EXCLUDED.name,
+    category = EXCLUDED.category,
+    address = EXCLUDED.address,
+    metro_stations = EXCLUDED.metro_stations,
+    coords = EXCLUDED.coords
+WHERE (estates.name, estates.category, estates.address, estates.metro_stations, estates.coords)
+    IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.category, EXCLUDED.address, EXCLUDED.metro_stations, EXCLUDED.coords)
+RETURNING id, link, (xmax = 0) AS inserted
+"""
+
+estate_ids_by_links = """
+SELECT id, link FROM estates
+WHERE link = ANY(:links)
+"""
@@ -1,3 +1,4 @@
+import json
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import model, interface
@@ -95,6 +96,27 @@ class RentOfferRepo(interface.IRentOfferRepo):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
+    async def rent_offers_by_ids(self, rent_offer_ids: list[int]) -> list[model.RentOffer]:
+        with self.tracer.start_as_current_span(
+                "RentOfferRepo.rent_offers_by_ids",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "rent_offer_ids": rent_offer_ids
+                }
+        ) as span:
+            try:
+                args = {"rent_offer_ids": rent_offer_ids}
+                rows = await self.db.select(rent_offers_by_ids, args)
+                if rows:
+                    rows = model.RentOffer.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
     async def all_rent_offer(self) -> list[model.RentOffer]:
         with self.tracer.start_as_current_span(
                 "RentOfferRepo.all_rent_offer",
@@ -113,3 +135,97 @@ class RentOfferRepo(interface.IRentOfferRepo):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
+    async def search_rent_offers(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            limit: int,
+    ) -> list[model.RentOffer]:
+        with self.tracer.start_as_current_span(
+                "RentOfferRepo.search_rent_offers",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "type": type,
+                    "budget": budget,
+                    "location": location,
+                    "square": square,
+                    "estate_class": estate_class,
+                    "distance_to_metro": distance_to_metro,
+                    "design": design,
+                    "readiness": readiness,
+                    "limit": limit
+                }
+        ) as span:
+            try:
+                args = {
+                    "type": type,
+                    "budget": budget,
+                    "location": location,
+                    "square": square,
+                    "estate_class": estate_class,
+                    "distance_to_metro": distance_to_metro,
+                    "design": design,
+                    "readiness": readiness,
+                    "limit": limit,
+                }
+                rows = await self.db.select(search_rent_offers, args)
+                if rows:
+                    rows = model.RentOffer.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def upsert_rent_offers(
+            self,
+            estate_ids: list[int],
+            rent_offers: list[model.ParsedRentOffer]
+    ) -> model.UpsertResult:
+        with self.tracer.start_as_current_span(
+                "RentOfferRepo.upsert_rent_offers",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "rent_offers_count": len(rent_offers)
+                }
+        ) as span:
+            try:
+                rent_offers = list({
+                    rent_offer.link: (estate_id, rent_offer)
+                    for estate_id, rent_offer in zip(estate_ids, rent_offers)
+                }.values())
+                args = {
+                    "estate_ids": [estate_id for estate_id, _ in rent_offers],
+                    "links": [rent_offer.link for _, rent_offer in rent_offers],
+                    "names": [rent_offer.name for _, rent_offer in rent_offers],
+                    "squares": [rent_offer.square for _, rent_offer in rent_offers],
+                    "prices_per_month": [rent_offer.price_per_month for _, rent_offer in rent_offers],
+                    "designs": [rent_offer.design for _, rent_offer in rent_offers],
+                    "floors": [rent_offer.floor for _, rent_offer in rent_offers],
+                    "types": [rent_offer.type for _, rent_offer in rent_offers],
+                    "locations": [rent_offer.location for _, rent_offer in rent_offers],
+                    "image_urls": [
+                        json.dumps(rent_offer.image_urls, ensure_ascii=False) for _, rent_offer in rent_offers
+                    ],
+                    "offer_readinesses": [rent_offer.offer_readiness for _, rent_offer in rent_offers],
+                    "readiness_dates": [rent_offer.readiness_date for _, rent_offer in rent_offers],
+                    "descriptions": [rent_offer.description for _, rent_offer in rent_offers],
+                }
+
+                upserted_rows, = await self.db.transaction([(upsert_rent_offers, args)])
+                upsert_result = model.UpsertResult.from_rows(upserted_rows, len(rent_offers))
+
+                span.set_status(Status(StatusCode.OK))
+                return upsert_result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
@@ -9,6 +9,11 @@ SELECT * FROM rent_offers
 WHERE id = :rent_offer_id
 """
 
+rent_offers_by_ids = """
+SELECT * FROM rent_offers
+WHERE id = ANY(:rent_offer_ids)
+"""
+
 all_rent_offer = """
 SELECT * FROM rent_offers
 """
@@ -17,4 +22,85 @@ update_location = """
 UPDATE rent_offers 
 SET location = :location
 WHERE id = :rent_offer_id
-"""
\ No newline at end of file
+"""
+
+search_rent_offers = """
+SELECT rent_offers.* FROM rent_offers
+JOIN estates ON estates.id = rent_offers.estate_id
+CROSS JOIN LATERAL (
+    SELECT MIN((metro_station->>'leg_distance')::INTEGER) AS leg_distance
+    FROM unnest(estates.metro_stations) AS metro_station
+) AS nearest_metro
+WHERE rent_offers.price_per_month > 0
+  AND (CAST(:budget AS BIGINT) = 0 OR rent_offers.price_per_month <= CAST(FLOOR(CAST(:budget AS BIGINT) * 1.10) AS BIGINT))
+  AND rent_offers.square > 0
+  AND (CAST(:square AS FLOAT) = 0 OR rent_offers.square >= CAST(:square AS FLOAT) * 0.90)
+  AND (CAST(:type AS INTEGER) = 0 OR rent_offers.type = CAST(:type AS INTEGER) - 1)
+  AND (
+    CAST(:location AS INTEGER) NOT IN (1, 2)
+    OR rent_offers.location = CASE CAST(:location AS INTEGER) WHEN 1 THEN 'ТТК' WHEN 2 THEN 'МКАД' END
+  )
+  AND (
+    CAST(:estate_class AS INTEGER) = 0
+    OR estates.category = CASE CAST(:estate_class AS INTEGER) WHEN 1 THEN 'A' WHEN 2 THEN 'B' END
+  )
+  AND (CAST(:distance_to_metro AS INTEGER) = 0 OR nearest_metro.leg_distance <= CAST(:distance_to_metro AS INTEGER))
+  AND (CAST(:design AS INTEGER) = 0 OR rent_offers.design = CAST(:design AS INTEGER))
+  AND (CAST(:readiness AS INTEGER) = 0 OR rent_offers.offer_readiness = CAST(:readiness AS INTEGER))
+ORDER BY rent_offers.id
+LIMIT :limit
+"""
+
+upsert_rent_offers = """
+INSERT INTO rent_offers (estate_id, link, name, square, price_per_month, design, floor, type, location, image_urls, offer_readiness, readiness_date, description)
+SELECT
+    batch.estate_id,
+    batch.link,
+    batch.name,
+    batch.square,
+    batch.price_per_month,
+    batch.design,
+    batch.floor,
+    batch.type,
+    batch.location,
+    ARRAY(SELECT jsonb_array_elements_text(CAST(batch.image_urls AS JSONB))),
+    batch.offer_readiness,
+    batch.readiness_date,
+    batch.description
+FROM unnest(
+    CAST(:estate_ids AS INTEGER[]),
+    CAST(:links AS TEXT[]),
+    CAST(:names AS TEXT[]),
+    CAST(:squares AS FLOAT[]),
+    CAST(:prices_per_month AS INTEGER[]),
+    CAST(:designs AS INTEGER[]),
+    CAST(:floors AS INTEGER[]),
+    CAST(:types AS INTEGER[]),
+    CAST(:locations AS TEXT[]),
+    CAST(:image_urls AS TEXT[]),
+    CAST(:offer_readinesses AS INTEGER[]),
+    CAST(:readiness_dates AS TEXT[]),
+    CAST(:descriptions AS TEXT[])
+) AS batch(estate_id, link, name, square, price_per_month, design, floor, type, location, image_urls, offer_readiness, readiness_date, description)
+ON CONFLICT (link) DO UPDATE
+SET estate_id = EXCLUDED.estate_id,
+    name = EXCLUDED.name,
+    square = EXCLUDED.square,
+    price_per_month = EXCLUDED.price_per_month,
+    design = EXCLUDED.design,
+    floor = EXCLUDED.floor,
+    type = EXCLUDED.type,
+    location = EXCLUDED.location,
+    image_urls = EXCLUDED.image_urls,
+    offer_readiness = EXCLUDED.offer_readiness,
+    readiness_date = EXCLUDED.readiness_date,
+    description = EXCLUDED.description,
+    updated_at = CURRENT_TIMESTAMP
+WHERE (rent_offers.estate_id, rent_offers.name, rent_offers.square, rent_offers.price_per_month, rent_offers.design,
+       rent_offers.floor, rent_offers.type, rent_offers.location, rent_offers.image_urls, rent_offers.offer_readiness,
+       rent_offers.readiness_date, rent_offers.description)
+    IS DISTINCT FROM (EXCLUDED.estate_id, EXCLUDED.name, EXCLUDED.square, EXCLUDED.price_per_month, EXCLUDED.design,
+       EXCLUDED.floor, EXCLUDED.type, EXCLUDED.location, EXCLUDED.image_urls, EXCLUDED.offer_readiness,
+       EXCLUDED.readiness_date, EXCLUDED.description)
+RETURNING id, (xmax = 0) AS inserted
+"""
@@ -0,0 +1,114 @@
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import model, interface
+from .sql_query import *
+
+
+class RouteRepo(interface.IRouteRepo):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            db: interface.IDB
+    ):
+        self.tracer = tel.tracer()
+        self.db = db
+
+    async def all_metro_station_coords(self) -> list[model.MetroStationCoords]:
+        with self.tracer.start_as_current_span(
+                "RouteRepo.all_metro_station_coords",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                rows = await self.db.select(all_metro_station_coords, {})
+                if rows:
+                    rows = model.MetroStationCoords.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def upsert_metro_station_coords(self, metro_stations: list[model.MetroStationCoords]) -> None:
+        with self.tracer.start_as_current_span(
+                "RouteRepo.upsert_metro_station_coords",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "metro_stations_count": len(metro_stations)
+                }
+        ) as span:
+            try:
+                args = {
+                    "names": [metro_station.name for metro_station in metro_stations],
+                    "lats": [metro_station.lat for metro_station in metro_stations],
+                    "lons": [metro_station.lon for metro_station in metro_stations],
+                }
+                await self.db.update(upsert_metro_station_coords, args)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def route_distances_by_coords(self, lat: float, lon: float) -> list[model.RouteDistance]:
+        with self.tracer.start_as_current_span(
+                "RouteRepo.route_distances_by_coords",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "lat": lat,
+                    "lon": lon
+                }
+        ) as span:
+            try:
+                args = {"lat": lat, "lon": lon}
+                rows = await self.db.select(route_distances_by_coords, args)
+                if rows:
+                    rows = model.RouteDistance.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def upsert_route_distance(
+            self,
+            station: str,
+            lat: float,
+            lon: float,
+            is_car: bool,
+            distance: int,
+            time: int,
+            source: str
+    ) -> None:
+        with self.tracer.start_as_current_span(
+                "RouteRepo.upsert_route_distance",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "station": station,
+                    "lat": lat,
+                    "lon": lon,
+                    "is_car": is_car,
+                    "source": source
+                }
+        ) as span:
+            try:
+                args = {
+                    "station": station,
+                    "lat": lat,
+                    "lon": lon,
+                    "is_car": is_car,
+                    "distance": distance,
+                    "time": time,
+                    "source": source,
+                }
+                await self.db.update(upsert_route_distance, args)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
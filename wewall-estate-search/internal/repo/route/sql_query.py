@@ -0,0 +1,21 @@
+all_metro_station_coords = """
+SELECT * FROM metro_station_coords
+"""
+
+upsert_metro_station_coords = """
+INSERT INTO metro_station_coords (name, lat, lon)
+SELECT * FROM unnest(CAST(:names AS TEXT[]), CAST(:lats AS FLOAT[]), CAST(:lons AS FLOAT[]))
+ON CONFLICT (name) DO UPDATE SET lat = EXCLUDED.lat, lon = EXCLUDED.lon
+"""
+
+route_distances_by_coords = """
+SELECT * FROM route_distances
+WHERE lat = :lat AND lon = :lon
+"""
+
+upsert_route_distance = """
+INSERT INTO route_distances (station, lat, lon, is_car, distance, time, source)
+VALUES (:station, :lat, :lon, :is_car, :distance, :time, :source)
+ON CONFLICT (lat, lon, station, is_car) DO UPDATE
+SET distance = EXCLUDED.distance, time = EXCLUDED.time, source = EXCLUDED.source, created_at = CURRENT_TIMESTAMP
+"""
@@ -1,3 +1,6 @@
+import json
+from datetime import datetime
+
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import model, interface
@@ -96,6 +99,23 @@ class SaleOfferRepo(interface.ISaleOfferRepo):
                 raise
 
 
+    async def update_sale_offers_irr(self, sale_offer_ids: list[int], irrs: list[float]) -> None:
+        with self.tracer.start_as_current_span(
+                "SaleOfferRepo.update_sale_offers_irr",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "sale_offers_count": len(sale_offer_ids)
+                }
+        ) as span:
+            try:
+                args = {"sale_offer_ids": sale_offer_ids, "irrs": irrs}
+                await self.db.update(update_sale_offers_irr, args)
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
     async def sale_offer_by_id(self, sale_offer_id: int) -> list[model.SaleOffer]:
         with self.tracer.start_as_current_span(
                 "SaleOfferRepo.sale_offer_by_id",
@@ -118,6 +138,27 @@ class SaleOfferRepo(interface.ISaleOfferRepo):
                 raise
 
 
+    async def sale_offers_by_ids(self, sale_offer_ids: list[int]) -> list[model.SaleOffer]:
+        with self.tracer.start_as_current_span(
+                "SaleOfferRepo.sale_offers_by_ids",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "sale_offer_ids": sale_offer_ids
+                }
+        ) as span:
+            try:
+                args = {"sale_offer_ids": sale_offer_ids}
+                rows = await self.db.select(sale_offers_by_ids, args)
+                if rows:
+                    rows = model.SaleOffer.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
     async def all_sale_offer(self) -> list[model.SaleOffer]:
         with self.tracer.start_as_current_span(
                 "SaleOfferRepo.all_sale_offer",
@@ -136,3 +177,137 @@ class SaleOfferRepo(interface.ISaleOfferRepo):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
+    async def sale_offers_updated_after(self, updated_after: datetime) -> list[model.SaleOffer]:
+        with self.tracer.start_as_current_span(
+                "SaleOfferRepo.sale_offers_updated_after",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "updated_after": str(updated_after)
+                }
+        ) as span:
+            try:
+                args = {"updated_after": updated_after}
+                rows = await self.db.select(sale_offers_updated_after, args)
+                if rows:
+                    rows = model.SaleOffer.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def all_sale_offer_ids(self) -> set[int]:
+        with self.tracer.start_as_current_span(
+                "SaleOfferRepo.all_sale_offer_ids",
+                kind=SpanKind.INTERNAL,
+        ) as span:
+            try:
+                rows = await self.db.select(all_sale_offer_ids, {})
+
+                span.set_status(Status(StatusCode.OK))
+                return {row.id for row in rows}
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def search_sale_offers(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            irr: float,
+            limit: int,
+    ) -> list[model.SaleOffer]:
+        with self.tracer.start_as_current_span(
+                "SaleOfferRepo.search_sale_offers",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "type": type,
+                    "budget": budget,
+                    "location": location,
+                    "square": square,
+                    "estate_class": estate_class,
+                    "distance_to_metro": distance_to_metro,
+                    "design": design,
+                    "readiness": readiness,
+                    "irr": irr,
+                    "limit": limit
+                }
+        ) as span:
+            try:
+                args = {
+                    "type": type,
+                    "budget": budget,
+                    "location": location,
+                    "square": square,
+                    "estate_class": estate_class,
+                    "distance_to_metro": distance_to_metro,
+                    "design": design,
+                    "readiness": readiness,
+                    "irr": irr,
+                    "limit": limit,
+                }
+                rows = await self.db.select(search_sale_offers, args)
+                if rows:
+                    rows = model.SaleOffer.serialize(rows)
+
+                span.set_status(Status(StatusCode.OK))
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def upsert_sale_offers(
+            self,
+            estate_ids: list[int],
+            sale_offers: list[model.ParsedSaleOffer]
+    ) -> model.UpsertResult:
+        with self.tracer.start_as_current_span(
+                "SaleOfferRepo.upsert_sale_offers",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "sale_offers_count": len(sale_offers)
+                }
+        ) as span:
+            try:
+                sale_offers = list({
+                    sale_offer.link: (estate_id, sale_offer)
+                    for estate_id, sale_offer in zip(estate_ids, sale_offers)
+                }.values())
+                args = {
+                    "estate_ids": [estate_id for estate_id, _ in sale_offers],
+                    "links": [sale_offer.link for _, sale_offer in sale_offers],
+                    "names": [sale_offer.name for _, sale_offer in sale_offers],
+                    "squares": [sale_offer.square for _, sale_offer in sale_offers],
+                    "prices": [sale_offer.price for _, sale_offer in sale_offers],
+                    "prices_per_meter": [sale_offer.price_per_meter for _, sale_offer in sale_offers],
+                    "designs": [sale_offer.design for _, sale_offer in sale_offers],
+                    "floors": [sale_offer.floor for _, sale_offer in sale_offers],
+                    "types": [sale_offer.type for _, sale_offer in sale_offers],
+                    "locations": [sale_offer.location for _, sale_offer in sale_offers],
+                    "image_urls": [
+                        json.dumps(sale_offer.image_urls, ensure_ascii=False) for _, sale_offer in sale_offers
+                    ],
+                    "offer_readinesses": [sale_offer.offer_readiness for _, sale_offer in sale_offers],
+                    "readiness_dates": [sale_offer.readiness_date for _, sale_offer in sale_offers],
+                    "descriptions": [sale_offer.description for _, sale_offer in sale_offers],
+                }
+
+                upserted_rows, = await self.db.transaction([(upsert_sale_offers, args)])
+                upsert_result = model.UpsertResult.from_rows(upserted_rows, len(sale_offers))
+
+                span.set_status(Status(StatusCode.OK))
+                return upsert_result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
@@ -6,16 +6,127 @@ RETURNING id;
 
 update_sale_offer_irr = """
 UPDATE sale_offers 
-SET irr = :irr
+SET irr = :irr, updated_at = CURRENT_TIMESTAMP
 WHERE id = :sale_offer_id
 """
 
+update_sale_offers_irr = """
+UPDATE sale_offers
+SET irr = batch.irr, updated_at = CURRENT_TIMESTAMP
+FROM unnest(CAST(:sale_offer_ids AS INTEGER[]), CAST(:irrs AS FLOAT[])) AS batch(id, irr)
+WHERE sale_offers.id = batch.id
+"""
+
 sale_offer_by_id = """
 SELECT * FROM sale_offers
 WHERE id = :sale_offer_id
 """
 
+sale_offers_by_ids = """
+SELECT * FROM sale_offers
+WHERE id = ANY(:sale_offer_ids)
+"""
+
 all_sale_offer = """
 SELECT * FROM sale_offers
 """
 
+sale_offers_updated_after = """
+SELECT * FROM sale_offers
+WHERE updated_at > :updated_after
+"""
+
+all_sale_offer_ids = """
+SELECT id FROM sale_offers
+"""
+
+search_sale_offers = """
+SELECT sale_offers.* FROM sale_offers
+JOIN estates ON estates.id = sale_offers.estate_id
+CROSS JOIN LATERAL (
+    SELECT MIN((metro_station->>'leg_distance')::INTEGER) AS leg_distance
+    FROM unnest(estates.metro_stations) AS metro_station
+) AS nearest_metro
+WHERE sale_offers.price > 0
+  AND (CAST(:budget AS BIGINT) = 0 OR sale_offers.price <= CAST(FLOOR(CAST(:budget AS BIGINT) * 1.10) AS BIGINT))
+  AND sale_offers.square > 0
+  AND (CAST(:square AS FLOAT) = 0 OR sale_offers.square >= CAST(:square AS FLOAT) * 0.90)
+  AND (CAST(:type AS INTEGER) = 0 OR sale_offers.type = CAST(:type AS INTEGER) - 1)
+  AND (
+    CAST(:location AS INTEGER) NOT IN (1, 2)
+    OR sale_offers.location = CASE CAST(:location AS INTEGER) WHEN 1 THEN 'ТТК' WHEN 2 THEN 'МКАД' END
+  )
+  AND (
+    CAST(:estate_class AS INTEGER) = 0
+    OR estates.category = CASE CAST(:estate_class AS INTEGER) WHEN 1 THEN 'A' WHEN 2 THEN 'B' END
+  )
+  AND (CAST(:distance_to_metro AS INTEGER) = 0 OR nearest_metro.leg_distance <= CAST(:distance_to_metro AS INTEGER))
+  AND (CAST(:design AS INTEGER) = 0 OR sale_offers.design = CAST(:design AS INTEGER))
+  AND (CAST(:readiness AS INTEGER) = 0 OR sale_offers.offer_readiness = CAST(:readiness AS INTEGER))
+  AND (CAST(:irr AS FLOAT) = 0 OR sale_offers.irr >= CAST(:irr AS FLOAT))
+ORDER BY sale_offers.id
+LIMIT :limit
+"""
+
+upsert_sale_offers = """
+INSERT INTO sale_offers (estate_id, link, name, square, price, price_per_meter, design, floor, type, location, image_urls, offer_readiness, readiness_date, description)
+SELECT
+    batch.estate_id,
+    batch.link,
+    batch.name,
+    batch.square,
+    batch.price,
+    batch.price_per_meter,
+    batch.design,
+    batch.floor,
+    batch.type,
+    batch.location,
+    ARRAY(SELECT jsonb_array_elements_text(CAST(batch.image_urls AS JSONB))),
+    batch.offer_readiness,
+    batch.readiness_date,
+    batch.description
+FROM unnest(
+    CAST(:estate_ids AS INTEGER[]),
+    CAST(:links AS TEXT[]),
+    CAST(:names AS TEXT[]),
+    CAST(:squares AS FLOAT[]),
+    CAST(:prices AS BIGINT[]),
+    CAST(:prices_per_meter AS BIGINT[]),
+    CAST(:designs AS INTEGER[]),
+    CAST(:floors AS INTEGER[]),
+    CAST(:types AS INTEGER[]),
+    CAST(:locations AS TEXT[]),
+    CAST(:image_urls AS TEXT[]),
+    CAST(:offer_readinesses AS INTEGER[]),
+    CAST(:readiness_dates AS TEXT[]),
+    CAST(:descriptions AS TEXT[])
+) AS batch(estate_id, link, name, square, price, price_per_meter, design, floor, type, location, image_urls, offer_readiness, readiness_date, description)
+ON CONFLICT (link) DO UPDATE
+SET estate_id = EXCLUDED.estate_id,
+    name = EXCLUDED.name,
+    square = EXCLUDED.square,
+    price = EXCLUDED.price,
+    price_per_meter = EXCLUDED.price_per_meter,
+    design = EXCLUDED.design,
+    floor = EXCLUDED.floor,
+    type = EXCLUDED.type,
+    location = EXCLUDED.location,
+    image_urls = EXCLUDED.image_urls,
+    offer_readiness = EXCLUDED.offer_readiness,
+    readiness_date = EXCLUDED.readiness_date,
+    description = EXCLUDED.description,
+    irr = CASE
+        WHEN (sale_offers.square, sale_offers.price_per_meter, sale_offers.design, sale_offers.estate_id)
+            IS DISTINCT FROM (EXCLUDED.square, EXCLUDED.price_per_meter, EXCLUDED.design, EXCLUDED.estate_id)
+        THEN 0
+        ELSE sale_offers.irr
+    END,
+    updated_at = CURRENT_TIMESTAMP
+WHERE (sale_offers.estate_id, sale_offers.name, sale_offers.square, sale_offers.price, sale_offers.price_per_meter,
+       sale_offers.design, sale_offers.floor, sale_offers.type, sale_offers.location, sale_offers.image_urls,
+       sale_offers.offer_readiness, sale_offers.readiness_date, sale_offers.description)
+    IS DISTINCT FROM (EXCLUDED.estate_id, EXCLUDED.name, EXCLUDED.square, EXCLUDED.price, EXCLUDED.price_per_meter,
+       EXCLUDED.design, EXCLUDED.floor, EXCLUDED.type, EXCLUDED.location, EXCLUDED.image_urls,
+       EXCLUDED.offer_readiness, EXCLUDED.readiness_date, EXCLUDED.description)
+RETURNING id, (xmax = 0) AS inserted
+"""
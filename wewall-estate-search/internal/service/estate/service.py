@@ -66,3 +66,23 @@ class EstateService(interface.IEstateService):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
+    async def upsert_estates(
+            self,
+            estates: list[model.ParsedEstate]
+    ) -> tuple[dict[str, int], model.UpsertResult]:
+        with self.tracer.start_as_current_span(
+                "EstateService.upsert_estates",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "estates_count": len(estates)
+                }
+        ) as span:
+            try:
+                estate_ids, upsert_result = await self.estate_repo.upsert_estates(estates)
+
+                span.set_status(Status(StatusCode.OK))
+                return estate_ids, upsert_result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
@@ -0,0 +1,163 @@
+import math
+import asyncio
+
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import model, interface
+
+
+class RouteEstimate:
+    earth_radius = 6_371_000
+    # типичные для Москвы коэффициенты извилистости маршрута и средние скорости, м/с
+    leg_detour = 1.25
+    leg_speed = 1.3
+    car_detour = 1.4
+    car_speed = 6.5
+
+
+class RouteService(interface.IRouteService):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            route_repo: interface.IRouteRepo,
+            route_client: interface.IRouteClient,
+            google_lookup: bool,
+            coords_precision: int = 4,
+            google_concurrency: int = 4
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.route_repo = route_repo
+        self.route_client = route_client
+        self.google_lookup = google_lookup
+        self.coords_precision = coords_precision
+        # Маршруты по всем станциям запрашиваются разом, а Google режет частые запросы с одного адреса
+        self.google_semaphore = asyncio.Semaphore(google_concurrency)
+
+        self._metro_coords: dict[str, model.Coords] = {}
+        self._metro_coords_lock = asyncio.Lock()
+
+    async def metro_coords(self) -> dict[str, model.Coords]:
+        with self.tracer.start_as_current_span(
+                "RouteService.metro_coords",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                async with self._metro_coords_lock:
+                    if not self._metro_coords:
+                        metro_stations = await self.route_repo.all_metro_station_coords()
+                        if not metro_stations:
+                            # таблица координат метро заполняется один раз, дальше hh.ru не нужен
+                            metro_stations = await self.route_client.metro_station_coords()
+                            await self.route_repo.upsert_metro_station_coords(metro_stations)
+
+                        self._metro_coords = {
+                            metro_station.name: model.Coords(lat=metro_station.lat, lon=metro_station.lon)
+                            for metro_station in metro_stations
+                        }
+
+                span.set_status(Status(StatusCode.OK))
+                return self._metro_coords
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def metro_stations(
+            self,
+            estate_coords: model.Coords,
+            station_coords: list[tuple[str, model.Coords]]
+    ) -> list[model.MetroStation]:
+        with self.tracer.start_as_current_span(
+                "RouteService.metro_stations",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "stations_count": len(station_coords)
+                }
+        ) as span:
+            try:
+                lat = round(estate_coords.lat, self.coords_precision)
+                lon = round(estate_coords.lon, self.coords_precision)
+
+                cached_routes = {
+                    (route.station, route.is_car): route
+                    for route in await self.route_repo.route_distances_by_coords(lat, lon)
+                }
+
+                # маршруты по станциям и видам транспорта независимы, запрашиваем их одновременно
+                routes = await asyncio.gather(*[
+                    self.__route(cached_routes, station, coords, lat, lon, is_car)
+                    for station, coords in station_coords
+                    for is_car in [True, False]
+                ])
+
+                metro_stations = []
+                for i, (station, _) in enumerate(station_coords):
+                    (car_distance, car_time), (leg_distance, leg_time) = routes[2 * i], routes[2 * i + 1]
+                    metro_stations.append(
+                        model.MetroStation(
+                            name=station,
+                            time_leg=leg_time,
+                            time_car=car_time,
+                            leg_distance=leg_distance,
+                            car_distance=car_distance
+                        )
+                    )
+
+                span.set_status(Status(StatusCode.OK))
+                return metro_stations
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def __route(
+            self,
+            cached_routes: dict[tuple[str, bool], model.RouteDistance],
+            station: str,
+            station_coords: model.Coords,
+            lat: float,
+            lon: float,
+            is_car: bool
+    ) -> tuple[int, int]:
+        cached_route = cached_routes.get((station, is_car))
+        if cached_route is not None and (cached_route.source == "google" or not self.google_lookup):
+            return cached_route.distance, cached_route.time
+
+        route = None
+        source = "google"
+        if self.google_lookup:
+            try:
+                async with self.google_semaphore:
+                    route = await self.route_client.route(station_coords.lon, station_coords.lat, lon, lat, is_car)
+            except Exception as err:
+                self.logger.warning("Не удалось получить маршрут из Google", {"station": station, "error": str(err)})
+
+        if route is None:
+            if cached_route is not None:
+                return cached_route.distance, cached_route.time
+            route = self.__estimate_route(station_coords, lat, lon, is_car)
+            source = "estimate"
+
+        distance, time = route
+        await self.route_repo.upsert_route_distance(station, lat, lon, is_car, distance, time, source)
+        cached_routes[(station, is_car)] = model.RouteDistance(station, lat, lon, is_car, distance, time, source, None)
+
+        return distance, time
+
+    @staticmethod
+    def __estimate_route(station_coords: model.Coords, lat: float, lon: float, is_car: bool) -> tuple[int, int]:
+        lat1, lon1 = math.radians(station_coords.lat), math.radians(station_coords.lon)
+        lat2, lon2 = math.radians(lat), math.radians(lon)
+
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        straight_distance = 2 * RouteEstimate.earth_radius * math.asin(math.sqrt(a))
+
+        if is_car:
+            distance = straight_distance * RouteEstimate.car_detour
+            time = distance / RouteEstimate.car_speed
+        else:
+            distance = straight_distance * RouteEstimate.leg_detour
+            time = distance / RouteEstimate.leg_speed
+
+        return int(round(distance)), int(round(time))
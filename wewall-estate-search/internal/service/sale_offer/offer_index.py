@@ -0,0 +1,347 @@
+import time
+import asyncio
+import bisect
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import model, interface
+
+
+@dataclass
+class _OfferBucket:
+    prices: list[int] = field(default_factory=list)
+    price_offer_ids: list[int] = field(default_factory=list)
+    squares: list[float] = field(default_factory=list)
+    square_offer_ids: list[int] = field(default_factory=list)
+
+
+class SaleOfferIndex(interface.ISaleOfferIndex):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            estate_repo: interface.IEstateRepo,
+            sale_offer_repo: interface.ISaleOfferRepo,
+            refresh_interval: int = 60,
+            reconcile_interval: int = 10 * 60,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.estate_repo = estate_repo
+        self.sale_offer_repo = sale_offer_repo
+
+        # парсеры пишут из другого процесса, поэтому изменения догружаем опросом по updated_at
+        self.refresh_interval = refresh_interval
+        # CURRENT_TIMESTAMP фиксируется на старте транзакции, поэтому перечитываем
+        # небольшое окно до watermark, повторное применение строки идемпотентно
+        self.refresh_overlap = timedelta(minutes=1)
+        # удаленные строки по updated_at не видны, поэтому периодически сверяем набор id с таблицами
+        self.reconcile_interval = reconcile_interval
+
+        self.estates: dict[int, model.Estate] = {}
+        self.estate_classes: dict[int, int] = {}
+        self.estate_nearest_metro_distances: dict[int, int | None] = {}
+
+        self.sale_offers: dict[int, model.SaleOffer] = {}
+        self.buckets: dict[tuple[int, str], _OfferBucket] = {}
+
+        self.watermark = datetime(1970, 1, 1)
+        self.refreshed_at = None
+        self.reconciled_at = None
+        self.refresh_lock = asyncio.Lock()
+        self.load_task: asyncio.Task | None = None
+
+    def is_loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    def load_in_background(self) -> None:
+        if self.load_task is not None and not self.load_task.done():
+            return
+        self.load_task = asyncio.create_task(self.__load())
+
+    async def __load(self):
+        try:
+            await self.refresh()
+        except Exception as err:
+            self.logger.error("Не смогли загрузить индекс sale_offers", {"error": str(err)})
+
+    async def refresh(self) -> None:
+        if not self.__is_stale():
+            return
+
+        async with self.refresh_lock:
+            if not self.__is_stale():
+                return
+
+            with self.tracer.start_as_current_span(
+                    "SaleOfferIndex.refresh",
+                    kind=SpanKind.INTERNAL,
+                    attributes={
+                        "watermark": str(self.watermark)
+                    }
+            ) as span:
+                try:
+                    updated_after = max(self.watermark - self.refresh_overlap, datetime(1970, 1, 1))
+                    estates = await self.estate_repo.estates_updated_after(updated_after)
+                    sale_offers = await self.sale_offer_repo.sale_offers_updated_after(updated_after)
+
+                    for estate in estates:
+                        self.__put_estate(estate)
+
+                    touched_bucket_keys = set()
+                    for sale_offer in sale_offers:
+                        old_sale_offer = self.sale_offers.get(sale_offer.id)
+                        if old_sale_offer is not None:
+                            touched_bucket_keys.add(self.__bucket_key(old_sale_offer))
+
+                        self.sale_offers[sale_offer.id] = sale_offer
+                        touched_bucket_keys.add(self.__bucket_key(sale_offer))
+
+                    deleted_estates = 0
+                    deleted_sale_offers = 0
+                    if self.__is_reconcile_due():
+                        deleted_estates, deleted_sale_offer_bucket_keys = await self.__reconcile()
+                        deleted_sale_offers = len(deleted_sale_offer_bucket_keys)
+                        touched_bucket_keys.update(deleted_sale_offer_bucket_keys)
+
+                    for bucket_key in touched_bucket_keys:
+                        self.__rebuild_bucket(bucket_key)
+
+                    for row in [*estates, *sale_offers]:
+                        if row.updated_at is not None and row.updated_at > self.watermark:
+                            self.watermark = row.updated_at
+
+                    self.refreshed_at = time.monotonic()
+                    self.logger.debug("Обновили индекс sale_offers", {
+                        "estates": len(estates),
+                        "sale_offers": len(sale_offers),
+                        "deleted_estates": deleted_estates,
+                        "deleted_sale_offers": deleted_sale_offers,
+                        "total_sale_offers": len(self.sale_offers),
+                    })
+
+                    span.set_status(Status(StatusCode.OK))
+                except Exception as err:
+                    span.record_exception(err)
+                    span.set_status(Status(StatusCode.ERROR, str(err)))
+                    raise
+
+    def find(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            irr: float,
+            limit: int,
+    ) -> list[model.SaleOffer]:
+        with self.tracer.start_as_current_span(
+                "SaleOfferIndex.find",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "type": type,
+                    "budget": budget,
+                    "location": location,
+                    "square": square,
+                    "estate_class": estate_class,
+                    "distance_to_metro": distance_to_metro,
+                    "design": design,
+                    "readiness": readiness,
+                    "irr": irr,
+                    "limit": limit
+                }
+        ) as span:
+            try:
+                if location not in [1, 2]:
+                    location = 0
+
+                candidate_ids = []
+                for bucket_key, bucket in self.buckets.items():
+                    if not self.__filter_type(bucket_key[0], type):
+                        continue
+                    if not self.__filter_location(bucket_key[1], location):
+                        continue
+                    candidate_ids.extend(self.__range_candidates(bucket, budget, square))
+
+                # сохраняем порядок выдачи как у SELECT * без ORDER BY
+                candidate_ids.sort()
+
+                found_sale_offers = []
+                for sale_offer_id in candidate_ids:
+                    sale_offer = self.sale_offers[sale_offer_id]
+                    if self.__filter_price(sale_offer.price, budget) \
+                            and self.__filter_square(sale_offer.square, square) \
+                            and self.__filter_estate_class(sale_offer.estate_id, estate_class) \
+                            and self.__filter_distance_to_metro(sale_offer.estate_id, distance_to_metro) \
+                            and self.__filter_design(sale_offer.design, design) \
+                            and self.__filter_readiness(sale_offer.offer_readiness, readiness) \
+                            and self.__filter_irr(sale_offer.irr, irr):
+                        found_sale_offers.append(sale_offer)
+                        if len(found_sale_offers) == limit:
+                            break
+
+                span.set_attribute("candidates", len(candidate_ids))
+                span.set_status(Status(StatusCode.OK))
+                return found_sale_offers
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    def estates_by_ids(self, estate_ids: list[int]) -> list[model.Estate]:
+        return [self.estates[estate_id] for estate_id in estate_ids if estate_id in self.estates]
+
+    def __is_stale(self) -> bool:
+        if self.refreshed_at is None:
+            return True
+        return time.monotonic() - self.refreshed_at >= self.refresh_interval
+
+    def __is_reconcile_due(self) -> bool:
+        if self.reconciled_at is None:
+            # первая загрузка читает таблицы целиком, сверять нечего
+            self.reconciled_at = time.monotonic()
+            return False
+        return time.monotonic() - self.reconciled_at >= self.reconcile_interval
+
+    async def __reconcile(self) -> tuple[int, list[tuple[int, str]]]:
+        estate_ids = await self.estate_repo.all_estate_ids()
+        sale_offer_ids = await self.sale_offer_repo.all_sale_offer_ids()
+
+        deleted_estate_ids = [estate_id for estate_id in self.estates if estate_id not in estate_ids]
+        for estate_id in deleted_estate_ids:
+            self.estates.pop(estate_id)
+            self.estate_classes.pop(estate_id, None)
+            self.estate_nearest_metro_distances.pop(estate_id, None)
+
+        deleted_sale_offer_bucket_keys = []
+        for sale_offer_id in [sale_offer_id for sale_offer_id in self.sale_offers if sale_offer_id not in sale_offer_ids]:
+            deleted_sale_offer_bucket_keys.append(self.__bucket_key(self.sale_offers.pop(sale_offer_id)))
+
+        self.reconciled_at = time.monotonic()
+        return len(deleted_estate_ids), deleted_sale_offer_bucket_keys
+
+    def __put_estate(self, estate: model.Estate):
+        self.estates[estate.id] = estate
+
+        if estate.category == 'A':
+            self.estate_classes[estate.id] = 1
+        elif estate.category == 'B':
+            self.estate_classes[estate.id] = 2
+        else:
+            self.estate_classes[estate.id] = 0
+
+        if estate.metro_stations:
+            self.estate_nearest_metro_distances[estate.id] = min(
+                metro_station.leg_distance for metro_station in estate.metro_stations
+            )
+        else:
+            self.estate_nearest_metro_distances[estate.id] = None
+
+    def __bucket_key(self, sale_offer: model.SaleOffer) -> tuple[int, str]:
+        return sale_offer.type, sale_offer.location
+
+    def __rebuild_bucket(self, bucket_key: tuple[int, str]):
+        sale_offers = [
+            sale_offer
+            for sale_offer in self.sale_offers.values()
+            if self.__bucket_key(sale_offer) == bucket_key
+        ]
+        if not sale_offers:
+            self.buckets.pop(bucket_key, None)
+            return
+
+        by_price = sorted(sale_offers, key=lambda sale_offer: (sale_offer.price, sale_offer.id))
+        by_square = sorted(sale_offers, key=lambda sale_offer: (sale_offer.square, sale_offer.id))
+        self.buckets[bucket_key] = _OfferBucket(
+            prices=[sale_offer.price for sale_offer in by_price],
+            price_offer_ids=[sale_offer.id for sale_offer in by_price],
+            squares=[sale_offer.square for sale_offer in by_square],
+            square_offer_ids=[sale_offer.id for sale_offer in by_square],
+        )
+
+    def __range_candidates(self, bucket: _OfferBucket, budget: int, square: float) -> list[int]:
+        # Границы берём с запасом, точное условие проверяется в __filter_price/__filter_square
+        price_start = bisect.bisect_right(bucket.prices, 0)
+        if budget == 0:
+            price_end = len(bucket.prices)
+        else:
+            price_end = bisect.bisect_right(bucket.prices, budget * 1.10 + 1)
+
+        if square == 0:
+            square_start = bisect.bisect_right(bucket.squares, 0)
+        else:
+            square_start = bisect.bisect_left(bucket.squares, square * 0.90 - 1e-6)
+        square_end = len(bucket.squares)
+
+        if price_end - price_start <= square_end - square_start:
+            return bucket.price_offer_ids[price_start:price_end]
+        return bucket.square_offer_ids[square_start:square_end]
+
+    def __filter_location(self, sale_offer_location: str, location: int) -> bool:
+        if location == 1 and sale_offer_location == "ТТК":
+            return True
+        elif location == 2 and sale_offer_location == "МКАД":
+            return True
+        elif location == 0:
+            return True
+        else:
+            return False
+
+    def __filter_estate_class(self, estate_id: int, estate_class: int) -> bool:
+        if estate_class == 0:
+            return True
+        return self.estate_classes.get(estate_id, 0) == estate_class
+
+    def __filter_type(self, sale_offer_type: int, type: int) -> bool:
+        if type == 0:
+            return True
+        else:
+            return sale_offer_type == type - 1
+
+    def __filter_distance_to_metro(self, estate_id: int, distance_to_metro: int) -> bool:
+        if distance_to_metro == 0:
+            return True
+        nearest_metro_distance = self.estate_nearest_metro_distances.get(estate_id)
+        if nearest_metro_distance is None:
+            return False
+        return nearest_metro_distance <= distance_to_metro
+
+    def __filter_design(self, sale_offer_design: int, design: int) -> bool:
+        if design == 0:
+            return True
+        else:
+            return sale_offer_design == design
+
+    def __filter_readiness(self, sale_offer_readiness: int, readiness: int) -> bool:
+        if readiness == 0:
+            return True
+        else:
+            return sale_offer_readiness == readiness
+
+    def __filter_price(self, sale_offer_price: int, price: int) -> bool:
+        if sale_offer_price == 0:
+            return False
+        if price == 0:
+            return True
+        if sale_offer_price > price:
+            return (sale_offer_price / price - 1) <= 0.10
+        return True
+
+    def __filter_square(self, sale_offer_square: float, square: float) -> bool:
+        if sale_offer_square == 0:
+            return False
+        if square == 0:
+            return True
+        if sale_offer_square < square:
+            return (square - sale_offer_square) / square <= 0.10
+        return True
+
+    def __filter_irr(self, sale_offer_irr: float, irr: float) -> bool:
+        if irr == 0:
+            return True
+        return irr <= sale_offer_irr
@@ -1,5 +1,3 @@
-import geopandas as gpd
-from shapely.geometry import Point
 from opentelemetry.trace import Status, StatusCode, SpanKind
 from internal import model, interface
 
@@ -10,13 +8,17 @@ class SaleOfferService(interface.ISaleOfferService):
             tel: interface.ITelemetry,
             estate_repo: interface.IEstateRepo,
             sale_offer_repo: interface.ISaleOfferRepo,
-            estate_calculator_client: interface.IWewallEstateCalculatorClient
+            sale_offer_index: interface.ISaleOfferIndex,
+            estate_calculator_client: interface.IWewallEstateCalculatorClient,
+            ring_classifier: interface.IRingClassifier
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.estate_repo = estate_repo
         self.sale_offer_repo = sale_offer_repo
+        self.sale_offer_index = sale_offer_index
         self.estate_calculator_client = estate_calculator_client
+        self.ring_classifier = ring_classifier
 
         self.nds_rate = 0
         self.map_coeff = 120
@@ -59,6 +61,10 @@ class SaleOfferService(interface.ISaleOfferService):
                 }
         ) as span:
             try:
+                if not location:
+                    estate = (await self.estate_repo.estate_by_id(estate_id))[0]
+                    location = self.ring_classifier.define_ring(estate.coords)
+
                 sale_offer_id = await self.sale_offer_repo.create_sale_offer(
                     estate_id,
                     link,
@@ -83,6 +89,28 @@ class SaleOfferService(interface.ISaleOfferService):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    async def upsert_sale_offers(
+            self,
+            estate_ids: list[int],
+            sale_offers: list[model.ParsedSaleOffer]
+    ) -> model.UpsertResult:
+        with self.tracer.start_as_current_span(
+                "SaleOfferService.upsert_sale_offers",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "sale_offers_count": len(sale_offers)
+                }
+        ) as span:
+            try:
+                upsert_result = await self.sale_offer_repo.upsert_sale_offers(estate_ids, sale_offers)
+
+                span.set_status(Status(StatusCode.OK))
+                return upsert_result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
     async def calc_sale_offer_irr(self, sale_offer: model.SaleOffer) -> None:
         if sale_offer.irr != 0.0:
             return
@@ -109,6 +137,71 @@ class SaleOfferService(interface.ISaleOfferService):
         else:
             return
 
+    async def calc_sale_offers_irr(self, sale_offers: list[model.SaleOffer]) -> None:
+        with self.tracer.start_as_current_span(
+                "SaleOfferService.calc_sale_offers_irr",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "sale_offers_count": len(sale_offers)
+                }
+        ) as span:
+            try:
+                sale_offers = [
+                    sale_offer for sale_offer in sale_offers
+                    if sale_offer.irr == 0.0 and sale_offer.type == 0
+                ]
+                estate_ids = list({sale_offer.estate_id for sale_offer in sale_offers})
+                estates = {estate.id: estate for estate in await self.estate_repo.estates_by_ids(estate_ids)}
+
+                calc_sale_offers = []
+                params = []
+                for sale_offer in sale_offers:
+                    estate = estates.get(sale_offer.estate_id)
+                    if estate is None:
+                        continue
+                    try:
+                        nearest_metro = self.__nearest_metro(estate.metro_stations)
+                    except:
+                        self.logger.debug("Не смогли вычислить ближайшее метро", {"sale_offer_id": sale_offer.id})
+                        continue
+
+                    calc_sale_offers.append(sale_offer)
+                    params.append({
+                        "square": sale_offer.square,
+                        "price_per_meter": sale_offer.price_per_meter,
+                        "need_repairs": sale_offer.design,
+                        "estate_category": estate.category.replace('+', '').replace('C', 'B'),
+                        "metro_station_name": nearest_metro.name,
+                        "distance_to_metro": nearest_metro.leg_distance,
+                        "nds_rate": self.nds_rate,
+                    })
+
+                if not params:
+                    span.set_status(Status(StatusCode.OK))
+                    return
+
+                calc_resps = await self.estate_calculator_client.calc_finance_model_finished_office_batch(params)
+
+                sale_offer_ids = []
+                irrs = []
+                for sale_offer, calc_resp in zip(calc_sale_offers, calc_resps):
+                    if calc_resp is None:
+                        continue
+                    sale_offer_ids.append(sale_offer.id)
+                    irrs.append(calc_resp.rent_irr)
+
+                await self.sale_offer_repo.update_sale_offers_irr(sale_offer_ids, irrs)
+                self.logger.debug("Рассчитали доходность sale_offers", {
+                    "sale_offers_count": len(sale_offers),
+                    "updated_count": len(sale_offer_ids),
+                })
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
     async def find_sale_offers(
             self,
             type: int,
@@ -137,57 +230,49 @@ class SaleOfferService(interface.ISaleOfferService):
                 }
         ) as span:
             try:
-                sale_offers = await self.sale_offer_repo.all_sale_offer()
-                estates = await self.estate_repo.all_estate()
-
-                filtered_sale_offers = self.__filter_offers(
-                    sale_offers,
-                    estates,
-                    type,
-                    budget,
-                    location,
-                    square,
-                    estate_class,
-                    distance_to_metro,
-                    design,
-                    readiness,
-                    irr
-                )
+                if self.sale_offer_index.is_loaded():
+                    await self.sale_offer_index.refresh()
+                    filtered_sale_offers = self.sale_offer_index.find(
+                        type,
+                        budget,
+                        location,
+                        square,
+                        estate_class,
+                        distance_to_metro,
+                        design,
+                        readiness,
+                        irr,
+                        8
+                    )
+                else:
+                    # пока индекс не прогрет, ищем в PostgreSQL и прогреваем индекс в фоне
+                    self.sale_offer_index.load_in_background()
+                    filtered_sale_offers = await self.sale_offer_repo.search_sale_offers(
+                        type,
+                        budget,
+                        location,
+                        square,
+                        estate_class,
+                        distance_to_metro,
+                        design,
+                        readiness,
+                        irr,
+                        8
+                    )
                 self.logger.debug("Получили отфильтрованные sale_offers")
 
-                if len(filtered_sale_offers) > 8:
-                    self.logger.debug("Получили больше 8 filtered_sale_offers")
-                    filtered_sale_offers = filtered_sale_offers[:8]
+                estate_ids = list({sale_offer.estate_id for sale_offer in filtered_sale_offers})
+                estates = []
+                if self.sale_offer_index.is_loaded():
+                    estates = self.sale_offer_index.estates_by_ids(estate_ids)
+                if len(estates) < len(estate_ids):
+                    estates = await self.estate_repo.estates_by_ids(estate_ids)
+                estates = {estate.id: estate for estate in estates}
 
-                sale_offers_dto = []
-                for filtered_sale_offer in filtered_sale_offers:
-                    estate = await self.estate_repo.estate_by_id(filtered_sale_offer.estate_id)
-                    sale_offer = await self.sale_offer_repo.sale_offer_by_id(filtered_sale_offer.id)
-
-                    sale_offer = sale_offer[0]
-                    estate = estate[0]
-                    sale_offers_dto.append(
-                        model.SaleOfferDTO(
-                            estate_id=estate.id,
-                            estate_name=estate.name,
-                            estate_category=estate.category,
-                            estate_address=estate.address,
-                            estate_coords=estate.coords,
-                            metro_stations=estate.metro_stations,
-                            link=sale_offer.link,
-                            name=sale_offer.name,
-                            square=sale_offer.square,
-                            price=sale_offer.price,
-                            price_per_meter=sale_offer.price_per_meter,
-                            design=sale_offer.design,
-                            floor=sale_offer.floor,
-                            type=sale_offer.type,
-                            image_urls=sale_offer.image_urls,
-                            offer_readiness=sale_offer.offer_readiness,
-                            readiness_date=sale_offer.readiness_date,
-                            description=sale_offer.description
-                        )
-                    )
+                sale_offers_dto = [
+                    self.__to_dto(sale_offer, estates[sale_offer.estate_id])
+                    for sale_offer in filtered_sale_offers
+                ]
 
                 span.set_status(Status(StatusCode.OK))
                 return sale_offers_dto
@@ -196,145 +281,62 @@ class SaleOfferService(interface.ISaleOfferService):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
-    def __filter_offers(
-            self,
-            sale_offers: list[model.SaleOffer],
-            estates: list[model.Estate],
-            type: int,
-            budget: int,
-            location: int,
-            square: float,
-            estate_class: int,
-            distance_to_metro: int,
-            design: int,
-            readiness: int,
-            irr: float
-    ) -> list[model.SaleOffer]:
+    async def sale_offers_by_ids(self, sale_offer_ids: list[int]) -> list[model.SaleOfferDTO]:
         with self.tracer.start_as_current_span(
-                "SaleOfferService.__filter_offers",
+                "SaleOfferService.sale_offers_by_ids",
                 kind=SpanKind.INTERNAL,
                 attributes={
-                    "budget": budget,
-                    "location": location,
-                    "square": square,
-                    "estate_class": estate_class,
-                    "distance_to_metro": distance_to_metro,
-                    "design": design,
-                    "readiness": readiness,
-                    "irr": irr
+                    "sale_offer_ids": sale_offer_ids,
                 }
         ) as span:
             try:
-                if location not in [1, 2]:
-                    location = 0
+                sale_offers = await self.sale_offer_repo.sale_offers_by_ids(sale_offer_ids)
+                sale_offers = {sale_offer.id: sale_offer for sale_offer in sale_offers}
 
-                if location == 0:
-                    filtered_sale_offers = [
-                        sale_offer
-                        for sale_offer in sale_offers
-                        if self.__filter_price(sale_offer.price, budget)
-                           and self.__filter_type(sale_offer.type, type)
-                           and self.__filter_square(sale_offer.square, square)
-                           and self.__filter_estate_class(estates, sale_offer.estate_id, estate_class)
-                           and self.__filter_distance_to_metro(estates, sale_offer.estate_id, distance_to_metro)
-                           and self.__filter_design(sale_offer.design, design)
-                           and self.__filter_readiness(sale_offer.offer_readiness, readiness)
-                           and self.__filter_irr(sale_offer.irr, irr)
-                    ]
-                else:
-                    filtered_sale_offers = [
-                        sale_offer
-                        for sale_offer in sale_offers
-                        if self.__filter_location(sale_offer.location, location)
-                           and self.__filter_type(sale_offer.type, type)
-                           and self.__filter_price(sale_offer.price, budget)
-                           and self.__filter_square(sale_offer.square, square)
-                           and self.__filter_estate_class(estates, sale_offer.estate_id, estate_class)
-                           and self.__filter_distance_to_metro(estates, sale_offer.estate_id, distance_to_metro)
-                           and self.__filter_design(sale_offer.design, design)
-                           and self.__filter_readiness(sale_offer.offer_readiness, readiness)
-                           and self.__filter_irr(sale_offer.irr, irr)
-                    ]
+                estate_ids = list({sale_offer.estate_id for sale_offer in sale_offers.values()})
+                estates = []
+                if self.sale_offer_index.is_loaded():
+                    estates = self.sale_offer_index.estates_by_ids(estate_ids)
+                if len(estates) < len(estate_ids):
+                    estates = await self.estate_repo.estates_by_ids(estate_ids)
+                estates = {estate.id: estate for estate in estates}
+
+                # Порядок как в запросе, удаленные офферы пропускаем
+                sale_offers_dto = [
+                    self.__to_dto(sale_offers[sale_offer_id], estates[sale_offers[sale_offer_id].estate_id])
+                    for sale_offer_id in sale_offer_ids
+                    if sale_offer_id in sale_offers
+                ]
 
                 span.set_status(Status(StatusCode.OK))
-                return filtered_sale_offers
-            except Exception as e:
-                span.record_exception(e)
-                span.set_status(Status(StatusCode.ERROR, str(e)))
+                return sale_offers_dto
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
-    def __filter_location(self, sale_offer_location: str, location: int) -> bool:
-        if location == 1 and sale_offer_location == "ТТК":
-            return True
-        elif location == 2 and sale_offer_location == "МКАД":
-            return True
-        elif location == 0:
-            return True
-        else:
-            return False
-
-    def __filter_estate_class(self, estates: list[model.Estate], estate_id: int, estate_class: int) -> bool:
-        if estate_class == 0:
-            return True
-        else:
-            estate = [estate for estate in estates if estate.id == estate_id][0]
-            if estate.category == 'A' and estate_class == 1:
-                return True
-            elif estate.category == 'B' and estate_class == 2:
-                return True
-            else:
-                return False
-
-    def __filter_type(self, sale_offer_type: int, type: int) -> bool:
-        if type == 0:
-            return True
-        else:
-            return sale_offer_type == type - 1
-
-    def __filter_distance_to_metro(self, estates: list[model.Estate], estate_id: int, distance_to_metro: int) -> bool:
-        if distance_to_metro == 0:
-            return True
-        else:
-            estate = [estate for estate in estates if estate.id == estate_id][0]
-            nearest_metro = self.__nearest_metro(estate.metro_stations)
-            return nearest_metro.leg_distance <= distance_to_metro
-
-    def __filter_design(self, sale_offer_design: int, design: int) -> bool:
-        if design == 0:
-            return True
-        else:
-            return sale_offer_design == design
-
-    def __filter_readiness(self, sale_offer_readiness: int, readiness: int) -> bool:
-        if readiness == 0:
-            return True
-        else:
-            return sale_offer_readiness == readiness
-
-    def __filter_price(self, sale_offer_price: int, price: int) -> bool:
-        if sale_offer_price == 0:
-            return False
-        if price == 0:
-            return True
-        if sale_offer_price > price:
-            return (sale_offer_price / price - 1) <= 0.10
-        return True
-
-    def __filter_square(self, sale_offer_square: float, square: float) -> bool:
-        if sale_offer_square == 0:
-            return False
-        if square == 0:
-            return True
-        if sale_offer_square < square:
-            return (square - sale_offer_square) / square <= 0.10
-        return True
-
-    def __filter_irr(self, sale_offer_irr: float, irr: float) -> bool:
-        if irr == 0:
-            return True
-        result = irr <= sale_offer_irr
-
-        return result
+    def __to_dto(self, sale_offer: model.SaleOffer, estate: model.Estate) -> model.SaleOfferDTO:
+        return model.SaleOfferDTO(
+            id=sale_offer.id,
+            estate_id=estate.id,
+            estate_name=estate.name,
+            estate_category=estate.category,
+            estate_address=estate.address,
+            estate_coords=estate.coords,
+            metro_stations=estate.metro_stations,
+            link=sale_offer.link,
+            name=sale_offer.name,
+            square=sale_offer.square,
+            price=sale_offer.price,
+            price_per_meter=sale_offer.price_per_meter,
+            design=sale_offer.design,
+            floor=sale_offer.floor,
+            type=sale_offer.type,
+            image_urls=sale_offer.image_urls,
+            offer_readiness=sale_offer.offer_readiness,
+            readiness_date=sale_offer.readiness_date,
+            description=sale_offer.description
+        )
 
     def __nearest_metro(self, metro_stations: list[model.MetroStation]) -> model.MetroStation:
         metro_distances = [metro.leg_distance for metro in metro_stations]
@@ -6,7 +6,9 @@ from infrastructure.telemetry.telemetry import Telemetry, AlertManager
 
 from pkg.parser.m2data_parser import M2DataParser
 from pkg.parser.trend_agent_parser import TrendAgentParser
+from pkg.moscow_ring_polygon.ring_classifier import MoscowRingClassifier
 from pkg.client.internal.wewall_estate_calculator.client import WewallEstateCalculatorClient
+from pkg.client.external.route.client import RouteClient
 
 from internal.controller.http.handler.sale_offer.handler import SaleOfferController
 from internal.controller.http.handler.rent_offer.handler import RentOfferController
@@ -17,10 +19,13 @@ from internal.config.config import Config
 from internal.repo.estate.repo import EstateRepo
 from internal.repo.sale_offer.repo import SaleOfferRepo
 from internal.repo.rent_offer.repo import RentOfferRepo
+from internal.repo.route.repo import RouteRepo
 
 from internal.service.estate.service import EstateService
 from internal.service.sale_offer.service import SaleOfferService
+from internal.service.sale_offer.offer_index import SaleOfferIndex
 from internal.service.rent_offer.service import RentOfferService
+from internal.service.route.service import RouteService
 
 from internal.app.http.app import NewHTTP
 from internal.app.parsing.app import M2DataParsing
@@ -61,18 +66,31 @@ tel = Telemetry(
 
 db = PG(tel, cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
 
-m2data_parser = M2DataParser(cfg.m2data_building_url)
-trend_agent_parser = TrendAgentParser()
+ring_classifier = MoscowRingClassifier()
 estate_calculator_client = WewallEstateCalculatorClient(tel, cfg.wewall_estate_calculator_host,
                                                         cfg.wewall_estate_calculator_port)
+route_client = RouteClient(tel)
 
 estate_repo = EstateRepo(tel, db)
 rent_offer_repo = RentOfferRepo(tel, db)
 sale_offer_repo = SaleOfferRepo(tel, db)
+route_repo = RouteRepo(tel, db)
+
+route_service = RouteService(tel, route_repo, route_client, cfg.route_google_lookup)
+m2data_parser = M2DataParser(cfg.m2data_building_url, ring_classifier, route_service, cfg.m2data_host_concurrency)
+trend_agent_parser = TrendAgentParser(ring_classifier, route_service)
 
 estate_service = EstateService(tel, estate_repo)
 rent_offer_service = RentOfferService(tel, estate_repo, rent_offer_repo)
-sale_offer_service = SaleOfferService(tel, estate_repo, sale_offer_repo, estate_calculator_client)
+sale_offer_index = SaleOfferIndex(tel, estate_repo, sale_offer_repo)
+sale_offer_service = SaleOfferService(
+    tel,
+    estate_repo,
+    sale_offer_repo,
+    sale_offer_index,
+    estate_calculator_client,
+    ring_classifier
+)
 
 rent_offer_controller = RentOfferController(tel, rent_offer_service)
 sale_offer_controller = SaleOfferController(tel, sale_offer_service)
@@ -107,6 +125,7 @@ if __name__ == '__main__':
         loop = asyncio.get_event_loop()
         loop.run_until_complete(
             TrendAgentParsing(
+                db,
                 estate_service,
                 sale_offer_service,
                 trend_agent_parser
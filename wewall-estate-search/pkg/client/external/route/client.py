@@ -0,0 +1,99 @@
+import re
+import json
+
+from bs4 import BeautifulSoup
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import model, interface
+
+from pkg.client.client import AsyncHTTPClient
+
+
+class RouteClient(interface.IRouteClient):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+    ):
+        self.logger = tel.logger()
+        self.tracer = tel.tracer()
+        self.hh_client = AsyncHTTPClient(
+            "api.hh.ru",
+            443,
+            use_https=True,
+            logger=self.logger,
+        )
+        self.google_client = AsyncHTTPClient(
+            "www.google.ru",
+            443,
+            use_https=True,
+            logger=self.logger,
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+                'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+                'Referer': 'https://www.google.com/ ',
+            }
+        )
+
+    async def metro_station_coords(self) -> list[model.MetroStationCoords]:
+        with self.tracer.start_as_current_span(
+                "RouteClient.metro_station_coords",
+                kind=SpanKind.CLIENT
+        ) as span:
+            try:
+                response = await self.hh_client.get("/metro/1")
+
+                metro_stations = []
+                for metro_line in response.json()["lines"]:
+                    for metro_station in metro_line["stations"]:
+                        metro_stations.append(model.MetroStationCoords(
+                            name=metro_station["name"],
+                            lat=metro_station["lat"],
+                            lon=metro_station["lng"],
+                        ))
+
+                span.set_status(Status(StatusCode.OK))
+                return metro_stations
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def route(
+            self,
+            lon1: float,
+            lat1: float,
+            lon2: float,
+            lat2: float,
+            is_car: bool
+    ) -> tuple[int, int] | None:
+        with self.tracer.start_as_current_span(
+                "RouteClient.route",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "is_car": is_car
+                }
+        ) as span:
+            try:
+                link = f"/maps/dir/{lat1},{lon1}/{lat2},{lon2}/@55.7629171,37.6096677,17z/data=!4m2!4m1!3e{0 if is_car else 2}?entry=ttu&g_ep=EgoyMDI1MDUwNy4wIKXMDSoASAFQAw%3D%3D"
+                response = await self.google_client.get(link)
+                soup = BeautifulSoup(response.text, "html.parser")
+
+                script = soup.find('script').string
+                pattern = r'window\.APP_INITIALIZATION_STATE=(.*?)window\.APP_FLAGS'
+
+                match = re.search(pattern, script)
+                if not match:
+                    span.set_status(Status(StatusCode.OK))
+                    return None
+
+                raw_value = json.loads(match.group(1)[:-1])
+                route_data = json.loads(raw_value[3][4].replace(")]}'", ""))[0][1][0][0]
+                distance = route_data[2][0]
+                time = route_data[3][0]
+
+                span.set_status(Status(StatusCode.OK))
+                return distance, time
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
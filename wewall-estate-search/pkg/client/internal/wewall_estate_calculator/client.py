@@ -20,8 +20,10 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
             prefix="/api/estate-calculator",
             use_tracing=True,
             logger=self.logger,
+            timeout=300,
         )
         self.tracer = tel.tracer()
+        self.batch_size = 1000
 
     async def calc_finance_model_finished_office(
             self,
@@ -112,3 +114,43 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
+
+    async def calc_finance_model_finished_office_batch(
+            self,
+            params: list[dict],
+    ) -> list[model.FinanceModelResponse | None]:
+        with self.tracer.start_as_current_span(
+                "WewallEstateCalculatorClient.calc_finance_model_finished_office_batch",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "items_count": len(params),
+                }
+        ) as span:
+            try:
+                finance_models = []
+                for start in range(0, len(params), self.batch_size):
+                    body = {"items": params[start:start + self.batch_size]}
+                    response = await self.client.post("/finished/office/batch", json=body)
+                    json_response = response.json()
+
+                    if response.status_code >= 500:
+                        raise Exception("Internal Server Error")
+                    if response.status_code >= 400:
+                        raise Exception(f"Client error: {response.status_code}")
+
+                    for item in json_response["items"]:
+                        if item["finance_model"] is None:
+                            self.logger.warning("Не удалось рассчитать финмодель", {
+                                "error": item["error"],
+                                "error_code": item["error_code"],
+                            })
+                            finance_models.append(None)
+                        else:
+                            finance_models.append(model.FinanceModelResponse(**item["finance_model"]))
+
+                span.set_status(Status(StatusCode.OK))
+                return finance_models
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
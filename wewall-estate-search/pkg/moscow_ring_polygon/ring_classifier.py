@@ -0,0 +1,47 @@
+import numpy as np
+import shapely
+import geopandas as gpd
+
+from internal import model, interface
+
+
+class MoscowRingClassifier(interface.IRingClassifier):
+    def __init__(
+            self,
+            ttk_path: str = "pkg/moscow_ring_polygon/ttk.geojson",
+            mkad_path: str = "pkg/moscow_ring_polygon/mkad.geojson"
+    ):
+        self.ttk_path = ttk_path
+        self.mkad_path = mkad_path
+
+        self.ttk = None
+        self.mkad = None
+
+    def define_ring(self, coords: model.Coords) -> str:
+        return self.define_rings([coords])[0]
+
+    def define_rings(self, coords_list: list[model.Coords]) -> list[str]:
+        if not coords_list:
+            return []
+        self.__load()
+
+        lons = np.array([coords.lon for coords in coords_list], dtype=float)
+        lats = np.array([coords.lat for coords in coords_list], dtype=float)
+
+        in_ttk = shapely.contains_xy(self.ttk, lons, lats)
+        in_mkad = shapely.contains_xy(self.mkad, lons, lats)
+
+        locations = np.where(in_ttk, "ТТК", np.where(in_mkad, "МКАД", "ЗАМКАД"))
+        return locations.tolist()
+
+    def __load(self) -> None:
+        if self.ttk is not None:
+            return
+
+        # полигоны читаются один раз за процесс и подготавливаются для быстрых contains
+        ttk = gpd.read_file(self.ttk_path).to_crs(epsg=4326).unary_union
+        mkad = gpd.read_file(self.mkad_path).to_crs(epsg=4326).unary_union
+        shapely.prepare(ttk)
+        shapely.prepare(mkad)
+
+        self.ttk, self.mkad = ttk, mkad
@@ -1,9 +1,9 @@
-import re
 import json
-import requests
+import asyncio
+from typing import AsyncIterator
+from urllib.parse import urlsplit
 
-import geopandas as gpd
-from shapely.geometry import Point
+import httpx
 
 from bs4 import BeautifulSoup
 
@@ -14,63 +14,169 @@ from internal import model, interface
 class M2DataParser(interface.IM2DataParser):
     def __init__(
             self,
-            m2data_building_url: str
+            m2data_building_url: str,
+            ring_classifier: interface.IRingClassifier,
+            route_service: interface.IRouteService,
+            host_concurrency: int = 8,
+            queue_size: int = 100,
+            timeout: float = 30
     ):
         self.m2data_building_url = m2data_building_url
+        self.ring_classifier = ring_classifier
+        self.route_service = route_service
+        self.host_concurrency = host_concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
 
-    def parse(self) -> list[model.ParsedEstate]:
+        self.client: httpx.AsyncClient | None = None
+        self.host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.in_flight: dict[str, asyncio.Task] = {}
+
+    async def parse(self) -> AsyncIterator[model.ParsedEstate]:
         print("Start M2DataParsing", flush=True)
-        estates = []
-        n = 0
-
-        for page in range(1, self.__page_counter()):
-            print(f"Parsing page {page}", flush=True)
-            for estate_link in self.__all_estate_link(page):
-                n += 1
-                print(f"Парсим№ {n}: {estate_link}", flush=True)
-                estate = self.__extract_estate_parameters(estate_link)
-                if estate is None:
-                    continue
-
-                # RENT
-                rent_offer_links = self.__extract_rent_offer_link(estate_link)
-                rent_offers = []
-                if rent_offer_links is None:
-                    continue
-                for rent_offer_link in rent_offer_links:
-                    rent_offer = self.extract_rent_offer_parameters(rent_offer_link)
-                    if rent_offer is None:
+        async with httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.host_concurrency * 4)
+        ) as client:
+            self.client = client
+            self.host_semaphores = {}
+            self.in_flight = {}
+
+            # краулер кладет готовые объекты в ограниченную очередь, запись в БД разбирает ее по мере готовности
+            estate_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            crawler = asyncio.create_task(self.__crawl(estate_queue))
+            try:
+                while True:
+                    estate = await estate_queue.get()
+                    if estate is None:
+                        break
+                    yield estate
+
+                await crawler
+            finally:
+                crawler.cancel()
+                self.client = None
+
+    async def __crawl(self, estate_queue: asyncio.Queue) -> None:
+        try:
+            metro_coords = await self.route_service.metro_coords()
+            pages = iter(range(1, await self.__page_counter()))
+            # Задач ровно по числу воркеров: ссылки ждут в ограниченной очереди, а не тысячами корутин в gather
+            link_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+            async def page_worker():
+                for page in pages:
+                    print(f"Parsing page {page}", flush=True)
+                    estate_links = await self.__all_estate_link(page)
+                    if estate_links is None:
                         continue
+                    for estate_link in estate_links:
+                        await link_queue.put(estate_link)
+
+            async def estate_worker():
+                while True:
+                    estate_link = await link_queue.get()
+                    if estate_link is None:
+                        return
 
-                    rent_offer.location = self.__define_ring_by_coords(estate.coords)
-                    rent_offers.append(rent_offer)
-                    break
-                estate.rent_offers = rent_offers
-                print(f"{len(rent_offers)=}", flush=True)
-
-                # SALE
-                sale_offer_links = self.__extract_sale_offer_link(estate_link)
-                sale_offers = []
-                if sale_offer_links is None:
-                    continue
-                for sale_offer_link in sale_offer_links:
-                    sale_offer = self.__extract_sale_offer_parameters(sale_offer_link)
-                    if sale_offer is None:
+                    try:
+                        estate = await self.__parse_estate(estate_link, metro_coords)
+                    except Exception as err:
+                        logger.error(err)
+                        continue
+                    if estate is None:
                         continue
 
-                    sale_offer.location = self.__define_ring_by_coords(estate.coords)
-                    sale_offers.append(sale_offer)
-                    break
-                estate.sale_offers = sale_offers
-                print(f"{len(sale_offers)=}", flush=True)
-                estates.append(estate)
+                    print(f"Спарсили: {estate_link}", flush=True)
+                    await estate_queue.put(estate)
 
-        return estates
+            estate_workers = [asyncio.create_task(estate_worker()) for _ in range(self.host_concurrency * 4)]
+            try:
+                await asyncio.gather(*[page_worker() for _ in range(self.host_concurrency)])
+                for _ in estate_workers:
+                    await link_queue.put(None)
+                await asyncio.gather(*estate_workers)
+            finally:
+                for estate_worker_task in estate_workers:
+                    estate_worker_task.cancel()
+        except Exception:
+            await estate_queue.put(None)
+            raise
+
+        await estate_queue.put(None)
+
+    async def __parse_estate(
+            self,
+            estate_link: str,
+            metro_coords: dict[str, model.Coords]
+    ) -> model.ParsedEstate | None:
+        try:
+            soup = await self.__soup(estate_link)
+        except Exception as err:
+            logger.error(err)
+            return None
+
+        estate = await self.__extract_estate_parameters(estate_link, soup, metro_coords)
+        if estate is None:
+            return None
+        location = self.ring_classifier.define_ring(estate.coords)
 
-    def __all_estate_link(self, page: int) -> list | None:
+        # RENT
+        rent_offer_links = self.__extract_rent_offer_link(soup)
+        rent_offers = []
+        if rent_offer_links is None:
+            return None
+        for rent_offer_link in rent_offer_links:
+            rent_offer = await self.extract_rent_offer_parameters(rent_offer_link)
+            if rent_offer is None:
+                continue
+
+            rent_offer.location = location
+            rent_offers.append(rent_offer)
+            break
+        estate.rent_offers = rent_offers
+
+        # SALE
+        sale_offer_links = self.__extract_sale_offer_link(soup)
+        sale_offers = []
+        if sale_offer_links is None:
+            return None
+        for sale_offer_link in sale_offer_links:
+            sale_offer = await self.__extract_sale_offer_parameters(sale_offer_link)
+            if sale_offer is None:
+                continue
+
+            sale_offer.location = location
+            sale_offers.append(sale_offer)
+            break
+        estate.sale_offers = sale_offers
+
+        return estate
+
+    async def __get(self, url: str, **kwargs) -> httpx.Response:
+        host = urlsplit(url).netloc
+        semaphore = self.host_semaphores.setdefault(host, asyncio.Semaphore(self.host_concurrency))
+        async with semaphore:
+            return await self.client.get(url, **kwargs)
+
+    async def __soup(self, url: str) -> BeautifulSoup:
+        # одновременные запросы одной и той же страницы выполняются один раз
+        task = self.in_flight.get(url)
+        if task is None:
+            task = asyncio.create_task(self.__fetch_soup(url))
+            self.in_flight[url] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(url, None))
+
+        return await asyncio.shield(task)
+
+    async def __fetch_soup(self, url: str) -> BeautifulSoup:
+        html = (await self.__get(url)).text
+        return BeautifulSoup(html, "html.parser")
+
+    async def __all_estate_link(self, page: int) -> list | None:
         try:
-            html = requests.get(self.m2data_building_url + "?page=" + str(page)).text
-            soup = BeautifulSoup(html, "html.parser")
+            soup = await self.__soup(self.m2data_building_url + "?page=" + str(page))
 
             element = soup.find("search-objects")
             estate_links = []
@@ -81,46 +187,25 @@ class M2DataParser(interface.IM2DataParser):
         except Exception as err:
             logger.error(err)
 
-    def __extract_estate_parameters(self, estate_link: str) -> model.ParsedEstate | None:
+    async def __extract_estate_parameters(
+            self,
+            estate_link: str,
+            soup: BeautifulSoup,
+            metro_coords: dict[str, model.Coords]
+    ) -> model.ParsedEstate | None:
         try:
-            html = requests.get(estate_link).text
-            soup = BeautifulSoup(html, "html.parser")
-
             estate_coords = json.loads(soup.find('object-gallery').attrs[":panorama"])["coords"]
             estate = model.ParsedEstate(estate_link, "", "", "",
                                         model.Coords(estate_coords[0], estate_coords[1]), [], [], [])
 
-            metro_coords = self.__all_metro_coords()
             estate_data = soup.find('object-main')
 
-            metro_stations = []
-            for metro in json.loads(estate_data.attrs[":metro"])["stations"]:
-                if metro is None:
-                    return None
-
-                car_distance, car_time = self.__calc_distance_by_coords(
-                    metro_coords[metro["title"]].lon,
-                    metro_coords[metro["title"]].lat,
-                    estate.coords.lon,
-                    estate.coords.lat,
-                    True
-                )
-                leg_distance, leg_time = self.__calc_distance_by_coords(
-                    metro_coords[metro["title"]].lon,
-                    metro_coords[metro["title"]].lat,
-                    estate.coords.lon,
-                    estate.coords.lat,
-                    False
-                )
-                metro_stations.append(
-                    model.MetroStation(
-                        name=metro["title"],
-                        time_leg=leg_time,
-                        time_car=car_time,
-                        leg_distance=leg_distance,
-                        car_distance=car_distance
-                    )
-                )
+            metros = json.loads(estate_data.attrs[":metro"])["stations"]
+            if None in metros:
+                return None
+
+            station_coords = [(metro["title"], metro_coords[metro["title"]]) for metro in metros]
+            metro_stations = await self.route_service.metro_stations(estate.coords, station_coords)
             if not metro_stations:
                 return None
 
@@ -144,11 +229,8 @@ class M2DataParser(interface.IM2DataParser):
             return "B"
 
     @staticmethod
-    def __extract_rent_offer_link(estate_link: str) -> list | None:
+    def __extract_rent_offer_link(soup: BeautifulSoup) -> list | None:
         try:
-            html = requests.get(estate_link).text
-            soup = BeautifulSoup(html, "html.parser")
-
             rent_offers = soup.find('object-offer', class_='object-page__rent-spaces')
             rent_offer_links = []
             for offer in json.loads(rent_offers.attrs[":data"]):
@@ -160,11 +242,8 @@ class M2DataParser(interface.IM2DataParser):
             logger.error(err)
 
     @staticmethod
-    def __extract_sale_offer_link(estate_link: str) -> list | None:
+    def __extract_sale_offer_link(soup: BeautifulSoup) -> list | None:
         try:
-            html = requests.get(estate_link).text
-            soup = BeautifulSoup(html, "html.parser")
-
             sale_offers = soup.find('object-offer', class_='object-page__sale-spaces')
             sale_offer_links = []
             for offer in json.loads(sale_offers.attrs[":data"]):
@@ -175,14 +254,12 @@ class M2DataParser(interface.IM2DataParser):
         except Exception as err:
             logger.error(err)
 
-    @staticmethod
-    def extract_rent_offer_parameters(rent_offer_link: str) -> model.ParsedRentOffer | None:
+    async def extract_rent_offer_parameters(self, rent_offer_link: str) -> model.ParsedRentOffer | None:
         try:
             print(f"Парсим аренду: {rent_offer_link}", flush=True)
             rent_offer = model.ParsedRentOffer(rent_offer_link, "", 0, 0, 0, 0, 0, "", [], 0, "", "")
 
-            html = requests.get(rent_offer_link).text
-            soup = BeautifulSoup(html, "html.parser")
+            soup = await self.__soup(rent_offer_link)
 
             rent_main_tag = soup.find('rent-main')
 
@@ -230,13 +307,11 @@ class M2DataParser(interface.IM2DataParser):
         except Exception as err:
             logger.error(err)
 
-    @staticmethod
-    def __extract_sale_offer_parameters(sale_offer_link: str) -> model.ParsedSaleOffer | None:
+    async def __extract_sale_offer_parameters(self, sale_offer_link: str) -> model.ParsedSaleOffer | None:
         try:
             sale_offer = model.ParsedSaleOffer(sale_offer_link, "", 0, 0, 0, 0, 0, 0, "", [], 0, "", "")
 
-            html = requests.get(sale_offer_link).text
-            soup = BeautifulSoup(html, "html.parser")
+            soup = await self.__soup(sale_offer_link)
             rent_main_tag = soup.find('rent-main')
 
             for parameter in json.loads(rent_main_tag.attrs[":parameters"]):
@@ -282,77 +357,9 @@ class M2DataParser(interface.IM2DataParser):
         except Exception as err:
             logger.error(err)
 
-    def __page_counter(self) -> int:
-        html = requests.get(self.m2data_building_url).text
-        soup = BeautifulSoup(html, "html.parser")
+    async def __page_counter(self) -> int:
+        soup = await self.__soup(self.m2data_building_url)
 
         pages = int(json.loads(soup.find("search-objects").attrs[":found-objects"])["total"] / 20)
 
         return pages
-
-    @staticmethod
-    def __calc_distance_by_coords(lon1: float, lat1: float, lon2: float, lat2: float, is_car: bool) -> tuple[int, int]:
-
-        link = f"https://www.google.ru/maps/dir/{lat1},{lon1}/{lat2},{lon2}/@55.7629171,37.6096677,17z/data=!4m2!4m1!3e{0 if is_car else 2}?entry=ttu&g_ep=EgoyMDI1MDUwNy4wIKXMDSoASAFQAw%3D%3D"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://www.google.com/ ',
-        }
-        html = requests.get(link, headers=headers).text
-        soup = BeautifulSoup(html, "html.parser")
-
-        script = soup.find('script').string
-        pattern = r'window\.APP_INITIALIZATION_STATE=(.*?)window\.APP_FLAGS'
-
-        distance = 0
-        time = 0
-        match = re.search(pattern, script)
-        if match:
-            try:
-                raw_value = json.loads(match.group(1)[:-1])
-                route_data = json.loads(raw_value[3][4].replace(")]}'", ""))[0][1][0][0]
-                distance = route_data[2][0]
-                time = route_data[3][0]
-            except Exception as err:
-                raw_value = match.group(1)[:-1]
-                print(raw_value)
-                logger.error(err)
-                return 0, 0
-        else:
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-
-        return distance, time
-
-    @staticmethod
-    def __all_metro_coords() -> dict[str, model.Coords]:
-        metro_data = requests.get("https://api.hh.ru/metro/1").json()["lines"]
-
-        metro_coords = {}
-        for metro_line in metro_data:
-            for metro_station in metro_line["stations"]:
-                metro_coords[metro_station["name"]] = model.Coords(lat=metro_station["lat"],
-                                                                   lon=metro_station["lng"])
-
-        return metro_coords
-
-    @staticmethod
-    def __define_ring_by_coords(coords: model.Coords) -> str:
-        ttk = gpd.read_file("pkg/moscow_ring_polygon/ttk.geojson").to_crs(epsg=4326).unary_union
-        mkad = gpd.read_file("pkg/moscow_ring_polygon/mkad.geojson").to_crs(epsg=4326).unary_union
-        point = Point(coords.lon, coords.lat)
-
-        if ttk.contains(point):
-            location = "ТТК"
-        elif mkad.contains(point):
-            location = "МКАД"
-        else:
-            location = "ЗАМКАД"
-
-        return location
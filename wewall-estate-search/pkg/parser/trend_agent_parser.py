@@ -3,23 +3,26 @@ import re
 import html
 from datetime import datetime
 
-import geopandas as gpd
-from shapely.geometry import Point
-
-from bs4 import BeautifulSoup
-
 from internal import model, interface
 import requests
 
 
 class TrendAgentParser(interface.ITrendAgentParser):
-    def __init__(self):
-        pass
-
-    def parse(self) -> list[model.ParsedEstate]:
+    def __init__(
+            self,
+            ring_classifier: interface.IRingClassifier,
+            route_service: interface.IRouteService
+    ):
+        self.ring_classifier = ring_classifier
+        self.route_service = route_service
+
+    async def parse(self) -> list[model.ParsedEstate]:
         estates = []
         try:
-            all_metro = self.__all_metro_coords()
+            all_metro = {
+                name.lower().replace("ё", "е").rstrip(): coords
+                for name, coords in (await self.route_service.metro_coords()).items()
+            }
             auth_token, refresh_token = self.__trend_agent_auth()
             estates_data = self.__commerce_list(auth_token, refresh_token)
 
@@ -32,7 +35,7 @@ class TrendAgentParser(interface.ITrendAgentParser):
 
                 print(f"\n\nEstate №{n}", flush=True)
 
-                estate = self.__extract_estate_params(estate_data, all_metro, auth_token, refresh_token)
+                estate = await self.__extract_estate_params(estate_data, all_metro, auth_token, refresh_token)
                 estate_image_urls = self.__extract_images(estate_data["block_id"], auth_token)
                 estate_description = self.__extract_estate_description(estate_data["block_id"], auth_token)
                 sale_offers = self.__extract_sale_offer_params(estate_data["block_id"], auth_token)
@@ -41,7 +44,6 @@ class TrendAgentParser(interface.ITrendAgentParser):
                     continue
 
                 for sale_offer in sale_offers:
-                    sale_offer.location = self.__define_ring_by_coords(estate.coords)
                     sale_offer.description = estate_description
                     sale_offer.image_urls = estate_image_urls
 
@@ -51,10 +53,16 @@ class TrendAgentParser(interface.ITrendAgentParser):
                 estate.sale_offers = sale_offers
                 estates.append(estate)
 
-            return estates
-
         except Exception as err:
-            return estates
+            print(f"Обход прерван: {err}", flush=True)
+
+        # локации всех объектов обхода определяются одним векторным вызовом
+        locations = self.ring_classifier.define_rings([estate.coords for estate in estates])
+        for estate, location in zip(estates, locations):
+            for sale_offer in estate.sale_offers:
+                sale_offer.location = location
+
+        return estates
 
     def __extract_estate_description(self, estate_id: str, auth_token: str) -> str:
         headers = {
@@ -165,7 +173,7 @@ class TrendAgentParser(interface.ITrendAgentParser):
         else:
             int_design = 1
         return int_design
-    def __extract_estate_params(self, estate_data: dict, all_metro: dict[str, model.Coords],
+    async def __extract_estate_params(self, estate_data: dict, all_metro: dict[str, model.Coords],
                                 auth_token: str, refresh_token: str) -> model.ParsedEstate | None:
         estate_prefix = estate_data["guid"]
         estate_id = estate_data["guid"]
@@ -178,7 +186,7 @@ class TrendAgentParser(interface.ITrendAgentParser):
         estate.link = f"https://msk.trendagent.ru/object/{estate_prefix}/#commerce"
         print(f"{estate.link=}\n\n", flush=True)
 
-        metro_stations = []
+        station_coords = []
         for metro in estate_data["subways"]:
             metro_name = re.sub(r'\s*\([^)]*\)', "", metro["name"]).strip().lower()
             if metro_name == "зеленоград-крюково":
@@ -187,32 +195,9 @@ class TrendAgentParser(interface.ITrendAgentParser):
                 metro_name = "реутово"
             elif metro_name == "очаково":
                 metro_name = "очаково i"
-            coords = all_metro[metro_name]
-
-            car_distance, car_time = self.__calc_distance_by_coords(
-                coords.lon,
-                coords.lat,
-                long,
-                lat,
-                True
-            )
-            leg_distance, leg_time = self.__calc_distance_by_coords(
-                coords.lon,
-                coords.lat,
-                long,
-                lat,
-                False
-            )
-
-            metro_stations.append(
-                model.MetroStation(
-                    name=metro_name,
-                    time_leg=leg_time,
-                    time_car=car_time,
-                    leg_distance=leg_distance,
-                    car_distance=car_distance
-                )
-            )
+            station_coords.append((metro_name, all_metro[metro_name]))
+
+        metro_stations = await self.route_service.metro_stations(estate.coords, station_coords)
         if not metro_stations:
             return None
 
@@ -292,44 +277,6 @@ class TrendAgentParser(interface.ITrendAgentParser):
 
         return response_json["result"]
 
-    @staticmethod
-    def __calc_distance_by_coords(lon1: float, lat1: float, lon2: float, lat2: float, is_car: bool) -> tuple[int, int]:
-        link = f"https://www.google.ru/maps/dir/{lat1},{lon1}/{lat2},{lon2}/@55.7629171,37.6096677,17z/data=!4m2!4m1!3e{0 if is_car else 2}?entry=ttu&g_ep=EgoyMDI1MDUwNy4wIKXMDSoASAFQAw%3D%3D"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://www.google.com/ ',
-        }
-        html = requests.get(link, headers=headers).text
-        soup = BeautifulSoup(html, "html.parser")
-
-        script = soup.find('script').string
-        pattern = r'window\.APP_INITIALIZATION_STATE=(.*?)window\.APP_FLAGS'
-
-        distance = 0
-        time = 0
-        match = re.search(pattern, script)
-        if match:
-            try:
-                raw_value = json.loads(match.group(1)[:-1])
-                route_data = json.loads(raw_value[3][4].replace(")]}'", ""))[0][1][0][0]
-                distance = route_data[2][0]
-                time = route_data[3][0]
-            except Exception as err:
-                raw_value = match.group(1)[:-1]
-                # print(raw_value)
-                return 0, 0
-        else:
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-            print("Пиздак")
-
-        return distance, time
-
     @staticmethod
     def __trend_agent_auth() -> tuple[str, str]:
         header = {
@@ -360,19 +307,6 @@ class TrendAgentParser(interface.ITrendAgentParser):
 
         return auth_token, refresh_token
 
-    @staticmethod
-    def __all_metro_coords() -> dict[str, model.Coords]:
-        metro_data = requests.get("https://api.hh.ru/metro/1").json()["lines"]
-
-        metro_coords = {}
-        for metro_line in metro_data:
-            for metro_station in metro_line["stations"]:
-                metro_coords[metro_station["name"].lower().replace("ё", "е").rstrip()] = model.Coords(lat=metro_station["lat"],
-                                                                           lon=metro_station["lng"])
-
-
-        return metro_coords
-
     @staticmethod
     def __process_deadline(deadline: str) -> tuple[int, str]:
         deadline = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
@@ -391,21 +325,6 @@ class TrendAgentParser(interface.ITrendAgentParser):
 
         return text
 
-    @staticmethod
-    def __define_ring_by_coords(coords: model.Coords) -> str:
-        ttk = gpd.read_file("pkg/moscow_ring_polygon/ttk.geojson").to_crs(epsg=4326).unary_union
-        mkad = gpd.read_file("pkg/moscow_ring_polygon/mkad.geojson").to_crs(epsg=4326).unary_union
-        point = Point(coords.lon, coords.lat)
-
-        if ttk.contains(point):
-            location = "ТТК"
-        elif mkad.contains(point):
-            location = "МКАД"
-        else:
-            location = "ЗАМКАД"
-
-        return location
-
     @staticmethod
     def __extract_images(estate_id: str, auth_token: str) -> list[str]:
         header = {
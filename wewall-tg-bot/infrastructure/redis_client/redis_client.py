@@ -57,6 +57,24 @@ class RedisClient(interface.IRedis):
         except Exception as e:
             return default
 
+    async def delete(self, key: str) -> int:
+        try:
+            client = await self.get_async_client()
+            return await client.delete(key)
+        except Exception as e:
+            raise e
+
+    async def hgetall(self, key: str) -> dict:
+        try:
+            client = await self.get_async_client()
+            return await client.hgetall(key)
+        except Exception as e:
+            raise e
+
+    async def pipeline(self, transaction: bool = True) -> aioredis.client.Pipeline:
+        client = await self.get_async_client()
+        return client.pipeline(transaction=transaction)
+
     async def get_async_client(self) -> aioredis.Redis:
         if self.async_client is None:
             self.async_pool = aioredis.ConnectionPool.from_url(
@@ -12,6 +12,9 @@ def NewTg(
         db: interface.IDB,
         dp: Dispatcher,
         worker: interface.IStatisticWorker,
+        state_flush_worker: interface.IStateFlushWorker,
+        subscription_service: interface.ISubscriptionService,
+        report_renderer: interface.IReportRenderer,
         http_middleware: interface.IHttpMiddleware,
         tg_middleware: interface.ITelegramMiddleware,
         tg_webhook_controller: interface.ITelegramWebhookController,
@@ -22,13 +25,23 @@ def NewTg(
 ):
     @asynccontextmanager
     async def lifespan(_: FastAPI):
+        # Процессы рендера и первая страница отчета готовятся до первого запроса
+        try:
+            await report_renderer.start()
+        except Exception as err:
+            print(f"Report renderer warm up failed: {err}", flush=True)
+
         daily_worker_task = asyncio.create_task(worker.collect_daily_stats())
         monthly_worker_task = asyncio.create_task(worker.collect_monthly_stats())
+        subscription_refresh_task = asyncio.create_task(subscription_service.refresh_active_subscriptions())
+        state_flush_task = asyncio.create_task(state_flush_worker.flush_counters())
         try:
             yield
         finally:
             daily_worker_task.cancel()
             monthly_worker_task.cancel()
+            subscription_refresh_task.cancel()
+            state_flush_task.cancel()
             try:
                 await daily_worker_task
             except asyncio.CancelledError:
@@ -38,6 +51,24 @@ def NewTg(
                 await monthly_worker_task
             except asyncio.CancelledError:
                 print("Monthly statistics worker cancelled", flush=True)
+
+            try:
+                await subscription_refresh_task
+            except asyncio.CancelledError:
+                print("Subscription refresh worker cancelled", flush=True)
+
+            try:
+                await state_flush_task
+            except asyncio.CancelledError:
+                print("State flush worker cancelled", flush=True)
+
+            # Счетчики, накопленные в Redis с последнего прохода, досбрасываем перед остановкой
+            try:
+                await state_flush_worker.flush_all_counters()
+            except Exception as err:
+                print(f"State counters flush failed: {err}", flush=True)
+
+            report_renderer.close()
     app = FastAPI(lifespan=lifespan)
     include_tg_middleware(dp, tg_middleware)
     include_http_middleware(app, http_middleware)
@@ -74,13 +105,7 @@ def include_tg_middleware(
         dp: Dispatcher,
         tg_middleware: interface.ITelegramMiddleware,
 ):
-    dp.update.middleware(tg_middleware.trace_middleware01)
-    dp.update.middleware(tg_middleware.metric_middleware02)
-    dp.update.middleware(tg_middleware.logger_middleware03)
-    dp.update.middleware(tg_middleware.check_subscribe_middleware04)
-    dp.update.middleware(tg_middleware.get_state_middleware05)
-    dp.update.middleware(tg_middleware.count_message_middleware06)
-    dp.update.middleware(tg_middleware.send_contact_message_to_amocrm_middleware07)
+    dp.update.middleware(tg_middleware.update_middleware)
 
 
 def include_tg_webhook(
@@ -172,6 +197,7 @@ def include_callback_handler(
 def include_db_handler(app: FastAPI, db: interface.IDB):
     app.add_api_route(common.PREFIX + "/table/create", create_table_handler(db), methods=["GET"])
     app.add_api_route(common.PREFIX + "/table/drop", drop_table_handler(db), methods=["GET"])
+    app.add_api_route(common.PREFIX + "/table/migrate", migrate_table_handler(db), methods=["GET"])
 
 
 def create_table_handler(db: interface.IDB):
@@ -192,3 +218,13 @@ def drop_table_handler(db: interface.IDB):
             raise err
 
     return delete_table
+
+
+def migrate_table_handler(db: interface.IDB):
+    async def migrate_table():
+        try:
+            await db.multi_query(model.migrate_queries)
+        except Exception as err:
+            raise err
+
+    return migrate_table
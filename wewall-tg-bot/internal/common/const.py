@@ -8,6 +8,7 @@ REQUEST_ID_KEY = "request_id"
 EXTRA_LOG_FIELDS_KEY = "extra"
 FILE_KEY = "file"
 ERROR_KEY = "error"
+OUTCOME_KEY = "outcome"
 
 HTTP_METHOD_KEY = "http.request.method"
 HTTP_STATUS_KEY = "http.response.status_code"
@@ -25,6 +26,11 @@ TELEGRAM_CALLBACK_QUERY_DATA_KEY = "telegram.callback_query.data"
 TELEGRAM_MESSAGE_DURATION_KEY = "telegram.message.duration"
 TELEGRAM_MESSAGE_DIRECTION_KEY = "telegram.message.direction"
 TELEGRAM_CHAT_TYPE_KEY = "telegram.chat.type"
+TELEGRAM_HANDLER_KEY = "telegram.handler"
+STATE_STATUS_KEY = "state.status"
+CACHE_RESULT_KEY = "cache.result"
+REPORT_RENDER_STAGE_KEY = "report.render.stage"
+SUBSCRIPTION_CHECK_REASON_KEY = "telegram.subscription.check.reason"
 
 REQUEST_DURATION_METRIC = "http.server.request.duration"
 ACTIVE_REQUESTS_METRIC = "http.server.active_requests"
@@ -40,6 +46,21 @@ ERROR_JOIN_CHAT_TOTAL_METRIC = "telegram.server.error.join_chat.total"
 MESSAGE_DURATION_METRIC = "telegram.server.message.duration"
 ACTIVE_MESSAGES_METRIC = "telegram.server.active_messages"
 
+REPORT_RENDER_STAGE_DURATION_METRIC = "report.render.stage.duration"
+FINANCE_MODEL_CACHE_LOOKUP_TOTAL_METRIC = "finance_model.cache.lookup.total"
+FINANCE_MODEL_CACHE_EVICTION_TOTAL_METRIC = "finance_model.cache.eviction.total"
+
+OFFER_PREFETCH_LOOKUP_TOTAL_METRIC = "estate_search.prefetch.lookup.total"
+OFFER_PREFETCH_TOTAL_METRIC = "estate_search.prefetch.total"
+ESTATE_SEARCH_OFFER_CACHE_LOOKUP_TOTAL_METRIC = "estate_search.offer_cache.lookup.total"
+
+STATE_CACHE_LOOKUP_TOTAL_METRIC = "state.cache.lookup.total"
+STATE_COUNTER_FLUSH_TOTAL_METRIC = "state.cache.counter_flush.total"
+
+SUBSCRIPTION_CACHE_LOOKUP_TOTAL_METRIC = "telegram.subscription.cache.lookup.total"
+SUBSCRIPTION_API_CALL_TOTAL_METRIC = "telegram.subscription.api_call.total"
+SUBSCRIPTION_API_CALL_SAVED_TOTAL_METRIC = "telegram.subscription.api_call.saved.total"
+
 TRACE_ID_HEADER = "X-Trace-ID"
 SPAN_ID_HEADER = "X-Span-ID"
 
@@ -53,6 +74,8 @@ class StateSwitchCommand:
     to_manager = "switch_to_manager"
     to_contact_collector = "switch_to_contact_collector"
 
+    prefix = "switch_to_"
+
 
 @dataclass
 class FinishStateCommand:
@@ -80,6 +103,11 @@ class StateStatuses:
     chat_with_amocrm_manager = "chat_with_amocrm_manager"
 
 
+class EstateSearchOfferType:
+    sale = "sale"
+    rent = "rent"
+
+
 @dataclass
 class EstateSearchKeyboardCallbackData:
     PREFIX = "estate_search:"
@@ -109,6 +137,7 @@ class AmocrmPipelineStatus:
 
 no_offers_text = "Нет подходящих предложений под ваши параметры поиска."
 no_more_offers = "Больше помещений под ваши параметры поиска нет"
+estate_search_expired_text = "Подборка устарела. Напишите, что ищете, и я подберу помещения заново"
 compromise_no_offers_text = """
 Клиент не смог найти предложений по свом параметрам поиска.
 Напиши что-то вроде:
@@ -123,5 +152,6 @@ compromise_no_offers_text = """
 no_more_estates = """
 Больше зданий под ваши параметры поиска нет
 """
+llm_response_placeholder_text = "⏳"
 manger_is_connecting_text = "Менеджер скоро подключится, бот будет работать дальше, пока не подключится менеджер"
 not_subscribe_text = 'WEWALL AI доступен только для подписчиков основного telegram-канала консалтинговой компании WEWALL'
@@ -26,6 +26,30 @@ class Config:
     wewall_estate_expert_host: str = os.environ.get("WEWALL_ESTATE_EXPERT_CONTAINER_NAME")
     wewall_estate_expert_port: int = int(os.environ.get("WEWALL_ESTATE_EXPERT_PORT"))
 
+    # Как часто (сек) обновлять сообщение при стриминге ответа LLM, Telegram ограничивает частоту редактирования
+    llm_stream_edit_interval: float = 1.0
+
+    # Сколько процессов рендерят PDF отчеты, каждый держит свой wkhtmltopdf
+    report_render_workers: int = 2
+
+    # Готовые финмодели (json, xlsx, pdf) по параметрам расчета, старые вытесняются по суммарному размеру
+    finance_model_cache_dir: str = os.environ.get("WEWALL_TG_BOT_FINANCE_MODEL_CACHE_DIR", "/tmp/finance-model-cache")
+    finance_model_cache_max_bytes: int = 512 * 1024 * 1024
+    finance_model_cache_ttl: int = 24 * 60 * 60
+    # Поднимаем при изменении справочников калькулятора (метро, коэффициенты), чтобы не отдавать старые расчеты
+    finance_model_reference_data_version: str = os.environ.get(
+        "WEWALL_TG_BOT_FINANCE_MODEL_REFERENCE_DATA_VERSION", "1"
+    )
+
+    # Пока пользователь смотрит оффер, следующий готовится в фоне
+    offer_prefetch_max_concurrency: int = 8
+    offer_prefetch_user_concurrency: int = 2
+    offer_prefetch_ttl: float = 15 * 60
+
+    # Сессия поиска хранит только id офферов, сами офферы читаются через кеш в Redis
+    estate_search_session_ttl: int = 24 * 60 * 60
+    estate_search_offer_cache_ttl: int = 60 * 60
+
     wewall_estate_search_host: str = os.environ.get("WEWALL_ESTATE_SEARCH_CONTAINER_NAME")
     wewall_estate_search_port: int = int(os.environ.get("WEWALL_ESTATE_SEARCH_PORT"))
 
@@ -61,3 +85,15 @@ class Config:
     monitoring_redis_port: int = int(os.environ.get('WEWALL_MONITORING_REDIS_PORT'))
     monitoring_redis_db: int = int(os.environ.get('WEWALL_MONITORING_DEDUPLICATE_ERROR_ALERT_REDIS_DB'))
     monitoring_redis_password: str = os.environ.get('WEWALL_MONITORING_REDIS_PASSWORD')
+    cache_redis_db: int = int(os.environ.get('WEWALL_TG_BOT_CACHE_REDIS_DB', 2))
+
+    state_cache_ttl: int = 60 * 60
+    state_counter_flush_interval: float = 10
+    state_counter_flush_batch_size: int = 500
+
+    # Подписка на канал кешируется только положительно: отписку ловим при истечении TTL,
+    # а подписку сразу по кнопке "Я подписался"
+    subscription_cache_ttl: int = 5 * 60
+    subscription_l1_cache_ttl: float = 30
+    subscription_refresh_interval: float = 60
+    subscription_active_user_window: float = 15 * 60
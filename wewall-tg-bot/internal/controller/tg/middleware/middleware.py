@@ -14,10 +14,11 @@ class TgMiddleware(interface.ITelegramMiddleware):
             tel: interface.ITelemetry,
             bot: Bot,
             state_service: interface.IStateService,
+            subscription_service: interface.ISubscriptionService,
+            offer_prefetcher: interface.IOfferPrefetcher,
             estate_expert_client: interface.IWewallEstateExpertClient,
             chat_client: interface.IWewallChatClient,
             wewall_expert_inline_keyboard_generator: interface.IWewallExpertInlineKeyboardGenerator,
-            wewall_tg_channel_login: str,
             amocrm_main_pipeline_id: int,
             amocrm_pipeline_status_high_engagement: int,
             amocrm_pipeline_status_active_user: int,
@@ -28,14 +29,22 @@ class TgMiddleware(interface.ITelegramMiddleware):
 
         self.bot = bot
         self.state_service = state_service
+        self.subscription_service = subscription_service
+        self.offer_prefetcher = offer_prefetcher
         self.estate_expert_client = estate_expert_client
         self.chat_client = chat_client
         self.wewall_expert_inline_keyboard_generator = wewall_expert_inline_keyboard_generator
-        self.wewall_tg_channel_login = wewall_tg_channel_login
         self.amocrm_main_pipeline_id = amocrm_main_pipeline_id
         self.amocrm_pipeline_status_high_engagement = amocrm_pipeline_status_high_engagement
         self.amocrm_pipeline_status_active_user = amocrm_pipeline_status_active_user
 
+        self.known_callback_data = {
+            callback_data
+            for callback_data_class in (common.EstateSearchKeyboardCallbackData, common.WewallExpertKeyboardCallbackData)
+            for name, callback_data in vars(callback_data_class).items()
+            if not name.startswith("_") and name != "PREFIX"
+        }
+
         self.ok_message_counter = self.meter.create_counter(
             name=common.OK_MESSAGE_TOTAL_METRIC,
             description="Total count of 200 messages",
@@ -49,373 +58,225 @@ class TgMiddleware(interface.ITelegramMiddleware):
         )
 
         self.message_duration = self.meter.create_histogram(
-            name=common.REQUEST_DURATION_METRIC,
+            name=common.MESSAGE_DURATION_METRIC,
             description="Message duration in seconds",
             unit="s"
         )
 
         self.active_messages = self.meter.create_up_down_counter(
-            name=common.ACTIVE_REQUESTS_METRIC,
+            name=common.ACTIVE_MESSAGES_METRIC,
             description="Number of active messages",
             unit="1"
         )
 
-    async def trace_middleware01(
+    async def update_middleware(
             self,
             handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
             event: Update,
             data: dict[str, Any]
     ):
-        message = event.message if event.message is not None else event.callback_query.message
-        event_type = "message" if event.message is not None else "callback_query"
-        message_id = message.message_id
-        if event_type == "message":
-            user_username = message.from_user.username
-        else:
-            user_username = event.callback_query.from_user.username
-        tg_chat_id = message.chat.id
-        if message.text is not None:
-            message_text = message.text
-        else:
-            message_text = "Изображение"
-        callback_query_data = event.callback_query.data if event.callback_query is not None else ""
+        # Поля апдейта разбираются один раз, из них же строятся спан, метрики и логи
+        ctx = self.__update_context(event)
+        event_name = "message" if ctx.event_type == "message" else "callback"
 
         with self.tracer.start_as_current_span(
-                "TgMiddleware.trace_middleware01",
+                "TgMiddleware.update_middleware",
                 kind=SpanKind.INTERNAL,
                 attributes={
-                    common.TELEGRAM_EVENT_TYPE_KEY: event_type,
-                    common.TELEGRAM_CHAT_ID_KEY: tg_chat_id,
-                    common.TELEGRAM_USER_USERNAME_KEY: user_username,
-                    common.TELEGRAM_USER_MESSAGE_KEY: message_text,
-                    common.TELEGRAM_MESSAGE_ID_KEY: message_id,
-                    common.TELEGRAM_CALLBACK_QUERY_DATA_KEY: callback_query_data,
+                    common.TELEGRAM_EVENT_TYPE_KEY: ctx.event_type,
+                    common.TELEGRAM_CHAT_ID_KEY: ctx.tg_chat_id,
+                    common.TELEGRAM_USER_USERNAME_KEY: ctx.user_username,
+                    common.TELEGRAM_USER_MESSAGE_KEY: ctx.message_text,
+                    common.TELEGRAM_MESSAGE_ID_KEY: ctx.message_id,
+                    common.TELEGRAM_CALLBACK_QUERY_DATA_KEY: ctx.callback_query_data,
                 }
         ) as root_span:
             span_ctx = root_span.get_span_context()
-            trace_id = format(span_ctx.trace_id, '032x')
-            span_id = format(span_ctx.span_id, '016x')
-
-            data["trace_id"] = trace_id
-            data["span_id"] = span_id
-            try:
-                await handler(event, data)
-
-                root_span.set_status(Status(StatusCode.OK))
-            except TelegramBadRequest:
-                pass
-            except Exception as error:
-                await message.answer("Непредвиденная ошибка на сервере")
-                root_span.record_exception(error)
-                root_span.set_status(Status(StatusCode.ERROR, str(error)))
+            extra_log: dict = {
+                common.TELEGRAM_EVENT_TYPE_KEY: ctx.event_type,
+                common.TELEGRAM_CHAT_ID_KEY: ctx.tg_chat_id,
+                common.TELEGRAM_USER_USERNAME_KEY: ctx.user_username,
+                common.TELEGRAM_USER_MESSAGE_KEY: ctx.message_text,
+                common.TELEGRAM_MESSAGE_ID_KEY: ctx.message_id,
+                common.TELEGRAM_CALLBACK_QUERY_DATA_KEY: ctx.callback_query_data,
+                common.TRACE_ID_KEY: format(span_ctx.trace_id, '032x'),
+                common.SPAN_ID_KEY: format(span_ctx.span_id, '016x'),
+            }
 
-    async def metric_middleware02(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ):
-        with self.tracer.start_as_current_span(
-                "TgMiddleware.metric_middleware02",
-                kind=SpanKind.INTERNAL
-        ) as span:
             start_time = time.time()
             self.active_messages.add(1)
+            self.logger.info(f"Начали обработку telegram {event_name}", extra_log)
 
-            message = event.message if event.message is not None else event.callback_query.message
-            event_type = "message" if event.message is not None else "callback_query"
-            message_id = message.message_id
-            if event_type == "message":
-                user_username = message.from_user.username
-            else:
-                user_username = event.callback_query.from_user.username
-            tg_chat_id = message.chat.id
-            if message.text is not None:
-                message_text = message.text
-            else:
-                message_text = "Изображение"
-            callback_query_data = event.callback_query.data if event.callback_query is not None else ""
-            trace_id = data["trace_id"]
-            span_id = data["span_id"]
-
-            request_attrs: dict = {
-                common.TELEGRAM_EVENT_TYPE_KEY: event_type,
-                common.TELEGRAM_CHAT_ID_KEY: tg_chat_id,
-                common.TELEGRAM_USER_USERNAME_KEY: user_username,
-                common.TELEGRAM_USER_MESSAGE_KEY: message_text,
-                common.TELEGRAM_MESSAGE_ID_KEY: message_id,
-                common.TELEGRAM_CALLBACK_QUERY_DATA_KEY: callback_query_data,
-                common.TRACE_ID_KEY: trace_id,
-                common.SPAN_ID_KEY: span_id,
-            }
-
+            outcome = "ok"
             try:
-                await handler(event, data)
-
-                duration_seconds = time.time() - start_time
+                await self.__process(handler, event, data, ctx)
 
-                request_attrs[common.HTTP_REQUEST_DURATION_KEY] = duration_seconds
-
-                self.ok_message_counter.add(1, attributes=request_attrs)
-                self.message_duration.record(duration_seconds, attributes=request_attrs)
-                span.set_status(Status(StatusCode.OK))
+                root_span.set_status(Status(StatusCode.OK))
+            except TelegramForbiddenError:
+                outcome = "forbidden"
+                self.logger.warning("Пользователь заблокировал бота", extra_log)
             except TelegramBadRequest:
-                pass
+                outcome = "bad_request"
             except Exception as err:
-                duration_seconds = time.time() - start_time
-                request_attrs[common.TELEGRAM_MESSAGE_DURATION_KEY] = 500
-                request_attrs[common.ERROR_KEY] = str(err)
-
-                self.error_message_counter.add(1, attributes=request_attrs)
-                self.message_duration.record(duration_seconds, attributes=request_attrs)
+                outcome = "error"
+                self.logger.error(f"Ошибка обработки telegram {event_name}: {str(err)}", {
+                    **extra_log,
+                    common.TELEGRAM_MESSAGE_DURATION_KEY: int((time.time() - start_time) * 1000),
+                })
+                root_span.record_exception(err)
+                root_span.set_status(Status(StatusCode.ERROR, str(err)))
 
-                span.record_exception(err)
-                span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise err
+                await ctx.message.answer("Непредвиденная ошибка на сервере")
             finally:
                 self.active_messages.add(-1)
+                self.__record_metrics(ctx, outcome, time.time() - start_time)
+
+            if outcome == "ok":
+                self.logger.info(f"Завершили обработку telegram {event_name}", {
+                    **extra_log,
+                    common.TELEGRAM_MESSAGE_DURATION_KEY: int((time.time() - start_time) * 1000),
+                })
 
-    async def logger_middleware03(
+    async def __process(
             self,
             handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
             event: Update,
-            data: dict[str, Any]
+            data: dict[str, Any],
+            ctx: model.TgUpdateContext
     ):
-        with self.tracer.start_as_current_span(
-                "TgMiddleware.logger_middleware03",
-                kind=SpanKind.INTERNAL
-        ) as span:
-            start_time = time.time()
+        if ctx.callback_query_data == common.WewallExpertKeyboardCallbackData.check_subscribe:
+            # Пользователь только что нажал "Я подписался", закешированный ответ тут неактуален
+            await self.subscription_service.invalidate(ctx.tg_chat_id)
 
-            message = event.message if event.message is not None else event.callback_query.message
-            event_type = "message" if event.message is not None else "callback_query"
-            message_id = message.message_id
-            if event_type == "message":
-                user_username = message.from_user.username
-            else:
-                user_username = event.callback_query.from_user.username
-            tg_chat_id = message.chat.id
-            if message.text is not None:
-                message_text = message.text
-            else:
-                message_text = "Изображение"
-            callback_query_data = event.callback_query.data if event.callback_query is not None else ""
-            trace_id = data["trace_id"]
-            span_id = data["span_id"]
+        subscribe = await self.subscription_service.is_subscribed(ctx.tg_chat_id)
+        if not subscribe:
+            self.logger.info("Пользователь не подписан на тг канал")
 
-            extra_log: dict = {
-                common.TELEGRAM_EVENT_TYPE_KEY: event_type,
-                common.TELEGRAM_CHAT_ID_KEY: tg_chat_id,
-                common.TELEGRAM_USER_USERNAME_KEY: user_username,
-                common.TELEGRAM_USER_MESSAGE_KEY: message_text,
-                common.TELEGRAM_MESSAGE_ID_KEY: message_id,
-                common.TELEGRAM_CALLBACK_QUERY_DATA_KEY: callback_query_data,
-                common.TRACE_ID_KEY: trace_id,
-                common.SPAN_ID_KEY: span_id,
-            }
-            try:
-                if event_type == "message":
-                    self.logger.info("Начали обработку telegram message", extra_log)
-                if event_type == "callback_query":
-                    self.logger.info("Начали обработку telegram callback", extra_log)
+            if event.callback_query is not None:
+                await event.callback_query.answer()
 
-                del data["trace_id"], data["span_id"]
-                await handler(event, data)
+            keyboard = await self.wewall_expert_inline_keyboard_generator.check_subscribe()
+            await ctx.message.answer(common.not_subscribe_text, reply_markup=keyboard)
+            return
 
-                extra_log = {
-                    **extra_log,
-                    common.TELEGRAM_MESSAGE_DURATION_KEY: int((time.time() - start_time) * 1000),
-                }
-                if event_type == "message":
-                    self.logger.info("Завершили обработку telegram message", extra_log)
-                elif event_type == "callback_query":
-                    self.logger.info("Завершили обработку telegram callback", extra_log)
+        if ctx.callback_query_data == common.WewallExpertKeyboardCallbackData.check_subscribe:
+            await self.__on_subscribe(event, ctx)
+            return
 
-                span.set_status(Status(StatusCode.OK))
-            except TelegramBadRequest:
-                pass
-            except Exception as err:
-                extra_log = {
-                    **extra_log,
-                    common.TELEGRAM_MESSAGE_DURATION_KEY: int((time.time() - start_time) * 1000),
-                }
-                if event_type == "message":
-                    self.logger.error(f"Ошибка обработки telegram message: {str(err)}", extra_log)
-                elif event_type == "callback_query":
-                    self.logger.error(f"Ошибка обработки telegram callback: {str(err)}", extra_log)
-                span.record_exception(err)
-                span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise err
-
-    async def check_subscribe_middleware04(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ):
-        with self.tracer.start_as_current_span(
-                "TgMiddleware.check_subscribe_middleware04",
-                kind=SpanKind.INTERNAL
-        ) as span:
-            try:
-                message = event.message if event.message is not None else event.callback_query.message
-                tg_chat_id = message.chat.id
-                subscribe = await self.__check_wewall_channel_subscribe(tg_chat_id)
-                if not subscribe:
-                    self.logger.info("Пользователь не подписан на тг канал")
-
-                    if event.callback_query is not None:
-                        await event.callback_query.answer()
-
-                    keyboard = await self.wewall_expert_inline_keyboard_generator.check_subscribe()
-                    await message.answer(common.not_subscribe_text, reply_markup=keyboard)
-                else:
-                    if event.callback_query is not None and event.callback_query.data == common.WewallExpertKeyboardCallbackData.check_subscribe:
-                        self.logger.info("Пользователь подписался на тг канал")
-
-                        tg_chat_id = message.chat.id
-                        await self.state_service.delete_state_by_tg_chat_id(tg_chat_id)
-                        state_id = await self.state_service.create_state(tg_chat_id)
-
-                        username = event.callback_query.from_user.username if event.callback_query.from_user.username is not None else ""
-                        first_name = event.callback_query.from_user.first_name if event.callback_query.from_user.first_name is not None else ""
-                        last_name = event.callback_query.from_user.last_name if event.callback_query.from_user.last_name is not None else ""
-                        await self.chat_client.create_chat_with_amocrm_manager(
-                            self.amocrm_main_pipeline_id,
-                            message.chat.id,
-                            username,
-                            first_name,
-                            last_name,
-                        )
-
-                        llm_response = await self.estate_expert_client.send_message_to_wewall_expert(
-                            tg_chat_id,
-                            "Расскажи мне про WEWALL"
-                        )
-                        await self.state_service.change_status(state_id, common.StateStatuses.wewall_expert)
-
-                        keyboard = await self.wewall_expert_inline_keyboard_generator.start()
-                        await event.callback_query.message.answer(llm_response, reply_markup=keyboard)
-                        await event.callback_query.answer()
-                    else:
-                        await handler(event, data)
-                span.set_status(Status(StatusCode.OK))
-            except TelegramForbiddenError:
-                self.logger.warning("Пользователь заблокировал бота")
-                return
+        ctx.state = await self.__load_state(ctx)
+        data["user_state"] = ctx.state
 
-            except Exception as err:
-                span.record_exception(err)
-                span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise err
+        if ctx.state.status != common.StateStatuses.estate_search:
+            # Из поиска можно уйти не только через его сервисы, заготовки офферов больше не нужны
+            self.offer_prefetcher.cancel(ctx.tg_chat_id)
 
-    async def __check_wewall_channel_subscribe(self, tg_user_id: int) -> bool:
-        user_channel_status = await self.bot.get_chat_member(chat_id=self.wewall_tg_channel_login, user_id=tg_user_id)
+        if event.message is not None:
+            await self.chat_client.send_message_to_amocrm(ctx.tg_chat_id, event.message.text)
 
-        if user_channel_status.status != 'left':
-            return True
-        else:
-            return False
+        await handler(event, data)
 
-    async def get_state_middleware05(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ):
-        with self.tracer.start_as_current_span(
-                "TgMiddleware.get_state_middleware05",
-                kind=SpanKind.INTERNAL
-        ) as span:
-            try:
-                message = event.message if event.message is not None else event.callback_query.message
-                event_type = "message" if event.message is not None else "callback_query"
-                if event_type == "message":
-                    username = message.from_user.username if message.from_user.username is not None else ""
-                    first_name = message.from_user.first_name if message.from_user.first_name is not None else ""
-                    last_name = message.from_user.last_name if message.from_user.last_name is not None else ""
-                else:
-                    username = event.callback_query.from_user.username if event.callback_query.from_user.username is not None else ""
-                    first_name = event.callback_query.from_user.first_name if event.callback_query.from_user.first_name is not None else ""
-                    last_name = event.callback_query.from_user.last_name if event.callback_query.from_user.last_name is not None else ""
-
-
-                tg_chat_id = message.chat.id
-
-                state = await self.state_service.state_by_id(tg_chat_id)
-                if not state:
-                    await self.state_service.create_state(tg_chat_id)
-                    state = await self.state_service.state_by_id(tg_chat_id)
-                    await self.state_service.change_status(state[0].id, common.StateStatuses.wewall_expert)
-                    state[0].status = common.StateStatuses.wewall_expert
-
-                    await self.chat_client.create_chat_with_amocrm_manager(
-                        self.amocrm_main_pipeline_id,
-                        message.chat.id,
-                        username,
-                        first_name,
-                        last_name,
-                    )
-
-                state = state[0]
-                data["user_state"] = state
-                await handler(event, data)
-
-                span.set_status(Status(StatusCode.OK))
-            except Exception as err:
-                span.record_exception(err)
-                span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise err
+    async def __on_subscribe(self, event: Update, ctx: model.TgUpdateContext):
+        self.logger.info("Пользователь подписался на тг канал")
 
-    async def count_message_middleware06(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ):
-        with self.tracer.start_as_current_span(
-                "TgMiddleware.count_message_middleware06",
-                kind=SpanKind.INTERNAL
-        ) as span:
-            try:
-                state: model.State = data["user_state"]
-
-                if event.message is not None:
-                    if not state.is_transferred_to_manager:
-                        if state.count_message == 20 - 1:
-                            self.logger.info("Счетчик сообщений сигнализирует о 'Высокой вовлеченности'")
-                            await self.chat_client.edit_lead(event.message.chat.id, self.amocrm_main_pipeline_id,
-                                                             self.amocrm_pipeline_status_high_engagement)
-                        elif state.count_message == 60 - 1:
-                            self.logger.info("Счетчик сообщений сигнализирует о 'Активном пользователе'")
-                            await self.chat_client.edit_lead(event.message.chat.id, self.amocrm_main_pipeline_id,
-                                                             self.amocrm_pipeline_status_active_user)
-                        await self.state_service.increment_message_count(state.id)
-                        self.logger.debug("Инкрементировали счетчик сообщений")
-
-                await handler(event, data)
-                span.set_status(Status(StatusCode.OK))
-            except Exception as err:
-                span.record_exception(err)
-                span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise err
-
-    async def send_contact_message_to_amocrm_middleware07(
-             self,
-             handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-             event: Update,
-             data: dict[str, Any]
-    ):
-        with self.tracer.start_as_current_span(
-                "TgMiddleware.send_contact_message_to_amocrm_middleware07",
-                kind=SpanKind.INTERNAL
-        ) as span:
-            try:
-                if event.message is not None:
-                    await self.chat_client.send_message_to_amocrm(event.message.chat.id, event.message.text)
-                await handler(event, data)
-                span.set_status(Status(StatusCode.OK))
-            except Exception as err:
-                span.record_exception(err)
-                span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise err
\ No newline at end of file
+        await self.state_service.delete_state_by_tg_chat_id(ctx.tg_chat_id)
+        state_id = await self.state_service.create_state(ctx.tg_chat_id)
+
+        await self.chat_client.create_chat_with_amocrm_manager(
+            self.amocrm_main_pipeline_id,
+            ctx.tg_chat_id,
+            ctx.user_username,
+            ctx.user_first_name,
+            ctx.user_last_name,
+        )
+
+        llm_response = await self.estate_expert_client.send_message_to_wewall_expert(
+            ctx.tg_chat_id,
+            "Расскажи мне про WEWALL"
+        )
+        await self.state_service.change_status(state_id, common.StateStatuses.wewall_expert)
+
+        keyboard = await self.wewall_expert_inline_keyboard_generator.start()
+        await event.callback_query.message.answer(llm_response, reply_markup=keyboard)
+        await event.callback_query.answer()
+
+    async def __load_state(self, ctx: model.TgUpdateContext) -> model.State:
+        # Чтение, создание и счетчик сообщений одним запросом вместо отдельных походов в БД
+        count_message = ctx.event_type == "message"
+        state, is_created = await self.state_service.state_for_update(
+            ctx.tg_chat_id,
+            common.StateStatuses.wewall_expert,
+            count_message
+        )
+
+        if is_created:
+            await self.chat_client.create_chat_with_amocrm_manager(
+                self.amocrm_main_pipeline_id,
+                ctx.tg_chat_id,
+                ctx.user_username,
+                ctx.user_first_name,
+                ctx.user_last_name,
+            )
+
+        if count_message and not state.is_transferred_to_manager:
+            if state.count_message == 20:
+                self.logger.info("Счетчик сообщений сигнализирует о 'Высокой вовлеченности'")
+                await self.chat_client.edit_lead(ctx.tg_chat_id, self.amocrm_main_pipeline_id,
+                                                 self.amocrm_pipeline_status_high_engagement)
+            elif state.count_message == 60:
+                self.logger.info("Счетчик сообщений сигнализирует о 'Активном пользователе'")
+                await self.chat_client.edit_lead(ctx.tg_chat_id, self.amocrm_main_pipeline_id,
+                                                 self.amocrm_pipeline_status_active_user)
+
+        return state
+
+    def __record_metrics(self, ctx: model.TgUpdateContext, outcome: str, duration_seconds: float):
+        # В метрики идут только метки с ограниченным набором значений: чат, пользователь и текст
+        # остаются в спанах и логах, а trace_id попадает в exemplars
+        metric_attrs = {
+            common.TELEGRAM_EVENT_TYPE_KEY: ctx.event_type,
+            common.TELEGRAM_HANDLER_KEY: ctx.handler_name,
+            common.STATE_STATUS_KEY: ctx.state.status if ctx.state is not None and ctx.state.status else "unknown",
+            common.OUTCOME_KEY: outcome,
+        }
+
+        if outcome == "ok":
+            self.ok_message_counter.add(1, attributes=metric_attrs)
+        else:
+            self.error_message_counter.add(1, attributes=metric_attrs)
+        self.message_duration.record(duration_seconds, attributes=metric_attrs)
+
+    def __update_context(self, event: Update) -> model.TgUpdateContext:
+        if event.message is not None:
+            event_type = "message"
+            message = event.message
+            user = message.from_user
+            callback_query_data = ""
+        else:
+            event_type = "callback_query"
+            message = event.callback_query.message
+            user = event.callback_query.from_user
+            callback_query_data = event.callback_query.data or ""
+
+        return model.TgUpdateContext(
+            event_type=event_type,
+            handler_name=self.__handler_name(message.text, callback_query_data, event_type),
+            message=message,
+            message_id=message.message_id,
+            message_text=message.text if message.text is not None else "Изображение",
+            callback_query_data=callback_query_data,
+            tg_chat_id=message.chat.id,
+            user_username=user.username if user.username is not None else "",
+            user_first_name=user.first_name if user.first_name is not None else "",
+            user_last_name=user.last_name if user.last_name is not None else "",
+        )
+
+    def __handler_name(self, text: str | None, callback_query_data: str, event_type: str) -> str:
+        if event_type == "callback_query":
+            # В callback data после действия идет id объекта, он в метку не попадает
+            callback_data = ":".join(callback_query_data.split(":")[:2])
+            return callback_data if callback_data in self.known_callback_data else "callback_query"
+        if text is None:
+            return "media"
+        if text.startswith("/"):
+            return "command"
+        return "text"
@@ -4,9 +4,12 @@ from internal.interface.estate_expert import *
 from internal.interface.estate_finance_model import *
 from internal.interface.estate_search import *
 from internal.interface.state import *
+from internal.interface.subscription import *
 from internal.interface.user import *
 from internal.interface.wewall_expert import *
 from internal.interface.post_short_link import *
+from internal.interface.report import *
+from internal.interface.finance_model_cache import *
 from internal.interface.general import *
 from internal.interface.client.estate_search import *
 from internal.interface.client.estate_calculator import *
@@ -31,6 +31,18 @@ class IWewallEstateCalculatorClient(Protocol):
             nds_rate: int,
     ) -> BufferedInputFile: pass
 
+    @abstractmethod
+    async def calc_finance_model_finished_office_bundle(
+            self,
+            square: float,
+            price_per_meter: float,
+            need_repairs: int,
+            estate_category: str,
+            metro_station_name: str,
+            distance_to_metro: float,
+            nds_rate: int,
+    ) -> tuple[model.FinanceModelResponse, bytes]: pass
+
     @abstractmethod
     async def calc_finance_model_finished_retail(
             self,
@@ -77,6 +89,19 @@ class IWewallEstateCalculatorClient(Protocol):
             transaction_dict: dict,
     ) -> BufferedInputFile: pass
 
+    @abstractmethod
+    async def calc_finance_model_building_office_bundle(
+            self,
+            project_readiness: str,
+            square: float,
+            metro_station_name: str,
+            distance_to_metro: float,
+            estate_category: str,
+            price_per_meter: float,
+            nds_rate: int,
+            transaction_dict: dict,
+    ) -> tuple[model.FinanceModelResponse, bytes]: pass
+
     @abstractmethod
     async def calc_finance_model_building_retail(
             self,
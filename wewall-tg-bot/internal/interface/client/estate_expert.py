@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Protocol
+from typing import Protocol, AsyncIterator
 
 class IWewallEstateExpertClient(Protocol):
 
@@ -9,6 +9,9 @@ class IWewallEstateExpertClient(Protocol):
     @abstractmethod
     async def send_message_to_estate_expert(self, tg_chat_id: int, text: str) -> str: pass
 
+    @abstractmethod
+    def stream_message_to_estate_expert(self, tg_chat_id: int, text: str) -> AsyncIterator[str]: pass
+
     @abstractmethod
     async def send_message_to_estate_search_expert(self, tg_chat_id: int, text: str) -> str: pass
 
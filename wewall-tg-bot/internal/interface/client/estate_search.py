@@ -30,4 +30,6 @@ class IWewallEstateSearchClient(Protocol):
             design: int,
             readiness: int,
             irr: float,
-    ) -> model.FindSaleOfferResponse: pass
\ No newline at end of file
+    ) -> model.FindSaleOfferResponse: pass
+    @abstractmethod
+    async def offers_by_ids(self, offer_type: str, offer_ids: list[int]) -> list[model.SaleOffer | model.RentOffer]: pass
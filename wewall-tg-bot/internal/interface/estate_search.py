@@ -13,7 +13,8 @@ class IEstateSearchCallbackController(Protocol):
 
 class IEstateSearchStateRepo(Protocol):
     @abstractmethod
-    async def create_estate_search_state(self, state_id: int, offers: list[model.SaleOffer | model.RentOffer],
+    async def create_estate_search_state(self, state_id: int, offer_type: str,
+                                         offers: list[model.SaleOffer | model.RentOffer],
                                          estate_search_params: dict) -> int:
         pass
 
@@ -59,3 +60,16 @@ class IEstateSearchInlineKeyboardGenerator(Protocol):
 
     @abstractmethod
     async def last_offer(self, current_offer_id: int) -> InlineKeyboardMarkup: pass
+
+
+class IOfferPrefetcher(Protocol):
+    @abstractmethod
+    def prefetch(self, tg_chat_id: int, state_estate_search: model.EstateSearchState, shown_offer_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def image_urls(self, tg_chat_id: int, offer_id: int, offer: model.SaleOffer | model.RentOffer) -> list[str]:
+        pass
+
+    @abstractmethod
+    def cancel(self, tg_chat_id: int) -> None: pass
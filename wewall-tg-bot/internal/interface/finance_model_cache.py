@@ -0,0 +1,31 @@
+from abc import abstractmethod
+from typing import Protocol
+
+from internal import model
+
+
+class IFinanceModelCache(Protocol):
+    @abstractmethod
+    async def finished_office_bundle(
+            self,
+            square: float,
+            price_per_meter: float,
+            need_repairs: int,
+            estate_category: str,
+            metro_station_name: str,
+            distance_to_metro: float,
+            nds_rate: int,
+    ) -> model.FinanceModelBundle: pass
+
+    @abstractmethod
+    async def building_office_bundle(
+            self,
+            project_readiness: str,
+            square: float,
+            metro_station_name: str,
+            distance_to_metro: float,
+            estate_category: str,
+            price_per_meter: float,
+            nds_rate: int,
+            transaction_dict: dict,
+    ) -> model.FinanceModelBundle: pass
@@ -41,57 +41,17 @@ class IStatisticWorker(Protocol):
     async def collect_monthly_stats(self): pass
 
 
-class ITelegramMiddleware(Protocol):
+class IStateFlushWorker(Protocol):
     @abstractmethod
-    async def trace_middleware01(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ): pass
+    async def flush_counters(self): pass
 
     @abstractmethod
-    async def metric_middleware02(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ): pass
+    async def flush_all_counters(self): pass
 
-    @abstractmethod
-    async def logger_middleware03(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ): pass
-
-    @abstractmethod
-    async def check_subscribe_middleware04(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ): pass
-
-    @abstractmethod
-    async def get_state_middleware05(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ): pass
-
-    @abstractmethod
-    async def count_message_middleware06(
-            self,
-            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
-            event: Update,
-            data: dict[str, Any]
-    ): pass
 
+class ITelegramMiddleware(Protocol):
     @abstractmethod
-    async def send_contact_message_to_amocrm_middleware07(
+    async def update_middleware(
             self,
             handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
             event: Update,
@@ -184,6 +144,15 @@ class IRedis(Protocol):
     @abstractmethod
     async def get(self, key: str, default: Any = None) -> Any: pass
 
+    @abstractmethod
+    async def delete(self, key: str) -> int: pass
+
+    @abstractmethod
+    async def hgetall(self, key: str) -> dict: pass
+
+    @abstractmethod
+    async def pipeline(self, transaction: bool = True) -> Any: pass
+
 
 class IDB(Protocol):
     @abstractmethod
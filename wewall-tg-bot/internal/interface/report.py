@@ -0,0 +1,13 @@
+from abc import abstractmethod
+from typing import Protocol
+
+
+class IReportRenderer(Protocol):
+    @abstractmethod
+    async def start(self) -> None: pass
+
+    @abstractmethod
+    async def render_finance_report(self, rent_page: dict, purchase_page: dict | None) -> bytes: pass
+
+    @abstractmethod
+    def close(self) -> None: pass
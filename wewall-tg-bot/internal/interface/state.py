@@ -12,6 +12,9 @@ class IStateService(Protocol):
     @abstractmethod
     async def state_by_id(self, tg_chat_id: int) -> list[model.State]: pass
 
+    @abstractmethod
+    async def state_for_update(self, tg_chat_id: int, status: str, count_message: bool) -> tuple[model.State, bool]: pass
+
     @abstractmethod
     async def increment_message_count(self, state_id: int) -> None: pass
 
@@ -33,6 +36,9 @@ class IStateRepo(Protocol):
     @abstractmethod
     async def state_by_id(self, tg_chat_id: int) -> list[model.State]: pass
 
+    @abstractmethod
+    async def state_for_update(self, tg_chat_id: int, status: str, count_message: bool) -> tuple[model.State, bool]: pass
+
     @abstractmethod
     async def increment_message_count(self, state_id: int) -> None: pass
 
@@ -50,3 +56,12 @@ class IStateRepo(Protocol):
 
     @abstractmethod
     async def delete_state_by_tg_chat_id(self, tg_chat_id: int) -> None: pass
+
+    @abstractmethod
+    async def apply_counter_deltas(self, deltas: list[model.StateCounterDelta]) -> None: pass
+
+
+class IStateCacheRepo(IStateRepo, Protocol):
+
+    @abstractmethod
+    async def flush_counters(self, batch_size: int) -> int: pass
@@ -0,0 +1,13 @@
+from abc import abstractmethod
+from typing import Protocol
+
+
+class ISubscriptionService(Protocol):
+    @abstractmethod
+    async def is_subscribed(self, tg_user_id: int) -> bool: pass
+
+    @abstractmethod
+    async def invalidate(self, tg_user_id: int) -> None: pass
+
+    @abstractmethod
+    async def refresh_active_subscriptions(self): pass
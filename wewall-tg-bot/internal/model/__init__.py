@@ -1,5 +1,6 @@
 from internal.model.sql_model import *
 from internal.model.state import *
+from internal.model.tg_update import *
 from internal.model.user import *
 from internal.model.post_short_link import *
 from internal.model.client.estate_calculator import *
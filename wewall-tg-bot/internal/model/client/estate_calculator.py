@@ -30,4 +30,11 @@ class FinanceModelResponse:
             "added_value": self.added_value,
             "rent_irr": self.rent_irr,
             "sale_irr": self.sale_irr,
-        }
\ No newline at end of file
+        }
+
+
+@dataclass
+class FinanceModelBundle:
+    finance_model: FinanceModelResponse
+    xlsx: bytes
+    pdf: bytes
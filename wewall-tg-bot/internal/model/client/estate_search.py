@@ -33,6 +33,7 @@ class MetroStation:
 
 @dataclass
 class Offer:
+    id: int
     estate_id: int
     estate_name: str
     estate_category: str
@@ -52,6 +53,7 @@ class Offer:
     description: str
 
     def __init__(self, offer_dict: dict):
+        self.id = offer_dict["id"]
         self.estate_id = offer_dict["estate_id"]
         self.estate_name = offer_dict["estate_name"]
         self.estate_category = offer_dict["estate_category"]
@@ -82,6 +84,7 @@ class SaleOffer(Offer):
 
     def to_dict(self) -> dict:
         return {
+            "id": self.id,
             "estate_id": self.estate_id,
             "estate_name": self.estate_name,
             "estate_category": self.estate_category,
@@ -113,6 +116,7 @@ class RentOffer(Offer):
 
     def to_dict(self) -> dict:
         return {
+            "id": self.id,
             "estate_id": self.estate_id,
             "estate_name": self.estate_name,
             "estate_category": self.estate_category,
@@ -54,14 +54,25 @@ CREATE TABLE IF NOT EXISTS estate_search_states (
     current_estate_id INTEGER DEFAULT 0,
     current_offer_id INTEGER DEFAULT 0,
     
-    offers JSONB[] NOT NULL,
+    offer_type TEXT NOT NULL,
+    offer_ids INTEGER[] NOT NULL,
+    offer_estate_ids INTEGER[] NOT NULL,
     estate_search_params jsonb NOT NULL,
     
+    expires_at TIMESTAMP NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 )
 """
 
+create_estate_search_state_index = """
+CREATE INDEX IF NOT EXISTS estate_search_states_state_id_idx ON estate_search_states (state_id);
+"""
+
+create_estate_search_state_expires_at_index = """
+CREATE INDEX IF NOT EXISTS estate_search_states_expires_at_idx ON estate_search_states (expires_at);
+"""
+
 on_update_table_query1 = """
 CREATE OR REPLACE FUNCTION update_updated_at()
 RETURNS TRIGGER AS $$
@@ -99,6 +110,10 @@ DROP TABLE IF EXISTS estate_search_states;
 """
 
 
-create_queries = [create_state_table, create_user_table, create_post_short_link_table, create_estate_search_state_table, on_update_table_query1,
+create_queries = [create_state_table, create_user_table, create_post_short_link_table, create_estate_search_state_table,
+                  create_estate_search_state_index, create_estate_search_state_expires_at_index, on_update_table_query1,
                   on_update_table_query2, on_update_table_query3]
 drop_queries = [drop_state_table, drop_state_table, drop_estate_search_state_table]
+# Сессии поиска короткоживущие, старую таблицу с JSON офферов пересоздаем без переноса данных
+migrate_queries = [drop_estate_search_state_table, create_estate_search_state_table, create_estate_search_state_index,
+                   create_estate_search_state_expires_at_index]
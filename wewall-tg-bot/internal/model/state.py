@@ -1,8 +1,6 @@
 from datetime import datetime
 from dataclasses import dataclass
 
-from internal.model.client.estate_search import SaleOffer, RentOffer
-
 
 @dataclass
 class State:
@@ -36,6 +34,15 @@ class State:
         ]
 
 
+@dataclass
+class StateCounterDelta:
+    state_id: int
+
+    count_message: int = 0
+    count_estate_search: int = 0
+    count_estate_calculator: int = 0
+
+
 @dataclass
 class EstateSearchState:
     id: int
@@ -44,9 +51,13 @@ class EstateSearchState:
     current_estate_id: int
     current_offer_id: int
 
-    offers: list[SaleOffer | RentOffer]
+    # Сами офферы не храним: только их id в порядке показа и номер здания для каждого
+    offer_type: str
+    offer_ids: list[int]
+    offer_estate_ids: list[int]
     estate_search_params: dict
 
+    expires_at: datetime
     created_at: datetime
     updated_at: datetime
 
@@ -58,17 +69,13 @@ class EstateSearchState:
                 state_id=row.state_id,
                 current_estate_id=row.current_estate_id,
                 current_offer_id=row.current_offer_id,
-                offers=[cls.define_offer_strategy(offer) for offer in row.offers],
+                offer_type=row.offer_type,
+                offer_ids=list(row.offer_ids),
+                offer_estate_ids=list(row.offer_estate_ids),
                 estate_search_params=row.estate_search_params,
+                expires_at=row.expires_at,
                 created_at=row.created_at,
                 updated_at=row.updated_at,
             )
             for row in rows
         ]
-
-    @classmethod
-    def define_offer_strategy(cls, offer: dict) -> SaleOffer | RentOffer:
-        if offer.get("price_per_meter") is not None:
-            return SaleOffer(offer)
-        else:
-            return RentOffer(offer)
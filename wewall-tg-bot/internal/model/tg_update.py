@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+from aiogram.types import Message
+
+from internal.model.state import State
+
+
+@dataclass
+class TgUpdateContext:
+    event_type: str
+    handler_name: str
+
+    message: Message
+    message_id: int
+    message_text: str
+    callback_query_data: str
+
+    tg_chat_id: int
+    user_username: str
+    user_first_name: str
+    user_last_name: str
+
+    state: State | None = None
@@ -1,27 +1,40 @@
 create_estate_search_state_query = """
-INSERT INTO estate_search_states (state_id, offers, estate_search_params)
-VALUES (:state_id, :offers, :estate_search_params)
+WITH expired AS (
+    DELETE FROM estate_search_states
+    WHERE expires_at < CURRENT_TIMESTAMP
+)
+INSERT INTO estate_search_states (state_id, offer_type, offer_ids, offer_estate_ids, estate_search_params, expires_at)
+VALUES (
+    :state_id,
+    :offer_type,
+    :offer_ids,
+    :offer_estate_ids,
+    :estate_search_params,
+    CURRENT_TIMESTAMP + CAST(:session_ttl AS INTEGER) * INTERVAL '1 second'
+)
 RETURNING id; 
 """
 
 change_current_offer_by_state_id_query = """
 UPDATE estate_search_states
-SET current_offer_id = :current_offer_id
+SET current_offer_id = :current_offer_id,
+    expires_at = CURRENT_TIMESTAMP + CAST(:session_ttl AS INTEGER) * INTERVAL '1 second'
 WHERE state_id = :state_id;
 """
 
 change_current_estate_by_state_id_query = """
 UPDATE estate_search_states
-SET current_estate_id = :current_estate_id
+SET current_estate_id = :current_estate_id,
+    expires_at = CURRENT_TIMESTAMP + CAST(:session_ttl AS INTEGER) * INTERVAL '1 second'
 WHERE state_id = :state_id;
 """
 
 estate_search_state_by_state_id_query = """
 SELECT * FROM estate_search_states
-WHERE state_id = :state_id;
+WHERE state_id = :state_id AND expires_at > CURRENT_TIMESTAMP;
 """
 
 delete_estate_search_state_by_state_id_query = """
 DELETE FROM estate_search_states
 WHERE state_id = :state_id;
-"""
\ No newline at end of file
+"""
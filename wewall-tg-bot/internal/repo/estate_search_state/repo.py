@@ -6,13 +6,16 @@ from .query import *
 
 
 class EstateSearchStateRepo(interface.IEstateSearchStateRepo):
-    def __init__(self, tel: interface.ITelemetry, db: interface.IDB):
+    def __init__(self, tel: interface.ITelemetry, db: interface.IDB, session_ttl: int = 24 * 60 * 60):
         self.db = db
         self.tracer = tel.tracer()
+        # Сессия продлевается при каждом переходе по подборке, брошенные удаляются при создании новых
+        self.session_ttl = session_ttl
 
     async def create_estate_search_state(
             self,
             state_id: int,
+            offer_type: str,
             offers: list[model.SaleOffer | model.RentOffer],
             estate_search_params: dict
     ) -> int:
@@ -21,15 +24,19 @@ class EstateSearchStateRepo(interface.IEstateSearchStateRepo):
                 kind=SpanKind.INTERNAL,
                 attributes={
                     "state_id": state_id,
-                    "offers": str(offers),
+                    "offer_type": offer_type,
+                    "offers_count": len(offers),
                     "estate_search_params": str(estate_search_params)
                 }
         ) as span:
             try:
                 args = {
                     "state_id": state_id,
-                    "offers": [json.dumps(offer.to_dict(), ensure_ascii=False) for offer in offers],
-                    "estate_search_params": json.dumps(estate_search_params, ensure_ascii=False)
+                    "offer_type": offer_type,
+                    "offer_ids": [offer.id for offer in offers],
+                    "offer_estate_ids": [offer.estate_id for offer in offers],
+                    "estate_search_params": json.dumps(estate_search_params, ensure_ascii=False),
+                    "session_ttl": self.session_ttl,
                 }
                 offer_id = await self.db.insert(create_estate_search_state_query, args)
 
@@ -50,7 +57,7 @@ class EstateSearchStateRepo(interface.IEstateSearchStateRepo):
                 }
         ) as span:
             try:
-                args = {"state_id": state_id, "current_offer_id": current_offer_id}
+                args = {"state_id": state_id, "current_offer_id": current_offer_id, "session_ttl": self.session_ttl}
                 await self.db.update(change_current_offer_by_state_id_query, args)
                 span.set_status(StatusCode.OK)
             except Exception as err:
@@ -68,7 +75,7 @@ class EstateSearchStateRepo(interface.IEstateSearchStateRepo):
                 }
         ) as span:
             try:
-                args = {"state_id": state_id, "current_estate_id": current_estate_id}
+                args = {"state_id": state_id, "current_estate_id": current_estate_id, "session_ttl": self.session_ttl}
                 await self.db.update(change_current_estate_by_state_id_query, args)
                 span.set_status(StatusCode.OK)
             except Exception as err:
@@ -0,0 +1,402 @@
+from datetime import datetime
+
+from opentelemetry.trace import SpanKind, StatusCode
+
+from internal import model, interface, common
+
+COUNTER_FIELDS = ("count_message", "count_estate_search", "count_estate_calculator")
+
+
+class StateCacheRepo(interface.IStateCacheRepo):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            state_repo: interface.IStateRepo,
+            redis: interface.IRedis,
+            state_ttl: int = 60 * 60,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
+
+        self.state_repo = state_repo
+        self.redis = redis
+        self.state_ttl = state_ttl
+
+        self.lookup_counter = self.meter.create_counter(
+            name=common.STATE_CACHE_LOOKUP_TOTAL_METRIC,
+            description="Total count of state cache lookups by result",
+            unit="1"
+        )
+        self.flush_counter = self.meter.create_counter(
+            name=common.STATE_COUNTER_FLUSH_TOTAL_METRIC,
+            description="Total count of state counter deltas flushed to Postgres",
+            unit="1"
+        )
+
+    async def create_state(self, tg_chat_id: int) -> int:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.create_state",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                }
+        ) as span:
+            try:
+                state_id = await self.state_repo.create_state(tg_chat_id)
+                await self.__invalidate(tg_chat_id)
+
+                span.set_status(StatusCode.OK)
+                return state_id
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def state_by_id(self, tg_chat_id: int) -> list[model.State]:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.state_by_id",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                }
+        ) as span:
+            try:
+                state = await self.__cached_state(tg_chat_id)
+                if state is not None:
+                    span.set_status(StatusCode.OK)
+                    return [state]
+
+                states = await self.state_repo.state_by_id(tg_chat_id)
+                if states:
+                    states[0] = await self.__cache_state(states[0])
+
+                span.set_status(StatusCode.OK)
+                return states
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def state_for_update(
+            self,
+            tg_chat_id: int,
+            status: str,
+            count_message: bool
+    ) -> tuple[model.State, bool]:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.state_for_update",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                    "status": status,
+                    "count_message": count_message,
+                }
+        ) as span:
+            try:
+                state = await self.__cached_state(tg_chat_id)
+
+                if state is not None and count_message and not state.is_transferred_to_manager:
+                    try:
+                        # Счетчик растет атомарно в Redis, а в Postgres уходит пачкой из flush_counters
+                        state.count_message = await self.__increment_counter(state.id, "count_message", tg_chat_id)
+                    except Exception as err:
+                        self.logger.warning(f"Не удалось увеличить счетчик сообщений в Redis: {err}")
+                        state = None
+
+                if state is not None:
+                    span.set_attribute("cache_result", "hit")
+                    span.set_status(StatusCode.OK)
+                    return state, False
+
+                state, is_created = await self.state_repo.state_for_update(tg_chat_id, status, count_message)
+                state = await self.__cache_state(state)
+
+                span.set_attribute("cache_result", "miss")
+                span.set_status(StatusCode.OK)
+                return state, is_created
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def increment_message_count(self, state_id: int) -> None:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.increment_message_count",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "state_id": state_id,
+                }
+        ) as span:
+            try:
+                await self.__increment_counter_by_state_id(state_id, "count_message")
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def increment_estate_search_count(self, state_id: int) -> None:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.increment_estate_search_count",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "state_id": state_id,
+                }
+        ) as span:
+            try:
+                await self.__increment_counter_by_state_id(state_id, "count_estate_search")
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def increment_estate_calculator_count(self, state_id: int) -> None:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.increment_estate_calculator_count",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "state_id": state_id,
+                }
+        ) as span:
+            try:
+                await self.__increment_counter_by_state_id(state_id, "count_estate_calculator")
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def change_status(self, state_id: int, status: str) -> None:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.change_status",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "state_id": state_id,
+                    "status": status
+                }
+        ) as span:
+            try:
+                await self.state_repo.change_status(state_id, status)
+                await self.__write_through(state_id, {"status": status})
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def set_is_transferred_to_manager(self, state_id: int, is_transferred_to_manager: bool) -> None:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.set_is_transferred_to_manager",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "state_id": state_id,
+                    "is_transferred_to_manager": is_transferred_to_manager,
+                }
+        ) as span:
+            try:
+                await self.state_repo.set_is_transferred_to_manager(state_id, is_transferred_to_manager)
+                await self.__write_through(state_id, {"is_transferred_to_manager": int(is_transferred_to_manager)})
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def delete_state_by_tg_chat_id(self, tg_chat_id: int) -> None:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.delete_state_by_tg_chat_id",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                }
+        ) as span:
+            try:
+                await self.state_repo.delete_state_by_tg_chat_id(tg_chat_id)
+                await self.__invalidate(tg_chat_id)
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def apply_counter_deltas(self, deltas: list[model.StateCounterDelta]) -> None:
+        await self.state_repo.apply_counter_deltas(deltas)
+
+    async def flush_counters(self, batch_size: int) -> int:
+        with self.tracer.start_as_current_span(
+                "StateCacheRepo.flush_counters",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "batch_size": batch_size,
+                }
+        ) as span:
+            try:
+                pipe = await self.redis.pipeline()
+                pipe.spop(self.__dirty_key(), batch_size)
+                [state_ids] = await pipe.execute()
+                if not state_ids:
+                    span.set_status(StatusCode.OK)
+                    return 0
+
+                # Приращения забираем и обнуляем в одной транзакции, чтобы не потерять параллельные INCR
+                pipe = await self.redis.pipeline()
+                for state_id in state_ids:
+                    pipe.hgetall(self.__delta_key(state_id))
+                    pipe.delete(self.__delta_key(state_id))
+                results = await pipe.execute()
+
+                deltas = [
+                    model.StateCounterDelta(
+                        state_id=int(state_id),
+                        **{field: int(value) for field, value in delta.items()}
+                    )
+                    for state_id, delta in zip(state_ids, results[::2])
+                    if delta
+                ]
+
+                if deltas:
+                    try:
+                        await self.state_repo.apply_counter_deltas(deltas)
+                    except Exception:
+                        await self.__restore_deltas(deltas)
+                        raise
+                    self.flush_counter.add(len(deltas))
+
+                span.set_attribute("flushed", len(deltas))
+                span.set_status(StatusCode.OK)
+                return len(state_ids)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def __cached_state(self, tg_chat_id: int) -> model.State | None:
+        try:
+            state_hash = await self.redis.hgetall(self.__state_key(tg_chat_id))
+        except Exception as err:
+            self.logger.warning(f"Не удалось прочитать состояние из Redis: {err}")
+            state_hash = None
+
+        # Хеш без id мог остаться от записи в уже истекшее состояние, такое считаем промахом
+        if not state_hash or "id" not in state_hash:
+            self.lookup_counter.add(1, {common.CACHE_RESULT_KEY: "miss"})
+            return None
+
+        self.lookup_counter.add(1, {common.CACHE_RESULT_KEY: "hit"})
+        return self.__from_hash(state_hash)
+
+    async def __cache_state(self, state: model.State) -> model.State:
+        try:
+            # В Postgres еще нет приращений, которые ждут сброса, добавляем их к прочитанным счетчикам
+            delta = await self.redis.hgetall(self.__delta_key(state.id))
+            for field, value in delta.items():
+                setattr(state, field, getattr(state, field) + int(value))
+
+            pipe = await self.redis.pipeline()
+            pipe.hset(self.__state_key(state.tg_chat_id), mapping=self.__to_hash(state))
+            pipe.expire(self.__state_key(state.tg_chat_id), self.state_ttl)
+            pipe.set(self.__state_id_key(state.id), state.tg_chat_id, ex=self.state_ttl)
+            await pipe.execute()
+        except Exception as err:
+            self.logger.warning(f"Не удалось сохранить состояние в Redis: {err}")
+
+        return state
+
+    async def __increment_counter(self, state_id: int, field: str, tg_chat_id: int | None) -> int | None:
+        pipe = await self.redis.pipeline()
+        if tg_chat_id is not None:
+            pipe.hincrby(self.__state_key(tg_chat_id), field, 1)
+            pipe.expire(self.__state_key(tg_chat_id), self.state_ttl)
+            # Обратный ключ живет не меньше хеша, иначе запись через state_id не найдет закешированное состояние
+            pipe.set(self.__state_id_key(state_id), tg_chat_id, ex=self.state_ttl)
+        pipe.hincrby(self.__delta_key(state_id), field, 1)
+        pipe.sadd(self.__dirty_key(), state_id)
+        results = await pipe.execute()
+
+        return results[0] if tg_chat_id is not None else None
+
+    async def __increment_counter_by_state_id(self, state_id: int, field: str):
+        try:
+            tg_chat_id = await self.redis.get(self.__state_id_key(state_id))
+            await self.__increment_counter(state_id, field, tg_chat_id)
+        except Exception as err:
+            self.logger.warning(f"Не удалось увеличить счетчик в Redis, пишем в Postgres: {err}")
+            await self.state_repo.apply_counter_deltas([model.StateCounterDelta(state_id=state_id, **{field: 1})])
+
+    async def __write_through(self, state_id: int, fields: dict):
+        try:
+            tg_chat_id = await self.redis.get(self.__state_id_key(state_id))
+            if tg_chat_id is None:
+                return
+
+            pipe = await self.redis.pipeline()
+            pipe.hset(self.__state_key(tg_chat_id), mapping=fields)
+            pipe.expire(self.__state_key(tg_chat_id), self.state_ttl)
+            pipe.set(self.__state_id_key(state_id), tg_chat_id, ex=self.state_ttl)
+            await pipe.execute()
+        except Exception as err:
+            self.logger.error(f"Не удалось обновить состояние в Redis: {err}")
+
+    async def __invalidate(self, tg_chat_id: int):
+        try:
+            await self.redis.delete(self.__state_key(tg_chat_id))
+        except Exception as err:
+            self.logger.error(f"Не удалось удалить состояние из Redis: {err}")
+
+    async def __restore_deltas(self, deltas: list[model.StateCounterDelta]):
+        try:
+            pipe = await self.redis.pipeline()
+            for delta in deltas:
+                for field in COUNTER_FIELDS:
+                    if getattr(delta, field):
+                        pipe.hincrby(self.__delta_key(delta.state_id), field, getattr(delta, field))
+                pipe.sadd(self.__dirty_key(), delta.state_id)
+            await pipe.execute()
+        except Exception as err:
+            self.logger.error(f"Не удалось вернуть несброшенные счетчики в Redis: {err}")
+
+    def __to_hash(self, state: model.State) -> dict:
+        return {
+            "id": state.id,
+            "tg_chat_id": state.tg_chat_id,
+            "status": state.status or "",
+            "is_transferred_to_manager": int(bool(state.is_transferred_to_manager)),
+            "count_estate_search": state.count_estate_search,
+            "count_estate_calculator": state.count_estate_calculator,
+            "count_message": state.count_message,
+            "created_at": state.created_at.isoformat() if state.created_at else "",
+            "updated_at": state.updated_at.isoformat() if state.updated_at else "",
+        }
+
+    def __from_hash(self, state_hash: dict) -> model.State:
+        return model.State(
+            id=int(state_hash["id"]),
+            tg_chat_id=int(state_hash["tg_chat_id"]),
+            status=state_hash.get("status") or None,
+            is_transferred_to_manager=state_hash.get("is_transferred_to_manager") == "1",
+            count_estate_search=int(state_hash.get("count_estate_search", 0)),
+            count_estate_calculator=int(state_hash.get("count_estate_calculator", 0)),
+            count_message=int(state_hash.get("count_message", 0)),
+            created_at=datetime.fromisoformat(state_hash["created_at"]) if state_hash.get("created_at") else None,
+            updated_at=datetime.fromisoformat(state_hash["updated_at"]) if state_hash.get("updated_at") else None,
+        )
+
+    def __state_key(self, tg_chat_id: int) -> str:
+        return f"tg-bot:state:{tg_chat_id}"
+
+    def __state_id_key(self, state_id: int) -> str:
+        return f"tg-bot:state:id:{state_id}"
+
+    def __delta_key(self, state_id: int | str) -> str:
+        return f"tg-bot:state:delta:{state_id}"
+
+    def __dirty_key(self) -> str:
+        return "tg-bot:state:dirty"
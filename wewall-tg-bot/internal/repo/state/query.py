@@ -15,6 +15,35 @@ SET is_transferred_to_manager = :is_transferred_to_manager
 WHERE id = :state_id
 """
 
+# Одним запросом достаем состояние чата, считаем сообщение и создаем состояние, если его еще нет
+state_for_update = """
+WITH existing AS (
+    UPDATE states
+    SET count_message = count_message + CASE
+        WHEN CAST(:count_message AS BOOLEAN) AND NOT is_transferred_to_manager THEN 1
+        ELSE 0
+    END
+    WHERE id = (
+        SELECT id FROM states
+        WHERE tg_chat_id = CAST(:tg_chat_id AS BIGINT)
+        ORDER BY id
+        LIMIT 1
+    )
+    RETURNING *
+), created AS (
+    INSERT INTO states (tg_chat_id, status, count_message)
+    SELECT
+        CAST(:tg_chat_id AS BIGINT),
+        CAST(:status AS TEXT),
+        CASE WHEN CAST(:count_message AS BOOLEAN) THEN 1 ELSE 0 END
+    WHERE NOT EXISTS (SELECT 1 FROM existing)
+    RETURNING *
+)
+SELECT *, FALSE AS is_created FROM existing
+UNION ALL
+SELECT *, TRUE AS is_created FROM created;
+"""
+
 increment_message_count = """
 UPDATE states
 SET count_message = count_message + 1
@@ -43,3 +72,18 @@ delete_state_by_tg_chat_id = """
 DELETE FROM states
 WHERE tg_chat_id = :tg_chat_id;
 """
+
+# Накопленные в кеше приращения счетчиков применяются пачкой одним запросом
+apply_counter_deltas = """
+UPDATE states
+SET count_message = states.count_message + delta.count_message,
+    count_estate_search = states.count_estate_search + delta.count_estate_search,
+    count_estate_calculator = states.count_estate_calculator + delta.count_estate_calculator
+FROM unnest(
+    CAST(:state_ids AS INTEGER[]),
+    CAST(:count_messages AS INTEGER[]),
+    CAST(:count_estate_searches AS INTEGER[]),
+    CAST(:count_estate_calculators AS INTEGER[])
+) AS delta(state_id, count_message, count_estate_search, count_estate_calculator)
+WHERE states.id = delta.state_id;
+"""
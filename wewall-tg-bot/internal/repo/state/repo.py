@@ -52,6 +52,38 @@ class StateRepo(interface.IStateRepo):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
 
+    async def state_for_update(
+            self,
+            tg_chat_id: int,
+            status: str,
+            count_message: bool
+    ) -> tuple[model.State, bool]:
+        with self.tracer.start_as_current_span(
+                "StateRepo.state_for_update",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                    "status": status,
+                    "count_message": count_message,
+                }
+        ) as span:
+            try:
+                args = {
+                    'tg_chat_id': tg_chat_id,
+                    'status': status,
+                    'count_message': count_message,
+                }
+                rows = await self.db.select(state_for_update, args)
+                state = model.State.serialize(rows)[0]
+                is_created = rows[0].is_created
+
+                span.set_status(StatusCode.OK)
+                return state, is_created
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
     async def increment_message_count(self, state_id: int) -> None:
         with self.tracer.start_as_current_span(
                 "StateRepo.increment_message_count",
@@ -168,3 +200,26 @@ class StateRepo(interface.IStateRepo):
                 span.record_exception(err)
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
+
+    async def apply_counter_deltas(self, deltas: list[model.StateCounterDelta]) -> None:
+        with self.tracer.start_as_current_span(
+                "StateRepo.apply_counter_deltas",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "deltas": len(deltas),
+                }
+        ) as span:
+            try:
+                args = {
+                    'state_ids': [delta.state_id for delta in deltas],
+                    'count_messages': [delta.count_message for delta in deltas],
+                    'count_estate_searches': [delta.count_estate_search for delta in deltas],
+                    'count_estate_calculators': [delta.count_estate_calculator for delta in deltas],
+                }
+                await self.db.update(apply_counter_deltas, args)
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
@@ -1,3 +1,5 @@
+import time
+
 from aiogram.types import Message
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
@@ -14,6 +16,7 @@ class EstateExpertMessageService(interface.IEstateExpertMessageService):
             wewall_expert_inline_keyboard_generator: interface.IWewallExpertInlineKeyboardGenerator,
             amocrm_appeal_pipeline_id: int,
             amocrm_pipeline_status_chat_with_manager: int,
+            stream_edit_interval: float = 1.0,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -24,6 +27,7 @@ class EstateExpertMessageService(interface.IEstateExpertMessageService):
         self.wewall_expert_inline_keyboard_generator = wewall_expert_inline_keyboard_generator
         self.amocrm_appeal_pipeline_id = amocrm_appeal_pipeline_id
         self.amocrm_pipeline_status_chat_with_manager = amocrm_pipeline_status_chat_with_manager
+        self.stream_edit_interval = stream_edit_interval
 
     async def handler(self, message: Message, state: model.State):
         with self.tracer.start_as_current_span(
@@ -31,10 +35,7 @@ class EstateExpertMessageService(interface.IEstateExpertMessageService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                llm_response = await self.estate_expert_client.send_message_to_estate_expert(
-                    message.chat.id,
-                    message.text
-                )
+                llm_response = await self.__stream_answer(message)
 
                 if common.StateSwitchCommand.to_manager in llm_response:
                     self.logger.info("Получена команда перехода на менеджера")
@@ -51,7 +52,6 @@ class EstateExpertMessageService(interface.IEstateExpertMessageService):
                     self.logger.info("Получена команда перехода на эксперт по поиску недвижимости")
                     await self.__to_estate_search_expert(message, state)
                 else:
-                    await message.answer(llm_response)
                     await self.chat_client.import_message_to_amocrm(message.chat.id, llm_response)
 
                 span.set_status(StatusCode.OK)
@@ -60,6 +60,59 @@ class EstateExpertMessageService(interface.IEstateExpertMessageService):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
 
+    async def __stream_answer(self, message: Message) -> str:
+        with self.tracer.start_as_current_span(
+                "EstateExpertMessageService.__stream_answer",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                placeholder = await message.answer(common.llm_response_placeholder_text)
+                try:
+                    llm_response = ""
+                    shown_text = ""
+                    last_edit_at = time.monotonic()
+
+                    async for chunk in self.estate_expert_client.stream_message_to_estate_expert(
+                            message.chat.id,
+                            message.text
+                    ):
+                        llm_response += chunk
+
+                        # Команду переключения клиент видеть не должен, после нее сообщение больше не обновляем
+                        if common.StateSwitchCommand.prefix in llm_response:
+                            continue
+                        if time.monotonic() - last_edit_at < self.stream_edit_interval:
+                            continue
+
+                        text = self.__without_command_prefix(llm_response)
+                        if text.strip() and text != shown_text:
+                            await placeholder.edit_text(text)
+                            shown_text = text
+                            last_edit_at = time.monotonic()
+
+                    if common.StateSwitchCommand.prefix in llm_response:
+                        await placeholder.delete()
+                    elif llm_response != shown_text:
+                        await placeholder.edit_text(llm_response)
+                except Exception:
+                    await placeholder.delete()
+                    raise
+
+                span.set_status(StatusCode.OK)
+                return llm_response
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    def __without_command_prefix(self, text: str) -> str:
+        # Отрезаем хвост, который может оказаться началом команды переключения
+        prefix = common.StateSwitchCommand.prefix
+        for size in range(min(len(prefix) - 1, len(text)), 0, -1):
+            if text.endswith(prefix[:size]):
+                return text[:-size]
+        return text
+
     async def __to_manager(self, message: Message, state: model.State):
         with self.tracer.start_as_current_span(
                 "EstateExpertMessageService.__to_manager",
@@ -1,4 +1,4 @@
-from aiogram.types import CallbackQuery, InputMediaDocument, InputMediaPhoto, InlineKeyboardMarkup
+from aiogram.types import CallbackQuery, InputMediaDocument, InputMediaPhoto, InlineKeyboardMarkup, BufferedInputFile
 from opentelemetry.trace import SpanKind, StatusCode
 
 from internal import model, common, interface
@@ -11,7 +11,9 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
             state_repo: interface.IStateRepo,
             estate_search_state_repo: interface.IEstateSearchStateRepo,
             estate_expert_client: interface.IWewallEstateExpertClient,
-            estate_calculator_client: interface.IWewallEstateCalculatorClient,
+            estate_search_client: interface.IWewallEstateSearchClient,
+            finance_model_cache: interface.IFinanceModelCache,
+            offer_prefetcher: interface.IOfferPrefetcher,
             estate_search_inline_keyboard_generator: interface.IEstateSearchInlineKeyboardGenerator,
             chat_client: interface.IWewallChatClient,
             llm_client: interface.ILLMClient
@@ -22,7 +24,9 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
         self.state_repo = state_repo
         self.estate_search_state_repo = estate_search_state_repo
         self.estate_expert_client = estate_expert_client
-        self.estate_calculator_client = estate_calculator_client
+        self.estate_search_client = estate_search_client
+        self.finance_model_cache = finance_model_cache
+        self.offer_prefetcher = offer_prefetcher
         self.estate_search_inline_keyboard_generator = estate_search_inline_keyboard_generator
         self.chat_client = chat_client
         self.llm_client = llm_client
@@ -36,9 +40,18 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                 }
         ) as span:
             try:
+                estate_search_state = await self.__estate_search_state(callback, state)
+                if estate_search_state is None:
+                    span.set_status(StatusCode.OK)
+                    return
+
+                offer = await self.__offer(callback, estate_search_state, offer_id)
+                if offer is None:
+                    span.set_status(StatusCode.OK)
+                    return
+
                 await self.state_repo.change_status(state.id, common.StateStatuses.contact_collector)
-                estate_search_state = (await self.estate_search_state_repo.estate_search_state_by_state_id(state.id))[0]
-                offer = estate_search_state.offers[offer_id]
+                self.offer_prefetcher.cancel(state.tg_chat_id)
 
                 text_for_llm = (
                         "Сделай мне из этого словаря красивый текст для менеджера, перечисли каждый параметр объекта\n\n"
@@ -68,22 +81,29 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
             try:
                 await self.estate_expert_client.add_message_to_chat(state.tg_chat_id, "Следующее помещение", "user")
 
-                state_estate_search = (await self.estate_search_state_repo.estate_search_state_by_state_id(state.id))[0]
+                state_estate_search = await self.__estate_search_state(callback, state)
+                if state_estate_search is None:
+                    span.set_status(StatusCode.OK)
+                    return
 
                 current_offer_id = state_estate_search.current_offer_id + 1
                 span.set_attribute("current_offer_id", current_offer_id)
                 await self.estate_search_state_repo.change_current_offer_by_state_id(state.id, current_offer_id)
 
-                if current_offer_id >= len(state_estate_search.offers):
+                if current_offer_id >= len(state_estate_search.offer_ids):
                     self.logger.info("Помещений больше нет")
                     await callback.message.answer(common.no_more_offers)
                     await self.chat_client.import_message_to_amocrm(callback.message.chat.id, common.no_more_offers)
 
                     return
 
-                offer = state_estate_search.offers[current_offer_id]
+                offer = await self.__offer(callback, state_estate_search, current_offer_id)
+                if offer is None:
+                    span.set_status(StatusCode.OK)
+                    return
+
                 current_estate_id = state_estate_search.current_estate_id + 1
-                if offer.estate_id == current_estate_id:
+                if state_estate_search.offer_estate_ids[current_offer_id] == current_estate_id:
                     self.logger.info("Перешли на следующее здание")
                     await self.estate_search_state_repo.change_current_estate_by_state_id(
                         state.id,
@@ -95,9 +115,10 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                 offer_text, offer_text_with_link = await self.__generate_offer_text(offer, calc_resp)
                 keyboard = await self.__generate_offer_keyboard(state_estate_search, current_offer_id,
                                                                 current_estate_id)
+                image_urls = await self.offer_prefetcher.image_urls(state.tg_chat_id, current_offer_id, offer)
                 photo_media_group = [
                     InputMediaPhoto(media=image_url)
-                    for image_url in offer.image_urls
+                    for image_url in image_urls
                 ]
                 # ANSWER
                 try:
@@ -112,6 +133,8 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                 await self.estate_expert_client.add_message_to_chat(state.tg_chat_id, offer_text_with_link, "assistant")
                 await self.chat_client.import_message_to_amocrm(callback.message.chat.id, offer_text)
 
+                self.offer_prefetcher.prefetch(state.tg_chat_id, state_estate_search, current_offer_id)
+
                 span.set_status(StatusCode.OK)
             except Exception as err:
                 span.record_exception(err)
@@ -126,19 +149,26 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
             try:
                 await self.estate_expert_client.add_message_to_chat(state.tg_chat_id, "Следующий проект", "user")
 
-                state_estate_search = (await self.estate_search_state_repo.estate_search_state_by_state_id(state.id))[0]
+                state_estate_search = await self.__estate_search_state(callback, state)
+                if state_estate_search is None:
+                    span.set_status(StatusCode.OK)
+                    return
 
                 current_estate_id = state_estate_search.current_estate_id + 1
                 await self.estate_search_state_repo.change_current_estate_by_state_id(state.id, current_estate_id)
-                if current_estate_id >= len({offer.estate_id for offer in state_estate_search.offers}):
+                if current_estate_id >= len(set(state_estate_search.offer_estate_ids)):
                     self.logger.info("Зданий больше нет")
                     await callback.message.answer(common.no_more_estates)
                     await self.chat_client.import_message_to_amocrm(callback.message.chat.id, common.no_more_estates)
 
                     return
-                for current_offer_id, offer in enumerate(state_estate_search.offers):
-                    if offer.estate_id == current_estate_id:
+                for current_offer_id, estate_id in enumerate(state_estate_search.offer_estate_ids):
+                    if estate_id == current_estate_id:
                         await self.estate_search_state_repo.change_current_offer_by_state_id(state.id, current_offer_id)
+                        offer = await self.__offer(callback, state_estate_search, current_offer_id)
+                        if offer is None:
+                            span.set_status(StatusCode.OK)
+                            return
 
                         document_media_group, calc_resp = await self.__get_finance_model(state_estate_search, offer)
 
@@ -146,9 +176,10 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                         keyboard = await self.__generate_offer_keyboard(state_estate_search, current_offer_id,
                                                                         current_estate_id)
 
+                        image_urls = await self.offer_prefetcher.image_urls(state.tg_chat_id, current_offer_id, offer)
                         photo_media_group = [
                             InputMediaPhoto(media=image_url)
-                            for image_url in offer.image_urls
+                            for image_url in image_urls
                         ]
                         try:
                             await callback.message.answer_media_group(photo_media_group[:10])
@@ -163,6 +194,8 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                                                                             "assistant")
                         await self.chat_client.import_message_to_amocrm(callback.message.chat.id, offer_text)
 
+                        self.offer_prefetcher.prefetch(state.tg_chat_id, state_estate_search, current_offer_id)
+
                         span.set_status(StatusCode.OK)
                         return
 
@@ -171,6 +204,40 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise err
 
+    async def __estate_search_state(
+            self,
+            callback: CallbackQuery,
+            state: model.State
+    ) -> model.EstateSearchState | None:
+        estate_search_states = await self.estate_search_state_repo.estate_search_state_by_state_id(state.id)
+        if not estate_search_states:
+            self.logger.info("Сессия поиска истекла")
+            await callback.message.answer(common.estate_search_expired_text)
+            await self.chat_client.import_message_to_amocrm(callback.message.chat.id, common.estate_search_expired_text)
+            return None
+
+        return estate_search_states[0]
+
+    async def __offer(
+            self,
+            callback: CallbackQuery,
+            state_estate_search: model.EstateSearchState,
+            offer_id: int
+    ) -> model.SaleOffer | model.RentOffer | None:
+        # Читаем один оффер по id, а не всю подборку: дальше его отдает кеш клиента поиска
+        offers = await self.estate_search_client.offers_by_ids(
+            state_estate_search.offer_type,
+            [state_estate_search.offer_ids[offer_id]]
+        )
+        if not offers:
+            # Помещение сняли с продажи после поиска, подборка устарела так же, как истекшая сессия
+            self.logger.info(f"Помещение {state_estate_search.offer_ids[offer_id]} больше не найдено")
+            await callback.message.answer(common.estate_search_expired_text)
+            await self.chat_client.import_message_to_amocrm(callback.message.chat.id, common.estate_search_expired_text)
+            return None
+
+        return offers[0]
+
     async def __get_finance_model(
             self,
             state_estate_search: model.EstateSearchState,
@@ -210,10 +277,10 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                if current_offer_id == len(state_estate_search.offers) - 1:
+                if current_offer_id == len(state_estate_search.offer_ids) - 1:
                     self.logger.debug("Показываем кнопку с оффером на последнем помещении")
                     keyboard = await self.estate_search_inline_keyboard_generator.last_offer(current_offer_id)
-                elif current_estate_id >= len({offer.estate_id for offer in state_estate_search.offers}) - 1:
+                elif current_estate_id >= len(set(state_estate_search.offer_estate_ids)) - 1:
                     self.logger.debug("Показываем кнопку с оффером на последнем здании")
                     keyboard = await self.estate_search_inline_keyboard_generator.last_estate(current_offer_id)
 
@@ -238,7 +305,7 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
             try:
                 nearest_metro = self.__nearest_metro(sale_offer.metro_stations)
 
-                calculator_resp = await self.estate_calculator_client.calc_finance_model_finished_office(
+                bundle = await self.finance_model_cache.finished_office_bundle(
                     sale_offer.square,
                     sale_offer.price_per_meter,
                     sale_offer.design,
@@ -248,36 +315,13 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                     0,
                 )
 
-                calc_xlsx = await self.estate_calculator_client.calc_finance_model_finished_office_table(
-                    sale_offer.square,
-                    sale_offer.price_per_meter,
-                    sale_offer.design,
-                    sale_offer.estate_category.replace("+", "").replace("C", "B"),
-                    nearest_metro.name,
-                    nearest_metro.leg_distance,
-                    0,
-                )
-
-                pdf_file = await self.estate_calculator_client.generate_pdf(
-                    common.FinishStateCommand.estate_calculator_finished_office,
-                    calculator_resp.buying_property,
-                    calculator_resp.sale_property,
-                    calculator_resp.sale_tax,
-                    calculator_resp.rent_tax,
-                    calculator_resp.price_of_finishing,
-                    calculator_resp.rent_flow,
-                    calculator_resp.terminal_value,
-                    calculator_resp.sale_income,
-                    calculator_resp.rent_income,
-                    calculator_resp.added_value,
-                    calculator_resp.rent_irr,
-                    calculator_resp.sale_irr,
-                )
-
-                document_media_group = [InputMediaDocument(media=pdf_file), InputMediaDocument(media=calc_xlsx)]
+                document_media_group = [
+                    InputMediaDocument(media=BufferedInputFile(bundle.pdf, filename="Отчет оценки доходности.pdf")),
+                    InputMediaDocument(media=BufferedInputFile(bundle.xlsx, filename="Финансовая модель офиса.xlsx")),
+                ]
 
                 span.set_status(StatusCode.OK)
-                return document_media_group, calculator_resp
+                return document_media_group, bundle.finance_model
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(StatusCode.ERROR, str(err))
@@ -294,7 +338,7 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
             try:
                 nearest_metro = self.__nearest_metro(sale_offer.metro_stations)
 
-                calculator_resp = await self.estate_calculator_client.calc_finance_model_building_office(
+                bundle = await self.finance_model_cache.building_office_bundle(
                     sale_offer.readiness_date,
                     sale_offer.square,
                     nearest_metro.name,
@@ -305,37 +349,13 @@ class EstateSearchCallbackService(interface.IEstateSearchCallbackService):
                     {"1Q2025": 100}
                 )
 
-                calc_xlsx = await self.estate_calculator_client.calc_finance_model_building_office_table(
-                    sale_offer.readiness_date,
-                    sale_offer.square,
-                    nearest_metro.name,
-                    nearest_metro.leg_distance,
-                    sale_offer.estate_category,
-                    sale_offer.price_per_meter,
-                    0,
-                    {"1Q2025": 100}
-                )
-
-                pdf_file = await self.estate_calculator_client.generate_pdf(
-                    common.FinishStateCommand.estate_calculator_building_office,
-                    calculator_resp.buying_property,
-                    calculator_resp.sale_property,
-                    calculator_resp.sale_tax,
-                    calculator_resp.rent_tax,
-                    calculator_resp.price_of_finishing,
-                    calculator_resp.rent_flow,
-                    calculator_resp.terminal_value,
-                    calculator_resp.sale_income,
-                    calculator_resp.rent_income,
-                    calculator_resp.added_value,
-                    calculator_resp.rent_irr,
-                    calculator_resp.sale_irr,
-                )
-
-                document_media_group = [InputMediaDocument(media=pdf_file), InputMediaDocument(media=calc_xlsx)]
+                document_media_group = [
+                    InputMediaDocument(media=BufferedInputFile(bundle.pdf, filename="Отчет оценки доходности.pdf")),
+                    InputMediaDocument(media=BufferedInputFile(bundle.xlsx, filename="Финансовая модель офиса.xlsx")),
+                ]
 
                 span.set_status(StatusCode.OK)
-                return document_media_group, calculator_resp
+                return document_media_group, bundle.finance_model
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(StatusCode.ERROR, str(err))
@@ -1,5 +1,5 @@
 import json
-from aiogram.types import Message, InputMediaDocument, InputMediaPhoto, InlineKeyboardMarkup
+from aiogram.types import Message, InputMediaDocument, InputMediaPhoto, InlineKeyboardMarkup, BufferedInputFile
 from opentelemetry.trace import StatusCode, SpanKind
 
 from internal import model, interface, common
@@ -14,7 +14,8 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
             chat_client: interface.IWewallChatClient,
             estate_expert_client: interface.IWewallEstateExpertClient,
             estate_search_client: interface.IWewallEstateSearchClient,
-            estate_calculator_client: interface.IWewallEstateCalculatorClient,
+            finance_model_cache: interface.IFinanceModelCache,
+            offer_prefetcher: interface.IOfferPrefetcher,
             estate_search_inline_keyboard_generator: interface.IEstateSearchInlineKeyboardGenerator,
             wewall_expert_inline_keyboard_generator: interface.IWewallExpertInlineKeyboardGenerator,
             llm_client: interface.ILLMClient,
@@ -32,7 +33,8 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
         self.chat_client = chat_client
         self.estate_expert_client = estate_expert_client
         self.estate_search_client = estate_search_client
-        self.estate_calculator_client = estate_calculator_client
+        self.finance_model_cache = finance_model_cache
+        self.offer_prefetcher = offer_prefetcher
         self.estate_search_inline_keyboard_generator = estate_search_inline_keyboard_generator
         self.wewall_expert_inline_keyboard_generator = wewall_expert_inline_keyboard_generator
         self.llm_client = llm_client
@@ -110,20 +112,40 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
             try:
                 await self.estate_expert_client.add_message_to_chat(state.tg_chat_id, "Следующее помещение", "user")
 
-                state_estate_search = (await self.estate_search_state_repo.estate_search_state_by_state_id(state.id))[0]
+                state_estate_search = await self.estate_search_state_repo.estate_search_state_by_state_id(state.id)
+                if not state_estate_search:
+                    self.logger.info("Сессия поиска истекла")
+                    await message.answer(common.estate_search_expired_text)
+                    await self.chat_client.import_message_to_amocrm(message.chat.id, common.estate_search_expired_text)
+
+                    span.set_status(StatusCode.OK)
+                    return
+                state_estate_search = state_estate_search[0]
+
                 current_offer_id = state_estate_search.current_offer_id + 1
                 await self.estate_search_state_repo.change_current_offer_by_state_id(state.id, current_offer_id)
 
                 span.set_attribute("current_offer_id", current_offer_id)
 
-                if current_offer_id >= len(state_estate_search.offers):
+                if current_offer_id >= len(state_estate_search.offer_ids):
                     self.logger.info("Помещений больше нет")
                     await message.answer(common.no_more_offers)
                     await self.chat_client.import_message_to_amocrm(message.chat.id, common.no_more_offers)
 
                     return
 
-                offer = state_estate_search.offers[current_offer_id]
+                offers = await self.estate_search_client.offers_by_ids(
+                    state_estate_search.offer_type,
+                    [state_estate_search.offer_ids[current_offer_id]]
+                )
+                if not offers:
+                    self.logger.info(f"Помещение {state_estate_search.offer_ids[current_offer_id]} больше не найдено")
+                    await message.answer(common.estate_search_expired_text)
+                    await self.chat_client.import_message_to_amocrm(message.chat.id, common.estate_search_expired_text)
+
+                    span.set_status(StatusCode.OK)
+                    return
+                offer = offers[0]
 
                 document_media_group = None
                 calc_resp = None
@@ -143,15 +165,16 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                 offer_text, offer_text_with_link = await self.__generate_offer_text(offer, calc_resp)
                 await self.estate_expert_client.add_message_to_chat(state.tg_chat_id, offer_text_with_link, "assistant")
 
-                if current_offer_id == len(state_estate_search.offers) - 1:
+                if current_offer_id == len(state_estate_search.offer_ids) - 1:
                     self.logger.debug("Показываем кнопку с оффером на последнем помещении")
                     keyboard = await self.estate_search_inline_keyboard_generator.last_offer(current_offer_id)
                 else:
                     keyboard = await self.estate_search_inline_keyboard_generator.middle_offer(current_offer_id)
 
+                image_urls = await self.offer_prefetcher.image_urls(state.tg_chat_id, current_offer_id, offer)
                 photo_media_group = [
                     InputMediaPhoto(media=image_url)
-                    for image_url in offer.image_urls
+                    for image_url in image_urls
                 ]
                 if photo_media_group:
                     await message.answer_media_group(photo_media_group[:10])
@@ -164,6 +187,8 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                     await message.answer_media_group(document_media_group)
                 await self.chat_client.import_message_to_amocrm(message.chat.id, offer_text)
 
+                self.offer_prefetcher.prefetch(state.tg_chat_id, state_estate_search, current_offer_id)
+
                 span.set_status(StatusCode.OK)
             except Exception as err:
                 span.record_exception(err)
@@ -205,6 +230,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
 
                 await self.estate_search_state_repo.create_estate_search_state(
                     state.id,
+                    common.EstateSearchOfferType.rent,
                     rent_offers_result.rent_offers,
                     estate_search_params
                 )
@@ -226,6 +252,8 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                     await message.answer("Нет фотографий этого помещения")
 
                 state_estate_search = (await self.estate_search_state_repo.estate_search_state_by_state_id(state.id))[0]
+                # Пока пользователь читает первый оффер, готовим следующий
+                self.offer_prefetcher.prefetch(state.tg_chat_id, state_estate_search, 0)
                 keyboard = await self.__generate_offer_keyboard(state_estate_search)
 
                 await message.answer(rent_offer_text, reply_markup=keyboard)
@@ -272,6 +300,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
 
                 await self.estate_search_state_repo.create_estate_search_state(
                     state.id,
+                    common.EstateSearchOfferType.sale,
                     sale_offers_result.sale_offers,
                     estate_search_params
                 )
@@ -308,6 +337,8 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                     await message.answer("Нет фотографий этого помещения")
 
                 state_estate_search = (await self.estate_search_state_repo.estate_search_state_by_state_id(state.id))[0]
+                # Пока пользователь читает первый оффер, готовим следующий
+                self.offer_prefetcher.prefetch(state.tg_chat_id, state_estate_search, 0)
                 keyboard = await self.__generate_offer_keyboard(state_estate_search)
                 await message.answer(sale_offer_text, reply_markup=keyboard)
                 await self.chat_client.import_message_to_amocrm(message.chat.id, sale_offer_text)
@@ -328,10 +359,10 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                if state_estate_search.current_offer_id == len(state_estate_search.offers) - 1:
+                if state_estate_search.current_offer_id == len(state_estate_search.offer_ids) - 1:
                     self.logger.debug("Показываем кнопку с оффером на последнем помещении")
                     keyboard = await self.estate_search_inline_keyboard_generator.last_offer(state_estate_search.current_offer_id)
-                elif state_estate_search.current_estate_id >= len({offer.estate_id for offer in state_estate_search.offers}) - 1:
+                elif state_estate_search.current_estate_id >= len(set(state_estate_search.offer_estate_ids)) - 1:
                     self.logger.debug("Показываем кнопку с оффером на последнем здании")
                     keyboard = await self.estate_search_inline_keyboard_generator.last_estate(state_estate_search.current_offer_id)
                 else:
@@ -354,7 +385,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
             try:
                 nearest_metro = self.__nearest_metro(sale_offer.metro_stations)
 
-                calculator_resp = await self.estate_calculator_client.calc_finance_model_finished_office(
+                bundle = await self.finance_model_cache.finished_office_bundle(
                     sale_offer.square,
                     sale_offer.price_per_meter,
                     sale_offer.design,
@@ -364,36 +395,13 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                     0,
                 )
 
-                calc_xlsx = await self.estate_calculator_client.calc_finance_model_finished_office_table(
-                    sale_offer.square,
-                    sale_offer.price_per_meter,
-                    sale_offer.design,
-                    sale_offer.estate_category.replace("+", "").replace("C", "B"),
-                    nearest_metro.name,
-                    nearest_metro.leg_distance,
-                    0,
-                )
-
-                pdf_file = await self.estate_calculator_client.generate_pdf(
-                    common.FinishStateCommand.estate_calculator_finished_office,
-                    calculator_resp.buying_property,
-                    calculator_resp.sale_property,
-                    calculator_resp.sale_tax,
-                    calculator_resp.rent_tax,
-                    calculator_resp.price_of_finishing,
-                    calculator_resp.rent_flow,
-                    calculator_resp.terminal_value,
-                    calculator_resp.sale_income,
-                    calculator_resp.rent_income,
-                    calculator_resp.added_value,
-                    calculator_resp.rent_irr,
-                    calculator_resp.sale_irr,
-                )
-
-                document_media_group = [InputMediaDocument(media=pdf_file), InputMediaDocument(media=calc_xlsx)]
+                document_media_group = [
+                    InputMediaDocument(media=BufferedInputFile(bundle.pdf, filename="Отчет оценки доходности.pdf")),
+                    InputMediaDocument(media=BufferedInputFile(bundle.xlsx, filename="Финансовая модель офиса.xlsx")),
+                ]
 
                 span.set_status(StatusCode.OK)
-                return document_media_group, calculator_resp
+                return document_media_group, bundle.finance_model
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(StatusCode.ERROR, str(err))
@@ -410,7 +418,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
             try:
                 nearest_metro = self.__nearest_metro(sale_offer.metro_stations)
 
-                calculator_resp = await self.estate_calculator_client.calc_finance_model_building_office(
+                bundle = await self.finance_model_cache.building_office_bundle(
                     sale_offer.readiness_date,
                     sale_offer.square,
                     nearest_metro.name,
@@ -421,37 +429,13 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                     {"1Q2025": 100}
                 )
 
-                calc_xlsx = await self.estate_calculator_client.calc_finance_model_building_office_table(
-                    sale_offer.readiness_date,
-                    sale_offer.square,
-                    nearest_metro.name,
-                    nearest_metro.leg_distance,
-                    sale_offer.estate_category,
-                    sale_offer.price_per_meter,
-                    0,
-                    {"1Q2025": 100}
-                )
-
-                pdf_file = await self.estate_calculator_client.generate_pdf(
-                    common.FinishStateCommand.estate_calculator_building_office,
-                    calculator_resp.buying_property,
-                    calculator_resp.sale_property,
-                    calculator_resp.sale_tax,
-                    calculator_resp.rent_tax,
-                    calculator_resp.price_of_finishing,
-                    calculator_resp.rent_flow,
-                    calculator_resp.terminal_value,
-                    calculator_resp.sale_income,
-                    calculator_resp.rent_income,
-                    calculator_resp.added_value,
-                    calculator_resp.rent_irr,
-                    calculator_resp.sale_irr,
-                )
-
-                document_media_group = [InputMediaDocument(media=pdf_file), InputMediaDocument(media=calc_xlsx)]
+                document_media_group = [
+                    InputMediaDocument(media=BufferedInputFile(bundle.pdf, filename="Отчет оценки доходности.pdf")),
+                    InputMediaDocument(media=BufferedInputFile(bundle.xlsx, filename="Финансовая модель офиса.xlsx")),
+                ]
 
                 span.set_status(StatusCode.OK)
-                return document_media_group, calculator_resp
+                return document_media_group, bundle.finance_model
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(StatusCode.ERROR, str(err))
@@ -494,6 +478,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                 await message.answer(llm_response)
 
                 await self.state_repo.change_status(state.id, common.StateStatuses.estate_finance_model)
+                self.offer_prefetcher.cancel(state.tg_chat_id)
                 await self.chat_client.import_message_to_amocrm(message.chat.id, llm_response)
 
                 span.set_status(StatusCode.OK)
@@ -518,6 +503,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                 await message.answer(llm_response, reply_markup=keyboard)
 
                 await self.state_repo.change_status(state.id, common.StateStatuses.wewall_expert)
+                self.offer_prefetcher.cancel(state.tg_chat_id)
                 await self.chat_client.import_message_to_amocrm(message.chat.id, llm_response)
 
                 span.set_status(StatusCode.OK)
@@ -541,6 +527,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                 await message.answer(llm_response)
 
                 await self.state_repo.change_status(state.id, common.StateStatuses.estate_expert)
+                self.offer_prefetcher.cancel(state.tg_chat_id)
                 await self.chat_client.import_message_to_amocrm(message.chat.id, llm_response)
 
                 span.set_status(StatusCode.OK)
@@ -563,6 +550,7 @@ class EstateSearchMessageService(interface.IEstateSearchMessageService):
                 await message.answer(llm_response)
 
                 await self.state_repo.change_status(state.id, common.StateStatuses.contact_collector)
+                self.offer_prefetcher.cancel(state.tg_chat_id)
                 await self.chat_client.import_message_to_amocrm(message.chat.id, llm_response)
 
                 span.set_status(StatusCode.OK)
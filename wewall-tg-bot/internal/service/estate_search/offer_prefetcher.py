@@ -0,0 +1,266 @@
+import time
+import asyncio
+
+import httpx
+from opentelemetry.trace import SpanKind, StatusCode
+
+from internal import model, interface, common
+
+
+class OfferPrefetcher(interface.IOfferPrefetcher):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            estate_search_client: interface.IWewallEstateSearchClient,
+            finance_model_cache: interface.IFinanceModelCache,
+            max_concurrency: int = 8,
+            user_concurrency: int = 2,
+            ttl: float = 15 * 60,
+            image_check_timeout: float = 3,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
+
+        self.estate_search_client = estate_search_client
+        self.finance_model_cache = finance_model_cache
+        self.user_concurrency = user_concurrency
+        self.ttl = ttl
+        self.image_check_timeout = image_check_timeout
+
+        # Общий лимит бережет калькулятор и рендер PDF, пользовательский не дает одному чату занять все слоты
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.user_semaphores: dict[int, asyncio.Semaphore] = {}
+        # Подготовленные офферы пользователя: ключ (номер оффера в подборке, id оффера), значение задача со списком фотографий
+        self.tasks: dict[int, dict[tuple[int, str], asyncio.Task]] = {}
+        self.last_used: dict[int, float] = {}
+
+        self.lookup_counter = self.meter.create_counter(
+            name=common.OFFER_PREFETCH_LOOKUP_TOTAL_METRIC,
+            description="Total count of shown offers by prefetch result",
+            unit="1"
+        )
+        self.prefetch_counter = self.meter.create_counter(
+            name=common.OFFER_PREFETCH_TOTAL_METRIC,
+            description="Total count of offer prefetches by outcome",
+            unit="1"
+        )
+
+    def prefetch(self, tg_chat_id: int, state_estate_search: model.EstateSearchState, shown_offer_id: int) -> None:
+        with self.tracer.start_as_current_span(
+                "OfferPrefetcher.prefetch",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                    "shown_offer_id": shown_offer_id,
+                }
+        ) as span:
+            try:
+                self.__sweep()
+
+                targets = self.__targets(state_estate_search, shown_offer_id)
+                with_finance_model = state_estate_search.estate_search_params.get("motivation") == 1
+
+                user_tasks = self.tasks.setdefault(tg_chat_id, {})
+                # Пользователь ушел дальше, заготовки для пропущенных офферов уже не понадобятся
+                for key in list(user_tasks):
+                    if key not in targets:
+                        user_tasks.pop(key).cancel()
+
+                for key in targets:
+                    if key not in user_tasks:
+                        user_tasks[key] = asyncio.create_task(
+                            self.__prefetch_offer(tg_chat_id, state_estate_search.offer_type, key[1], with_finance_model)
+                        )
+
+                self.last_used[tg_chat_id] = time.monotonic()
+                span.set_attribute("offers", len(targets))
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise err
+
+    async def image_urls(self, tg_chat_id: int, offer_id: int, offer: model.SaleOffer | model.RentOffer) -> list[str]:
+        with self.tracer.start_as_current_span(
+                "OfferPrefetcher.image_urls",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                    "offer_id": offer_id,
+                }
+        ) as span:
+            try:
+                task = self.tasks.get(tg_chat_id, {}).pop((offer_id, offer.id), None)
+
+                if task is None or task.cancelled():
+                    result = "miss"
+                    image_urls = list(offer.image_urls)
+                elif task.done():
+                    result = "hit"
+                    image_urls = task.result()
+                else:
+                    # Расчет уже идет, ждать его выгоднее, чем начинать заново
+                    result = "in_flight"
+                    image_urls = await asyncio.shield(task)
+
+                if image_urls is None:
+                    # Заготовку не удалось собрать, показываем фотографии как есть
+                    image_urls = list(offer.image_urls)
+
+                self.lookup_counter.add(1, {common.CACHE_RESULT_KEY: result})
+                span.set_attribute("cache_result", result)
+                span.set_status(StatusCode.OK)
+                return image_urls
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise err
+
+    def cancel(self, tg_chat_id: int) -> None:
+        user_tasks = self.tasks.pop(tg_chat_id, {})
+        for task in user_tasks.values():
+            task.cancel()
+
+        self.user_semaphores.pop(tg_chat_id, None)
+        self.last_used.pop(tg_chat_id, None)
+
+        if user_tasks:
+            self.logger.debug(f"Отменили подготовку офферов: {len(user_tasks)}")
+
+    async def __prefetch_offer(
+            self,
+            tg_chat_id: int,
+            offer_type: str,
+            offer_id: int,
+            with_finance_model: bool
+    ) -> list[str] | None:
+        with self.tracer.start_as_current_span(
+                "OfferPrefetcher.__prefetch_offer",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                    "offer_id": offer_id,
+                    "with_finance_model": with_finance_model,
+                }
+        ) as span:
+            outcome = "ok"
+            try:
+                async with self.__user_semaphore(tg_chat_id), self.semaphore:
+                    offers = await self.estate_search_client.offers_by_ids(offer_type, [offer_id])
+                    if not offers:
+                        outcome = "not_found"
+                        span.set_status(StatusCode.OK)
+                        return None
+                    offer = offers[0]
+
+                    jobs = [self.__resolve_image_urls(offer.image_urls[:10])]
+                    if with_finance_model:
+                        # Результат не нужен: бандл ляжет в кеш финмоделей и оттуда его заберет сервис
+                        jobs.append(self.__warm_finance_model(offer))
+
+                    image_urls, *_ = await asyncio.gather(*jobs)
+
+                span.set_status(StatusCode.OK)
+                return image_urls
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            except Exception as err:
+                outcome = "error"
+                self.logger.warning(f"Не удалось подготовить оффер заранее: {err}")
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                return None
+            finally:
+                self.prefetch_counter.add(1, {common.OUTCOME_KEY: outcome})
+
+    async def __warm_finance_model(self, offer: model.SaleOffer):
+        # Аргументы совпадают с расчетом в EstateSearchCallbackService и EstateSearchMessageService,
+        # иначе ключ кеша будет другим и заготовка не пригодится
+        try:
+            nearest_metro = min(offer.metro_stations, key=lambda metro: metro.leg_distance)
+
+            if offer.offer_readiness == 1:
+                await self.finance_model_cache.finished_office_bundle(
+                    offer.square,
+                    offer.price_per_meter,
+                    offer.design,
+                    offer.estate_category.replace("+", "").replace("C", "B"),
+                    nearest_metro.name,
+                    nearest_metro.leg_distance,
+                    0,
+                )
+            else:
+                await self.finance_model_cache.building_office_bundle(
+                    offer.readiness_date,
+                    offer.square,
+                    nearest_metro.name,
+                    nearest_metro.leg_distance,
+                    offer.estate_category,
+                    offer.price_per_meter,
+                    0,
+                    {"1Q2025": 100}
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            # Ошибку расчета пользователь увидит при показе оффера, здесь только фотографии
+            self.logger.warning(f"Не удалось заранее рассчитать финмодель: {err}")
+
+    async def __resolve_image_urls(self, image_urls: list[str]) -> list[str]:
+        async with httpx.AsyncClient(timeout=self.image_check_timeout, follow_redirects=True) as client:
+            resolved = await asyncio.gather(*[
+                self.__resolve_image_url(client, image_url)
+                for image_url in image_urls
+            ])
+        return [image_url for image_url in resolved if image_url is not None]
+
+    async def __resolve_image_url(self, client: httpx.AsyncClient, image_url: str) -> str | None:
+        try:
+            response = await client.head(image_url)
+        except httpx.HTTPError:
+            # Не смогли проверить сами, пусть Telegram попробует скачать
+            return image_url
+
+        if response.status_code == 405:
+            return image_url
+        if response.status_code >= 400:
+            self.logger.debug(f"Фотография недоступна: {response.status_code}")
+            return None
+
+        content_type = response.headers.get("content-type", "")
+        if content_type and not content_type.startswith("image/"):
+            return None
+
+        return str(response.url)
+
+    def __targets(self, state_estate_search: model.EstateSearchState, shown_offer_id: int) -> list[tuple[int, int]]:
+        # Следующим пользователь откроет либо следующее помещение, либо первое помещение следующего здания
+        offer_ids = state_estate_search.offer_ids
+        offer_estate_ids = state_estate_search.offer_estate_ids
+
+        targets = []
+        next_offer_id = shown_offer_id + 1
+        if next_offer_id < len(offer_ids):
+            targets.append((next_offer_id, offer_ids[next_offer_id]))
+
+        next_estate_id = offer_estate_ids[shown_offer_id] + 1
+        for offer_id, estate_id in enumerate(offer_estate_ids):
+            if estate_id == next_estate_id:
+                if offer_id != next_offer_id:
+                    targets.append((offer_id, offer_ids[offer_id]))
+                break
+
+        return targets
+
+    def __user_semaphore(self, tg_chat_id: int) -> asyncio.Semaphore:
+        if tg_chat_id not in self.user_semaphores:
+            self.user_semaphores[tg_chat_id] = asyncio.Semaphore(self.user_concurrency)
+        return self.user_semaphores[tg_chat_id]
+
+    def __sweep(self):
+        expired_before = time.monotonic() - self.ttl
+        for tg_chat_id, last_used in list(self.last_used.items()):
+            if last_used < expired_before:
+                self.cancel(tg_chat_id)
@@ -0,0 +1,381 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+from datetime import date
+from collections import OrderedDict
+
+from opentelemetry.trace import SpanKind, StatusCode
+
+from internal import interface, model, common
+
+# Меняем при изменении шаблонов отчета или формата записей, старые записи перестанут совпадать по ключу
+CACHE_VERSION = 1
+FILE_SUFFIXES = (".json", ".xlsx", ".pdf")
+
+
+def deal_quarter() -> str:
+    # Калькулятор начинает расчет с текущего квартала, поэтому с его сменой старые расчеты устаревают
+    today = date.today()
+    return f"{(today.month - 1) // 3 + 1}Q{today.year}"
+
+
+class FinanceModelCache(interface.IFinanceModelCache):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            estate_calculator_client: interface.IWewallEstateCalculatorClient,
+            cache_dir: str,
+            reference_data_version: str,
+            ttl: int = 24 * 60 * 60,
+            max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
+
+        self.estate_calculator_client = estate_calculator_client
+        self.cache_dir = cache_dir
+        self.reference_data_version = reference_data_version
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        # PDF весит мегабайты, поэтому бандлы лежат на локальном диске, а в памяти только размеры в порядке LRU
+        self.index: OrderedDict[str, int] = OrderedDict()
+        # Время записи бандла, по нему записи старше ttl пересчитываются
+        self.created_at: dict[str, float] = {}
+        self.total_bytes = 0
+        self.index_loaded = False
+        self.index_lock = asyncio.Lock()
+        # Одинаковый расчет, запрошенный несколькими пользователями одновременно, считается один раз
+        self.in_flight: dict[str, asyncio.Task] = {}
+
+        self.lookup_counter = self.meter.create_counter(
+            name=common.FINANCE_MODEL_CACHE_LOOKUP_TOTAL_METRIC,
+            description="Total count of finance model cache lookups by result",
+            unit="1"
+        )
+        self.eviction_counter = self.meter.create_counter(
+            name=common.FINANCE_MODEL_CACHE_EVICTION_TOTAL_METRIC,
+            description="Total count of finance model bundles evicted from cache",
+            unit="1"
+        )
+
+    async def finished_office_bundle(
+            self,
+            square: float,
+            price_per_meter: float,
+            need_repairs: int,
+            estate_category: str,
+            metro_station_name: str,
+            distance_to_metro: float,
+            nds_rate: int,
+    ) -> model.FinanceModelBundle:
+        with self.tracer.start_as_current_span(
+                "FinanceModelCache.finished_office_bundle",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "square": square,
+                    "price_per_meter": price_per_meter,
+                    "need_repairs": need_repairs,
+                    "estate_category": estate_category,
+                    "metro_station_name": metro_station_name,
+                    "distance_to_metro": distance_to_metro,
+                    "nds_rate": nds_rate,
+                }
+        ) as span:
+            try:
+                # Расчет идет по нормализованным значениям, иначе результат в кеше не совпадет с ключом
+                params = {
+                    "square": round(float(square), 2),
+                    "price_per_meter": round(float(price_per_meter), 2),
+                    "need_repairs": int(need_repairs),
+                    "estate_category": estate_category.strip(),
+                    "metro_station_name": metro_station_name.strip(),
+                    "distance_to_metro": round(float(distance_to_metro)),
+                    "nds_rate": int(nds_rate),
+                }
+
+                async def calc():
+                    return await self.estate_calculator_client.calc_finance_model_finished_office_bundle(**params)
+
+                bundle = await self.__bundle(
+                    common.FinishStateCommand.estate_calculator_finished_office,
+                    params,
+                    calc,
+                    span,
+                )
+
+                span.set_status(StatusCode.OK)
+                return bundle
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise err
+
+    async def building_office_bundle(
+            self,
+            project_readiness: str,
+            square: float,
+            metro_station_name: str,
+            distance_to_metro: float,
+            estate_category: str,
+            price_per_meter: float,
+            nds_rate: int,
+            transaction_dict: dict,
+    ) -> model.FinanceModelBundle:
+        with self.tracer.start_as_current_span(
+                "FinanceModelCache.building_office_bundle",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "project_readiness": project_readiness,
+                    "square": square,
+                    "metro_station_name": metro_station_name,
+                    "distance_to_metro": distance_to_metro,
+                    "estate_category": estate_category,
+                    "price_per_meter": price_per_meter,
+                    "nds_rate": nds_rate,
+                    "transaction_dict": str(transaction_dict),
+                }
+        ) as span:
+            try:
+                params = {
+                    "project_readiness": project_readiness.strip(),
+                    "square": round(float(square), 2),
+                    "metro_station_name": metro_station_name.strip(),
+                    "distance_to_metro": round(float(distance_to_metro)),
+                    "estate_category": estate_category.strip(),
+                    "price_per_meter": round(float(price_per_meter), 2),
+                    "nds_rate": int(nds_rate),
+                    "transaction_dict": {
+                        quarter: round(float(share), 2)
+                        for quarter, share in sorted(transaction_dict.items())
+                    },
+                }
+
+                async def calc():
+                    return await self.estate_calculator_client.calc_finance_model_building_office_bundle(**params)
+
+                bundle = await self.__bundle(
+                    common.FinishStateCommand.estate_calculator_building_office,
+                    params,
+                    calc,
+                    span,
+                )
+
+                span.set_status(StatusCode.OK)
+                return bundle
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise err
+
+    async def __bundle(self, estate_type: str, params: dict, calc, span) -> model.FinanceModelBundle:
+        key = self.__key(estate_type, params)
+        span.set_attribute("cache_key", key)
+        await self.__load_index()
+
+        miss_result = "miss"
+        if key in self.index and self.__is_expired(key):
+            miss_result = "expired"
+            await self.__drop(key)
+
+        if key in self.index:
+            bundle = await asyncio.to_thread(self.__read_bundle, key)
+            if bundle is not None:
+                if key in self.index:
+                    self.index.move_to_end(key)
+                self.__record_lookup("hit")
+                span.set_attribute("cache_result", "hit")
+                return bundle
+
+            self.logger.warning(f"Запись финмодели {key} в кеше повреждена, пересчитываем")
+            await self.__drop(key)
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.__record_lookup("in_flight")
+            span.set_attribute("cache_result", "in_flight")
+            return await asyncio.shield(task)
+
+        self.__record_lookup(miss_result)
+        span.set_attribute("cache_result", miss_result)
+
+        task = asyncio.create_task(self.__compute(key, estate_type, calc))
+        self.in_flight[key] = task
+        task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def __compute(self, key: str, estate_type: str, calc) -> model.FinanceModelBundle:
+        finance_model, xlsx = await calc()
+        pdf_file = await self.estate_calculator_client.generate_pdf(
+            estate_type,
+            finance_model.buying_property,
+            finance_model.sale_property,
+            finance_model.sale_tax,
+            finance_model.rent_tax,
+            finance_model.price_of_finishing,
+            finance_model.rent_flow,
+            finance_model.terminal_value,
+            finance_model.sale_income,
+            finance_model.rent_income,
+            finance_model.added_value,
+            finance_model.rent_irr,
+            finance_model.sale_irr,
+        )
+        bundle = model.FinanceModelBundle(finance_model=finance_model, xlsx=xlsx, pdf=pdf_file.data)
+
+        try:
+            created_at = time.time()
+            size = await asyncio.to_thread(self.__write_bundle, key, bundle)
+            async with self.index_lock:
+                self.__add(key, size, created_at)
+                evicted = self.__evict()
+            if evicted:
+                await asyncio.to_thread(self.__remove_files, evicted)
+                self.eviction_counter.add(len(evicted))
+        except Exception as err:
+            # Без кеша бот продолжает работать, просто считает заново
+            self.logger.warning(f"Не удалось сохранить финмодель в кеш: {err}")
+
+        return bundle
+
+    async def __load_index(self):
+        if self.index_loaded:
+            return
+
+        async with self.index_lock:
+            if self.index_loaded:
+                return
+            entries = await asyncio.to_thread(self.__scan_dir)
+            for key, size, created_at in entries:
+                self.__add(key, size, created_at)
+            evicted = [key for key in self.index if self.__is_expired(key)]
+            for key in evicted:
+                self.total_bytes -= self.index.pop(key)
+                self.created_at.pop(key, None)
+            evicted += self.__evict()
+            if evicted:
+                await asyncio.to_thread(self.__remove_files, evicted)
+            self.index_loaded = True
+
+        self.logger.info(f"Индекс кеша финмоделей загружен: {len(self.index)} записей, {self.total_bytes} байт")
+
+    async def __drop(self, key: str):
+        async with self.index_lock:
+            self.total_bytes -= self.index.pop(key, 0)
+            self.created_at.pop(key, None)
+        await asyncio.to_thread(self.__remove_files, [key])
+
+    def __add(self, key: str, size: int, created_at: float):
+        self.total_bytes += size - self.index.pop(key, 0)
+        self.index[key] = size
+        self.created_at[key] = created_at
+
+    def __is_expired(self, key: str) -> bool:
+        return time.time() - self.created_at.get(key, 0) > self.ttl
+
+    def __evict(self) -> list[str]:
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self.index) > 1:
+            key, size = self.index.popitem(last=False)
+            self.total_bytes -= size
+            self.created_at.pop(key, None)
+            evicted.append(key)
+        return evicted
+
+    def __scan_dir(self) -> list[tuple[str, int, float]]:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        files: dict[str, dict[str, os.stat_result]] = {}
+        for name in os.listdir(self.cache_dir):
+            key, suffix = os.path.splitext(name)
+            if suffix not in FILE_SUFFIXES:
+                # Недописанные временные файлы после падения процесса
+                self.__remove(os.path.join(self.cache_dir, name))
+                continue
+            files.setdefault(key, {})[suffix] = os.stat(os.path.join(self.cache_dir, name))
+
+        entries = []
+        for key, stats in files.items():
+            if len(stats) != len(FILE_SUFFIXES):
+                self.__remove_files([key])
+                continue
+            # xlsx после записи не трогается, его mtime и есть время расчета
+            last_used = stats[".json"].st_mtime
+            created_at = stats[".xlsx"].st_mtime
+            entries.append((last_used, key, sum(stat.st_size for stat in stats.values()), created_at))
+
+        return [(key, size, created_at) for _, key, size, created_at in sorted(entries)]
+
+    def __read_bundle(self, key: str) -> model.FinanceModelBundle | None:
+        try:
+            json_path = self.__path(key, ".json")
+            with open(json_path, "r", encoding="utf-8") as file:
+                finance_model = model.FinanceModelResponse(**json.load(file))
+            with open(self.__path(key, ".xlsx"), "rb") as file:
+                xlsx = file.read()
+            with open(self.__path(key, ".pdf"), "rb") as file:
+                pdf = file.read()
+
+            # mtime json-файла служит временем последнего обращения при перезапуске
+            os.utime(json_path)
+            return model.FinanceModelBundle(finance_model=finance_model, xlsx=xlsx, pdf=pdf)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def __write_bundle(self, key: str, bundle: model.FinanceModelBundle) -> int:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # json пишется последним: запись без него при следующем старте считается недописанной
+        size = self.__write_file(self.__path(key, ".xlsx"), bundle.xlsx)
+        size += self.__write_file(self.__path(key, ".pdf"), bundle.pdf)
+        size += self.__write_file(
+            self.__path(key, ".json"),
+            json.dumps(bundle.finance_model.to_dict(), ensure_ascii=False).encode("utf-8")
+        )
+        return size
+
+    def __write_file(self, path: str, data: bytes) -> int:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            self.__remove(tmp_path)
+            raise
+        return len(data)
+
+    def __remove_files(self, keys: list[str]):
+        for key in keys:
+            for suffix in FILE_SUFFIXES:
+                self.__remove(self.__path(key, suffix))
+
+    def __remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def __path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def __key(self, estate_type: str, params: dict) -> str:
+        raw = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "reference_data_version": self.reference_data_version,
+                "deal_quarter": deal_quarter(),
+                "estate_type": estate_type,
+                "params": params,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def __record_lookup(self, result: str):
+        self.lookup_counter.add(1, {common.CACHE_RESULT_KEY: result})
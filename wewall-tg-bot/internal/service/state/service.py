@@ -46,6 +46,31 @@ class StateService(interface.IStateService):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
 
+    async def state_for_update(
+            self,
+            tg_chat_id: int,
+            status: str,
+            count_message: bool
+    ) -> tuple[model.State, bool]:
+        with self.tracer.start_as_current_span(
+                "StateService.state_for_update",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                    "status": status,
+                    "count_message": count_message,
+                }
+        ) as span:
+            try:
+                state, is_created = await self.state_repo.state_for_update(tg_chat_id, status, count_message)
+
+                span.set_status(StatusCode.OK)
+                return state, is_created
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
     async def increment_message_count(self, state_id: int) -> None:
         with self.tracer.start_as_current_span(
                 "StateService.increment_message_count",
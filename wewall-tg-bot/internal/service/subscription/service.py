@@ -0,0 +1,185 @@
+import time
+import asyncio
+
+from aiogram import Bot
+from opentelemetry.trace import SpanKind, StatusCode
+
+from internal import interface, common
+
+
+class SubscriptionService(interface.ISubscriptionService):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            bot: Bot,
+            redis: interface.IRedis,
+            wewall_tg_channel_login: str,
+            positive_ttl: int = 300,
+            l1_ttl: float = 30,
+            refresh_interval: float = 60,
+            active_user_window: float = 15 * 60,
+            refresh_batch_size: int = 20,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
+
+        self.bot = bot
+        self.redis = redis
+        self.wewall_tg_channel_login = wewall_tg_channel_login
+
+        # Кешируется только подписка: неподписанный пользователь должен пройти сразу, как только подпишется
+        self.positive_ttl = positive_ttl
+        self.l1_ttl = l1_ttl
+        self.refresh_interval = refresh_interval
+        self.active_user_window = active_user_window
+        self.refresh_batch_size = refresh_batch_size
+
+        self.l1: dict[int, float] = {}
+        # Когда пользователь последний раз писал и когда истекает его запись в Redis
+        self.active_users: dict[int, float] = {}
+        self.cached_until: dict[int, float] = {}
+
+        self.lookup_counter = self.meter.create_counter(
+            name=common.SUBSCRIPTION_CACHE_LOOKUP_TOTAL_METRIC,
+            description="Total count of subscription cache lookups by result",
+            unit="1"
+        )
+        self.api_call_counter = self.meter.create_counter(
+            name=common.SUBSCRIPTION_API_CALL_TOTAL_METRIC,
+            description="Total count of get_chat_member calls by reason",
+            unit="1"
+        )
+        self.api_call_saved_counter = self.meter.create_counter(
+            name=common.SUBSCRIPTION_API_CALL_SAVED_TOTAL_METRIC,
+            description="Total count of get_chat_member calls answered from cache",
+            unit="1"
+        )
+
+    async def is_subscribed(self, tg_user_id: int) -> bool:
+        with self.tracer.start_as_current_span(
+                "SubscriptionService.is_subscribed",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_user_id": tg_user_id,
+                }
+        ) as span:
+            try:
+                now = time.monotonic()
+                self.active_users[tg_user_id] = now
+
+                if self.l1.get(tg_user_id, 0) > now:
+                    self.__record_lookup("l1_hit")
+                    span.set_attribute("cache_result", "l1_hit")
+                    span.set_status(StatusCode.OK)
+                    return True
+
+                if await self.redis.get(self.__key(tg_user_id)) is not None:
+                    self.l1[tg_user_id] = now + self.l1_ttl
+                    self.__record_lookup("redis_hit")
+                    span.set_attribute("cache_result", "redis_hit")
+                    span.set_status(StatusCode.OK)
+                    return True
+
+                self.__record_lookup("miss")
+                subscribe = await self.__check_wewall_channel_subscribe(tg_user_id, "miss")
+
+                span.set_attribute("cache_result", "miss")
+                span.set_status(StatusCode.OK)
+                return subscribe
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def invalidate(self, tg_user_id: int) -> None:
+        with self.tracer.start_as_current_span(
+                "SubscriptionService.invalidate",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_user_id": tg_user_id,
+                }
+        ) as span:
+            try:
+                self.l1.pop(tg_user_id, None)
+                self.cached_until.pop(tg_user_id, None)
+                try:
+                    await self.redis.delete(self.__key(tg_user_id))
+                except Exception as err:
+                    self.logger.warning(f"Не удалось удалить подписку из Redis: {err}")
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def refresh_active_subscriptions(self):
+        while True:
+            try:
+                await asyncio.sleep(self.refresh_interval)
+                await self.__refresh_active_subscriptions()
+            except Exception as err:
+                self.logger.error(f"Ошибка в обновлении кеша подписок: {err}")
+
+    async def __refresh_active_subscriptions(self):
+        with self.tracer.start_as_current_span(
+                "SubscriptionService.__refresh_active_subscriptions",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                now = time.monotonic()
+                for tg_user_id, last_seen_at in list(self.active_users.items()):
+                    if now - last_seen_at > self.active_user_window:
+                        del self.active_users[tg_user_id]
+                        self.cached_until.pop(tg_user_id, None)
+                        self.l1.pop(tg_user_id, None)
+
+                # Обновляем заранее только тех, у кого запись истечет до следующего прохода,
+                # и не больше пачки за раз, чтобы не упираться в лимиты Telegram
+                expiring = [
+                    tg_user_id
+                    for tg_user_id, cached_until in self.cached_until.items()
+                    if tg_user_id in self.active_users and cached_until - now <= self.refresh_interval
+                ]
+                expiring.sort(key=lambda tg_user_id: self.cached_until[tg_user_id])
+                for tg_user_id in expiring[:self.refresh_batch_size]:
+                    await self.__check_wewall_channel_subscribe(tg_user_id, "refresh")
+
+                span.set_attribute("refreshed", min(len(expiring), self.refresh_batch_size))
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def __check_wewall_channel_subscribe(self, tg_user_id: int, reason: str) -> bool:
+        self.api_call_counter.add(1, {common.SUBSCRIPTION_CHECK_REASON_KEY: reason})
+        user_channel_status = await self.bot.get_chat_member(chat_id=self.wewall_tg_channel_login, user_id=tg_user_id)
+        subscribe = user_channel_status.status != 'left'
+
+        if subscribe:
+            now = time.monotonic()
+            self.l1[tg_user_id] = now + self.l1_ttl
+            self.cached_until[tg_user_id] = now + self.positive_ttl
+            try:
+                await self.redis.set(self.__key(tg_user_id), 1, ttl=self.positive_ttl)
+            except Exception as err:
+                self.logger.warning(f"Не удалось сохранить подписку в Redis: {err}")
+        else:
+            self.l1.pop(tg_user_id, None)
+            self.cached_until.pop(tg_user_id, None)
+            try:
+                await self.redis.delete(self.__key(tg_user_id))
+            except Exception as err:
+                self.logger.warning(f"Не удалось удалить подписку из Redis: {err}")
+
+        return subscribe
+
+    def __record_lookup(self, result: str):
+        self.lookup_counter.add(1, {common.CACHE_RESULT_KEY: result})
+        if result != "miss":
+            self.api_call_saved_counter.add(1)
+
+    def __key(self, tg_user_id: int) -> str:
+        return f"tg-bot:subscription:{tg_user_id}"
@@ -434,6 +434,26 @@ class AsyncHTTPClient:
         except Exception as err:
             raise
 
+    async def stream_lines(
+            self,
+            method: str,
+            url: str,
+            **kwargs
+    ) -> AsyncIterator[str]:
+        session = await self._get_session()
+
+        headers = {**self.default_headers, **kwargs.pop('headers', {})}
+        if self.use_tracing:
+            propagate.inject(headers)
+
+        try:
+            async with session.stream(method, url, headers=headers, **kwargs) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    yield line
+        except Exception as err:
+            raise
+
     async def download_file(
             self,
             url: str,
@@ -1,9 +1,4 @@
-import io
-
-import pdfkit
-import os
-from string import Template
-from PyPDF2 import PdfMerger
+import base64
 
 from aiogram.types import BufferedInputFile
 
@@ -19,9 +14,11 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
             self,
             tel: interface.ITelemetry,
             host: str,
-            port: int
+            port: int,
+            report_renderer: interface.IReportRenderer,
     ):
         self.logger = tel.logger()
+        self.report_renderer = report_renderer
         self.client = AsyncHTTPClient(
             host,
             port,
@@ -153,6 +150,62 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
+    async def calc_finance_model_finished_office_bundle(
+            self,
+            square: float,
+            price_per_meter: float,
+            need_repairs: int,
+            estate_category: str,
+            metro_station_name: str,
+            distance_to_metro: float,
+            nds_rate: int,
+    ) -> tuple[model.FinanceModelResponse, bytes]:
+        with self.tracer.start_as_current_span(
+                "WewallEstateCalculatorClient.calc_finance_model_finished_office_bundle",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "square": square,
+                    "price_per_meter": price_per_meter,
+                    "need_repairs": need_repairs,
+                    "estate_category": estate_category,
+                    "metro_station_name": metro_station_name,
+                    "distance_to_metro": distance_to_metro,
+                    "nds_rate": nds_rate,
+                }
+        ) as span:
+            try:
+                body = {
+                    "square": square,
+                    "price_per_meter": price_per_meter,
+                    "need_repairs": need_repairs,
+                    "metro_station_name": metro_station_name,
+                    "estate_category": estate_category,
+                    "distance_to_metro": distance_to_metro,
+                    "nds_rate": nds_rate,
+                }
+                response = await self.client.post("/finished/office/bundle", json=body)
+                json_response = response.json()
+
+                if response.status_code >= 500:
+                    raise Exception("Internal Server Error")
+                if response.status_code >= 400:
+                    if json_response.get("error_code") is not None:
+                        match json_response["error_code"]:
+                            case 4041:
+                                err = common.MetroStationNotFound(json_response.get("error"))
+                                span.record_exception(err)
+                                span.set_status(Status(StatusCode.ERROR, str(err)))
+                                raise err
+
+                    raise Exception(f"Client error: {response.status_code}")
+
+                span.set_status(Status(StatusCode.OK))
+                return self.__bundle_from_json(json_response)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
     async def calc_finance_model_finished_retail(
             self,
             square: float,
@@ -381,6 +434,71 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
 
+    async def calc_finance_model_building_office_bundle(
+            self,
+            project_readiness: str,
+            square: float,
+            metro_station_name: str,
+            distance_to_metro: float,
+            estate_category: str,
+            price_per_meter: float,
+            nds_rate: int,
+            transaction_dict: dict,
+    ) -> tuple[model.FinanceModelResponse, bytes]:
+        with self.tracer.start_as_current_span(
+                "WewallEstateCalculatorClient.calc_finance_model_building_office_bundle",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "project_readiness": project_readiness,
+                    "square": square,
+                    "metro_station_name": metro_station_name,
+                    "distance_to_metro": distance_to_metro,
+                    "estate_category": estate_category,
+                    "price_per_meter": price_per_meter,
+                    "nds_rate": nds_rate,
+                    "transaction_dict": transaction_dict
+                }
+        ) as span:
+            try:
+                body = {
+                    "project_readiness": project_readiness,
+                    "square": square,
+                    "metro_station_name": metro_station_name,
+                    "distance_to_metro": distance_to_metro,
+                    "estate_category": estate_category,
+                    "price_per_meter": price_per_meter,
+                    "nds_rate": nds_rate,
+                    "transaction_dict": transaction_dict,
+                }
+                response = await self.client.post("/building/office/bundle", json=body)
+                json_response = response.json()
+
+                if json_response.get("error") is not None:
+                    match json_response["error_code"]:
+                        case 4001:
+                            err = common.TransactionDictSumNotEqual100(json_response["error"])
+                            span.record_exception(err)
+                            span.set_status(Status(StatusCode.ERROR, str(err)))
+                            raise err
+
+                        case 4041:
+                            err = common.MetroStationNotFound(json_response.get("error"))
+                            span.record_exception(err)
+                            span.set_status(Status(StatusCode.ERROR, str(err)))
+                            raise err
+
+                if response.status_code >= 500:
+                    raise Exception("Internal Server Error")
+                if response.status_code >= 400:
+                    raise Exception(f"Client error: {response.status_code}")
+
+                span.set_status(Status(StatusCode.OK))
+                return self.__bundle_from_json(json_response)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
     async def calc_finance_model_building_retail(
             self,
             project_readiness: str,
@@ -539,33 +657,10 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
                 }
         ) as span:
             try:
-                BASE_DIR = os.path.abspath(
-                    "pkg/client/internal/wewall_estate_calculator/image_generator/html")
-
-                IMG_DIR = os.path.abspath(
-                    "pkg/client/internal/wewall_estate_calculator/image_generator/img/")
-
                 sale_analyse_text = await self.__analyse_text_by_irr(sale_irr, estate_type)
                 rent_analyse_text = await self.__analyse_text_by_irr(rent_irr, estate_type)
 
-                with open(os.path.join(BASE_DIR, "wewall_rent_template.html"), "r", encoding="utf-8") as file:
-                    wewall_rent_template = Template(file.read())
-                with open(os.path.join(BASE_DIR, "wewall_purchase_template.html"), "r", encoding="utf-8") as file:
-                    wewall_purchase_template = Template(file.read())
-                with open(os.path.join(BASE_DIR, "wewall_landing.html"), "r", encoding="utf-8") as file:
-                    wewall_landing_html = Template(file.read())
-
-                wewall_landing_html = wewall_landing_html.substitute()
-                wewall_purchase_html = wewall_purchase_template.substitute({
-                    "sale_analyse_text": sale_analyse_text,
-                    "irr": sale_irr,
-                    "income": sale_income,
-                    "purchase": buying_property,
-                    "estate_tax": sale_tax,
-                    "finish_price": sale_property,
-                    "extra_price": added_value,
-                })
-                wewall_rent_html = wewall_rent_template.substitute({
+                rent_page = {
                     "rent_analyse_text": rent_analyse_text,
                     "irr": rent_irr,
                     "income": rent_income,
@@ -576,57 +671,23 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
                     "finishing_price": terminal_value,
                     "invest_cycle": "6 ЛЕТ",
                     "invest_cycle_text": "С ДАТЫ ПОКУПКИ" if "finished" in estate_type else "С ДАТЫ ВВОДА",
-                })
-
-                wewall_landing_html = wewall_landing_html.replace('src="../img/', f'src="file://{IMG_DIR}/')
-                wewall_rent_html = wewall_rent_html.replace('src="../img/', f'src="file://{IMG_DIR}/')
-                wewall_purchase_html = wewall_purchase_html.replace('src="../img/', f'src="file://{IMG_DIR}/')
-
-                options = {
-                    'margin-top': '0',
-                    'margin-left': '0',
-                    'margin-right': '0',
-                    'margin-bottom': '0',
-                    'page-height': '12cm',
-                    'page-width': '8cm',
-                    'dpi': 300,
-                    '--enable-local-file-access': '',
-                    '--print-media-type': '',
                 }
-                if estate_type in (common.FinishStateCommand.estate_calculator_finished_retail,
-                                   common.FinishStateCommand.estate_calculator_finished_office):
-                    pdf_bytes_1 = pdfkit.from_string(wewall_landing_html, False, options=options)
-                    pdf_bytes_2 = pdfkit.from_string(wewall_rent_html, False, options=options)
-
-                    final_pdf_stream = io.BytesIO()
-
-                    merger = PdfMerger()
-                    merger.append(io.BytesIO(pdf_bytes_1))
-                    merger.append(io.BytesIO(pdf_bytes_2))
-                    merger.write(final_pdf_stream)
-                    merger.close()
-
-                else:
-                    pdf_bytes_1 = pdfkit.from_string(wewall_landing_html, False, options=options)  # Первая страница
-                    pdf_bytes_2 = pdfkit.from_string(wewall_rent_html, False, options=options)  # Вторая страница
-                    pdf_bytes_3 = pdfkit.from_string(wewall_purchase_html, False, options=options)  # Третья страница
-
-                    final_pdf_stream = io.BytesIO()
-
-                    merger = PdfMerger()
-                    merger.append(io.BytesIO(pdf_bytes_1))
-                    merger.append(io.BytesIO(pdf_bytes_2))
-                    merger.append(io.BytesIO(pdf_bytes_3))
-                    merger.write(final_pdf_stream)
-                    merger.close()
-
-                wewall_landing_html = wewall_landing_html.replace(f'src="file://{IMG_DIR}/', f'src="../img/')
-                wewall_rent_html = wewall_rent_html.replace(f'src="file://{IMG_DIR}/', f'src="../img/')
-                wewall_purchase_html = wewall_purchase_html.replace(f'src="file://{IMG_DIR}/', f'src="../img/')
-
-                final_pdf_stream.seek(0)
-
-                pdf_file = BufferedInputFile(final_pdf_stream.read(), filename="Отчет оценки доходности.pdf")
+                purchase_page = None
+                if estate_type not in (common.FinishStateCommand.estate_calculator_finished_retail,
+                                       common.FinishStateCommand.estate_calculator_finished_office):
+                    purchase_page = {
+                        "sale_analyse_text": sale_analyse_text,
+                        "irr": sale_irr,
+                        "income": sale_income,
+                        "purchase": buying_property,
+                        "estate_tax": sale_tax,
+                        "finish_price": sale_property,
+                        "extra_price": added_value,
+                    }
+
+                report_pdf = await self.report_renderer.render_finance_report(rent_page, purchase_page)
+
+                pdf_file = BufferedInputFile(report_pdf, filename="Отчет оценки доходности.pdf")
 
                 span.set_status(Status(StatusCode.OK))
                 return pdf_file
@@ -693,3 +754,10 @@ class WewallEstateCalculatorClient(interface.IWewallEstateCalculatorClient):
 
             return analyse_text
         return ""
+
+    @staticmethod
+    def __bundle_from_json(json_response: dict) -> tuple[model.FinanceModelResponse, bytes]:
+        return (
+            model.FinanceModelResponse(**json_response["finance_model"]),
+            base64.b64decode(json_response["xlsx"]),
+        )
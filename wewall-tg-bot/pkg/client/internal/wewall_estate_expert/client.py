@@ -1,3 +1,7 @@
+import json
+from contextlib import aclosing
+from typing import AsyncIterator
+
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import model,interface
@@ -76,6 +80,43 @@ class WewallEstateExpertClient(interface.IWewallEstateExpertClient):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
+    async def stream_message_to_estate_expert(self, tg_chat_id: int, text: str) -> AsyncIterator[str]:
+        with self.tracer.start_as_current_span(
+                "WewallEstateExpertClient.stream_message_to_estate_expert",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                    "text": text
+                }
+        ) as span:
+            try:
+                body = {"tg_chat_id": tg_chat_id, "text": text}
+
+                # Ответ приходит как text/event-stream: "event: ..." и "data: {json}", события разделены пустой строкой
+                event = "message"
+                # aclosing закрывает поток и возвращает соединение в пул сразу после "done", не дожидаясь сборщика мусора
+                async with aclosing(
+                        self.client.stream_lines("POST", "/message/send/tg/estate-expert/stream", json=body)
+                ) as lines:
+                    async for line in lines:
+                        if line.startswith("event:"):
+                            event = line[len("event:"):].strip()
+                        elif line.startswith("data:"):
+                            data = json.loads(line[len("data:"):].strip())
+                            if event == "error":
+                                raise Exception(f"LLM stream error: {data['error']}")
+                            if event == "done":
+                                break
+                            yield data["text"]
+                        elif not line:
+                            event = "message"
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
     async def send_message_to_estate_search_expert(self, tg_chat_id: int, text: str) -> str:
         with self.tracer.start_as_current_span(
                 "WewallEstateExpertClient.send_message_to_estate_search_expert",
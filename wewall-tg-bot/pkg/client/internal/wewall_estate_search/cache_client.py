@@ -0,0 +1,162 @@
+import asyncio
+
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import model, interface, common
+
+
+class WewallEstateSearchCacheClient(interface.IWewallEstateSearchClient):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            estate_search_client: interface.IWewallEstateSearchClient,
+            redis: interface.IRedis,
+            offer_ttl: int = 60 * 60,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
+
+        self.estate_search_client = estate_search_client
+        self.redis = redis
+        self.offer_ttl = offer_ttl
+
+        self.lookup_counter = self.meter.create_counter(
+            name=common.ESTATE_SEARCH_OFFER_CACHE_LOOKUP_TOTAL_METRIC,
+            description="Total count of estate search offer cache lookups by result",
+            unit="1"
+        )
+
+    async def find_rent_offer(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            irr: float,
+    ) -> model.FindRentOfferResponse:
+        with self.tracer.start_as_current_span(
+                "WewallEstateSearchCacheClient.find_rent_offer",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                rent_offers_result = await self.estate_search_client.find_rent_offer(
+                    type,
+                    budget,
+                    location,
+                    square,
+                    estate_class,
+                    distance_to_metro,
+                    design,
+                    readiness,
+                    irr,
+                )
+                # Найденные офферы сразу кладем в кеш, сессия поиска дальше хранит только их id
+                await self.__cache_offers(common.EstateSearchOfferType.rent, rent_offers_result.rent_offers)
+
+                span.set_status(Status(StatusCode.OK))
+                return rent_offers_result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def find_sale_offer(
+            self,
+            type: int,
+            budget: int,
+            location: int,
+            square: float,
+            estate_class: int,
+            distance_to_metro: int,
+            design: int,
+            readiness: int,
+            irr: float,
+    ) -> model.FindSaleOfferResponse:
+        with self.tracer.start_as_current_span(
+                "WewallEstateSearchCacheClient.find_sale_offer",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                sale_offers_result = await self.estate_search_client.find_sale_offer(
+                    type,
+                    budget,
+                    location,
+                    square,
+                    estate_class,
+                    distance_to_metro,
+                    design,
+                    readiness,
+                    irr,
+                )
+                await self.__cache_offers(common.EstateSearchOfferType.sale, sale_offers_result.sale_offers)
+
+                span.set_status(Status(StatusCode.OK))
+                return sale_offers_result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def offers_by_ids(self, offer_type: str, offer_ids: list[int]) -> list[model.SaleOffer | model.RentOffer]:
+        with self.tracer.start_as_current_span(
+                "WewallEstateSearchCacheClient.offers_by_ids",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "offer_type": offer_type,
+                    "offer_ids": offer_ids,
+                }
+        ) as span:
+            try:
+                cached_offers = await asyncio.gather(*[
+                    self.redis.get(self.__key(offer_type, offer_id))
+                    for offer_id in offer_ids
+                ])
+
+                offers = {}
+                missed_offer_ids = []
+                for offer_id, offer_dict in zip(offer_ids, cached_offers):
+                    if offer_dict is None:
+                        missed_offer_ids.append(offer_id)
+                    else:
+                        offers[offer_id] = self.__offer(offer_type, offer_dict)
+
+                if offers:
+                    self.lookup_counter.add(len(offers), {common.CACHE_RESULT_KEY: "hit"})
+                if missed_offer_ids:
+                    self.lookup_counter.add(len(missed_offer_ids), {common.CACHE_RESULT_KEY: "miss"})
+
+                    fetched_offers = await self.estate_search_client.offers_by_ids(offer_type, missed_offer_ids)
+                    await self.__cache_offers(offer_type, fetched_offers)
+                    offers.update({offer.id: offer for offer in fetched_offers})
+
+                span.set_attribute("missed_offers", len(missed_offer_ids))
+                span.set_status(Status(StatusCode.OK))
+                return [offers[offer_id] for offer_id in offer_ids if offer_id in offers]
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def __cache_offers(self, offer_type: str, offers: list[model.SaleOffer | model.RentOffer]):
+        # estate_id в оффере из кеша не используется: номер здания внутри подборки хранит сессия поиска
+        try:
+            await asyncio.gather(*[
+                self.redis.set(self.__key(offer_type, offer.id), offer.to_dict(), self.offer_ttl)
+                for offer in offers
+            ])
+        except Exception as err:
+            # Без кеша оффер просто запросится у сервиса поиска еще раз
+            self.logger.warning(f"Не удалось сохранить офферы в Redis: {err}")
+
+    def __offer(self, offer_type: str, offer_dict: dict) -> model.SaleOffer | model.RentOffer:
+        if offer_type == common.EstateSearchOfferType.rent:
+            return model.RentOffer(offer_dict)
+        return model.SaleOffer(offer_dict)
+
+    def __key(self, offer_type: str, offer_id: int) -> str:
+        return f"tg-bot:estate-search-offer:{offer_type}:{offer_id}"
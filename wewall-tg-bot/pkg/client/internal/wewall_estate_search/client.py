@@ -1,6 +1,6 @@
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
-from internal import model, interface
+from internal import model, interface, common
 
 from pkg.client.client import AsyncHTTPClient
 
@@ -131,4 +131,36 @@ class WewallEstateSearchClient(interface.IWewallEstateSearchClient):
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
-                raise err
\ No newline at end of file
+                raise err
+
+    async def offers_by_ids(self, offer_type: str, offer_ids: list[int]) -> list[model.SaleOffer | model.RentOffer]:
+        with self.tracer.start_as_current_span(
+                "WewallEstateSearchClient.offers_by_ids",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "offer_type": offer_type,
+                    "offer_ids": offer_ids,
+                }
+        ) as span:
+            try:
+                body = {"ids": offer_ids}
+
+                response = await self.client.post(f"/{offer_type}/by-ids", json=body)
+                json_response = response.json()
+
+                if response.status_code >= 500:
+                    raise Exception("Internal Server Error")
+                if response.status_code >= 400:
+                    raise Exception(f"Client error {response.status_code}: {json_response['message']}")
+
+                if offer_type == common.EstateSearchOfferType.rent:
+                    offers = [model.RentOffer(offer) for offer in json_response["rent_offers"]]
+                else:
+                    offers = [model.SaleOffer(offer) for offer in json_response["sale_offers"]]
+
+                span.set_status(Status(StatusCode.OK))
+                return offers
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
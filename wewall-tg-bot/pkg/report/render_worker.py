@@ -0,0 +1,27 @@
+import io
+
+import pdfkit
+from PyPDF2 import PdfMerger
+
+
+# Модуль импортируется в процессах пула, поэтому здесь только то, что нужно для рендера
+
+def warm_up():
+    # Процесс прогревается самим импортом модуля: pdfkit и PyPDF2 уже загружены
+    pass
+
+
+def render_pdf(html: str, options: dict) -> bytes:
+    return pdfkit.from_string(html, False, options=options)
+
+
+def merge_pdfs(pdfs: list[bytes]) -> bytes:
+    final_pdf_stream = io.BytesIO()
+
+    merger = PdfMerger()
+    for pdf in pdfs:
+        merger.append(io.BytesIO(pdf))
+    merger.write(final_pdf_stream)
+    merger.close()
+
+    return final_pdf_stream.getvalue()
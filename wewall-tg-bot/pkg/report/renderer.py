@@ -0,0 +1,174 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from string import Template
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import interface, common
+from pkg.report import render_worker
+
+IMAGE_GENERATOR_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "client/internal/wewall_estate_calculator/image_generator"
+)
+HTML_DIR = os.path.join(IMAGE_GENERATOR_DIR, "html")
+IMG_DIR = os.path.join(IMAGE_GENERATOR_DIR, "img")
+
+
+class ReportRenderer(interface.IReportRenderer):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            max_workers: int = 2,
+            html_dir: str = HTML_DIR,
+            img_dir: str = IMG_DIR,
+    ):
+        self.tracer = tel.tracer()
+        self.logger = tel.logger()
+        self.meter = tel.meter()
+
+        self.max_workers = max_workers
+
+        # Шаблоны читаются и разбираются один раз, пути к картинкам подставляются сразу
+        img_src = f'src="file://{os.path.abspath(img_dir)}/'
+        self.templates = {
+            name: Template(self.__read_template(os.path.join(html_dir, f"{name}.html")).replace('src="../img/', img_src))
+            for name in ("wewall_landing", "wewall_rent_template", "wewall_purchase_template")
+        }
+        self.options = {
+            'margin-top': '0',
+            'margin-left': '0',
+            'margin-right': '0',
+            'margin-bottom': '0',
+            'page-height': '12cm',
+            'page-width': '8cm',
+            'dpi': 300,
+            '--enable-local-file-access': '',
+            '--print-media-type': '',
+        }
+
+        # wkhtmltopdf и склейка PDF уходят в отдельные процессы, event loop в это время обслуживает остальные апдейты
+        self.pool: ProcessPoolExecutor | None = None
+        # Первая страница одинаковая во всех отчетах, рендерим ее один раз за жизнь процесса
+        self.landing_pdf: asyncio.Task | None = None
+
+        self.stage_duration = self.meter.create_histogram(
+            name=common.REPORT_RENDER_STAGE_DURATION_METRIC,
+            description="Report rendering stage duration in seconds",
+            unit="s"
+        )
+
+    async def start(self) -> None:
+        with self.tracer.start_as_current_span(
+                "ReportRenderer.start",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                await asyncio.gather(*[
+                    self.__run(render_worker.warm_up)
+                    for _ in range(self.max_workers)
+                ])
+                await self.__landing_pdf()
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    async def render_finance_report(self, rent_page: dict, purchase_page: dict | None) -> bytes:
+        with self.tracer.start_as_current_span(
+                "ReportRenderer.render_finance_report",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "pages": 3 if purchase_page is not None else 2,
+                }
+        ) as span:
+            try:
+                start_time = time.perf_counter()
+
+                stage_start_time = time.perf_counter()
+                htmls = [self.templates["wewall_rent_template"].substitute(rent_page)]
+                if purchase_page is not None:
+                    htmls.append(self.templates["wewall_purchase_template"].substitute(purchase_page))
+                self.__record_stage("template", stage_start_time)
+
+                stage_start_time = time.perf_counter()
+                pdfs = await asyncio.gather(
+                    self.__landing_pdf(),
+                    *[self.__run(render_worker.render_pdf, html, self.options) for html in htmls]
+                )
+                self.__record_stage("pages", stage_start_time)
+
+                stage_start_time = time.perf_counter()
+                report_pdf = await self.__run(render_worker.merge_pdfs, pdfs)
+                self.__record_stage("merge", stage_start_time)
+
+                self.__record_stage("total", start_time)
+
+                span.set_status(Status(StatusCode.OK))
+                return report_pdf
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def __landing_pdf(self) -> bytes:
+        if self.landing_pdf is None:
+            self.landing_pdf = asyncio.create_task(self.__render_landing_pdf())
+
+        landing_pdf = self.landing_pdf
+        try:
+            return await asyncio.shield(landing_pdf)
+        except Exception:
+            # Неудачный рендер не кешируем, следующий отчет попробует снова
+            if landing_pdf.done() and self.landing_pdf is landing_pdf:
+                self.landing_pdf = None
+            raise
+
+    async def __render_landing_pdf(self) -> bytes:
+        stage_start_time = time.perf_counter()
+        landing_pdf = await self.__run(render_worker.render_pdf, self.templates["wewall_landing"].substitute(), self.options)
+        self.__record_stage("landing", stage_start_time)
+
+        self.logger.info("Первая страница отчета отрендерена")
+        return landing_pdf
+
+    async def __run(self, fn, *args):
+        pool = self.__pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # Воркер умер (OOM, падение wkhtmltopdf), сломанный пул больше не принимает задачи.
+            # Сбрасываем его, следующий рендер поднимет новый
+            if self.pool is pool:
+                self.logger.error("Пул рендера отчетов сломан, пересоздаем")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+            raise
+
+    def __pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            # spawn, а не fork: родитель многопоточный (OTel экспортеры, пул БД)
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=render_worker.warm_up,
+            )
+        return self.pool
+
+    def __record_stage(self, stage: str, start_time: float):
+        self.stage_duration.record(time.perf_counter() - start_time, {common.REPORT_RENDER_STAGE_KEY: stage})
+
+    def __read_template(self, path: str) -> str:
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
@@ -0,0 +1,30 @@
+import asyncio
+
+from internal import interface
+
+
+class StateFlushWorker(interface.IStateFlushWorker):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            state_cache_repo: interface.IStateCacheRepo,
+            flush_interval: float = 10,
+            batch_size: int = 500,
+    ):
+        self.logger = tel.logger()
+        self.state_cache_repo = state_cache_repo
+
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+    async def flush_counters(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush_all_counters()
+            except Exception as e:
+                self.logger.error(f"Ошибка в воркере сброса счетчиков состояний: {e}")
+
+    async def flush_all_counters(self):
+        while await self.state_cache_repo.flush_counters(self.batch_size) >= self.batch_size:
+            pass
@@ -50,6 +50,8 @@ def mocks(mock_tel, mock_bot):
         'chat_client': AsyncMock(spec=interface.IWewallChatClient),
         'wewall_expert_inline_keyboard_generator': AsyncMock(spec=interface.IWewallExpertInlineKeyboardGenerator),
         'state_service': AsyncMock(spec=interface.IStateService),
+        'subscription_service': AsyncMock(spec=interface.ISubscriptionService),
+        "redis": AsyncMock(spec=interface.IRedis),
         'estate_search_callback_service': AsyncMock(spec=interface.IEstateSearchCallbackService),
         'amocrm_manager_message_service': AsyncMock(spec=interface.IAmoCrmManagerMessageService),
         'wewall_expert_message_service': AsyncMock(spec=interface.IWewallExpertMessageService),
@@ -60,6 +62,8 @@ def mocks(mock_tel, mock_bot):
         'contact_collector_message_service': AsyncMock(spec=interface.IContactCollectorMessageService),
         "state_repo": AsyncMock(spec=interface.IStateRepo),
         "estate_calculator_client": AsyncMock(spec=interface.IWewallEstateCalculatorClient),
+        "finance_model_cache": AsyncMock(spec=interface.IFinanceModelCache),
+        "offer_prefetcher": MagicMock(spec=interface.IOfferPrefetcher),
         "estate_search_state_repo": AsyncMock(spec=interface.IEstateSearchStateRepo),
         "estate_search_client": AsyncMock(spec=interface.IWewallEstateSearchClient),
         "estate_search_inline_keyboard_generator": AsyncMock(spec=interface.IEstateSearchInlineKeyboardGenerator),
@@ -2,9 +2,8 @@ import pytest
 from unittest.mock import MagicMock, call
 
 from opentelemetry.trace import SpanKind
-from aiogram.types import BufferedInputFile, InputMediaDocument
 
-from internal import common
+from internal import common, model
 from internal.service.estate_search.callback_service import EstateSearchCallbackService
 from tests.unit import utils
 
@@ -19,7 +18,9 @@ class TestEstateSearchCallbackService:
             estate_search_state_repo=mocks["estate_search_state_repo"],
             chat_client=mocks["chat_client"],
             estate_expert_client=mocks["estate_expert_client"],
-            estate_calculator_client=mocks["estate_calculator_client"],
+            estate_search_client=mocks["estate_search_client"],
+            finance_model_cache=mocks["finance_model_cache"],
+            offer_prefetcher=mocks["offer_prefetcher"],
             estate_search_inline_keyboard_generator=mocks["estate_search_inline_keyboard_generator"],
             llm_client=mocks["llm_client"],
         )
@@ -112,25 +113,22 @@ class TestEstateSearchCallbackService:
 
         #  __calc_sale_office_finance_model
         calc_resp = utils.create_finance_model_response()
-        mocks["estate_calculator_client"].calc_finance_model_finished_office.return_value = calc_resp
-
-        xlsx_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].calc_finance_model_finished_office_table.return_value = xlsx_file_mock
-
-        pdf_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].generate_pdf.return_value = pdf_file_mock
-
-        document_media_group = [InputMediaDocument(media=pdf_file_mock), InputMediaDocument(media=xlsx_file_mock)]
+        mocks["finance_model_cache"].finished_office_bundle.return_value = model.FinanceModelBundle(
+            finance_model=calc_resp,
+            xlsx=b"xlsx",
+            pdf=b"pdf",
+        )
 
         # __nearest_metro
-        offer = estate_search_state[0].offers[estate_search_state[0].current_offer_id + 1]
+        offer = utils.create_offer("Покупка", "Офис")
+        mocks["estate_search_client"].offers_by_ids.return_value = [offer]
         metro_distances = [metro.leg_distance for metro in offer.metro_stations]
         nearest_metro_distance = min(metro_distances)
         nearest_metro_idx = metro_distances.index(nearest_metro_distance)
 
         # __generate_offer_text
         offer_text = "Предложение на улице 123"
-        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.sale_offer_link
+        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.link
         mocks["llm_client"].generate.return_value = offer_text
 
         # Act
@@ -148,7 +146,9 @@ class TestEstateSearchCallbackService:
         ])
 
         callback_query.message.answer.assert_awaited_once_with(offer_text, reply_markup=keyboard_mock)
-        callback_query.message.answer_media_group.assert_awaited_once_with(document_media_group)
+        [pdf_media, xlsx_media] = callback_query.message.answer_media_group.await_args.args[0]
+        assert pdf_media.media.data == b"pdf"
+        assert xlsx_media.media.data == b"xlsx"
 
         mocks["chat_client"].import_message_to_amocrm.assert_awaited_once_with(
             callback_query.message.chat.id,
@@ -158,9 +158,11 @@ class TestEstateSearchCallbackService:
         tracer = estate_search_callback_service.tracer
         utils.assert_span(tracer, [
             {"name": "EstateSearchCallbackService.next_offer"},
-            {"name": "EstateSearchCallbackService.__calc_sale_office_finance_model"},
+            {"name": "EstateSearchCallbackService.__get_finance_model"},
+            {"name": "EstateSearchMessageService.__calc_sale_finished_office_finance_model"},
             {"name": "EstateSearchCallbackService.__nearest_metro"},
-            {"name": "EstateSearchCallbackService.__generate_offer_text"}
+            {"name": "EstateSearchCallbackService.__generate_offer_text"},
+            {"name": "EstateSearchMessageService.__generate_offer_keyboard"}
         ])
 
     async def test_handler_next_last_sale_offer_office_err(
@@ -187,6 +189,79 @@ class TestEstateSearchCallbackService:
         tracer = estate_search_callback_service.tracer
         utils.assert_span_error(tracer, err, 1)
 
+    async def test_handler_next_offer_expired_session(
+            self,
+            estate_search_callback_service,
+            mocks
+    ):
+        # Arrange
+        state = utils.create_state(common.StateStatuses.estate_search)
+        callback_query = utils.create_callback_query(
+            common.EstateSearchKeyboardCallbackData.next_offer + ":1",
+            "Следующее предложение"
+        )
+        mocks["estate_search_state_repo"].estate_search_state_by_state_id.return_value = []
+
+        # Act
+        await estate_search_callback_service.next_offer(callback_query, state)
+
+        # Assert
+        callback_query.message.answer.assert_awaited_once_with(common.estate_search_expired_text)
+        mocks["estate_search_state_repo"].change_current_offer_by_state_id.assert_not_awaited()
+        mocks["estate_search_client"].offers_by_ids.assert_not_awaited()
+
+    async def test_handler_next_offer_removed_offer(
+            self,
+            estate_search_callback_service,
+            mocks
+    ):
+        # Arrange
+        state = utils.create_state(common.StateStatuses.estate_search)
+        callback_query = utils.create_callback_query(
+            common.EstateSearchKeyboardCallbackData.next_offer + ":1",
+            "Следующее предложение"
+        )
+        mocks["estate_search_state_repo"].estate_search_state_by_state_id.return_value = [
+            utils.create_estate_search_state("Покупка", "Офис", 3)
+        ]
+        mocks["estate_search_client"].offers_by_ids.return_value = []
+
+        # Act
+        await estate_search_callback_service.next_offer(callback_query, state)
+
+        # Assert
+        callback_query.message.answer.assert_awaited_once_with(common.estate_search_expired_text)
+        mocks["chat_client"].import_message_to_amocrm.assert_awaited_once_with(
+            callback_query.message.chat.id,
+            common.estate_search_expired_text
+        )
+        mocks["finance_model_cache"].finished_office_bundle.assert_not_awaited()
+        mocks["offer_prefetcher"].prefetch.assert_not_called()
+
+    async def test_handle_like_offer_removed_offer(
+            self,
+            estate_search_callback_service,
+            mocks
+    ):
+        # Arrange
+        state = utils.create_state(common.StateStatuses.estate_search)
+        callback_query = utils.create_callback_query(
+            common.EstateSearchKeyboardCallbackData.like_offer + ":1",
+            "Записаться на просмотр"
+        )
+        mocks["estate_search_state_repo"].estate_search_state_by_state_id.return_value = [
+            utils.create_estate_search_state("Покупка", "Офис", 3)
+        ]
+        mocks["estate_search_client"].offers_by_ids.return_value = []
+
+        # Act
+        await estate_search_callback_service.like_offer(callback_query, state, 1)
+
+        # Assert
+        callback_query.message.answer.assert_awaited_once_with(common.estate_search_expired_text)
+        mocks["state_repo"].change_status.assert_not_awaited()
+        mocks["estate_expert_client"].send_message_to_contact_collector.assert_not_awaited()
+
     async def test_handler_next_middle_sale_offer_office(
             self,
             estate_search_callback_service,
@@ -208,25 +283,22 @@ class TestEstateSearchCallbackService:
 
         #  __calc_sale_office_finance_model
         calc_resp = utils.create_finance_model_response()
-        mocks["estate_calculator_client"].calc_finance_model_finished_office.return_value = calc_resp
-
-        xlsx_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].calc_finance_model_finished_office_table.return_value = xlsx_file_mock
-
-        pdf_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].generate_pdf.return_value = pdf_file_mock
-
-        document_media_group = [InputMediaDocument(media=pdf_file_mock), InputMediaDocument(media=xlsx_file_mock)]
+        mocks["finance_model_cache"].finished_office_bundle.return_value = model.FinanceModelBundle(
+            finance_model=calc_resp,
+            xlsx=b"xlsx",
+            pdf=b"pdf",
+        )
 
         # __nearest_metro
-        offer = estate_search_state[0].offers[estate_search_state[0].current_offer_id + 1]
+        offer = utils.create_offer("Покупка", "Офис")
+        mocks["estate_search_client"].offers_by_ids.return_value = [offer]
         metro_distances = [metro.leg_distance for metro in offer.metro_stations]
         nearest_metro_distance = min(metro_distances)
         nearest_metro_idx = metro_distances.index(nearest_metro_distance)
 
         # __generate_offer_text
         offer_text = "Предложение на улице 123"
-        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.sale_offer_link
+        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.link
         mocks["llm_client"].generate.return_value = offer_text
 
         # Act
@@ -244,7 +316,9 @@ class TestEstateSearchCallbackService:
         ])
 
         callback_query.message.answer.assert_awaited_once_with(offer_text, reply_markup=keyboard_mock)
-        callback_query.message.answer_media_group.assert_awaited_once_with(document_media_group)
+        [pdf_media, xlsx_media] = callback_query.message.answer_media_group.await_args.args[0]
+        assert pdf_media.media.data == b"pdf"
+        assert xlsx_media.media.data == b"xlsx"
 
         mocks["chat_client"].import_message_to_amocrm.assert_awaited_once_with(
             callback_query.message.chat.id,
@@ -296,25 +370,22 @@ class TestEstateSearchCallbackService:
 
         #  __calc_sale_office_finance_model
         calc_resp = utils.create_finance_model_response()
-        mocks["estate_calculator_client"].calc_finance_model_finished_retail.return_value = calc_resp
-
-        xlsx_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].calc_finance_model_finished_retail_table.return_value = xlsx_file_mock
-
-        pdf_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].generate_pdf.return_value = pdf_file_mock
-
-        document_media_group = [InputMediaDocument(media=pdf_file_mock), InputMediaDocument(media=xlsx_file_mock)]
+        mocks["finance_model_cache"].finished_office_bundle.return_value = model.FinanceModelBundle(
+            finance_model=calc_resp,
+            xlsx=b"xlsx",
+            pdf=b"pdf",
+        )
 
         # __nearest_metro
-        offer = estate_search_state[0].offers[estate_search_state[0].current_offer_id + 1]
+        offer = utils.create_offer("Покупка", "Ритейл")
+        mocks["estate_search_client"].offers_by_ids.return_value = [offer]
         metro_distances = [metro.leg_distance for metro in offer.metro_stations]
         nearest_metro_distance = min(metro_distances)
         nearest_metro_idx = metro_distances.index(nearest_metro_distance)
 
         # __generate_offer_text
         offer_text = "Предложение на улице 123"
-        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.sale_offer_link
+        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.link
         mocks["llm_client"].generate.return_value = offer_text
 
         # Act
@@ -332,7 +403,9 @@ class TestEstateSearchCallbackService:
         ])
 
         callback_query.message.answer.assert_awaited_once_with(offer_text, reply_markup=keyboard_mock)
-        callback_query.message.answer_media_group.assert_awaited_once_with(document_media_group)
+        [pdf_media, xlsx_media] = callback_query.message.answer_media_group.await_args.args[0]
+        assert pdf_media.media.data == b"pdf"
+        assert xlsx_media.media.data == b"xlsx"
 
         mocks["chat_client"].import_message_to_amocrm.assert_awaited_once_with(
             callback_query.message.chat.id,
@@ -384,25 +457,22 @@ class TestEstateSearchCallbackService:
 
         #  __calc_sale_office_finance_model
         calc_resp = utils.create_finance_model_response()
-        mocks["estate_calculator_client"].calc_finance_model_finished_retail.return_value = calc_resp
-
-        xlsx_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].calc_finance_model_finished_retail_table.return_value = xlsx_file_mock
-
-        pdf_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].generate_pdf.return_value = pdf_file_mock
-
-        document_media_group = [InputMediaDocument(media=pdf_file_mock), InputMediaDocument(media=xlsx_file_mock)]
+        mocks["finance_model_cache"].finished_office_bundle.return_value = model.FinanceModelBundle(
+            finance_model=calc_resp,
+            xlsx=b"xlsx",
+            pdf=b"pdf",
+        )
 
         # __nearest_metro
-        offer = estate_search_state[0].offers[estate_search_state[0].current_offer_id + 1]
+        offer = utils.create_offer("Покупка", "Ритейл")
+        mocks["estate_search_client"].offers_by_ids.return_value = [offer]
         metro_distances = [metro.leg_distance for metro in offer.metro_stations]
         nearest_metro_distance = min(metro_distances)
         nearest_metro_idx = metro_distances.index(nearest_metro_distance)
 
         # __generate_offer_text
         offer_text = "Предложение на улице 123"
-        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.sale_offer_link
+        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.link
         mocks["llm_client"].generate.return_value = offer_text
 
         # Act
@@ -420,7 +490,9 @@ class TestEstateSearchCallbackService:
         ])
 
         callback_query.message.answer.assert_awaited_once_with(offer_text, reply_markup=keyboard_mock)
-        callback_query.message.answer_media_group.assert_awaited_once_with(document_media_group)
+        [pdf_media, xlsx_media] = callback_query.message.answer_media_group.await_args.args[0]
+        assert pdf_media.media.data == b"pdf"
+        assert xlsx_media.media.data == b"xlsx"
 
         mocks["chat_client"].import_message_to_amocrm.assert_awaited_once_with(
             callback_query.message.chat.id,
@@ -471,10 +543,11 @@ class TestEstateSearchCallbackService:
         mocks["estate_search_inline_keyboard_generator"].last_offer.return_value = keyboard_mock
 
         # __generate_offer_text
-        offer = estate_search_state[0].offers[estate_search_state[0].current_offer_id + 1]
+        offer = utils.create_offer("Аренда", "Ритейл")
+        mocks["estate_search_client"].offers_by_ids.return_value = [offer]
 
         offer_text = "Предложение на улице 123"
-        offer_text_with_link = offer.rent_offer_link
+        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.link
         mocks["llm_client"].generate.return_value = offer_text
 
         # Act
@@ -542,10 +615,11 @@ class TestEstateSearchCallbackService:
         mocks["estate_search_inline_keyboard_generator"].middle_offer.return_value = keyboard_mock
 
         # __generate_offer_text
-        offer = estate_search_state[0].offers[estate_search_state[0].current_offer_id + 1]
+        offer = utils.create_offer("Аренда", "Офис")
+        mocks["estate_search_client"].offers_by_ids.return_value = [offer]
 
         offer_text = "Предложение на улице 123"
-        offer_text_with_link = offer.rent_offer_link
+        offer_text_with_link = offer_text + '\n\nСсылка для саммари для менеджера, а не клиента: ' + offer.link
         mocks["llm_client"].generate.return_value = offer_text
 
         # Act
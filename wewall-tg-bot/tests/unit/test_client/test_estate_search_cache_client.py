@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock
+
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+
+from internal import common, model
+from pkg.client.internal.wewall_estate_search.cache_client import WewallEstateSearchCacheClient
+
+from tests.unit import utils
+
+
+def create_offer_dict(offer_id: int, estate_id: int) -> dict:
+    return {
+        "id": offer_id,
+        "estate_id": estate_id,
+        "estate_name": "Бизнес-центр",
+        "estate_category": "B+",
+        "estate_address": "Москва, ул. Тверская 1",
+        "estate_coords": {"lat": 55.75, "lon": 37.61},
+        "metro_stations": [
+            {"name": "Тверская", "time_leg": 10, "time_car": 5, "leg_distance": 800, "car_distance": 1200},
+        ],
+        "link": f"https://wewall.ru/offer/{offer_id}",
+        "name": f"Офис {offer_id}",
+        "square": 120.5,
+        "price": 36000000,
+        "price_per_meter": 300000,
+        "design": 1,
+        "floor": 5,
+        "type": 1,
+        "image_urls": [f"https://img.wewall.ru/{offer_id}/1.jpg"],
+        "offer_readiness": 1,
+        "readiness_date": "4Q2026",
+        "description": "Офис с отделкой",
+    }
+
+
+class TestWewallEstateSearchCacheClient:
+
+    @pytest.fixture
+    def metric_reader(self):
+        return InMemoryMetricReader()
+
+    @pytest.fixture
+    def redis(self):
+        return utils.FakeRedis()
+
+    @pytest.fixture
+    def cache_client(self, mocks, redis, metric_reader):
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("test")
+        tel.meter.return_value = MeterProvider(metric_readers=[metric_reader]).get_meter("test")
+        tel.logger.return_value = MagicMock()
+
+        return WewallEstateSearchCacheClient(
+            tel=tel,
+            estate_search_client=mocks["estate_search_client"],
+            redis=redis,
+        )
+
+    def lookups(self, metric_reader) -> dict:
+        return {
+            point.attributes[common.CACHE_RESULT_KEY]: point.value
+            for point in utils.collect_metric_points(metric_reader, {common.ESTATE_SEARCH_OFFER_CACHE_LOOKUP_TOTAL_METRIC})
+        }
+
+    async def test_found_offers_are_served_from_cache(self, mocks, cache_client, metric_reader):
+        # Arrange
+        mocks["estate_search_client"].find_sale_offer.return_value = model.FindSaleOfferResponse(
+            [create_offer_dict(10, 7), create_offer_dict(11, 7)]
+        )
+        await cache_client.find_sale_offer(1, 30000000, 1, 100, 1, 1000, 1, 1, 10)
+
+        # Act
+        offers = await cache_client.offers_by_ids(common.EstateSearchOfferType.sale, [11])
+
+        # Assert
+        assert [offer.id for offer in offers] == [11]
+        assert isinstance(offers[0], model.SaleOffer)
+        mocks["estate_search_client"].offers_by_ids.assert_not_awaited()
+        assert self.lookups(metric_reader) == {"hit": 1}
+
+    async def test_misses_are_fetched_in_one_request_and_cached(self, mocks, cache_client, redis, metric_reader):
+        # Arrange
+        await redis.set("tg-bot:estate-search-offer:sale:1", create_offer_dict(1, 3))
+        mocks["estate_search_client"].offers_by_ids.return_value = [
+            model.SaleOffer(create_offer_dict(2, 3)),
+            model.SaleOffer(create_offer_dict(4, 5)),
+        ]
+
+        # Act
+        offers = await cache_client.offers_by_ids(common.EstateSearchOfferType.sale, [4, 1, 2])
+        await cache_client.offers_by_ids(common.EstateSearchOfferType.sale, [2, 4])
+
+        # Assert
+        assert [offer.id for offer in offers] == [4, 1, 2]
+        mocks["estate_search_client"].offers_by_ids.assert_awaited_once_with(common.EstateSearchOfferType.sale, [4, 2])
+        assert redis.ttls["tg-bot:estate-search-offer:sale:4"] == cache_client.offer_ttl
+        assert self.lookups(metric_reader) == {"hit": 3, "miss": 2}
+
+    async def test_offer_types_do_not_collide(self, mocks, cache_client, redis):
+        # Arrange
+        await redis.set("tg-bot:estate-search-offer:sale:1", create_offer_dict(1, 3))
+        mocks["estate_search_client"].offers_by_ids.return_value = []
+
+        # Act
+        offers = await cache_client.offers_by_ids(common.EstateSearchOfferType.rent, [1])
+
+        # Assert
+        assert offers == []
+        mocks["estate_search_client"].offers_by_ids.assert_awaited_once_with(common.EstateSearchOfferType.rent, [1])
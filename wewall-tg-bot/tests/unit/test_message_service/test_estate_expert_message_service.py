@@ -19,6 +19,8 @@ class TestEstateExpertMessageService:
             chat_client=mocks["chat_client"],
             wewall_expert_inline_keyboard_generator=mocks["wewall_expert_inline_keyboard_generator"],
             amocrm_appeal_pipeline_id=5353,
+            amocrm_pipeline_status_chat_with_manager=common.AmocrmPipelineStatus.chat_with_manager,
+            stream_edit_interval=0,
         )
 
     async def test_handler_simple_llm_response(
@@ -31,18 +33,19 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Рынок недвижимости в Москве показывает стабильный рост..."
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # Act
         await estate_expert_message_service.handler(message, state)
 
         # Assert
-        mocks["estate_expert_client"].send_message_to_estate_expert.assert_awaited_once_with(
+        mocks["estate_expert_client"].stream_message_to_estate_expert.assert_called_once_with(
             message.chat.id,
             message.text
         )
 
-        message.answer.assert_awaited_once_with(llm_response)
+        message.answer.assert_awaited_once_with(common.llm_response_placeholder_text)
+        message.answer.return_value.edit_text.assert_awaited_once_with(llm_response)
 
         mocks["chat_client"].import_message_to_amocrm.assert_awaited_once_with(
             message.chat.id,
@@ -50,7 +53,10 @@ class TestEstateExpertMessageService:
         )
 
         tracer = estate_expert_message_service.tracer
-        utils.assert_span(tracer, [{"name": "EstateExpertMessageService.handler"}])
+        utils.assert_span(tracer, [
+            {"name": "EstateExpertMessageService.handler"},
+            {"name": "EstateExpertMessageService.__stream_answer"}
+        ])
 
     async def test_handler_simple_llm_response_error(
             self,
@@ -62,15 +68,43 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         err = Exception("Ошибка при отправке сообщения estate_expert_client")
-        mocks["estate_expert_client"].send_message_to_estate_expert.side_effect = err
+        mocks["estate_expert_client"].stream_message_to_estate_expert.side_effect = err
 
         # Act
         with pytest.raises(Exception, match="Ошибка при отправке сообщения estate_expert_client"):
             await estate_expert_message_service.handler(message, state)
 
         # Assert
+        message.answer.return_value.delete.assert_awaited_once()
+
         tracer = estate_expert_message_service.tracer
-        utils.assert_span_error(tracer, err, 1)
+        utils.assert_span_error(tracer, err, 2)
+
+    async def test_handler_streams_llm_response(
+            self,
+            mocks,
+            estate_expert_message_service,
+    ):
+        # Arrange
+        message = utils.create_message("Расскажи про рынок недвижимости")
+        state = utils.create_state(common.StateStatuses.estate_expert)
+
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(
+            "Рынок ", "растет", ". Подробнее расскажет менеджер sw", "itch_to_manager"
+        )
+
+        # Act
+        await estate_expert_message_service.handler(message, state)
+
+        # Assert
+        placeholder = message.answer.return_value
+        placeholder.edit_text.assert_has_awaits([
+            call("Рынок "),
+            call("Рынок растет"),
+            call("Рынок растет. Подробнее расскажет менеджер "),
+        ])
+        placeholder.delete.assert_awaited_once()
+        mocks["estate_expert_client"].summary.assert_awaited_once_with(message.chat.id)
 
     async def test_handler_to_manager_llm_response(
             self,
@@ -82,7 +116,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Здравствуйте! хорошо." + common.StateSwitchCommand.to_manager
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_manager
         chat_summary = "Краткое резюме диалога с клиентом о недвижимости"
@@ -98,7 +132,7 @@ class TestEstateExpertMessageService:
         await estate_expert_message_service.handler(message, state)
 
         # Assert
-        mocks["estate_expert_client"].send_message_to_estate_expert.assert_awaited_once_with(
+        mocks["estate_expert_client"].stream_message_to_estate_expert.assert_called_once_with(
             message.chat.id,
             message.text
         )
@@ -127,6 +161,7 @@ class TestEstateExpertMessageService:
         ])
 
         message.answer.assert_has_awaits([
+            call(common.llm_response_placeholder_text),
             call(common.manger_is_connecting_text),
             call(wewall_expert_response, reply_markup=keyboard_mock)
         ])
@@ -139,6 +174,7 @@ class TestEstateExpertMessageService:
         tracer = estate_expert_message_service.tracer
         utils.assert_span(tracer, [
             {"name": "EstateExpertMessageService.handler"},
+            {"name": "EstateExpertMessageService.__stream_answer"},
             {"name": "EstateExpertMessageService.__to_manager"}
         ])
 
@@ -152,7 +188,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Хорошо, подключаю менеджера. " + common.StateSwitchCommand.to_manager
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_manager
         err = Exception("Ошибка __to_manager")
@@ -163,7 +199,7 @@ class TestEstateExpertMessageService:
 
         # Assert
         tracer = estate_expert_message_service.tracer
-        utils.assert_span_error(tracer, err, 2)
+        utils.assert_span_error(tracer, err, 2, ok_count=1)
 
     async def test_handler_to_estate_finance_model_expert_llm_response(
             self,
@@ -175,7 +211,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Переключаю на расчет доходности. " + common.StateSwitchCommand.to_estate_finance_model_expert
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_estate_finance_model_expert
         finance_model_response = "Помогу рассчитать доходность недвижимости..."
@@ -185,7 +221,7 @@ class TestEstateExpertMessageService:
         await estate_expert_message_service.handler(message, state)
 
         # Assert
-        mocks["estate_expert_client"].send_message_to_estate_expert.assert_awaited_once_with(
+        mocks["estate_expert_client"].stream_message_to_estate_expert.assert_called_once_with(
             message.chat.id,
             message.text
         )
@@ -197,7 +233,11 @@ class TestEstateExpertMessageService:
             "Помоги, мне рассчитать доходность недвижимости"
         )
 
-        message.answer.assert_awaited_once_with(finance_model_response)
+        message.answer.assert_has_awaits([
+            call(common.llm_response_placeholder_text),
+            call(finance_model_response)
+        ])
+        message.answer.return_value.delete.assert_awaited_once()
 
         mocks["state_repo"].change_status.assert_awaited_once_with(
             state.id,
@@ -212,6 +252,7 @@ class TestEstateExpertMessageService:
         tracer = estate_expert_message_service.tracer
         utils.assert_span(tracer, [
             {"name": "EstateExpertMessageService.handler"},
+            {"name": "EstateExpertMessageService.__stream_answer"},
             {"name": "EstateExpertMessageService.__to_estate_finance_model_expert"}
         ])
 
@@ -225,7 +266,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Переключаю на расчет доходности. " + common.StateSwitchCommand.to_estate_finance_model_expert
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_estate_finance_model_expert
         err = Exception("Ошибка __to_estate_finance_model_expert")
@@ -237,7 +278,7 @@ class TestEstateExpertMessageService:
 
         # Assert
         tracer = estate_expert_message_service.tracer
-        utils.assert_span_error(tracer, err, 2)
+        utils.assert_span_error(tracer, err, 2, ok_count=1)
 
     async def test_handler_to_wewall_expert_llm_response(
             self,
@@ -249,7 +290,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Переключаю на WEWALL эксперта. " + common.StateSwitchCommand.to_wewall_expert
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_wewall_expert
         wewall_expert_response = "Расскажу вам про WEWALL..."
@@ -261,7 +302,7 @@ class TestEstateExpertMessageService:
         # Act
         await estate_expert_message_service.handler(message, state)
 
-        mocks["estate_expert_client"].send_message_to_estate_expert.assert_awaited_once_with(
+        mocks["estate_expert_client"].stream_message_to_estate_expert.assert_called_once_with(
             message.chat.id,
             message.text
         )
@@ -279,7 +320,11 @@ class TestEstateExpertMessageService:
         )
 
         mocks["wewall_expert_inline_keyboard_generator"].start.assert_awaited_once()
-        message.answer.assert_awaited_once_with(wewall_expert_response, reply_markup=keyboard_mock)
+        message.answer.assert_has_awaits([
+            call(common.llm_response_placeholder_text),
+            call(wewall_expert_response, reply_markup=keyboard_mock)
+        ])
+        message.answer.return_value.delete.assert_awaited_once()
 
         mocks["state_repo"].change_status.assert_awaited_once_with(
             state.id,
@@ -291,6 +336,7 @@ class TestEstateExpertMessageService:
         tracer = estate_expert_message_service.tracer
         utils.assert_span(tracer, [
             {"name": "EstateExpertMessageService.handler"},
+            {"name": "EstateExpertMessageService.__stream_answer"},
             {"name": "EstateExpertMessageService.__to_wewall_expert"}
         ])
 
@@ -304,7 +350,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Переключаю на WEWALL эксперта. " + common.StateSwitchCommand.to_wewall_expert
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_wewall_expert
         err = Exception("Ошибка __to_wewall_expert")
@@ -316,7 +362,7 @@ class TestEstateExpertMessageService:
 
         # Assert
         tracer = estate_expert_message_service.tracer
-        utils.assert_span_error(tracer, err, 2)
+        utils.assert_span_error(tracer, err, 2, ok_count=1)
 
     async def test_handler_to_estate_search_expert_llm_response(
             self,
@@ -328,7 +374,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Переключаю на поиск недвижимости. " + common.StateSwitchCommand.to_estate_search_expert
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_estate_search_expert
         estate_search_response = "Помогу подобрать недвижимость из ассортимента..."
@@ -338,7 +384,7 @@ class TestEstateExpertMessageService:
         await estate_expert_message_service.handler(message, state)
 
         # Assert
-        mocks["estate_expert_client"].send_message_to_estate_expert.assert_awaited_once_with(
+        mocks["estate_expert_client"].stream_message_to_estate_expert.assert_called_once_with(
             message.chat.id,
             message.text
         )
@@ -350,7 +396,11 @@ class TestEstateExpertMessageService:
             "Помоги мне подобрать недвижимость из вашего ассортимента"
         )
 
-        message.answer.assert_awaited_once_with(estate_search_response)
+        message.answer.assert_has_awaits([
+            call(common.llm_response_placeholder_text),
+            call(estate_search_response)
+        ])
+        message.answer.return_value.delete.assert_awaited_once()
 
         mocks["state_repo"].change_status.assert_awaited_once_with(
             state.id,
@@ -362,7 +412,8 @@ class TestEstateExpertMessageService:
         tracer = estate_expert_message_service.tracer
         utils.assert_span(tracer, [
             {"name": "EstateExpertMessageService.handler"},
-             {"name": "EstateExpertMessageService.__to_estate_search_expert"}
+            {"name": "EstateExpertMessageService.__stream_answer"},
+            {"name": "EstateExpertMessageService.__to_estate_search_expert"}
         ])
 
     async def test_handler_to_estate_search_expert_error(
@@ -375,7 +426,7 @@ class TestEstateExpertMessageService:
         state = utils.create_state(common.StateStatuses.estate_expert)
 
         llm_response = "Переключаю на поиск недвижимости. " + common.StateSwitchCommand.to_estate_search_expert
-        mocks["estate_expert_client"].send_message_to_estate_expert.return_value = llm_response
+        mocks["estate_expert_client"].stream_message_to_estate_expert.return_value = utils.create_llm_stream(llm_response)
 
         # __to_estate_search_expert
         err = Exception("Ошибка __to_estate_search_expert")
@@ -387,4 +438,4 @@ class TestEstateExpertMessageService:
 
         # Assert
         tracer = estate_expert_message_service.tracer
-        utils.assert_span_error(tracer, err, 2)
\ No newline at end of file
+        utils.assert_span_error(tracer, err, 2, ok_count=1)
\ No newline at end of file
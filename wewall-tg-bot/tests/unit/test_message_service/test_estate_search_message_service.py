@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, ANY, AsyncMock
 import pytest
 from aiogram.types import BufferedInputFile
 
-from internal import common
+from internal import common, model
 from internal.service.estate_search.message_service import EstateSearchMessageService
 from tests.unit import utils
 
@@ -20,7 +20,8 @@ class TestEstateSearchMessageService:
             chat_client=mocks["chat_client"],
             estate_expert_client=mocks["estate_expert_client"],
             estate_search_client=mocks["estate_search_client"],
-            estate_calculator_client=mocks["estate_calculator_client"],
+            finance_model_cache=mocks["finance_model_cache"],
+            offer_prefetcher=mocks["offer_prefetcher"],
             estate_search_inline_keyboard_generator=mocks["estate_search_inline_keyboard_generator"],
             wewall_expert_inline_keyboard_generator=mocks["wewall_expert_inline_keyboard_generator"],
             llm_client=mocks["llm_client"],
@@ -649,13 +650,11 @@ class TestEstateSearchMessageService:
 
         # __calc_sale_office_finance_model
         calc_resp = utils.calc_resp()
-        mocks["estate_calculator_client"].calc_finance_model_finished_office.return_value = calc_resp
-
-        pdf_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].generate_pdf.return_value = pdf_file_mock
-
-        xlsx_file_mock = MagicMock(spec=BufferedInputFile)
-        mocks["estate_calculator_client"].calc_finance_model_finished_office_table.return_value = xlsx_file_mock
+        mocks["finance_model_cache"].finished_office_bundle.return_value = model.FinanceModelBundle(
+            finance_model=calc_resp,
+            xlsx=b"xlsx",
+            pdf=b"pdf",
+        )
 
         # __generate_offer_text
         offer_text = "Отличный ритейл для инвестиций..."
@@ -687,17 +686,7 @@ class TestEstateSearchMessageService:
         )
 
         # __calc_sale_office_finance_model
-        mocks["estate_calculator_client"].calc_finance_model_finished_office.assert_awaited_once_with(
-            sale_offers[0].sale_offer_square,
-            sale_offers[0].sale_offer_price_per_meter,
-            sale_offers[0].sale_offer_design,
-            sale_offers[0].estate_category.replace("+", "").replace("C", "B"),
-            ANY,
-            ANY,
-            estate_search_params["nds"]
-        )
-
-        mocks["estate_calculator_client"].calc_finance_model_finished_office_table.assert_awaited_once_with(
+        mocks["finance_model_cache"].finished_office_bundle.assert_awaited_once_with(
             sale_offers[0].sale_offer_square,
             sale_offers[0].sale_offer_price_per_meter,
             sale_offers[0].sale_offer_design,
@@ -707,22 +696,6 @@ class TestEstateSearchMessageService:
             estate_search_params["nds"]
         )
 
-        mocks["estate_calculator_client"].generate_pdf.assert_awaited_once_with(
-            common.FinishStateCommand.estate_calculator_finished_office,
-            calc_resp.buying_property,
-            calc_resp.sale_property,
-            calc_resp.sale_tax,
-            calc_resp.rent_tax,
-            calc_resp.price_of_finishing,
-            calc_resp.rent_flow,
-            calc_resp.terminal_value,
-            calc_resp.sale_income,
-            calc_resp.rent_income,
-            calc_resp.added_value,
-            calc_resp.rent_irr,
-            calc_resp.sale_irr,
-        )
-
         mocks["estate_expert_client"].add_message_to_chat.assert_awaited_once_with(
             state.tg_chat_id,
             ANY,
@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.metrics import MeterProvider, TraceBasedExemplarFilter
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.semconv.trace import SpanAttributes
+
+from internal import common
+from internal.controller.http.middlerware.middleware import HttpMiddleware
+
+from tests.unit import utils
+
+HTTP_METRIC_KEYS = {
+    SpanAttributes.HTTP_METHOD,
+    SpanAttributes.HTTP_ROUTE,
+    common.HTTP_STATUS_KEY,
+    common.OUTCOME_KEY,
+}
+
+
+class TestHttpMiddleware:
+
+    @pytest.fixture
+    def metric_reader(self):
+        return InMemoryMetricReader()
+
+    @pytest.fixture
+    def http_middleware(self, metric_reader):
+        meter_provider = MeterProvider(metric_readers=[metric_reader], exemplar_filter=TraceBasedExemplarFilter())
+
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("test")
+        tel.meter.return_value = meter_provider.get_meter("test")
+        tel.logger.return_value = MagicMock()
+        return HttpMiddleware(tel, common.PREFIX)
+
+    def test_metric_attributes_are_bounded(self, http_middleware, metric_reader):
+        # Arrange
+        app = FastAPI()
+
+        async def offer(offer_id: int):
+            return {"offer_id": offer_id}
+
+        app.add_api_route(common.PREFIX + "/offer/{offer_id}", offer, methods=["GET"])
+        http_middleware.logger_middleware03(app)
+        http_middleware.metrics_middleware02(app)
+        http_middleware.trace_middleware01(app)
+        client = TestClient(app)
+
+        # Act
+        for offer_id in range(30):
+            client.get(common.PREFIX + f"/offer/{offer_id}")
+        client.get(common.PREFIX + "/unknown/path")
+
+        # Assert
+        points = utils.collect_metric_points(metric_reader, {
+            common.OK_REQUEST_TOTAL_METRIC,
+            common.REQUEST_DURATION_METRIC,
+        })
+        attribute_sets = {frozenset(point.attributes.items()) for point in points}
+
+        assert {key for attributes in attribute_sets for key, _ in attributes} <= HTTP_METRIC_KEYS
+        assert {dict(attributes)[SpanAttributes.HTTP_ROUTE] for attributes in attribute_sets} == {
+            common.PREFIX + "/offer/{offer_id}",
+            "unmatched",
+        }
+        assert len(attribute_sets) == 2
@@ -0,0 +1,267 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider, TraceBasedExemplarFilter
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+
+from internal import common
+from internal.controller.tg.middleware.middleware import TgMiddleware
+
+from tests.unit import utils
+
+TG_METRIC_KEYS = {
+    common.TELEGRAM_EVENT_TYPE_KEY,
+    common.TELEGRAM_HANDLER_KEY,
+    common.STATE_STATUS_KEY,
+    common.OUTCOME_KEY,
+}
+
+
+class TestTgMiddleware:
+
+    @pytest.fixture
+    def metric_reader(self):
+        return InMemoryMetricReader()
+
+    @pytest.fixture
+    def tg_middleware(self, mocks, metric_reader):
+        meter_provider = MeterProvider(metric_readers=[metric_reader], exemplar_filter=TraceBasedExemplarFilter())
+
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("test")
+        tel.meter.return_value = meter_provider.get_meter("test")
+        tel.logger.return_value = MagicMock()
+
+        mocks["state_service"].state_for_update.return_value = (
+            utils.create_state(common.StateStatuses.estate_expert, count_message=5),
+            False,
+        )
+        mocks["subscription_service"].is_subscribed.return_value = True
+
+        return TgMiddleware(
+            tel=tel,
+            bot=mocks["bot"],
+            state_service=mocks["state_service"],
+            subscription_service=mocks["subscription_service"],
+            offer_prefetcher=mocks["offer_prefetcher"],
+            estate_expert_client=mocks["estate_expert_client"],
+            chat_client=mocks["chat_client"],
+            wewall_expert_inline_keyboard_generator=mocks["wewall_expert_inline_keyboard_generator"],
+            amocrm_main_pipeline_id=1,
+            amocrm_pipeline_status_high_engagement=2,
+            amocrm_pipeline_status_active_user=3,
+        )
+
+    async def test_message_loads_state_with_single_query(self, mocks, tg_middleware):
+        # Arrange
+        handler = AsyncMock()
+        message = utils.create_message("Привет", chat_id=456)
+        update = utils.create_update(message=message)
+        data = {}
+
+        # Act
+        await tg_middleware.update_middleware(handler, update, data)
+
+        # Assert
+        mocks["state_service"].state_for_update.assert_awaited_once_with(
+            456,
+            common.StateStatuses.wewall_expert,
+            True
+        )
+        mocks["state_service"].state_by_id.assert_not_awaited()
+        mocks["state_service"].increment_message_count.assert_not_awaited()
+        mocks["chat_client"].create_chat_with_amocrm_manager.assert_not_awaited()
+        mocks["chat_client"].edit_lead.assert_not_awaited()
+        mocks["chat_client"].send_message_to_amocrm.assert_awaited_once_with(456, "Привет")
+
+        handler.assert_awaited_once_with(update, data)
+        assert data["user_state"].status == common.StateStatuses.estate_expert
+
+    async def test_callback_does_not_count_message(self, mocks, tg_middleware):
+        # Arrange
+        handler = AsyncMock()
+        callback_query = utils.create_callback_query(common.WewallExpertKeyboardCallbackData.to_estate_expert, "Меню")
+        update = utils.create_update(callback_query=callback_query)
+
+        # Act
+        await tg_middleware.update_middleware(handler, update, {})
+
+        # Assert
+        mocks["state_service"].state_for_update.assert_awaited_once_with(
+            callback_query.message.chat.id,
+            common.StateStatuses.wewall_expert,
+            False
+        )
+        mocks["chat_client"].send_message_to_amocrm.assert_not_awaited()
+        handler.assert_awaited_once()
+
+    async def test_new_state_creates_amocrm_chat(self, mocks, tg_middleware):
+        # Arrange
+        mocks["state_service"].state_for_update.return_value = (
+            utils.create_state(common.StateStatuses.wewall_expert, count_message=1),
+            True,
+        )
+        message = utils.create_message("Привет", chat_id=456, username="newuser")
+        update = utils.create_update(message=message)
+
+        # Act
+        await tg_middleware.update_middleware(AsyncMock(), update, {})
+
+        # Assert
+        mocks["chat_client"].create_chat_with_amocrm_manager.assert_awaited_once_with(1, 456, "newuser", "Test", "User")
+
+    async def test_engagement_threshold_edits_lead(self, mocks, tg_middleware):
+        # Arrange
+        mocks["state_service"].state_for_update.return_value = (
+            utils.create_state(common.StateStatuses.estate_expert, count_message=20),
+            False,
+        )
+        update = utils.create_update(message=utils.create_message("Привет", chat_id=456))
+
+        # Act
+        await tg_middleware.update_middleware(AsyncMock(), update, {})
+
+        # Assert
+        mocks["chat_client"].edit_lead.assert_awaited_once_with(456, 1, 2)
+
+    async def test_leaving_estate_search_cancels_prefetch(self, mocks, tg_middleware):
+        # Arrange
+        update = utils.create_update(message=utils.create_message("Привет", chat_id=456))
+
+        # Act
+        await tg_middleware.update_middleware(AsyncMock(), update, {})
+
+        # Assert
+        mocks["offer_prefetcher"].cancel.assert_called_once_with(456)
+
+    async def test_estate_search_keeps_prefetch(self, mocks, tg_middleware):
+        # Arrange
+        mocks["state_service"].state_for_update.return_value = (
+            utils.create_state(common.StateStatuses.estate_search, count_message=5),
+            False,
+        )
+        update = utils.create_update(message=utils.create_message("Привет", chat_id=456))
+
+        # Act
+        await tg_middleware.update_middleware(AsyncMock(), update, {})
+
+        # Assert
+        mocks["offer_prefetcher"].cancel.assert_not_called()
+
+    async def test_not_subscribed_stops_pipeline(self, mocks, tg_middleware):
+        # Arrange
+        handler = AsyncMock()
+        mocks["subscription_service"].is_subscribed.return_value = False
+        message = utils.create_message("Привет")
+        update = utils.create_update(message=message)
+
+        # Act
+        await tg_middleware.update_middleware(handler, update, {})
+
+        # Assert
+        handler.assert_not_awaited()
+        mocks["state_service"].state_for_update.assert_not_awaited()
+        message.answer.assert_awaited_once_with(
+            common.not_subscribe_text,
+            reply_markup=mocks["wewall_expert_inline_keyboard_generator"].check_subscribe.return_value
+        )
+
+    async def test_check_subscribe_invalidates_cache(self, mocks, tg_middleware):
+        # Arrange
+        handler = AsyncMock()
+        callback_query = utils.create_callback_query(common.WewallExpertKeyboardCallbackData.check_subscribe, "Подписка")
+        update = utils.create_update(callback_query=callback_query)
+        mocks["state_service"].create_state.return_value = 1
+
+        calls = []
+        mocks["subscription_service"].invalidate.side_effect = lambda tg_user_id: calls.append("invalidate")
+        mocks["subscription_service"].is_subscribed.side_effect = lambda tg_user_id: calls.append("is_subscribed") or True
+
+        # Act
+        await tg_middleware.update_middleware(handler, update, {})
+
+        # Assert
+        assert calls == ["invalidate", "is_subscribed"]
+        mocks["subscription_service"].invalidate.assert_awaited_once_with(callback_query.message.chat.id)
+        mocks["state_service"].create_state.assert_awaited_once_with(callback_query.message.chat.id)
+        handler.assert_not_awaited()
+
+    async def test_handler_error_answers_user(self, tg_middleware, metric_reader):
+        # Arrange
+        handler = AsyncMock(side_effect=Exception("Ошибка обработчика"))
+        message = utils.create_message("/start")
+        update = utils.create_update(message=message)
+
+        # Act
+        await tg_middleware.update_middleware(handler, update, {})
+
+        # Assert
+        message.answer.assert_awaited_once_with("Непредвиденная ошибка на сервере")
+
+        [point] = utils.collect_metric_points(metric_reader, {common.ERROR_MESSAGE_TOTAL_METRIC})
+        assert dict(point.attributes) == {
+            common.TELEGRAM_EVENT_TYPE_KEY: "message",
+            common.TELEGRAM_HANDLER_KEY: "command",
+            common.STATE_STATUS_KEY: common.StateStatuses.estate_expert,
+            common.OUTCOME_KEY: "error",
+        }
+
+    async def test_metric_attributes_are_bounded(self, tg_middleware, metric_reader):
+        # Arrange
+        updates = []
+        for i in range(50):
+            message = utils.create_message(f"Вопрос номер {i}", user_id=i, chat_id=1000 + i, username=f"user{i}")
+            updates.append(utils.create_update(message=message))
+
+            callback_query = utils.create_callback_query(
+                common.EstateSearchKeyboardCallbackData.next_offer + f":{i}",
+                "Предложение",
+                user_id=i,
+                username=f"user{i}",
+            )
+            updates.append(utils.create_update(callback_query=callback_query))
+
+        # Act
+        for update in updates:
+            await tg_middleware.update_middleware(AsyncMock(), update, {})
+
+        # Assert
+        points = utils.collect_metric_points(metric_reader, {
+            common.OK_MESSAGE_TOTAL_METRIC,
+            common.MESSAGE_DURATION_METRIC,
+        })
+        attribute_sets = {frozenset(point.attributes.items()) for point in points}
+
+        assert {key for attributes in attribute_sets for key, _ in attributes} <= TG_METRIC_KEYS
+        assert attribute_sets == {
+            frozenset({
+                common.TELEGRAM_EVENT_TYPE_KEY: "message",
+                common.TELEGRAM_HANDLER_KEY: "text",
+                common.STATE_STATUS_KEY: common.StateStatuses.estate_expert,
+                common.OUTCOME_KEY: "ok",
+            }.items()),
+            frozenset({
+                common.TELEGRAM_EVENT_TYPE_KEY: "callback_query",
+                common.TELEGRAM_HANDLER_KEY: common.EstateSearchKeyboardCallbackData.next_offer,
+                common.STATE_STATUS_KEY: common.StateStatuses.estate_expert,
+                common.OUTCOME_KEY: "ok",
+            }.items()),
+        }
+
+    async def test_metric_links_trace_by_exemplar(self, tg_middleware, metric_reader):
+        # Arrange
+        trace_ids = []
+
+        async def handler(event, data):
+            trace_ids.append(tg_middleware.tracer.start_span("probe").get_span_context().trace_id)
+
+        update = utils.create_update(message=utils.create_message("Привет"))
+
+        # Act
+        await tg_middleware.update_middleware(handler, update, {})
+
+        # Assert
+        [point] = utils.collect_metric_points(metric_reader, {common.MESSAGE_DURATION_METRIC})
+        assert common.TRACE_ID_KEY not in point.attributes
+        assert [exemplar.trace_id for exemplar in point.exemplars] == trace_ids
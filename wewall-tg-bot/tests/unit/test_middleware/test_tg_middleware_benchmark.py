@@ -0,0 +1,107 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from aiogram import Dispatcher
+from aiogram.dispatcher.middlewares.manager import MiddlewareManager
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.trace import TracerProvider
+
+from internal import common
+from internal.app.tg.app import include_tg_middleware
+from internal.controller.tg.middleware.middleware import TgMiddleware
+
+from tests.unit import utils
+from tests.unit.utils.legacy_tg_middleware import LegacyTgMiddleware
+
+
+@pytest.mark.performance
+class TestTgMiddlewareBenchmark:
+    update_count = 5000
+
+    async def test_update_overhead(self, mocks, record_property):
+        # Arrange
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("benchmark")
+        tel.meter.return_value = MeterProvider().get_meter("benchmark")
+        tel.logger.return_value = MagicMock()
+
+        state = utils.create_state(common.StateStatuses.estate_expert, count_message=5)
+        mocks["state_service"].state_for_update.return_value = (state, False)
+        mocks["state_service"].state_by_id.return_value = [state]
+        mocks["subscription_service"].is_subscribed.return_value = True
+        tg_middleware = TgMiddleware(
+            tel,
+            mocks["bot"],
+            mocks["state_service"],
+            mocks["subscription_service"],
+            mocks["offer_prefetcher"],
+            mocks["estate_expert_client"],
+            mocks["chat_client"],
+            mocks["wewall_expert_inline_keyboard_generator"],
+            1,
+            2,
+            3,
+        )
+        legacy_tg_middleware = LegacyTgMiddleware(
+            tel,
+            mocks["bot"],
+            mocks["state_service"],
+            mocks["estate_expert_client"],
+            mocks["chat_client"],
+            mocks["wewall_expert_inline_keyboard_generator"],
+            "wewall",
+            1,
+            2,
+            3,
+        )
+
+        # Обе цепочки собираются так же, как в приложении, чтобы замер включал накладные расходы aiogram
+        dp = Dispatcher()
+        include_tg_middleware(dp, tg_middleware)
+
+        legacy_dp = Dispatcher()
+        legacy_dp.update.middleware(legacy_tg_middleware.trace_middleware01)
+        legacy_dp.update.middleware(legacy_tg_middleware.metric_middleware02)
+        legacy_dp.update.middleware(legacy_tg_middleware.logger_middleware03)
+        legacy_dp.update.middleware(legacy_tg_middleware.check_subscribe_middleware04)
+        legacy_dp.update.middleware(legacy_tg_middleware.get_state_middleware05)
+        legacy_dp.update.middleware(legacy_tg_middleware.count_message_middleware06)
+        legacy_dp.update.middleware(legacy_tg_middleware.send_contact_message_to_amocrm_middleware07)
+
+        updates = [
+            utils.create_update(message=utils.create_message(f"Сообщение {i}", chat_id=i))
+            for i in range(200)
+        ]
+
+        # Act
+        per_update_us = await self.__per_update_us(dp, updates)
+        legacy_per_update_us = await self.__per_update_us(legacy_dp, updates)
+        ratio = per_update_us / legacy_per_update_us
+
+        # Assert
+        record_property("tg_middleware_us_per_update", round(per_update_us, 1))
+        record_property("legacy_tg_middleware_us_per_update", round(legacy_per_update_us, 1))
+        record_property("tg_middleware_overhead_ratio", round(ratio, 2))
+
+        assert len(list(dp.update.middleware)) == 1
+        assert mocks["state_service"].state_for_update.await_count == self.update_count + len(updates)
+        assert mocks["state_service"].state_by_id.await_count == self.update_count + len(updates)
+        assert ratio < 0.8, (
+            f"TgMiddleware: {per_update_us:.1f} us/update, "
+            f"старая цепочка: {legacy_per_update_us:.1f} us/update"
+        )
+
+    async def __per_update_us(self, dp: Dispatcher, updates: list) -> float:
+        async def handler(event, **kwargs): pass
+
+        chain = MiddlewareManager.wrap_middlewares(list(dp.update.middleware), handler)
+
+        # Прогрев, чтобы в замер не попали первые вызовы
+        for update in updates:
+            await chain(update, {})
+
+        start_time = time.perf_counter()
+        for i in range(self.update_count):
+            await chain(updates[i % len(updates)], {})
+        return (time.perf_counter() - start_time) / self.update_count * 1e6
@@ -29,6 +29,7 @@ class TestEstateSearchStateRepo:
         # Act
         result = await estate_search_state_repo.create_estate_search_state(
             state_id,
+            common.EstateSearchOfferType.sale,
             offers,
             estate_search_params
         )
@@ -39,8 +40,11 @@ class TestEstateSearchStateRepo:
             create_estate_search_state_query,
             {
                 'state_id': state_id,
-                'offers': [json.dumps(offer.to_dict(), ensure_ascii=False) for offer in offers],
-                'estate_search_params': json.dumps(estate_search_params, ensure_ascii=False)
+                'offer_type': common.EstateSearchOfferType.sale,
+                'offer_ids': [offer.id for offer in offers],
+                'offer_estate_ids': [offer.estate_id for offer in offers],
+                'estate_search_params': json.dumps(estate_search_params, ensure_ascii=False),
+                'session_ttl': estate_search_state_repo.session_ttl,
             }
         )
 
@@ -50,7 +54,8 @@ class TestEstateSearchStateRepo:
              "attributes":
                  {
                      "state_id": state_id,
-                     "offers": str(offers),
+                     "offer_type": common.EstateSearchOfferType.sale,
+                     "offers_count": len(offers),
                      "estate_search_params": str(estate_search_params),
                  }
              }
@@ -68,6 +73,7 @@ class TestEstateSearchStateRepo:
         with pytest.raises(Exception, match="Ошибка при create_estate_search_state"):
             await estate_search_state_repo.create_estate_search_state(
                 state_id,
+                common.EstateSearchOfferType.sale,
                 offers,
                 estate_search_params
             )
@@ -91,7 +97,9 @@ class TestEstateSearchStateRepo:
         mocks["db"].update.assert_called_once_with(
             change_current_offer_by_state_id_query,
             {
-                "state_id": state_id, "current_offer_id": current_offer_id
+                "state_id": state_id,
+                "current_offer_id": current_offer_id,
+                "session_ttl": estate_search_state_repo.session_ttl
             }
         )
 
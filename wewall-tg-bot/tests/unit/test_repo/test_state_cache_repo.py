@@ -0,0 +1,155 @@
+import pytest
+
+from internal import common, model
+from internal.repo.state.cache_repo import StateCacheRepo
+
+from tests.unit import utils
+
+
+class TestStateCacheRepo:
+    @pytest.fixture
+    def redis(self):
+        return utils.FakeRedis()
+
+    @pytest.fixture
+    def state_cache_repo(self, mocks, redis):
+        mocks["state_repo"].state_for_update.return_value = (
+            utils.create_state(common.StateStatuses.wewall_expert, count_message=1),
+            False,
+        )
+        return StateCacheRepo(tel=mocks["tel"], state_repo=mocks["state_repo"], redis=redis)
+
+    async def test_state_for_update_hits_db_once_for_chatty_user(self, mocks, state_cache_repo):
+        # Act
+        results = [await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True) for _ in range(5)]
+
+        # Assert
+        mocks["state_repo"].state_for_update.assert_awaited_once_with(52, common.StateStatuses.wewall_expert, True)
+        assert [state.count_message for state, _ in results] == [1, 2, 3, 4, 5]
+        assert all(state.status == common.StateStatuses.wewall_expert for state, _ in results)
+        mocks["state_repo"].apply_counter_deltas.assert_not_awaited()
+
+    async def test_transferred_to_manager_is_not_counted(self, mocks, state_cache_repo):
+        # Arrange
+        mocks["state_repo"].state_for_update.return_value = (
+            utils.create_state(common.StateStatuses.wewall_expert, count_message=7, is_transferred_to_manager=True),
+            False,
+        )
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+
+        # Act
+        state, is_created = await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+
+        # Assert
+        assert state.count_message == 7
+        assert state.is_transferred_to_manager is True
+        assert await state_cache_repo.flush_counters(100) == 0
+
+    async def test_flush_counters_applies_deltas_in_one_batch(self, mocks, state_cache_repo):
+        # Arrange
+        for _ in range(4):
+            await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+        await state_cache_repo.increment_estate_search_count(1)
+        await state_cache_repo.increment_estate_calculator_count(2)
+
+        # Act
+        flushed = await state_cache_repo.flush_counters(100)
+
+        # Assert
+        assert flushed == 2
+        mocks["state_repo"].apply_counter_deltas.assert_awaited_once_with([
+            model.StateCounterDelta(state_id=1, count_message=3, count_estate_search=1),
+            model.StateCounterDelta(state_id=2, count_estate_calculator=1),
+        ])
+        assert await state_cache_repo.flush_counters(100) == 0
+
+    async def test_flush_error_keeps_deltas(self, mocks, state_cache_repo):
+        # Arrange
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+        mocks["state_repo"].apply_counter_deltas.side_effect = [Exception("Ошибка БД"), None]
+
+        # Act
+        with pytest.raises(Exception, match="Ошибка БД"):
+            await state_cache_repo.flush_counters(100)
+        await state_cache_repo.flush_counters(100)
+
+        # Assert
+        assert mocks["state_repo"].apply_counter_deltas.await_args_list[-1].args == (
+            [model.StateCounterDelta(state_id=1, count_message=1)],
+        )
+
+    async def test_miss_adds_pending_deltas_to_db_counters(self, mocks, redis, state_cache_repo):
+        # Arrange
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+        await redis.delete("tg-bot:state:52")
+
+        # Act
+        state, _ = await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, False)
+
+        # Assert
+        assert mocks["state_repo"].state_for_update.await_count == 2
+        assert state.count_message == 2
+
+    async def test_change_status_writes_through(self, mocks, state_cache_repo):
+        # Arrange
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+
+        # Act
+        await state_cache_repo.change_status(1, common.StateStatuses.estate_expert)
+        await state_cache_repo.set_is_transferred_to_manager(1, True)
+        [state] = await state_cache_repo.state_by_id(52)
+
+        # Assert
+        mocks["state_repo"].change_status.assert_awaited_once_with(1, common.StateStatuses.estate_expert)
+        mocks["state_repo"].set_is_transferred_to_manager.assert_awaited_once_with(1, True)
+        mocks["state_repo"].state_by_id.assert_not_awaited()
+        assert state.status == common.StateStatuses.estate_expert
+        assert state.is_transferred_to_manager is True
+
+    async def test_change_status_writes_through_after_id_key_ttl(self, mocks, redis, state_cache_repo):
+        # Arrange
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+        # Обратный ключ истек, а хеш продолжают продлевать сообщения пользователя
+        await redis.delete("tg-bot:state:id:1")
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+
+        # Act
+        await state_cache_repo.change_status(1, common.StateStatuses.estate_search)
+        await state_cache_repo.increment_estate_search_count(1)
+        [state] = await state_cache_repo.state_by_id(52)
+
+        # Assert
+        mocks["state_repo"].change_status.assert_awaited_once_with(1, common.StateStatuses.estate_search)
+        mocks["state_repo"].state_by_id.assert_not_awaited()
+        assert state.status == common.StateStatuses.estate_search
+        assert state.count_estate_search == 1
+        assert redis.ttls["tg-bot:state:id:1"] == redis.ttls["tg-bot:state:52"]
+
+    async def test_delete_state_invalidates_cache(self, mocks, state_cache_repo):
+        # Arrange
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+
+        # Act
+        await state_cache_repo.delete_state_by_tg_chat_id(52)
+        await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+
+        # Assert
+        mocks["state_repo"].delete_state_by_tg_chat_id.assert_awaited_once_with(52)
+        assert mocks["state_repo"].state_for_update.await_count == 2
+
+    async def test_redis_unavailable_falls_back_to_db(self, mocks, redis, state_cache_repo):
+        # Arrange
+        async def unavailable(*args, **kwargs):
+            raise ConnectionError("Redis недоступен")
+
+        redis.hgetall = unavailable
+        redis.pipeline = unavailable
+
+        # Act
+        state, _ = await state_cache_repo.state_for_update(52, common.StateStatuses.wewall_expert, True)
+
+        # Assert
+        assert state.count_message == 1
+        mocks["state_repo"].state_for_update.assert_awaited_once()
@@ -1,6 +1,8 @@
+from unittest.mock import MagicMock
+
 import pytest
 
-from internal import common
+from internal import common, model
 from internal.repo.state.repo import StateRepo
 from internal.repo.state.query import *
 
@@ -78,6 +80,51 @@ class TestStateRepo:
         tracer = state_repo.tracer
         utils.assert_span_error(tracer, err, 1)
 
+    async def test_state_for_update(self, state_repo, mocks):
+        # Arrange
+        expected_state = utils.create_state(common.StateStatuses.wewall_expert, count_message=1)
+        row = MagicMock(**vars(expected_state), is_created=True)
+
+        mocks["db"].select.return_value = [row]
+
+        # Act
+        state, is_created = await state_repo.state_for_update(
+            expected_state.tg_chat_id,
+            common.StateStatuses.wewall_expert,
+            True
+        )
+
+        # Assert
+        assert state == expected_state
+        assert is_created
+
+        mocks["db"].select.assert_called_once_with(state_for_update, {
+            'tg_chat_id': expected_state.tg_chat_id,
+            'status': common.StateStatuses.wewall_expert,
+            'count_message': True,
+        })
+
+        tracer = state_repo.tracer
+        utils.assert_span(tracer, [
+            {"name": "StateRepo.state_for_update", "attributes": {
+                "tg_chat_id": expected_state.tg_chat_id,
+                "status": common.StateStatuses.wewall_expert,
+                "count_message": True,
+            }}
+        ])
+
+    async def test_state_for_update_err(self, state_repo, mocks):
+        # Arrange
+        err = Exception("Ошибка при state_for_update")
+        mocks["db"].select.side_effect = err
+
+        with pytest.raises(Exception, match="Ошибка при state_for_update"):
+            await state_repo.state_for_update(12345, common.StateStatuses.wewall_expert, True)
+
+        # Assert
+        tracer = state_repo.tracer
+        utils.assert_span_error(tracer, err, 1)
+
     async def test_increment_message_count(self, state_repo, mocks):
         # Arrange
         state_id = 1
@@ -223,3 +270,26 @@ class TestStateRepo:
         # Assert
         tracer = state_repo.tracer
         utils.assert_span_error(tracer, err, 1)
+
+    async def test_apply_counter_deltas(self, state_repo, mocks):
+        # Arrange
+        deltas = [
+            model.StateCounterDelta(state_id=1, count_message=3),
+            model.StateCounterDelta(state_id=2, count_estate_search=1, count_estate_calculator=2),
+        ]
+
+        # Act
+        await state_repo.apply_counter_deltas(deltas)
+
+        # Assert
+        mocks["db"].update.assert_called_once_with(apply_counter_deltas, {
+            'state_ids': [1, 2],
+            'count_messages': [3, 0],
+            'count_estate_searches': [0, 1],
+            'count_estate_calculators': [0, 2],
+        })
+
+        tracer = state_repo.tracer
+        utils.assert_span(tracer, [
+            {"name": "StateRepo.apply_counter_deltas", "attributes": {"deltas": 2}}
+        ])
@@ -0,0 +1,150 @@
+import io
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock
+
+import pytest
+from PyPDF2 import PdfReader, PdfWriter
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+
+from internal import common
+from pkg.report import render_worker, renderer
+from pkg.report.renderer import ReportRenderer
+
+from tests.unit import utils
+
+RENT_PAGE = {
+    "rent_analyse_text": "Текст", "irr": 10, "income": 1, "purchase": 2, "estate_tax": 3, "design_price": 4,
+    "rent_income": 5, "finishing_price": 6, "invest_cycle": "6 ЛЕТ", "invest_cycle_text": "С ДАТЫ ПОКУПКИ",
+}
+PURCHASE_PAGE = {
+    "sale_analyse_text": "Текст", "irr": 10, "income": 1, "purchase": 2, "estate_tax": 3, "finish_price": 4,
+    "extra_price": 5,
+}
+
+
+def blank_pdf() -> bytes:
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=150)
+    pdf_stream = io.BytesIO()
+    writer.write(pdf_stream)
+    return pdf_stream.getvalue()
+
+
+class TestReportRenderer:
+
+    @pytest.fixture
+    def rendered_htmls(self, monkeypatch):
+        rendered_htmls = []
+
+        def render_pdf(html, options):
+            rendered_htmls.append(html)
+            return blank_pdf()
+
+        monkeypatch.setattr(render_worker, "render_pdf", render_pdf)
+        monkeypatch.setattr(render_worker, "warm_up", lambda: None)
+        return rendered_htmls
+
+    @pytest.fixture
+    def metric_reader(self):
+        return InMemoryMetricReader()
+
+    @pytest.fixture
+    def report_renderer(self, metric_reader, rendered_htmls):
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("test")
+        tel.meter.return_value = MeterProvider(metric_readers=[metric_reader]).get_meter("test")
+        tel.logger.return_value = MagicMock()
+
+        report_renderer = ReportRenderer(tel, max_workers=2)
+        # Процессы в юнит тестах не нужны, подменяем пул потоками
+        report_renderer.pool = ThreadPoolExecutor(max_workers=2)
+        yield report_renderer
+        report_renderer.close()
+
+    async def test_landing_page_rendered_once(self, report_renderer, rendered_htmls):
+        # Act
+        reports = await asyncio.gather(*[
+            report_renderer.render_finance_report(RENT_PAGE, PURCHASE_PAGE)
+            for _ in range(5)
+        ])
+
+        # Assert
+        assert len(rendered_htmls) == 1 + 5 * 2
+        assert sum('landing' in html for html in rendered_htmls) == 1
+        assert all(len(PdfReader(io.BytesIO(report)).pages) == 3 for report in reports)
+
+    async def test_finished_estate_report_has_two_pages(self, report_renderer, rendered_htmls):
+        # Arrange
+        await report_renderer.start()
+        rendered_htmls.clear()
+
+        # Act
+        report = await report_renderer.render_finance_report(RENT_PAGE, None)
+
+        # Assert
+        assert len(rendered_htmls) == 1
+        assert "С ДАТЫ ПОКУПКИ" in rendered_htmls[0]
+        assert len(PdfReader(io.BytesIO(report)).pages) == 2
+
+    async def test_templates_use_absolute_image_paths(self, report_renderer, rendered_htmls):
+        # Act
+        await report_renderer.render_finance_report(RENT_PAGE, PURCHASE_PAGE)
+
+        # Assert
+        assert all('src="../img/' not in html for html in rendered_htmls)
+        assert any('src="file:///' in html for html in rendered_htmls)
+
+    async def test_failed_landing_render_is_retried(self, report_renderer, monkeypatch):
+        # Arrange
+        calls = []
+
+        def render_pdf(html, options):
+            calls.append(html)
+            if len(calls) == 1:
+                raise RuntimeError("wkhtmltopdf упал")
+            return blank_pdf()
+
+        monkeypatch.setattr(render_worker, "render_pdf", render_pdf)
+
+        # Act
+        with pytest.raises(RuntimeError):
+            await report_renderer.render_finance_report(RENT_PAGE, None)
+        report = await report_renderer.render_finance_report(RENT_PAGE, None)
+
+        # Assert
+        assert len(PdfReader(io.BytesIO(report)).pages) == 2
+
+    async def test_broken_pool_is_rebuilt(self, report_renderer, monkeypatch):
+        # Arrange
+        class BrokenPool(ThreadPoolExecutor):
+            def submit(self, fn, /, *args, **kwargs):
+                raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+
+        broken_pool = BrokenPool(max_workers=1)
+        report_renderer.close()
+        report_renderer.pool = broken_pool
+        monkeypatch.setattr(renderer, "ProcessPoolExecutor", lambda **kwargs: ThreadPoolExecutor(max_workers=2))
+
+        # Act
+        with pytest.raises(BrokenProcessPool):
+            await report_renderer.render_finance_report(RENT_PAGE, None)
+        report = await report_renderer.render_finance_report(RENT_PAGE, None)
+
+        # Assert
+        assert broken_pool._shutdown
+        assert report_renderer.pool is not broken_pool
+        assert len(PdfReader(io.BytesIO(report)).pages) == 2
+
+    async def test_stage_durations_are_recorded(self, report_renderer, metric_reader):
+        # Act
+        await report_renderer.render_finance_report(RENT_PAGE, PURCHASE_PAGE)
+
+        # Assert
+        points = utils.collect_metric_points(metric_reader, {common.REPORT_RENDER_STAGE_DURATION_METRIC})
+        assert {point.attributes[common.REPORT_RENDER_STAGE_KEY] for point in points} == {
+            "template", "landing", "pages", "merge", "total"
+        }
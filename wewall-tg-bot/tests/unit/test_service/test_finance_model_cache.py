@@ -0,0 +1,254 @@
+import os
+import time
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from aiogram.types import BufferedInputFile
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+
+from internal import common, model
+from internal.service.finance_model_cache import service
+from internal.service.finance_model_cache.service import FinanceModelCache
+
+from tests.unit import utils
+
+
+def create_finance_model():
+    return model.FinanceModelResponse(
+        buying_property=15000000,
+        sale_property=18000000,
+        sale_tax=500000,
+        rent_tax=300000,
+        price_of_finishing=1000000,
+        rent_flow=2000000,
+        terminal_value=20000000,
+        sale_income=3000000,
+        rent_income=5000000,
+        added_value=2500000,
+        rent_irr=12.5,
+        sale_irr=8.7,
+    )
+
+
+class TestFinanceModelCache:
+
+    @pytest.fixture
+    def metric_reader(self):
+        return InMemoryMetricReader()
+
+    @pytest.fixture
+    def tel(self, metric_reader):
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("test")
+        tel.meter.return_value = MeterProvider(metric_readers=[metric_reader]).get_meter("test")
+        tel.logger.return_value = MagicMock()
+        return tel
+
+    @pytest.fixture
+    def finance_model_cache(self, tel, mocks, tmp_path):
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.return_value = (
+            create_finance_model(),
+            b"xlsx",
+        )
+        mocks["estate_calculator_client"].calc_finance_model_building_office_bundle.return_value = (
+            create_finance_model(),
+            b"xlsx",
+        )
+        mocks["estate_calculator_client"].generate_pdf.return_value = BufferedInputFile(b"pdf", filename="report.pdf")
+
+        return FinanceModelCache(
+            tel=tel,
+            estate_calculator_client=mocks["estate_calculator_client"],
+            cache_dir=str(tmp_path),
+            reference_data_version="1",
+        )
+
+    async def test_miss_calculates_once_and_hit_reads_disk(self, mocks, finance_model_cache, metric_reader, tmp_path):
+        # Act
+        first = await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        second = await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        assert first == second == model.FinanceModelBundle(create_finance_model(), b"xlsx", b"pdf")
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.assert_awaited_once()
+        mocks["estate_calculator_client"].generate_pdf.assert_awaited_once()
+        assert sorted(path.suffix for path in tmp_path.iterdir()) == [".json", ".pdf", ".xlsx"]
+
+        lookups = {
+            point.attributes[common.CACHE_RESULT_KEY]: point.value
+            for point in utils.collect_metric_points(metric_reader, {common.FINANCE_MODEL_CACHE_LOOKUP_TOTAL_METRIC})
+        }
+        assert lookups == {"miss": 1, "hit": 1}
+
+    async def test_equivalent_inputs_share_entry(self, mocks, finance_model_cache):
+        # Act
+        await finance_model_cache.finished_office_bundle(50.001, 300000.004, 1, "A", "Арбатская ", 500.2, 0)
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.assert_awaited_once_with(
+            square=50.0,
+            price_per_meter=300000.0,
+            need_repairs=1,
+            estate_category="A",
+            metro_station_name="Арбатская",
+            distance_to_metro=500,
+            nds_rate=0,
+        )
+
+    async def test_estate_types_do_not_collide(self, mocks, finance_model_cache):
+        # Act
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        await finance_model_cache.building_office_bundle("4Q2026", 50, "Арбатская", 500, "A", 300000, 0, {"1Q2025": 100})
+
+        # Assert
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.assert_awaited_once()
+        mocks["estate_calculator_client"].calc_finance_model_building_office_bundle.assert_awaited_once()
+        assert [c.args[0] for c in mocks["estate_calculator_client"].generate_pdf.await_args_list] == [
+            common.FinishStateCommand.estate_calculator_finished_office,
+            common.FinishStateCommand.estate_calculator_building_office,
+        ]
+
+    async def test_concurrent_requests_calculate_once(self, mocks, finance_model_cache):
+        # Arrange
+        release = asyncio.Event()
+
+        async def slow_bundle(**kwargs):
+            await release.wait()
+            return create_finance_model(), b"xlsx"
+
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.side_effect = slow_bundle
+
+        # Act
+        tasks = [
+            asyncio.create_task(finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        # Assert
+        assert all(result.pdf == b"pdf" for result in results)
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.assert_awaited_once()
+        mocks["estate_calculator_client"].generate_pdf.assert_awaited_once()
+
+    async def test_evicts_least_recently_used(self, tel, mocks, finance_model_cache, tmp_path):
+        # Arrange
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        entry_bytes = finance_model_cache.total_bytes
+        finance_model_cache.max_bytes = entry_bytes * 2
+
+        await finance_model_cache.finished_office_bundle(60, 300000, 1, "A", "Арбатская", 500, 0)
+        # Первая запись становится самой свежей
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Act
+        await finance_model_cache.finished_office_bundle(70, 300000, 1, "A", "Арбатская", 500, 0)
+        await finance_model_cache.finished_office_bundle(60, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        squares = [
+            c.kwargs["square"]
+            for c in mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.await_args_list
+        ]
+        assert squares == [50, 60, 70, 60]
+        assert finance_model_cache.total_bytes <= entry_bytes * 2
+        assert len(list(tmp_path.iterdir())) == 2 * 3
+
+    async def test_index_is_restored_from_disk(self, tel, mocks, finance_model_cache, tmp_path):
+        # Arrange
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        (tmp_path / "broken.xlsx").write_bytes(b"xlsx")
+        (tmp_path / "tmpabc.tmp").write_bytes(b"partial")
+
+        restarted_cache = FinanceModelCache(
+            tel=tel,
+            estate_calculator_client=mocks["estate_calculator_client"],
+            cache_dir=str(tmp_path),
+            reference_data_version="1",
+        )
+
+        # Act
+        bundle = await restarted_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        assert bundle.xlsx == b"xlsx"
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.assert_awaited_once()
+        assert not (tmp_path / "broken.xlsx").exists()
+        assert not (tmp_path / "tmpabc.tmp").exists()
+
+    async def test_calculator_error_is_not_cached(self, mocks, finance_model_cache, tmp_path):
+        # Arrange
+        err = common.MetroStationNotFound("Станция не найдена")
+        mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.side_effect = [
+            err,
+            (create_finance_model(), b"xlsx"),
+        ]
+
+        # Act
+        with pytest.raises(common.MetroStationNotFound):
+            await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        bundle = await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        assert bundle.pdf == b"pdf"
+        assert mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.await_count == 2
+        assert finance_model_cache.in_flight == {}
+
+    async def test_new_deal_quarter_recalculates(self, mocks, finance_model_cache, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(service, "deal_quarter", lambda: "4Q2026")
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Act
+        monkeypatch.setattr(service, "deal_quarter", lambda: "1Q2027")
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        assert mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.await_count == 2
+
+    async def test_reference_data_version_change_recalculates(self, tel, mocks, finance_model_cache, tmp_path):
+        # Arrange
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        updated_cache = FinanceModelCache(
+            tel=tel,
+            estate_calculator_client=mocks["estate_calculator_client"],
+            cache_dir=str(tmp_path),
+            reference_data_version="2",
+        )
+
+        # Act
+        await updated_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        assert mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.await_count == 2
+
+    async def test_expired_entry_is_recalculated(self, tel, mocks, finance_model_cache, metric_reader, tmp_path):
+        # Arrange
+        await finance_model_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        expired_at = time.time() - 2 * 60 * 60
+        for path in tmp_path.iterdir():
+            os.utime(path, (expired_at, expired_at))
+
+        restarted_cache = FinanceModelCache(
+            tel=tel,
+            estate_calculator_client=mocks["estate_calculator_client"],
+            cache_dir=str(tmp_path),
+            reference_data_version="1",
+            ttl=60 * 60,
+        )
+
+        # Act
+        await restarted_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+        restarted_cache.created_at = {key: expired_at for key in restarted_cache.created_at}
+        await restarted_cache.finished_office_bundle(50, 300000, 1, "A", "Арбатская", 500, 0)
+
+        # Assert
+        assert mocks["estate_calculator_client"].calc_finance_model_finished_office_bundle.await_count == 3
+        assert len(list(tmp_path.iterdir())) == 3
+        points = utils.collect_metric_points(metric_reader, {common.FINANCE_MODEL_CACHE_LOOKUP_TOTAL_METRIC})
+        assert {point.attributes[common.CACHE_RESULT_KEY] for point in points} >= {"miss", "expired"}
@@ -0,0 +1,285 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+
+from internal import common, model
+from internal.service.estate_search import offer_prefetcher
+from internal.service.estate_search.offer_prefetcher import OfferPrefetcher
+
+from tests.unit import utils
+
+
+def create_offer(offer_id: int, estate_id: int, offer_readiness: int = 1) -> model.SaleOffer:
+    return model.SaleOffer({
+        "id": offer_id,
+        "estate_id": estate_id,
+        "estate_name": "Бизнес-центр",
+        "estate_category": "B+",
+        "estate_address": "Москва, ул. Тверская 1",
+        "estate_coords": {"lat": 55.75, "lon": 37.61},
+        "metro_stations": [
+            {"name": "Тверская", "time_leg": 10, "time_car": 5, "leg_distance": 800, "car_distance": 1200},
+            {"name": "Пушкинская", "time_leg": 5, "time_car": 3, "leg_distance": 400, "car_distance": 600},
+        ],
+        "link": f"https://wewall.ru/offer/{offer_id}",
+        "name": f"Офис {offer_id}",
+        "square": 120.5,
+        "price": 36000000,
+        "price_per_meter": 300000,
+        "design": 1,
+        "floor": 5,
+        "type": 1,
+        "image_urls": [f"https://img.wewall.ru/{offer_id}/1.jpg", f"https://img.wewall.ru/{offer_id}/broken.jpg"],
+        "offer_readiness": offer_readiness,
+        "readiness_date": "4Q2026",
+        "description": "Офис с отделкой",
+    })
+
+
+def create_state(offers: list[model.SaleOffer], motivation: int = 1) -> model.EstateSearchState:
+    return model.EstateSearchState(
+        id=1,
+        state_id=1,
+        current_estate_id=0,
+        current_offer_id=0,
+        offer_type=common.EstateSearchOfferType.sale,
+        offer_ids=[offer.id for offer in offers],
+        offer_estate_ids=[offer.estate_id for offer in offers],
+        estate_search_params={"motivation": motivation},
+        expires_at=datetime.now() + timedelta(days=1),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+def serve_offers(mocks, offers: list[model.SaleOffer]):
+    offers_by_id = {offer.id: offer for offer in offers}
+
+    async def offers_by_ids(offer_type, offer_ids):
+        return [offers_by_id[offer_id] for offer_id in offer_ids if offer_id in offers_by_id]
+
+    mocks["estate_search_client"].offers_by_ids.side_effect = offers_by_ids
+
+
+def image_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("broken.jpg"):
+        return httpx.Response(404)
+    return httpx.Response(200, headers={"content-type": "image/jpeg"})
+
+
+class TestOfferPrefetcher:
+
+    @pytest.fixture(autouse=True)
+    def mock_transport(self, monkeypatch):
+        async_client = httpx.AsyncClient
+        monkeypatch.setattr(
+            offer_prefetcher.httpx,
+            "AsyncClient",
+            lambda **kwargs: async_client(transport=httpx.MockTransport(image_handler), **kwargs)
+        )
+
+    @pytest.fixture
+    def metric_reader(self):
+        return InMemoryMetricReader()
+
+    @pytest.fixture
+    def prefetcher(self, mocks, metric_reader):
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("test")
+        tel.meter.return_value = MeterProvider(metric_readers=[metric_reader]).get_meter("test")
+        tel.logger.return_value = MagicMock()
+
+        return OfferPrefetcher(
+            tel=tel,
+            estate_search_client=mocks["estate_search_client"],
+            finance_model_cache=mocks["finance_model_cache"],
+            max_concurrency=8,
+            user_concurrency=2,
+        )
+
+    def lookups(self, metric_reader) -> dict:
+        return {
+            point.attributes[common.CACHE_RESULT_KEY]: point.value
+            for point in utils.collect_metric_points(metric_reader, {common.OFFER_PREFETCH_LOOKUP_TOTAL_METRIC})
+        }
+
+    async def test_prefetch_warms_finance_model_and_resolves_images(self, mocks, prefetcher, metric_reader):
+        # Arrange
+        offers = [create_offer(0, 0), create_offer(1, 0)]
+        serve_offers(mocks, offers)
+
+        # Act
+        prefetcher.prefetch(123, create_state(offers), 0)
+        await asyncio.sleep(0.05)
+        image_urls = await prefetcher.image_urls(123, 1, offers[1])
+
+        # Assert
+        assert image_urls == ["https://img.wewall.ru/1/1.jpg"]
+        mocks["finance_model_cache"].finished_office_bundle.assert_awaited_once_with(
+            120.5,
+            300000,
+            1,
+            "B",
+            "Пушкинская",
+            400,
+            0,
+        )
+        assert self.lookups(metric_reader) == {"hit": 1}
+
+    async def test_prefetches_next_offer_and_next_estate(self, mocks, prefetcher):
+        # Arrange
+        offers = [create_offer(0, 0), create_offer(1, 0), create_offer(2, 1, offer_readiness=2)]
+        serve_offers(mocks, offers)
+
+        # Act
+        prefetcher.prefetch(123, create_state(offers), 0)
+        await asyncio.sleep(0.05)
+
+        # Assert
+        mocks["finance_model_cache"].finished_office_bundle.assert_awaited_once()
+        mocks["finance_model_cache"].building_office_bundle.assert_awaited_once_with(
+            "4Q2026",
+            120.5,
+            "Пушкинская",
+            400,
+            "B+",
+            300000,
+            0,
+            {"1Q2025": 100},
+        )
+
+    async def test_rent_search_skips_finance_model(self, mocks, prefetcher):
+        # Arrange
+        offers = [create_offer(0, 0), create_offer(1, 0)]
+        serve_offers(mocks, offers)
+
+        # Act
+        prefetcher.prefetch(123, create_state(offers, motivation=2), 0)
+        await asyncio.sleep(0.05)
+        image_urls = await prefetcher.image_urls(123, 1, offers[1])
+
+        # Assert
+        assert image_urls == ["https://img.wewall.ru/1/1.jpg"]
+        mocks["finance_model_cache"].finished_office_bundle.assert_not_awaited()
+
+    async def test_not_prefetched_offer_is_miss(self, prefetcher, metric_reader):
+        # Arrange
+        offer = create_offer(1, 0)
+
+        # Act
+        image_urls = await prefetcher.image_urls(123, 1, offer)
+
+        # Assert
+        assert image_urls == offer.image_urls
+        assert self.lookups(metric_reader) == {"miss": 1}
+
+    async def test_new_search_does_not_reuse_old_offers(self, mocks, prefetcher, metric_reader):
+        # Arrange
+        offers = [create_offer(0, 0), create_offer(1, 0)]
+        serve_offers(mocks, offers)
+        prefetcher.prefetch(123, create_state(offers), 0)
+        await asyncio.sleep(0.05)
+        new_offer = create_offer(11, 0)
+
+        # Act
+        image_urls = await prefetcher.image_urls(123, 1, new_offer)
+
+        # Assert
+        assert image_urls == new_offer.image_urls
+        assert self.lookups(metric_reader) == {"miss": 1}
+
+    async def test_waits_for_prefetch_in_flight(self, mocks, prefetcher, metric_reader):
+        # Arrange
+        release = asyncio.Event()
+
+        async def slow_bundle(*args):
+            await release.wait()
+
+        mocks["finance_model_cache"].finished_office_bundle.side_effect = slow_bundle
+        offers = [create_offer(0, 0), create_offer(1, 0)]
+        serve_offers(mocks, offers)
+
+        prefetcher.prefetch(123, create_state(offers), 0)
+        await asyncio.sleep(0.05)
+
+        # Act
+        lookup = asyncio.create_task(prefetcher.image_urls(123, 1, offers[1]))
+        await asyncio.sleep(0.05)
+        assert not lookup.done()
+        release.set()
+
+        # Assert
+        assert await lookup == ["https://img.wewall.ru/1/1.jpg"]
+        assert self.lookups(metric_reader) == {"in_flight": 1}
+
+    async def test_cancel_stops_prefetch(self, mocks, prefetcher, metric_reader):
+        # Arrange
+        async def hanging_bundle(*args):
+            await asyncio.Event().wait()
+
+        mocks["finance_model_cache"].finished_office_bundle.side_effect = hanging_bundle
+        offers = [create_offer(0, 0), create_offer(1, 0)]
+        serve_offers(mocks, offers)
+
+        prefetcher.prefetch(123, create_state(offers), 0)
+        await asyncio.sleep(0.05)
+        [task] = prefetcher.tasks[123].values()
+
+        # Act
+        prefetcher.cancel(123)
+        await asyncio.gather(task, return_exceptions=True)
+
+        # Assert
+        assert task.cancelled()
+        assert 123 not in prefetcher.tasks
+
+        [point] = utils.collect_metric_points(metric_reader, {common.OFFER_PREFETCH_TOTAL_METRIC})
+        assert dict(point.attributes) == {common.OUTCOME_KEY: "cancelled"}
+
+    async def test_user_concurrency_is_bounded(self, mocks, prefetcher):
+        # Arrange
+        prefetcher.user_concurrency = 1
+        running = 0
+        max_running = 0
+
+        async def slow_bundle(*args):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        mocks["finance_model_cache"].finished_office_bundle.side_effect = slow_bundle
+        offers = [create_offer(0, 0), create_offer(1, 0), create_offer(2, 1)]
+        serve_offers(mocks, offers)
+
+        # Act
+        prefetcher.prefetch(123, create_state(offers), 0)
+        await asyncio.gather(*prefetcher.tasks[123].values())
+
+        # Assert
+        assert mocks["finance_model_cache"].finished_office_bundle.await_count == 2
+        assert max_running == 1
+
+    async def test_removed_offer_falls_back_to_shown_offer(self, mocks, prefetcher, metric_reader):
+        # Arrange
+        offers = [create_offer(0, 0), create_offer(1, 0)]
+        serve_offers(mocks, offers[:1])
+
+        # Act
+        prefetcher.prefetch(123, create_state(offers), 0)
+        await asyncio.sleep(0.05)
+        image_urls = await prefetcher.image_urls(123, 1, offers[1])
+
+        # Assert
+        assert image_urls == offers[1].image_urls
+        mocks["finance_model_cache"].finished_office_bundle.assert_not_awaited()
+
+        [point] = utils.collect_metric_points(metric_reader, {common.OFFER_PREFETCH_TOTAL_METRIC})
+        assert dict(point.attributes) == {common.OUTCOME_KEY: "not_found"}
@@ -84,6 +84,46 @@ class TestStateService:
         tracer = state_service.tracer
         utils.assert_span_error(tracer, err, 1)
 
+    async def test_state_for_update(self, mocks, state_service):
+        # Arrange
+        tg_chat_id = 123456789
+        expected_state = utils.create_state(common.StateStatuses.wewall_expert)
+
+        mocks["state_repo"].state_for_update.return_value = (expected_state, False)
+
+        # Act
+        result = await state_service.state_for_update(tg_chat_id, common.StateStatuses.wewall_expert, False)
+
+        # Assert
+        assert result == (expected_state, False)
+
+        mocks["state_repo"].state_for_update.assert_awaited_once_with(
+            tg_chat_id,
+            common.StateStatuses.wewall_expert,
+            False
+        )
+        tracer = state_service.tracer
+        utils.assert_span(tracer, [
+            {"name": "StateService.state_for_update", "attributes": {
+                "tg_chat_id": tg_chat_id,
+                "status": common.StateStatuses.wewall_expert,
+                "count_message": False,
+            }}
+        ])
+
+    async def test_state_for_update_err(self, mocks, state_service):
+        # Arrange
+        err = Exception("Ошибка при state_for_update")
+        mocks["state_repo"].state_for_update.side_effect = err
+
+        # Act
+        with pytest.raises(Exception, match="Ошибка при state_for_update"):
+            await state_service.state_for_update(123456789, common.StateStatuses.wewall_expert, True)
+
+        # Assert
+        tracer = state_service.tracer
+        utils.assert_span_error(tracer, err, 1)
+
     async def test_increment_message_count(self, mocks, state_service):
         # Arrange
         state_id = 1
@@ -0,0 +1,142 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+
+from internal import common
+from internal.service.subscription.service import SubscriptionService
+
+from tests.unit import utils
+
+
+class TestSubscriptionService:
+
+    @pytest.fixture
+    def metric_reader(self):
+        return InMemoryMetricReader()
+
+    @pytest.fixture
+    def subscription_service(self, mocks, metric_reader):
+        tel = MagicMock()
+        tel.tracer.return_value = TracerProvider().get_tracer("test")
+        tel.meter.return_value = MeterProvider(metric_readers=[metric_reader]).get_meter("test")
+        tel.logger.return_value = MagicMock()
+
+        mocks["redis"].get.return_value = None
+
+        return SubscriptionService(
+            tel=tel,
+            bot=mocks["bot"],
+            redis=mocks["redis"],
+            wewall_tg_channel_login="@wewall",
+            positive_ttl=300,
+            l1_ttl=30,
+            refresh_interval=60,
+        )
+
+    async def test_miss_checks_api_and_caches_subscription(self, mocks, subscription_service):
+        # Act
+        result = await subscription_service.is_subscribed(123)
+
+        # Assert
+        assert result is True
+        mocks["bot"].get_chat_member.assert_awaited_once_with(chat_id="@wewall", user_id=123)
+        mocks["redis"].set.assert_awaited_once_with("tg-bot:subscription:123", 1, ttl=300)
+
+    async def test_l1_hit_skips_redis_and_api(self, mocks, subscription_service, metric_reader):
+        # Arrange
+        await subscription_service.is_subscribed(123)
+        mocks["redis"].get.reset_mock()
+
+        # Act
+        results = [await subscription_service.is_subscribed(123) for _ in range(5)]
+
+        # Assert
+        assert results == [True] * 5
+        mocks["bot"].get_chat_member.assert_awaited_once()
+        mocks["redis"].get.assert_not_awaited()
+
+        lookups = {
+            point.attributes[common.CACHE_RESULT_KEY]: point.value
+            for point in utils.collect_metric_points(metric_reader, {common.SUBSCRIPTION_CACHE_LOOKUP_TOTAL_METRIC})
+        }
+        assert lookups == {"miss": 1, "l1_hit": 5}
+        [saved] = utils.collect_metric_points(metric_reader, {common.SUBSCRIPTION_API_CALL_SAVED_TOTAL_METRIC})
+        assert saved.value == 5
+
+    async def test_redis_hit_skips_api(self, mocks, subscription_service):
+        # Arrange
+        mocks["redis"].get.return_value = "1"
+
+        # Act
+        result = await subscription_service.is_subscribed(123)
+
+        # Assert
+        assert result is True
+        mocks["redis"].get.assert_awaited_once_with("tg-bot:subscription:123")
+        mocks["bot"].get_chat_member.assert_not_awaited()
+
+    async def test_not_subscribed_is_not_cached(self, mocks, subscription_service):
+        # Arrange
+        mocks["bot"].get_chat_member.return_value = MagicMock(status="left")
+
+        # Act
+        results = [await subscription_service.is_subscribed(123) for _ in range(2)]
+
+        # Assert
+        assert results == [False, False]
+        assert mocks["bot"].get_chat_member.await_count == 2
+        mocks["redis"].set.assert_not_awaited()
+
+    async def test_redis_error_falls_back_to_api(self, mocks, subscription_service):
+        # Arrange
+        mocks["redis"].set.side_effect = Exception("Redis недоступен")
+
+        # Act
+        result = await subscription_service.is_subscribed(123)
+
+        # Assert
+        assert result is True
+        subscription_service.logger.warning.assert_called_once()
+
+    async def test_invalidate_drops_cached_subscription(self, mocks, subscription_service):
+        # Arrange
+        await subscription_service.is_subscribed(123)
+
+        # Act
+        await subscription_service.invalidate(123)
+        await subscription_service.is_subscribed(123)
+
+        # Assert
+        mocks["redis"].delete.assert_awaited_once_with("tg-bot:subscription:123")
+        assert mocks["bot"].get_chat_member.await_count == 2
+
+    async def test_refresh_rechecks_only_active_expiring_users(self, mocks, subscription_service):
+        # Arrange
+        subscription_service.positive_ttl = 30
+        await subscription_service.is_subscribed(1)
+        subscription_service.positive_ttl = 300
+        await subscription_service.is_subscribed(2)
+        mocks["bot"].get_chat_member.reset_mock()
+
+        # Act
+        await subscription_service._SubscriptionService__refresh_active_subscriptions()
+
+        # Assert
+        mocks["bot"].get_chat_member.assert_awaited_once_with(chat_id="@wewall", user_id=1)
+
+    async def test_refresh_forgets_inactive_users(self, mocks, subscription_service):
+        # Arrange
+        subscription_service.positive_ttl = 30
+        await subscription_service.is_subscribed(1)
+        subscription_service.active_users[1] -= subscription_service.active_user_window + 1
+        mocks["bot"].get_chat_member.reset_mock()
+
+        # Act
+        await subscription_service._SubscriptionService__refresh_active_subscriptions()
+
+        # Assert
+        mocks["bot"].get_chat_member.assert_not_awaited()
+        assert 1 not in subscription_service.active_users
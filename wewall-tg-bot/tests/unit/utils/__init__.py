@@ -1,3 +1,4 @@
 from tests.unit.utils.general import *
 from tests.unit.utils.estate_search import *
-from tests.unit.utils.finance_model import *
\ No newline at end of file
+from tests.unit.utils.finance_model import *
+from tests.unit.utils.redis import *
@@ -1,34 +1,36 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
-from internal import model
+from internal import model, common
 
 
 def create_estate_search_state(strategy: str, type: str, amount: int):
-    if strategy == "Аренда" and type == "Офис":
-        offers = [create_rent_offer("Офис") for _ in range(amount)]
-    elif strategy == "Аренда" and type == "Ритейл":
-        offers = [create_rent_offer("Ритейл") for _ in range(amount)]
-    elif strategy == "Покупка" and type == "Офис":
-        offers = [create_sale_offer("Офис") for _ in range(amount)]
-    elif strategy == "Покупка" and type == "Ритейл":
-        offers = [create_sale_offer("Ритейл") for _ in range(amount)]
-    else:
+    if strategy not in ("Аренда", "Покупка") or type not in ("Офис", "Ритейл"):
         raise Exception("Invalid strategy or type")
 
     return model.EstateSearchState(
         id=1,
         state_id=1,
+        current_estate_id=0,
         current_offer_id=0,
-        offers=offers,
+        offer_type=common.EstateSearchOfferType.rent if strategy == "Аренда" else common.EstateSearchOfferType.sale,
+        offer_ids=list(range(1, amount + 1)),
+        offer_estate_ids=list(range(amount)),
         estate_search_params=estate_search_params(strategy, type),
+        expires_at=datetime.now() + timedelta(days=1),
         created_at=datetime.now(),
         updated_at=datetime.now()
     )
 
 
+def create_offer(strategy: str, type: str):
+    if strategy == "Аренда":
+        return create_rent_offer(type)
+    return create_sale_offer(type)
+
+
 def estate_search_state():
     return {
         "estate_type": "rent",
@@ -49,36 +51,57 @@ def estate_search_params(strategy: str, type: str):
         "floor": 1,
         "irr": 18.0,
         "nds": 20,
-        "m_a_p": 2000
+        "m_a_p": 2000,
+        "motivation": 1 if strategy == "Покупка" else 2
     }
 
 
-def create_rent_offer(type: str):
-    rent_offer = MagicMock(spec=model.RentOffer)
-    rent_offer.rent_offer_type = 0 if type == "Офис" else 1
-    rent_offer.rent_offer_square = 100
-    rent_offer.rent_offer_price_per_month = 150000
-    rent_offer.rent_offer_design = 1
-    rent_offer.estate_category = "A+"
-    rent_offer.rent_offer_link = "https://example.com/sale/123"
-    rent_offer.rent_offer_image_urls = ["https://example.com/img1.jpg"]
-
-    # Metro stations
-    metro_station1 = MagicMock(spec=model.MetroStation)
-    metro_station1.name = "Сокольники"
-    metro_station1.leg_distance = 300
-
-    metro_station2 = MagicMock(spec=model.MetroStation)
-    metro_station2.name = "Красносельская"
-    metro_station2.leg_distance = 600
-
-    rent_offer.metro_stations = [metro_station1, metro_station2]
+def create_rent_offer(type: str, offer_id: int = 1, estate_id: int = 0):
+    rent_offer = model.RentOffer(
+        offer_dict={
+            "id": offer_id,
+            "estate_id": estate_id,
+            "estate_name": "Estate name",
+            "estate_category": "A+",
+            "estate_address": "Космонавтов 213",
+            "estate_coords": {"lat": 30.123, "lon": 29.2133},
+            "metro_stations": [
+                {
+                    "name": "Сокольники",
+                    "time_leg": 4,
+                    "time_car": 2,
+                    "leg_distance": 300,
+                    "car_distance": 400
+                },
+                {
+                    "name": "Красносельская",
+                    "time_leg": 8,
+                    "time_car": 3,
+                    "leg_distance": 600,
+                    "car_distance": 700
+                }
+            ],
+            "link": "https://example.com/rent/123",
+            "name": "rent_offer_name",
+            "square": 100,
+            "price_per_month": 150000,
+            "design": 1,
+            "floor": 1,
+            "type": 0 if type == "Офис" else 1,
+            "image_urls": ["https://example.com/img1.jpg"],
+            "offer_readiness": 1,
+            "readiness_date": "",
+            "description": "description"
+        }
+    )
     return rent_offer
 
 
-def create_sale_offer(type: str):
+def create_sale_offer(type: str, offer_id: int = 1, estate_id: int = 0):
     sale_offer = model.SaleOffer(
         offer_dict={
+            "id": offer_id,
+            "estate_id": estate_id,
             "estate_name": "Estate name",
             "estate_category": "A+",
             "estate_address": "Космонавтов 213",
@@ -90,15 +113,18 @@ def create_sale_offer(type: str):
                 "leg_distance": 800,
                 "car_distance": 850
             }],
-            "sale_offer_link": "https://example.com/sale/123",
-            "sale_offer_name": "sale_offer_name",
-            "sale_offer_square": 50,
-            "sale_offer_price": 5000000,
-            "sale_offer_price_per_meter": 100000,
-            "sale_offer_design": 0,
-            "sale_offer_floor": 5,
-            "sale_offer_type": 0 if type == "Офис" else 1,
-            "sale_offer_image_urls": ["https://example.com/img1.jpg"]
+            "link": "https://example.com/sale/123",
+            "name": "sale_offer_name",
+            "square": 50,
+            "price": 5000000,
+            "price_per_meter": 100000,
+            "design": 0,
+            "floor": 5,
+            "type": 0 if type == "Офис" else 1,
+            "image_urls": ["https://example.com/img1.jpg"],
+            "offer_readiness": 1,
+            "readiness_date": "",
+            "description": "description"
         }
     )
     return sale_offer
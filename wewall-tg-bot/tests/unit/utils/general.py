@@ -31,6 +31,14 @@ def create_message(text="Test message", user_id=123, chat_id=456, username="test
     return message
 
 
+def create_llm_stream(*chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return stream()
+
+
 def create_callback_query(data, message, user_id=123, username="testuser"):
     callback = MagicMock(spec=CallbackQuery)
     callback.data = data
@@ -55,14 +63,16 @@ def create_update(message=None, callback_query=None):
     return update
 
 
-def create_state(status: str, count_estate_calculator=0, count_estate_search=0):
+def create_state(status: str, count_estate_calculator=0, count_estate_search=0, count_message=0,
+                 is_transferred_to_manager=False):
     state = model.State(
         id=1,
         tg_chat_id=52,
         status=status,
+        is_transferred_to_manager=is_transferred_to_manager,
         count_estate_search=count_estate_search,
         count_estate_calculator=count_estate_calculator,
-        count_message=0,
+        count_message=count_message,
         created_at=datetime.now(),
         updated_at=datetime.now(),
     )
@@ -94,15 +104,24 @@ def assert_span(
     ])
 
 
-def assert_span_error(tracer, err: Exception, call_count: int):
+def assert_span_error(tracer, err: Exception, call_count: int, ok_count: int = 0):
     span_mock = tracer.start_as_current_span.return_value.__enter__.return_value
     assert span_mock.record_exception.call_count == call_count
     span_mock.record_exception.assert_has_calls([
         call(err)
         for _ in range(call_count)
     ])
-    assert span_mock.set_status.call_count == call_count
+    assert span_mock.set_status.call_count == call_count + ok_count
     span_mock.set_status.assert_has_calls([
         call(StatusCode.ERROR, str(err))
         for _ in range(call_count)
-    ])
\ No newline at end of file
+    ])
+
+def collect_metric_points(metric_reader, metric_names: set[str]) -> list:
+    points = []
+    for resource_metrics in metric_reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name in metric_names:
+                    points.extend(metric.data.data_points)
+    return points
@@ -0,0 +1,89 @@
+import json
+from typing import Any
+
+
+class FakeRedis:
+    """Хранит данные в памяти и повторяет команды redis-py, которыми пользуется бот."""
+
+    def __init__(self):
+        self.data: dict[str, Any] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def set(self, key: str, value: Any, ttl: int = None) -> bool:
+        self._set(key, value if isinstance(value, str) else json.dumps(value), ex=ttl)
+        return True
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = self.data.get(key)
+        if value is None:
+            return default
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return value
+
+    async def delete(self, key: str) -> int:
+        return self._delete(key)
+
+    async def hgetall(self, key: str) -> dict:
+        return self._hgetall(key)
+
+    async def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def _set(self, key: str, value: Any, ex: int = None):
+        self.data[key] = str(value)
+        if ex:
+            self.ttls[key] = ex
+
+    def _delete(self, key: str) -> int:
+        self.ttls.pop(key, None)
+        return int(self.data.pop(key, None) is not None)
+
+    def _hgetall(self, key: str) -> dict:
+        return dict(self.data.get(key, {}))
+
+    def _hset(self, key: str, mapping: dict) -> int:
+        self.data.setdefault(key, {}).update({field: str(value) for field, value in mapping.items()})
+        return len(mapping)
+
+    def _hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        state_hash = self.data.setdefault(key, {})
+        state_hash[field] = str(int(state_hash.get(field, 0)) + amount)
+        return int(state_hash[field])
+
+    def _expire(self, key: str, ttl: int) -> bool:
+        self.ttls[key] = ttl
+        return key in self.data
+
+    def _sadd(self, key: str, *values) -> int:
+        members = self.data.setdefault(key, set())
+        added = {str(value) for value in values} - members
+        members.update(added)
+        return len(added)
+
+    def _spop(self, key: str, count: int) -> list[str]:
+        members = self.data.get(key, set())
+        popped = sorted(members)[:count]
+        members.difference_update(popped)
+        return popped
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self.redis, f"_{name}")
+
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results